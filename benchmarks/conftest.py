@@ -0,0 +1,155 @@
+"""
+Benchmark suite: the perf_*.py modules in this directory, run with
+
+    python -m pytest benchmarks [--bench-update-baseline] [--bench-fail-on-regression]
+
+Each benchmark times a callable with the 'bench' fixture. Results of the run
+are written to benchmarks/results-latest.json and compared with the committed
+benchmarks/baselines.json; anything whose best round is slower than the
+baseline's by more than --bench-tolerance is listed as a regression in the
+summary (the best round is far less noisy than the median on a busy machine). Baselines are
+machine-specific: refresh them with --bench-update-baseline on the machine
+the comparison should be made on.
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+BENCH_DIR = Path(__file__).parent
+BASELINES_PATH = BENCH_DIR / "baselines.json"
+RESULTS_PATH = BENCH_DIR / "results-latest.json"
+
+_results = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-update-baseline", action="store_true",
+                    help="write this run's results to benchmarks/baselines.json")
+    group.addoption("--bench-fail-on-regression", action="store_true",
+                    help="fail benchmarks slower than baseline * tolerance")
+    group.addoption("--bench-tolerance", type=float, default=1.5,
+                    help="slowdown factor over the baseline reported as a regression (default 1.5)")
+    group.addoption("--bench-rounds", type=int, default=None,
+                    help="override the number of timed rounds of every benchmark")
+
+
+def _load_baselines():
+    try:
+        return json.loads(BASELINES_PATH.read_text()).get("benchmarks", {})
+    except FileNotFoundError:
+        return {}
+
+
+def _machine():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+@pytest.fixture(autouse=True)
+def _isolated_user_data(tmp_path, monkeypatch):
+    """Benchmarks must not read or write the real user data dir."""
+    import constants as C
+
+    monkeypatch.setattr(C, "CONFIG_INDEX_PATH", tmp_path / "config-index.json")
+    monkeypatch.setattr(C, "CONNECT_TIMINGS_PATH", tmp_path / "connect-timings.json")
+    monkeypatch.setattr(C, "LOG_FILE_PATH", tmp_path / "openvpn-gui.log")
+
+
+@pytest.fixture
+def bench(request):
+    """
+    bench(fn, rounds=5, setup=None, items=None, unit="items") times fn()
+    'rounds' times (setup() runs untimed before each round) and records the
+    best and median round under the test's id. 'items' per call gives a
+    throughput figure.
+    """
+    config = request.config
+    name = f"{request.node.module.__name__}::{request.node.name}"
+
+    def run(fn, rounds=5, setup=None, items=None, unit="items"):
+        rounds = config.getoption("bench_rounds", None) or rounds
+        times = []
+        for _ in range(rounds):
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+        best = min(times)
+        result = {"best_s": best, "median_s": statistics.median(times), "rounds": rounds}
+        if items:
+            result["throughput"] = items / best
+            result["unit"] = f"{unit}/s"
+        _results[name] = result
+
+        baseline = _load_baselines().get(name)
+        tolerance = config.getoption("bench_tolerance", 1.5)
+        if (
+            baseline
+            and config.getoption("bench_fail_on_regression", False)
+            and best > baseline["best_s"] * tolerance
+        ):
+            pytest.fail(
+                f"{name}: {best * 1000:.2f}ms vs baseline {baseline['best_s'] * 1000:.2f}ms",
+                pytrace=False,
+            )
+        return result
+
+    return run
+
+
+def pytest_sessionfinish(session):
+    if not _results:
+        return
+    document = {"machine": _machine(), "benchmarks": dict(sorted(_results.items()))}
+    RESULTS_PATH.write_text(json.dumps(document, indent=2) + "\n")
+    if session.config.getoption("bench_update_baseline", False):
+        baselines = _load_baselines()
+        baselines.update(_results)
+        document["benchmarks"] = dict(sorted(baselines.items()))
+        BASELINES_PATH.write_text(json.dumps(document, indent=2) + "\n")
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _results:
+        return
+    baselines = _load_baselines()
+    tolerance = config.getoption("bench_tolerance", 1.5)
+    write = terminalreporter.write_line
+    terminalreporter.section("benchmarks")
+    write(f"{'benchmark':<56} {'best':>11} {'median':>11} {'baseline':>11} {'ratio':>7}  throughput")
+    for name, result in sorted(_results.items()):
+        baseline = baselines.get(name)
+        ratio = result["best_s"] / baseline["best_s"] if baseline else None
+        flag = "  REGRESSION" if ratio is not None and ratio > tolerance else ""
+        throughput = (
+            f"{result['throughput']:,.0f} {result['unit']}" if "throughput" in result else ""
+        )
+        write(
+            f"{name:<56} {result['best_s'] * 1000:>9.2f}ms {result['median_s'] * 1000:>9.2f}ms "
+            + (f"{baseline['best_s'] * 1000:>9.2f}ms {ratio:>6.2f}x" if baseline else f"{'-':>11} {'-':>7}")
+            + f"  {throughput}{flag}"
+        )
+    write(f"results written to {RESULTS_PATH}")
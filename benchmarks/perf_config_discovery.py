@@ -0,0 +1,55 @@
+"""discover_configs over a directory of 10k configs, cold and with the cached index."""
+import os
+import time
+
+import pytest
+
+import constants as C
+from config_manager import ConfigManager
+
+CONFIGS = 10_000
+
+
+@pytest.fixture(scope="module")
+def configs_dir(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("configs")
+    for i in range(CONFIGS):
+        (directory / f"provider-{i:05d}.ovpn").write_text("client\nremote vpn.example.com 1194\n")
+    # Older than the racy window, so the cached listing is trusted
+    past = time.time() - 60
+    os.utime(directory, (past, past))
+    return directory
+
+
+def make_manager(configs_dir):
+    manager = ConfigManager()
+    manager.config_dirs = [configs_dir]
+    return manager
+
+
+def test_discover_cold(bench, configs_dir):
+    manager = make_manager(configs_dir)
+
+    def forget_index():
+        C.CONFIG_INDEX_PATH.unlink(missing_ok=True)
+        manager._index = None
+
+    bench(manager.discover_configs, setup=forget_index, items=CONFIGS, unit="configs")
+    assert len(manager.discover_configs()) == CONFIGS
+
+
+def test_discover_from_index_on_disk(bench, configs_dir):
+    """A new session: the index is read from disk, the directory is not listed."""
+    make_manager(configs_dir).discover_configs()
+    manager = make_manager(configs_dir)
+
+    def forget_memory():
+        manager._index = None
+
+    bench(manager.discover_configs, setup=forget_memory, items=CONFIGS, unit="configs")
+
+
+def test_discover_warm(bench, configs_dir):
+    manager = make_manager(configs_dir)
+    manager.discover_configs()
+    bench(manager.discover_configs, items=CONFIGS, unit="configs")
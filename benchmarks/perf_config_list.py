@@ -0,0 +1,58 @@
+"""Populating and updating the config list with 10k configs."""
+from pathlib import Path
+
+import pytest
+
+from config_manager import VpnConfig
+from ui.config_list import ConfigList
+
+CONFIGS = 10_000
+
+
+@pytest.fixture
+def configs():
+    return [VpnConfig(f"provider-{i:05d}.ovpn", Path(f"/etc/openvpn/client/provider-{i:05d}.ovpn"))
+            for i in range(CONFIGS)]
+
+
+@pytest.fixture
+def config_list(qapp):
+    widget = ConfigList()
+    yield widget
+    widget.deleteLater()
+
+
+def test_set_configs(bench, config_list, configs):
+    bench(lambda: config_list.set_configs(configs), setup=config_list.clear_configs,
+          items=CONFIGS, unit="configs")
+
+
+def test_add_config_one_by_one(bench, config_list, configs):
+    def run():
+        for config in configs:
+            config_list.add_config(config)
+
+    bench(run, setup=config_list.clear_configs, rounds=3, items=CONFIGS, unit="configs")
+
+
+def test_sync_after_one_change(bench, config_list, configs):
+    """Background rediscovery finding one new config."""
+    changed = configs[:5000] + [VpnConfig("new.ovpn", Path("/tmp/new.ovpn"))] + configs[5000:]
+
+    def reset():
+        config_list.set_configs(configs)
+        config_list.select_config_by_path(str(configs[-1].path))
+
+    bench(lambda: config_list.sync_configs(changed), setup=reset)
+    assert config_list.get_selected_config_path() == str(configs[-1].path)
+
+
+def test_select_by_path(bench, config_list, configs):
+    config_list.set_configs(configs)
+    paths = [str(c.path) for c in configs[::100]]
+
+    def run():
+        for path in paths:
+            config_list.select_config_by_path(path)
+
+    bench(run, items=len(paths), unit="selections")
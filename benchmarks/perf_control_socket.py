@@ -0,0 +1,87 @@
+"""
+The control socket of control_server.py: request round-trips of one client,
+and one state change fanned out to many subscribed clients. The server runs
+on this thread's event loop, like in the app; clients are plain sockets.
+"""
+import json
+import socket
+import threading
+
+import pytest
+
+import constants as C
+from config_manager import ConfigManager
+from control_server import ControlServer
+from vpn_manager import VPNManager
+
+CALLS = 500
+SUBSCRIBERS = 50
+EVENTS = 20
+
+
+@pytest.fixture
+def server(qapp, tmp_path):
+    manager = VPNManager()
+    for i in range(4):
+        connection = manager._connection(f"/tmp/provider-{i}.ovpn")
+        connection._set_state(C.VpnState.CONNECTED)
+    server = ControlServer(manager, ConfigManager(), None)
+    assert server.listen(tmp_path / "control.sock")
+    yield server
+    server.close()
+
+
+def _connect(server):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(server.path)
+    return client
+
+
+def _serve_while(qapp, client_work):
+    """Run client_work() on a thread while this thread serves the requests."""
+    thread = threading.Thread(target=client_work)
+    thread.start()
+    while thread.is_alive():
+        qapp.processEvents()
+    thread.join()
+
+
+def test_status_round_trip(bench, server, qapp):
+    client = _connect(server)
+    reader = client.makefile("rb")
+    request = b'{"jsonrpc":"2.0","id":1,"method":"status"}\n'
+
+    def calls():
+        for _ in range(CALLS):
+            client.sendall(request)
+            assert b'"result"' in reader.readline()
+
+    try:
+        bench(lambda: _serve_while(qapp, calls), items=CALLS, unit="requests")
+    finally:
+        client.close()
+
+
+def test_state_event_fan_out(bench, server, qapp):
+    clients = [_connect(server) for _ in range(SUBSCRIBERS)]
+    readers = [client.makefile("rb") for client in clients]
+    for client, reader in zip(clients, readers):
+        client.sendall(b'{"jsonrpc":"2.0","id":1,"method":"subscribe_events","params":{"events":["state"]}}\n')
+    _serve_while(qapp, lambda: [reader.readline() for reader in readers])
+    connection = server.vpn_manager.connection("/tmp/provider-0.ovpn")
+
+    def read_events():
+        for reader in readers:
+            for _ in range(EVENTS):
+                assert json.loads(reader.readline())["method"] == "event"
+
+    def run():
+        for i in range(EVENTS):
+            connection._set_state(C.VpnState.CONNECTED if i % 2 else C.VpnState.CONNECTING)
+        _serve_while(qapp, read_events)
+
+    try:
+        bench(run, items=EVENTS * SUBSCRIBERS, unit="events")
+    finally:
+        for client in clients:
+            client.close()
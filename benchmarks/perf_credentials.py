@@ -0,0 +1,103 @@
+"""Keyring round trips through CredentialsManager against an in-memory backend, and cached lookups."""
+from pathlib import Path
+
+import pytest
+
+keyring = pytest.importorskip("keyring")
+from keyring.backend import KeyringBackend
+from keyring.errors import PasswordDeleteError
+
+from command_executor import CommandExecutor
+from credentials_manager import CredentialsManager
+
+CONFIGS = 1000
+
+
+class MemoryKeyring(KeyringBackend):
+    """Keeps secrets in a dict, so only our own overhead is measured."""
+
+    priority = 1
+
+    def __init__(self):
+        super().__init__()
+        self.secrets = {}
+
+    def get_password(self, service, username):
+        return self.secrets.get((service, username))
+
+    def set_password(self, service, username, password):
+        self.secrets[(service, username)] = password
+
+    def delete_password(self, service, username):
+        if self.secrets.pop((service, username), None) is None:
+            raise PasswordDeleteError(username)
+
+
+@pytest.fixture
+def manager():
+    previous = keyring.get_keyring()
+    keyring.set_keyring(MemoryKeyring())
+    try:
+        # Inline and uncached, so every call is a keyring round trip
+        yield CredentialsManager(CommandExecutor(inline=True), cache_ttl=0)
+    finally:
+        keyring.set_keyring(previous)
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return [tmp_path / f"provider-{i:04d}.ovpn" for i in range(CONFIGS)]
+
+
+def test_save_credentials(bench, manager, paths):
+    def run():
+        for path in paths:
+            manager.save_credentials(path, "user", "secret")
+
+    bench(run, items=CONFIGS, unit="saves")
+
+
+def test_get_credentials(bench, manager, paths):
+    for path in paths:
+        manager.save_credentials(path, "user", "secret")
+
+    def run():
+        for path in paths:
+            manager.get_credentials(path)
+
+    bench(run, items=CONFIGS, unit="lookups")
+    assert manager.get_credentials(paths[0]) == ("user", "secret")
+
+
+def test_read_many(bench, manager, paths):
+    for path in paths:
+        manager.save_credentials(path, "user", "secret")
+
+    bench(lambda: manager.read_many(paths), items=CONFIGS, unit="lookups")
+
+
+def test_get_credentials_cached(bench, paths):
+    previous = keyring.get_keyring()
+    keyring.set_keyring(MemoryKeyring())
+    try:
+        manager = CredentialsManager(CommandExecutor(inline=True))
+        for path in paths:
+            manager.save_credentials(path, "user", "secret")
+
+        def run():
+            for path in paths:
+                manager.get_credentials(path)
+
+        bench(run, items=CONFIGS, unit="lookups")
+    finally:
+        keyring.set_keyring(previous)
+
+
+def test_round_trip(bench, manager, paths):
+    def run():
+        for path in paths:
+            manager.save_credentials(path, "user", "secret")
+            manager.get_credentials(path)
+            manager.delete_credentials(path)
+
+    bench(run, items=CONFIGS, unit="round trips")
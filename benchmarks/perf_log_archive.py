@@ -0,0 +1,82 @@
+"""Archive search index over 2000 archived session logs: build, no-op update and queries."""
+import random
+import time
+
+import pytest
+
+from log_archive import LogArchiveIndex
+from log_classifier import LogEventKind
+
+ARCHIVES = 2000
+LINES = 200
+CONFIGS = 20
+DAY = 24 * 60 * 60
+FILLER = [
+    "TLS: tls_multi_process: initial untrusted session promoted to trusted",
+    "Data Channel: using negotiated cipher 'AES-256-GCM'",
+    "Outgoing Data Channel: Cipher 'AES-256-GCM' initialized with 256 bit key",
+    "TCP/UDP: Preserving recently used remote address: [AF_INET]192.0.2.1:1194",
+    "PUSH: Received control message: 'PUSH_REPLY,redirect-gateway def1,dhcp-option DNS 10.8.0.1'",
+]
+FAILURES = [
+    "TLS Error: TLS key negotiation failed to occur within 60 seconds (check your network connectivity)",
+    "RESOLVE: Cannot resolve host address: vpn.example.com:1194 (Name or service not known)",
+    "AUTH: Received control message: AUTH_FAILED",
+]
+
+
+@pytest.fixture(scope="module")
+def archive_dir(tmp_path_factory):
+    """Archives the way the helper names them, ~30% with a failure somewhere in the session."""
+    directory = tmp_path_factory.mktemp("OpenVPN-Py")
+    rng = random.Random(42)
+    now = time.time()
+    for i in range(ARCHIVES):
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now - rng.uniform(0, 180 * DAY)))
+        body = [rng.choice(FILLER) for _ in range(LINES)]
+        if rng.random() < 0.3:
+            body.insert(rng.randrange(LINES), rng.choice(FAILURES))
+        body.append("Initialization Sequence Completed")
+        (directory / f"openvpn-provider{i % CONFIGS}-{stamp}.log").write_text("\n".join(body) + "\n")
+    return directory
+
+
+@pytest.fixture(scope="module")
+def index(archive_dir, tmp_path_factory):
+    index = LogArchiveIndex(tmp_path_factory.mktemp("index") / "index.sqlite3")
+    index.update(archive_dir)
+    return index
+
+
+def test_initial_index(bench, archive_dir, tmp_path):
+    index = LogArchiveIndex(tmp_path / "index.sqlite3")
+
+    def forget_index():
+        for path in tmp_path.glob("index.sqlite3*"):
+            path.unlink()
+
+    bench(lambda: index.update(archive_dir), setup=forget_index, rounds=3, items=ARCHIVES, unit="archives")
+
+
+def test_update_with_nothing_changed(bench, index, archive_dir):
+    bench(lambda: index.update(archive_dir), items=ARCHIVES, unit="archives")
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        dict(config="provider7", kinds=[LogEventKind.TLS_ERROR], since=time.time() - 30 * DAY),
+        dict(kinds=[LogEventKind.AUTH_FAILED]),
+        dict(text="cannot resolve example"),
+    ],
+    ids=["config-kind-30-days", "kind", "full-text"],
+)
+def test_search(bench, index, archive_dir, query):
+    hits = []
+
+    def run():
+        for _ in range(20):
+            hits.append(index.search(archive_dir, **query))
+
+    bench(run, items=20, unit="queries")
+    assert hits[-1]
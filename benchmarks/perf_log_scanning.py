@@ -0,0 +1,52 @@
+"""Log marker scanning: the streaming classifier over 1 MB - 1 GB, and whole-block scans."""
+import pytest
+
+from log_classifier import LogClassifier, find_marked_lines
+
+LINES = [
+    b"2024-05-01 12:00:00 us=123456 TLS: tls_multi_process: initial untrusted session promoted to trusted",
+    b"2024-05-01 12:00:00 us=123457 UDPv4 READ [1420] from [AF_INET]198.51.100.7:1194: P_DATA_V2 kid=0 DATA len=1416",
+    b"2024-05-01 12:00:00 us=123458 TUN WRITE [1392]",
+    b"2024-05-01 12:00:00 us=123459 Data Channel: using negotiated cipher 'AES-256-GCM'",
+]
+MARKER = b"2024-05-01 12:00:01 us=000001 TLS Error: TLS key negotiation failed to occur within 60 seconds"
+MB = 1024 * 1024
+
+
+def log_block(size: int = MB) -> bytes:
+    """'size' bytes of verbose log with a marker roughly every 5000 lines."""
+    lines = []
+    total = 0
+    while total < size:
+        line = MARKER if len(lines) % 5000 == 4999 else LINES[len(lines) % len(LINES)]
+        lines.append(line)
+        total += len(line) + 1
+    return (b"\n".join(lines) + b"\n")[:size]
+
+
+@pytest.fixture(scope="module")
+def block():
+    return log_block()
+
+
+@pytest.mark.parametrize("size_mb", [1, 16, 256, 1024], ids=lambda mb: f"{mb}MB")
+def test_stream_classifier(bench, block, size_mb):
+    """What the log tail does: feed the log in 256 KiB reads as it grows."""
+    reads = [block[i:i + 256 * 1024] for i in range(0, len(block), 256 * 1024)]
+
+    def run():
+        classifier = LogClassifier()
+        for _ in range(size_mb):
+            for data in reads:
+                classifier.feed(data)
+
+    bench(run, rounds=2 if size_mb >= 256 else 5, items=size_mb, unit="MB")
+
+
+@pytest.mark.parametrize("size_mb", [1, 16, 64], ids=lambda mb: f"{mb}MB")
+def test_find_marked_lines(bench, block, size_mb):
+    """What archive indexing does: one pass over a whole session log."""
+    data = block * size_mb
+    found = []
+    bench(lambda: found.append(find_marked_lines(data)), rounds=3, items=size_mb, unit="MB")
+    assert found[-1]
@@ -0,0 +1,27 @@
+"""LogViewer.add_log throughput, including the frame flushes that render the lines."""
+import pytest
+
+from ui.log_viewer import LogViewer
+
+LINE = "2024-05-01 12:00:00 us=123456 TLS: tls_multi_process: initial untrusted session promoted to trusted"
+LINES = 20_000
+
+
+@pytest.mark.parametrize("lines_per_call", [1, 50], ids=["single-lines", "tail-chunks"])
+def test_add_log(bench, qapp, lines_per_call):
+    viewer = LogViewer()
+    message = "\n".join([LINE] * lines_per_call)
+    calls = LINES // lines_per_call
+
+    def run():
+        for i in range(calls):
+            viewer.add_log(message)
+            if i % 100 == 99:
+                # A frame: whatever arrived since the last one is rendered
+                viewer.flush()
+                qapp.processEvents()
+        viewer.flush()
+        qapp.processEvents()
+
+    bench(run, setup=viewer.clear_log, items=LINES, unit="lines")
+    viewer.deleteLater()
@@ -0,0 +1,71 @@
+"""Opening a 256 MB session log in the Logs window, and decoding screenfuls of its rows."""
+import random
+
+import pytest
+
+import constants as C
+from ui.logs_window import LogsWindow
+
+LINE = b"2024-05-01 12:00:00 us=123456 TLS: tls_multi_process: initial untrusted session promoted to trusted\n"
+SIZE_MB = 256
+SCREEN_ROWS = 50
+
+
+@pytest.fixture(scope="module")
+def log_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("logs") / "openvpn-gui.log"
+    block = LINE * (1024 * 1024 // len(LINE))
+    with open(path, "wb") as fh:
+        for _ in range(SIZE_MB):
+            fh.write(block)
+    return path
+
+
+@pytest.fixture
+def open_window(qapp, log_path, monkeypatch):
+    monkeypatch.setattr(C, "LOG_FILE_PATH", log_path)
+    windows = []
+
+    def open_window():
+        window = LogsWindow()
+        window.show()
+        qapp.processEvents()
+        windows.append(window)
+        return window
+
+    yield open_window
+    for window in windows:
+        window.close()
+        window.deleteLater()
+
+
+def test_first_rows(bench, open_window):
+    """Until the window shows rows; the rest of the file is indexed in the background."""
+    windows = []
+    bench(lambda: windows.append(open_window()))
+    assert windows[-1].model.rowCount() > 0
+
+
+def test_full_index(bench, qapp, open_window):
+    """Until every line is indexed, with the event loop running meanwhile."""
+
+    def run():
+        window = open_window()
+        while not window.model.is_indexed():
+            qapp.processEvents()
+
+    bench(run, rounds=3, items=SIZE_MB, unit="MB")
+
+
+def test_screen_at_random_positions(bench, qapp, open_window):
+    window = open_window()
+    window.model.ensure_indexed()
+    rng = random.Random(7)
+    firsts = [rng.randrange(window.model.rowCount() - SCREEN_ROWS) for _ in range(100)]
+
+    def run():
+        for first in firsts:
+            for row in range(first, first + SCREEN_ROWS):
+                window.model.line(row)
+
+    bench(run, items=len(firsts), unit="screens")
@@ -0,0 +1,86 @@
+"""Parsing 2000 provider-style .ovpn files (~6 KiB, inline keys): in memory, through the cache cold and warm."""
+import base64
+import random
+
+import pytest
+
+from ovpn_parser import OvpnConfigCache, parse_ovpn
+
+CONFIGS = 2000
+
+
+def pem(kind: str, rng: random.Random, size: int) -> str:
+    body = base64.encodebytes(rng.randbytes(size)).decode()
+    return f"-----BEGIN {kind}-----\n{body}-----END {kind}-----\n"
+
+
+def make_config(i: int, rng: random.Random) -> str:
+    remotes = "\n".join(
+        f"remote de{i}-{n}.vpn.example.net {rng.choice([1194, 443, 1197])}" for n in range(rng.randint(1, 4))
+    )
+    return f"""# Generated by provider tooling
+client
+dev tun
+proto {rng.choice(["udp", "tcp"])}
+{remotes}
+remote-random
+resolv-retry infinite
+nobind
+persist-key
+persist-tun
+remote-cert-tls server
+auth-user-pass
+data-ciphers AES-256-GCM:AES-128-GCM:CHACHA20-POLY1305
+auth SHA512
+verb 3
+script-security 2
+up /etc/openvpn/update-resolv-conf
+down /etc/openvpn/update-resolv-conf
+ping 15
+ping-restart 60
+<ca>
+{pem("CERTIFICATE", rng, 1400)}</ca>
+<cert>
+{pem("CERTIFICATE", rng, 1200)}</cert>
+<key>
+{pem("PRIVATE KEY", rng, 1200)}</key>
+<tls-crypt>
+{pem("OpenVPN Static key V1", rng, 256)}</tls-crypt>
+"""
+
+
+@pytest.fixture(scope="module")
+def paths(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("configs")
+    rng = random.Random(7)
+    paths = []
+    for i in range(CONFIGS):
+        path = directory / f"provider-{i:05d}.ovpn"
+        path.write_text(make_config(i, rng))
+        paths.append(path)
+    return paths
+
+
+def test_parse_in_memory(bench, paths):
+    blobs = [path.read_bytes() for path in paths]
+    bench(lambda: [parse_ovpn(blob) for blob in blobs], items=CONFIGS, unit="configs")
+
+
+def test_cache_cold(bench, paths):
+    caches = []
+    bench(lambda: [caches[-1].get(path) for path in paths], setup=lambda: caches.append(OvpnConfigCache()),
+          items=CONFIGS, unit="configs")
+
+
+def test_cache_warm(bench, paths):
+    """Memoized lookups: one stat per config, and the fields a connect needs."""
+    cache = OvpnConfigCache()
+    for path in paths:
+        cache.get(path)
+
+    def run():
+        for path in paths:
+            config = cache.get(path)
+            config.remotes, config.proto, config.auth_user_pass, config.data_ciphers
+
+    bench(run, items=CONFIGS, unit="configs")
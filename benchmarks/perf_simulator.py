@@ -0,0 +1,105 @@
+"""
+VPNManager against the simulated helper backend: a chatty tunnel's log
+tailed into the inline LogViewer, and connect/disconnect cycles.
+"""
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import constants as C
+from helper_backend import SimulatedHelperBackend, SimulationProfile
+from ui.log_viewer import LogViewer
+from vpn_manager import VPNManager
+
+CONFIG = "/tmp/bench-simulator.ovpn"
+# Far above what the tail keeps up with, so the app rather than the simulator sets the pace
+LOG_RATE = 500_000
+LOG_LINES = 20_000
+CYCLES = 20
+
+
+def process_until(qapp, predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        qapp.processEvents()
+        if predicate():
+            return True
+        time.sleep(0.001)
+    return predicate()
+
+
+@pytest.fixture
+def backend():
+    backend = SimulatedHelperBackend()
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def manager(qapp, backend, monkeypatch):
+    monkeypatch.setattr(C, "PROBE_REMOTES_BEFORE_CONNECT", False)
+    manager = VPNManager(backend)
+    # Drive the sweep from the benchmark rather than the 2 s timer
+    manager._status_timer.stop()
+    manager._helper_client = None
+    yield manager
+    manager.disconnect_all()
+    process_until(qapp, lambda: not manager.active_connections())
+    manager._status_timer.stop()
+    manager.wait_for_pending_commands(5)
+
+
+def reached(manager, state):
+    def check():
+        manager.check_connection_status()
+        return manager.state(CONFIG) == state
+    return check
+
+
+def test_tail_chatty_log(bench, qapp, manager, backend):
+    backend.profile = SimulationProfile(connect_delay=0.01, lines_per_second=LOG_RATE)
+    viewer = LogViewer()
+    delivered = 0
+
+    def on_log(_config, message):
+        nonlocal delivered
+        # The tail delivers whatever it read since the last drain in one message
+        delivered += message.count("\n") + 1
+        viewer.add_log(message)
+
+    manager.connection_log_received.connect(on_log)
+    manager.connect(CONFIG, "user", "pass")
+    assert process_until(qapp, reached(manager, C.VpnState.CONNECTED))
+    gaps = []
+
+    def run():
+        target = delivered + LOG_LINES
+        last_frame = time.perf_counter()
+        while delivered < target:
+            qapp.processEvents()
+            now = time.perf_counter()
+            gaps.append(now - last_frame)
+            last_frame = now
+
+    result = bench(run, items=LOG_LINES, unit="lines")
+    # How long the UI went without processing events, worst case over all rounds
+    result["worst_event_loop_gap_s"] = max(gaps)
+    viewer.deleteLater()
+
+
+def test_connect_disconnect_cycles(bench, qapp, manager, backend):
+    backend.profile = SimulationProfile(connect_delay=0.01, lines_per_second=100)
+
+    def run():
+        for _ in range(CYCLES):
+            manager.connect(CONFIG, "user", "pass")
+            assert process_until(qapp, reached(manager, C.VpnState.CONNECTED))
+            manager.disconnect(CONFIG)
+            assert process_until(qapp, lambda: manager.state(CONFIG) == C.VpnState.DISCONNECTED)
+
+    bench(run, rounds=3, items=CYCLES, unit="cycles")
+    assert backend.unit(Path(CONFIG).name) is None
+    # Simulated units are threads; none may outlive its cycle (the executor's pool threads idle on)
+    assert not [t for t in threading.enumerate() if t.name.startswith("sim-")]
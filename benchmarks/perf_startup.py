@@ -0,0 +1,49 @@
+"""
+Start-up time, each round a fresh interpreter: until the main window has
+painted ('main.py --profile-startup', which quits right after the first
+paint), the import of main_window alone, and a complete headless 'status'
+command (which never imports QtWidgets).
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def env(tmp_path):
+    return {
+        **os.environ,
+        "QT_QPA_PLATFORM": "offscreen",
+        "XDG_CONFIG_HOME": str(tmp_path),
+        # Keeps the control socket out of the real runtime dir
+        "XDG_RUNTIME_DIR": str(tmp_path),
+        # Nothing may reach a real helper daemon or sudo
+        "OPENVPN_PY_HELPER_BACKEND": "simulator",
+    }
+
+
+def _run(command, env):
+    subprocess.run(command, cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def test_time_to_first_window(bench, env):
+    # -X importtime given here keeps --profile-startup from starting a second interpreter
+    command = [sys.executable, "-X", "importtime", str(ROOT / "main.py"), "--profile-startup", "json"]
+    bench(lambda: _run(command, env), rounds=7)
+
+
+def test_import_main_window(bench, env):
+    bench(lambda: _run([sys.executable, "-c", "import main_window"], env), rounds=7)
+
+
+def test_headless_status(bench, env, tmp_path):
+    config = tmp_path / "bench.ovpn"
+    config.write_text("client\nremote vpn.example.com 1194\n")
+    command = [sys.executable, str(ROOT / "main.py"), "--headless", "status", str(config)]
+    bench(lambda: _run(command, env), rounds=7)
@@ -0,0 +1,42 @@
+"""The full status sweep over active connections against the fake helper daemon."""
+import pytest
+
+import constants as C
+from helper_client import HelperClient
+from tests.fake_helper import fake_helper_server
+from vpn_manager import VPNManager
+
+SWEEPS = 50
+
+
+@pytest.fixture
+def daemon():
+    with fake_helper_server() as server:
+        yield server
+
+
+@pytest.fixture
+def manager(daemon, qapp):
+    manager = VPNManager()
+    manager._executor.inline = True
+    manager._helper_client = HelperClient(daemon.socket_path)
+    yield manager
+    manager._status_timer.stop()
+    manager._helper_client.close()
+
+
+@pytest.mark.parametrize("connections", [1, 8], ids=lambda n: f"{n}-connections")
+def test_status_sweep(bench, manager, daemon, connections):
+    for i in range(connections):
+        config = f"/tmp/provider-{i}.ovpn"
+        daemon.service.backend.statuses[f"provider-{i}.ovpn"] = "connected"
+        connection = manager._connection(config)
+        connection._set_state(C.VpnState.CONNECTING)
+        connection._set_state(C.VpnState.CONNECTED)
+
+    def run():
+        for _ in range(SWEEPS):
+            manager.check_connection_status()
+
+    bench(run, items=SWEEPS, unit="sweeps")
+    assert all(c.state == C.VpnState.CONNECTED for c in manager.connections())
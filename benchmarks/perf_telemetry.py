@@ -0,0 +1,56 @@
+"""The telemetry ring buffer over long sessions: appends, sparkline reads and CSV export."""
+import random
+import tracemalloc
+
+import pytest
+
+import constants as C
+from telemetry import TelemetryBuffer
+
+SAMPLES = 500_000
+
+
+@pytest.fixture(scope="module")
+def deltas():
+    rng = random.Random(7)
+    return [(rng.randrange(10**7), rng.randrange(10**6)) for _ in range(4096)]
+
+
+def fill(buffer, deltas, count):
+    now = 0.0
+    for i in range(count):
+        rx, tx = deltas[i & 4095]
+        now += 1.0
+        buffer.append(1.0, rx, tx, rx // 1400, tx // 1400, now=now)
+
+
+@pytest.fixture
+def full_buffer(deltas):
+    buffer = TelemetryBuffer(C.TELEMETRY_HISTORY_SAMPLES)
+    fill(buffer, deltas, C.TELEMETRY_HISTORY_SAMPLES * 2)
+    return buffer
+
+
+def test_append(bench, deltas):
+    buffer = TelemetryBuffer(C.TELEMETRY_HISTORY_SAMPLES)
+    bench(lambda: fill(buffer, deltas, SAMPLES), rounds=3, items=SAMPLES, unit="samples")
+
+    # The ring is allocated up front; appending must not grow it
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    fill(buffer, deltas, C.TELEMETRY_HISTORY_SAMPLES * 10)
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert grown < 64 * 1024
+
+
+def test_sparkline_window(bench, full_buffer):
+    def run():
+        for _ in range(200):
+            full_buffer.rates(C.TELEMETRY_SPARKLINE_SAMPLES)
+
+    bench(run, items=200, unit="refreshes")
+
+
+def test_export_csv(bench, full_buffer, tmp_path):
+    bench(lambda: full_buffer.export_csv(tmp_path / "traffic.csv"), items=len(full_buffer), unit="rows")
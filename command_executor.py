@@ -0,0 +1,253 @@
+# command_executor.py
+import itertools
+import logging
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, QCoreApplication, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+
+class CommandCancelled(Exception):
+    pass
+
+
+@dataclass
+class CommandResult:
+    command_id: int
+    tag: str
+    value: Any = None
+    error: Optional[BaseException] = None
+    cancelled: bool = False
+    timed_out: bool = False
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.cancelled and not self.timed_out
+
+
+class CommandContext:
+    """
+    Handed to every submitted callable. Lets the callable register the
+    subprocess it spawns, so cancellation and timeouts can kill it, and
+    tells it how much of its time budget is left.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self._deadline = time.monotonic() + timeout if timeout else None
+        self._cancelled = threading.Event()
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without a timeout."""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def check(self):
+        """Raise CommandCancelled if the command was cancelled or timed out."""
+        if self._cancelled.is_set():
+            raise CommandCancelled()
+
+    def attach_process(self, process: subprocess.Popen):
+        with self._lock:
+            self._process = process
+            if self._cancelled.is_set():
+                self._kill_locked()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled.set()
+            self._kill_locked()
+
+    def _kill_locked(self):
+        if self._process is not None and self._process.poll() is None:
+            try:
+                self._process.kill()
+            except Exception:
+                pass
+
+
+class _CommandSignals(QObject):
+    done = pyqtSignal(object)
+
+
+class _CommandRunnable(QRunnable):
+    def __init__(self, command_id, fn, context, signals):
+        super().__init__()
+        self.command_id = command_id
+        self.fn = fn
+        self.context = context
+        self.signals = signals
+
+    def run(self):
+        started = time.monotonic()
+        value, error = None, None
+        try:
+            self.context.check()
+            value = self.fn(self.context)
+        except BaseException as e:
+            error = e
+        self.signals.done.emit((self.command_id, value, error, time.monotonic() - started))
+
+
+@dataclass
+class _Pending:
+    tag: str
+    context: CommandContext
+    callback: Optional[Callable[[CommandResult], None]]
+    signals: _CommandSignals
+    timer: Optional[QTimer]
+    started: float
+
+
+class CommandExecutor(QObject):
+    """
+    Runs blocking work (helper invocations, keyring calls, ...) on a private
+    QThreadPool and delivers a CommandResult back on the GUI thread through
+    the 'finished' signal and an optional per-command callback.
+
+    Each command can have a timeout; timing out or cancelling a command
+    kills its attached subprocess and reports the result immediately,
+    any late value from the worker is discarded. A worker with nothing to
+    kill keeps its pool thread until it returns; running_count() sees it.
+
+    Without a Qt application (unit tests, scripts) commands run inline,
+    the same way VPNManager skips its timers when no event loop exists.
+    """
+
+    finished = pyqtSignal(object)  # CommandResult
+
+    def __init__(self, parent=None, max_threads: int = 4, inline: Optional[bool] = None):
+        super().__init__(parent)
+        self.inline = inline
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._pending: Dict[int, _Pending] = {}
+        # Every submitted runnable until its worker returns, reported or not;
+        # holding its signals keeps a late done() deliverable after a timeout
+        self._running: Dict[int, Tuple[str, _CommandSignals]] = {}
+        self._ids = itertools.count(1)
+
+    def _run_inline(self) -> bool:
+        if self.inline is not None:
+            return self.inline
+        return QCoreApplication.instance() is None
+
+    def submit(
+        self,
+        fn: Callable[[CommandContext], Any],
+        tag: str = "",
+        timeout: Optional[float] = None,
+        callback: Optional[Callable[[CommandResult], None]] = None,
+    ) -> int:
+        """Schedule fn(context) and return the command id."""
+        command_id = next(self._ids)
+        context = CommandContext(timeout)
+
+        if self._run_inline():
+            started = time.monotonic()
+            value, error = None, None
+            try:
+                value = fn(context)
+            except Exception as e:
+                error = e
+            result = CommandResult(
+                command_id, tag, value, error, duration=time.monotonic() - started
+            )
+            self._deliver(result, callback)
+            return command_id
+
+        signals = _CommandSignals()
+        signals.done.connect(self._on_done)
+        timer = None
+        if timeout:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda cid=command_id: self._expire(cid))
+            timer.start(int(timeout * 1000))
+        self._pending[command_id] = _Pending(
+            tag, context, callback, signals, timer, time.monotonic()
+        )
+        self._running[command_id] = (tag, signals)
+        self._pool.start(_CommandRunnable(command_id, fn, context, signals))
+        return command_id
+
+    def cancel(self, command_id: int) -> bool:
+        """Cancel a pending command. Its callback receives a cancelled result."""
+        pending = self._pending.pop(command_id, None)
+        if pending is None:
+            return False
+        pending.context.cancel()
+        self._finish(command_id, pending, cancelled=True)
+        return True
+
+    def cancel_all(self, tag: Optional[str] = None) -> int:
+        ids = [cid for cid, p in self._pending.items() if tag is None or p.tag == tag]
+        for cid in ids:
+            self.cancel(cid)
+        return len(ids)
+
+    def pending_count(self, tag: Optional[str] = None) -> int:
+        return sum(1 for p in self._pending.values() if tag is None or p.tag == tag)
+
+    def running_count(self, tag: Optional[str] = None) -> int:
+        """Commands whose worker has not returned yet, including timed out and cancelled ones."""
+        return sum(1 for t, _ in self._running.values() if tag is None or t == tag)
+
+    def wait_for_done(self, timeout: float) -> bool:
+        """Block until every worker has returned (used on application shutdown)."""
+        return self._pool.waitForDone(int(timeout * 1000))
+
+    def _expire(self, command_id: int):
+        pending = self._pending.pop(command_id, None)
+        if pending is None:
+            return
+        logger.warning(f"Command '{pending.tag}' timed out")
+        pending.context.cancel()
+        self._finish(command_id, pending, timed_out=True)
+
+    def _on_done(self, payload):
+        command_id, value, error, duration = payload
+        self._running.pop(command_id, None)
+        pending = self._pending.pop(command_id, None)
+        if pending is None:
+            # Already reported as cancelled or timed out
+            return
+        if isinstance(error, CommandCancelled):
+            self._finish(command_id, pending, cancelled=True)
+            return
+        if error is not None and pending.context.cancelled:
+            # Killed subprocesses surface as arbitrary errors; report the cancellation
+            self._finish(command_id, pending, cancelled=True)
+            return
+        self._finish(command_id, pending, value=value, error=error, duration=duration)
+
+    def _finish(self, command_id, pending: _Pending, value=None, error=None,
+                cancelled=False, timed_out=False, duration=None):
+        if pending.timer is not None:
+            pending.timer.stop()
+            pending.timer.deleteLater()
+        if duration is None:
+            duration = time.monotonic() - pending.started
+        result = CommandResult(
+            command_id, pending.tag, value, error, cancelled, timed_out, duration
+        )
+        self._deliver(result, pending.callback)
+
+    def _deliver(self, result: CommandResult, callback):
+        if callback is not None:
+            try:
+                callback(result)
+            except Exception as e:
+                logger.error(f"Callback for command '{result.tag}' failed: {e}", exc_info=True)
+        self.finished.emit(result)
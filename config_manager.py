@@ -1,11 +1,16 @@
 # config_manager.py
+import json
+import os
 import shutil
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 import logging
 
 import constants as C
+from ovpn_parser import OvpnConfig, forget_ovpn, load_ovpn
 
 logger = logging.getLogger(__name__)
 
@@ -24,39 +29,159 @@ class VpnConfig:
     path: Path
 
 
+def find_config(spec: str, configs: List[VpnConfig]) -> Optional[Path]:
+    """A config file path as given, or the path of the config among 'configs'
+    named 'spec' (with or without its extension); None if there is neither."""
+    path = Path(spec).expanduser()
+    if path.is_file():
+        return path.absolute()
+    for config in configs:
+        if spec in (config.name, config.path.stem):
+            return config.path
+    return None
+
+
+CONFIG_INDEX_VERSION = 1
+
+# A directory modified this recently may still change within the same mtime
+# tick; its listing is cached but re-scanned next time (like git's racy index)
+_RACY_SECONDS = 2.0
+
+
 class ConfigManager:
     def __init__(self):
         # Search for configs in user dir and system dirs
         self.config_dirs = [C.USER_CONFIGS_DIR] + C.SYSTEM_CONFIG_DIRS
+        # Cached directory listings, keyed by directory path; see discover_configs
+        self._index: Optional[Dict[str, dict]] = None
+        self._lock = threading.Lock()
         logger.info(
             f"ConfigManager initialized. Search paths: {self.config_dirs}"
         )
 
     def discover_configs(self) -> List[VpnConfig]:
-        """Discovers .ovpn and .conf files in all defined directories."""
+        """
+        Discovers .ovpn and .conf files in all defined directories.
+
+        Directory listings are cached on disk (C.CONFIG_INDEX_PATH) together
+        with the directory's inode and mtime; only directories whose stat
+        changed since the last scan are listed again.
+        """
+        with self._lock:
+            index = self._load_index()
+            changed = False
+            listings = []
+            for config_dir in self.config_dirs:
+                names, dir_changed = self._list_dir(config_dir, index)
+                listings.append((config_dir, names))
+                changed = changed or dir_changed
+            if changed:
+                self._save_index(index)
+
+        discovered_configs = self._merge(listings)
+        logger.info(f"{len(discovered_configs)} VPN configurations found.")
+        return discovered_configs
+
+    def cached_configs(self) -> Optional[List[VpnConfig]]:
+        """
+        The configs from the last discovery without touching the config
+        directories, for showing the list before discover_configs() has run.
+        Returns None when there is no usable cache.
+        """
+        with self._lock:
+            index = self._load_index()
+        if not index:
+            return None
+        listings = []
+        for config_dir in self.config_dirs:
+            entry = index.get(str(config_dir))
+            if entry is None:
+                return None
+            listings.append((config_dir, entry["files"]))
+        return self._merge(listings)
+
+    def config_details(self, config: VpnConfig) -> OvpnConfig:
+        """
+        Parsed contents of a config (remotes, proto, inline blocks...).
+        Memoized by file identity; raises OSError or OvpnParseError.
+        """
+        return load_ovpn(config.path)
+
+    def _merge(self, listings) -> List[VpnConfig]:
+        # Earlier directories win on duplicate names (user dir first)
         discovered_configs = []
         seen_names = set()
-        for config_dir in self.config_dirs:
+        for config_dir, names in listings:
+            for name in names:
+                if name not in seen_names:
+                    discovered_configs.append(VpnConfig(name=name, path=config_dir / name))
+                    seen_names.add(name)
+        discovered_configs.sort(key=lambda x: x.name)
+        return discovered_configs
+
+    def _list_dir(self, config_dir: Path, index: Dict[str, dict]):
+        """Return (config file names, whether the cache entry changed) for one directory."""
+        key = str(config_dir)
+        cached = index.get(key)
+        try:
+            st = os.stat(config_dir)
+        except FileNotFoundError:
+            st = None
+        except PermissionError as e:
+            logger.warning(f"Permission denied accessing {config_dir}: {e}")
+            st = None
+        except Exception as e:
+            logger.error(f"Error scanning {config_dir}: {e}")
+            st = None
+
+        if st is None or not config_dir.is_dir():
+            changed = cached is None or cached.get("stamp") is not None or cached["files"]
+            index[key] = {"stamp": None, "files": []}
+            return [], bool(changed)
+
+        stamp = [st.st_dev, st.st_ino, st.st_mtime_ns]
+        if cached is not None and cached.get("stamp") == stamp:
+            return cached["files"], False
+
+        names = []
+        try:
+            for extension in ["*.ovpn", "*.conf"]:
+                for config_file in config_dir.glob(extension):
+                    if config_file.is_file():
+                        names.append(config_file.name)
+        except PermissionError as e:
+            logger.warning(f"Permission denied accessing {config_dir}: {e}")
+        except Exception as e:
+            logger.error(f"Error scanning {config_dir}: {e}")
+        names.sort()
+
+        if time.time() - st.st_mtime < _RACY_SECONDS:
+            stamp = None
+        index[key] = {"stamp": stamp, "files": names}
+        return names, True
+
+    def _load_index(self) -> Dict[str, dict]:
+        if self._index is None:
+            self._index = {}
             try:
-                if not config_dir.is_dir():
-                    continue
-
-                for extension in ["*.ovpn", "*.conf"]:
-                    for config_file in config_dir.glob(extension):
-                        if not config_file.is_file():
-                            continue
-                        config = VpnConfig(name=config_file.name, path=config_file)
-                        if config.name not in seen_names:
-                            discovered_configs.append(config)
-                            seen_names.add(config.name)
-            except PermissionError as e:
-                logger.warning(f"Permission denied accessing {config_dir}: {e}")
+                data = json.loads(C.CONFIG_INDEX_PATH.read_text())
+                if data.get("version") == CONFIG_INDEX_VERSION:
+                    self._index = data.get("dirs", {})
+            except FileNotFoundError:
+                pass
             except Exception as e:
-                logger.error(f"Error scanning {config_dir}: {e}")
+                logger.warning(f"Ignoring unreadable config index {C.CONFIG_INDEX_PATH}: {e}")
+        return self._index
 
-        discovered_configs.sort(key=lambda x: x.name)
-        logger.info(f"{len(discovered_configs)} VPN configurations found.")
-        return discovered_configs
+    def _save_index(self, index: Dict[str, dict]):
+        path = C.CONFIG_INDEX_PATH
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(json.dumps({"version": CONFIG_INDEX_VERSION, "dirs": index}))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not write config index {path}: {e}")
 
     def import_config(self, source_path: str):
         """Copy a configuration file to the user's config directory."""
@@ -102,6 +227,7 @@ class ConfigManager:
 
         try:
             config.path.unlink()
+            forget_ovpn(config.path)
             logger.info(f"Configuration deleted: {config.path}")
         except FileNotFoundError:
             logger.warning(
@@ -0,0 +1,274 @@
+# connect_timing.py
+"""
+Where connecting spends its time.
+
+An attempt is split into phases between marks taken by the GUI itself
+(connect requested, helper invoked, helper returned), durations the helper
+reports on stdout (HELPER_PHASES=...) and OpenVPN log markers as the tail
+sees them (link up, TLS done, PUSH_REPLY, initialization completed, DNS
+fixed up). The phases of every successful attempt go into one log-bucketed
+histogram per config and phase, persisted across sessions, so p50/p95 stay
+cheap however many connects have been recorded. Disconnects are timed the
+same way: the helper's stop command as a whole and the part the script
+reports for itself.
+"""
+import json
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Dict, List, Mapping, NamedTuple, Optional
+
+import constants as C
+from log_classifier import LogEventKind
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMINGS_VERSION = 1
+
+HELPER_PHASES_PREFIX = "HELPER_PHASES="
+
+
+class Phase(NamedTuple):
+    key: str
+    label: str
+    # Marks (VpnConnection.timings keys) bounding the phase; None for phases
+    # the helper measures itself or that are derived from others
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+
+# In the order an attempt goes through them
+PHASES = (
+    Phase("probe", "Probe remotes", "connect_requested", "helper_invoked"),
+    Phase("helper", "Helper start command", "helper_invoked", "helper_started"),
+    Phase("sudo", "sudo / helper daemon overhead"),
+    Phase("env_probe", "Probe OpenVPN, AppArmor and DNS helpers"),
+    Phase("preclean", "Pre-clean stale unit"),
+    Phase("prepare", "Prepare config and DNS integration"),
+    Phase("unit_start", "Start systemd unit"),
+    Phase("resolve", "Resolve remote and open link", "helper_started", "link_up"),
+    Phase("tls", "TLS handshake", "link_up", "tls_done"),
+    Phase("push_reply", "Wait for PUSH_REPLY", "tls_done", "push_reply"),
+    Phase("configure", "Configure tunnel", "push_reply", "connected"),
+    Phase("dns_fixup", "Post-start DNS fix-up", "push_reply", "dns_fixed"),
+    Phase("total", "Total", "connect_requested", "connected"),
+    # Disconnecting
+    Phase("stop", "Helper stop command", "disconnect_requested", "helper_stopped"),
+    Phase("unit_stop", "Stop unit and archive log"),
+)
+PHASES_BY_KEY = {phase.key: phase for phase in PHASES}
+
+# Parts of the helper's start command it times itself
+HELPER_PHASES = ("env_probe", "preclean", "prepare", "unit_start")
+# ... and of its stop command
+HELPER_STOP_PHASES = ("unit_stop",)
+# Reported by every helper script version (env_probe came later)
+_REQUIRED_HELPER_PHASES = ("preclean", "prepare", "unit_start")
+
+# Log markers that set a mark the first time they are seen during an attempt
+LOG_MARKS = {
+    LogEventKind.LINK_UP: "link_up",
+    LogEventKind.TLS_DONE: "tls_done",
+    LogEventKind.PUSH_REPLY: "push_reply",
+    LogEventKind.DNS_FIXED: "dns_fixed",
+}
+
+
+def parse_helper_phases(helper_output: str) -> Dict[str, float]:
+    """Seconds per phase from the 'HELPER_PHASES=preclean:12,prepare:40,...' (ms) line of 'start' or 'stop'."""
+    phases: Dict[str, float] = {}
+    for line in helper_output.splitlines():
+        line = line.strip()
+        if not line.startswith(HELPER_PHASES_PREFIX):
+            continue
+        for item in line[len(HELPER_PHASES_PREFIX):].split(","):
+            name, _, value = item.partition(":")
+            try:
+                milliseconds = int(value)
+            except ValueError:
+                continue
+            if (name in HELPER_PHASES or name in HELPER_STOP_PHASES) and milliseconds >= 0:
+                phases[name] = milliseconds / 1000
+    return phases
+
+
+def phase_durations(marks: Mapping[str, float], helper_phases: Mapping[str, float]) -> Dict[str, float]:
+    """Seconds spent in each phase whose bounds are known. Marks are time.monotonic() values."""
+    durations: Dict[str, float] = {}
+    for phase in PHASES:
+        if phase.start in marks and phase.end in marks:
+            # Log lines already written when the tail attaches arrive together
+            durations[phase.key] = max(0.0, marks[phase.end] - marks[phase.start])
+    durations.update(
+        (k, v) for k, v in helper_phases.items() if k in HELPER_PHASES or k in HELPER_STOP_PHASES
+    )
+    if "helper" in durations and all(k in helper_phases for k in _REQUIRED_HELPER_PHASES):
+        # Whatever the script did not account for went to sudo or the daemon round trip
+        inside = sum(helper_phases.get(k, 0.0) for k in HELPER_PHASES)
+        durations["sudo"] = max(0.0, durations["helper"] - inside)
+    return durations
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:.0f} ms"
+    return f"{seconds:.2f} s"
+
+
+# Bucket layout: values below 2**_SUB_BUCKET_BITS ms are exact; above, every
+# power of two is split into 2**(_SUB_BUCKET_BITS - 1) equal buckets.
+_SUB_BUCKET_BITS = 6
+_HALF_BUCKET_COUNT = 1 << (_SUB_BUCKET_BITS - 1)
+_MAX_MS = 60 * 60 * 1000
+
+
+def _bucket_index(ms: int) -> int:
+    if ms < 2 * _HALF_BUCKET_COUNT:
+        return ms
+    shift = ms.bit_length() - _SUB_BUCKET_BITS
+    return (shift << (_SUB_BUCKET_BITS - 1)) + (ms >> shift)
+
+
+def _bucket_value(index: int) -> float:
+    """Middle of the values (ms) falling into a bucket."""
+    if index < 2 * _HALF_BUCKET_COUNT:
+        return float(index)
+    shift = (index >> (_SUB_BUCKET_BITS - 1)) - 1
+    low = (index - (shift << (_SUB_BUCKET_BITS - 1))) << shift
+    return low + ((1 << shift) - 1) / 2
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of durations: exact to the millisecond below 64 ms,
+    within ~3% above, with a bounded number of buckets (at most ~600 for up
+    to an hour) no matter how many values are recorded.
+    """
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+
+    def __len__(self) -> int:
+        return self.total
+
+    def record(self, seconds: float, count: int = 1):
+        ms = min(max(int(round(seconds * 1000)), 0), _MAX_MS)
+        index = _bucket_index(ms)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Seconds below which 'percent' of the recorded values fall; None when empty."""
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(percent / 100 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return _bucket_value(index) / 1000
+        return None
+
+    def to_dict(self) -> dict:
+        return {str(index): count for index, count in sorted(self.counts.items())}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, int]) -> "LatencyHistogram":
+        histogram = cls()
+        for index, count in data.items():
+            histogram.counts[int(index)] = int(count)
+            histogram.total += int(count)
+        return histogram
+
+
+class PhaseStats(NamedTuple):
+    phase: Phase
+    count: int
+    p50: float
+    p95: float
+
+
+class ConnectTimingStore:
+    """Phase histograms per config, kept in CONNECT_TIMINGS_PATH between sessions."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+        self._configs: Optional[Dict[str, Dict[str, LatencyHistogram]]] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path if self._path is not None else C.CONNECT_TIMINGS_PATH
+
+    def configs(self) -> List[str]:
+        return sorted(self._load())
+
+    def histogram(self, config_path, phase: str) -> Optional[LatencyHistogram]:
+        return self._load().get(str(config_path), {}).get(phase)
+
+    def record(self, config_path, durations: Mapping[str, float]):
+        """Add one attempt's phase durations (seconds) and save."""
+        phases = self._load().setdefault(str(config_path), {})
+        for key, seconds in durations.items():
+            if key in PHASES_BY_KEY:
+                phases.setdefault(key, LatencyHistogram()).record(seconds)
+        self._save()
+
+    def summary(self, config_path) -> List[PhaseStats]:
+        """p50/p95 of every phase recorded for a config, in PHASES order."""
+        phases = self._load().get(str(config_path), {})
+        stats = []
+        for phase in PHASES:
+            histogram = phases.get(phase.key)
+            if histogram:
+                stats.append(
+                    PhaseStats(phase, len(histogram), histogram.percentile(50), histogram.percentile(95))
+                )
+        return stats
+
+    def clear(self, config_path=None):
+        """Forget one config's timings, or all of them."""
+        if config_path is None:
+            self._configs = {}
+        else:
+            self._load().pop(str(config_path), None)
+        self._save()
+
+    def _load(self) -> Dict[str, Dict[str, LatencyHistogram]]:
+        if self._configs is None:
+            self._configs = {}
+            try:
+                data = json.loads(self.path.read_text())
+                if data.get("version") == CONNECT_TIMINGS_VERSION:
+                    self._configs = {
+                        config: {key: LatencyHistogram.from_dict(counts) for key, counts in phases.items()}
+                        for config, phases in data.get("configs", {}).items()
+                    }
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable connect timings {self.path}: {e}")
+        return self._configs
+
+    def _save(self):
+        path = self.path
+        data = {
+            "version": CONNECT_TIMINGS_VERSION,
+            "configs": {
+                config: {key: histogram.to_dict() for key, histogram in phases.items()}
+                for config, phases in self._load().items()
+            },
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(json.dumps(data, separators=(",", ":")))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not write connect timings {path}: {e}")
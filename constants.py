@@ -20,9 +20,15 @@ USER_DATA_DIR = xdg_config_home / "openvpn-py"
 USER_CONFIGS_DIR = USER_DATA_DIR / "configs"
 LOG_DIR = USER_DATA_DIR / "logs"
 
-# Create user directories if they don't exist
-USER_CONFIGS_DIR.mkdir(parents=True, exist_ok=True)
-LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+def ensure_user_dirs():
+    """
+    Create the user directories if they don't exist. Called once the window
+    is up rather than on import, so importing this module does no I/O.
+    """
+    USER_CONFIGS_DIR.mkdir(parents=True, exist_ok=True)
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+
 
 # System-wide configuration paths to search for .ovpn files
 SYSTEM_CONFIG_DIRS = [
@@ -30,12 +36,67 @@ SYSTEM_CONFIG_DIRS = [
     Path("/etc/openvpn"),
 ]
 
+# Cached listing of the config directories, so the window can show configs at once
+CONFIG_INDEX_PATH = USER_DATA_DIR / "config-index.json"
+
 # Path to the log file used by the helper and read by the GUI.
 LOG_FILE_PATH = LOG_DIR / "openvpn-gui.log"
 
+
+def connection_log_path(config_path) -> Path:
+    """Each concurrent connection logs to its own file next to LOG_FILE_PATH."""
+    return LOG_FILE_PATH.with_name(f"{LOG_FILE_PATH.stem}-{Path(config_path).stem}.log")
+
+
+# Search index over the session logs the helper archives into Documents/OpenVPN-Py
+LOG_ARCHIVE_INDEX_PATH = USER_DATA_DIR / "log-archive.sqlite3"
+
+# Per-config histograms of how long each phase of connecting took (see connect_timing.py)
+CONNECT_TIMINGS_PATH = USER_DATA_DIR / "connect-timings.json"
+
 # Path to the helper script, consistent with install.sh
 HELPER_SCRIPT_PATH = Path("/usr/local/bin/openvpn-gui-helper.sh")
 
+# Unix socket of the persistent helper daemon (openvpn-py-helperd.service).
+# When it is not running, the GUI falls back to 'sudo -n HELPER_SCRIPT_PATH'.
+HELPER_SOCKET_PATH = Path("/run/openvpn-py/helper.sock")
+
+# Local JSON-RPC socket of the running app for scripts (see control_server.py).
+# In the user's runtime dir, which only the user can enter.
+xdg_runtime_env = os.environ.get("XDG_RUNTIME_DIR", None)
+CONTROL_SOCKET_PATH = (
+    Path(xdg_runtime_env) / "openvpn-py" / "control.sock" if xdg_runtime_env else USER_DATA_DIR / "control.sock"
+)
+# A control client with this much unread output (or an unfinished request
+# this long) is disconnected instead of growing the app's memory
+CONTROL_MAX_BUFFERED_BYTES = 1024 * 1024
+
+# Before connecting, probe all 'remote' entries of a config in parallel and
+# hand the helper the reachable ones fastest first (see remote_probe.py).
+PROBE_REMOTES_BEFORE_CONNECT = True
+REMOTE_PROBE_TIMEOUT_SECONDS = 1.5
+# Probe results are reused for this long while on the same network
+REMOTE_PROBE_CACHE_TTL_SECONDS = 10 * 60
+
+# Auto-reconnect (opt-in per config, see reconnect.py): exponential backoff
+# from the initial delay up to the maximum, +/- RECONNECT_JITTER of each delay
+RECONNECT_INITIAL_DELAY_SECONDS = 2.0
+RECONNECT_MAX_DELAY_SECONDS = 120.0
+RECONNECT_JITTER = 0.3
+RECONNECT_MAX_ATTEMPTS = 10
+
+# Throughput telemetry (see telemetry.py): one sample per interval, the last
+# TELEMETRY_HISTORY_SAMPLES kept per connection (an hour at 1 Hz, ~100 KiB)
+TELEMETRY_SAMPLE_INTERVAL_MS = 1000
+TELEMETRY_HISTORY_SAMPLES = 3600
+# Samples drawn in the control panel's sparkline
+TELEMETRY_SPARKLINE_SAMPLES = 120
+
+# Credentials read from the keyring are kept in memory this long, so
+# clicking Connect after selecting a config never waits on the keyring.
+# Wiped when the session locks and on quit (see credentials_manager.py).
+CREDENTIALS_CACHE_TTL_SECONDS = 3 * 60
+
 
 # --- VPN State Management ---
 # Enum for tracking the VPN connection state across the application.
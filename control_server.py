@@ -0,0 +1,395 @@
+# control_server.py
+"""
+Local control socket of the running app, for scripts and automation.
+
+Clients connect to C.CONTROL_SOCKET_PATH (a Unix socket only the user can
+open) and speak JSON-RPC 2.0, one message per line:
+
+    -> {"jsonrpc": "2.0", "id": 1, "method": "connect", "params": {"config": "work"}}
+    <- {"jsonrpc": "2.0", "id": 1, "result": {"config": "work.ovpn", "path": "...", "state": "CONNECTING"}}
+
+Methods: list_configs, status, connect, disconnect, get_metrics,
+subscribe_events and unsubscribe_events. A subscribed client is sent
+notifications {"jsonrpc": "2.0", "method": "event", "params": {...}} whose
+params are the events 'main.py --headless' prints: 'state' on every
+connection state change and 'log' for log messages.
+
+Everything runs on the GUI thread and nothing in it blocks: requests are
+answered from the managers' in-memory state as soon as they are read, and
+an event is encoded once and queued on every subscriber's socket. Configs
+are the ones the app's background discovery reported (set_configs); until
+it has, the cached index stands in and list_configs says discovery is
+pending. A client
+that stops reading is disconnected once C.CONTROL_MAX_BUFFERED_BYTES are
+queued for it, so it can neither grow the app's memory nor hold up the rest.
+"""
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from PyQt6.QtCore import QObject
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+import constants as C
+from config_manager import ConfigManager, find_config
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# Application errors
+NO_SUCH_CONFIG = -32001
+NO_CREDENTIALS = -32002
+NOT_CONNECTED = -32003
+
+EVENT_KINDS = ("state", "log")
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def encode_message(message: dict) -> bytes:
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+class _Client:
+    """One connected socket: its unfinished input and the events it subscribed to."""
+
+    __slots__ = ("socket", "pending", "events")
+
+    def __init__(self, socket: QLocalSocket):
+        self.socket = socket
+        self.pending = bytearray()
+        self.events: Set[str] = set()
+
+
+class ControlServer(QObject):
+    """Serves the control protocol over a QLocalServer; see the module docstring."""
+
+    def __init__(self, vpn_manager, config_manager: ConfigManager, credentials_manager, parent=None,
+                 clock: Callable[[], float] = time.time):
+        super().__init__(parent)
+        self.vpn_manager = vpn_manager
+        self.config_manager = config_manager
+        self.credentials_manager = credentials_manager
+        self._clock = clock
+        self._server = QLocalServer(self)
+        # The socket file is created 0700, on top of the runtime dir being private
+        self._server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self._server.newConnection.connect(self._on_new_connection)
+        self._clients: Dict[QLocalSocket, _Client] = {}
+        self.requests_served = 0
+        # From set_configs; None until the app has reported any
+        self._known_configs: Optional[List] = None
+        self._discovered = False
+        self._methods = {
+            "list_configs": self._list_configs,
+            "status": self._status,
+            "connect": self._connect,
+            "disconnect": self._disconnect,
+            "get_metrics": self._get_metrics,
+            "subscribe_events": self._subscribe_events,
+            "unsubscribe_events": self._unsubscribe_events,
+        }
+        vpn_manager.connection_state_changed.connect(self._on_state_changed)
+        vpn_manager.connection_log_received.connect(self._on_connection_log)
+        vpn_manager.log_received.connect(lambda message: self._broadcast("log", lambda: {"message": message}))
+
+    # --- Server ---
+    def listen(self, path: Optional[Path] = None) -> bool:
+        """Start serving on 'path' (default C.CONTROL_SOCKET_PATH); False if that is not possible."""
+        path = Path(path or C.CONTROL_SOCKET_PATH)
+        try:
+            path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Control socket disabled: cannot create {path.parent}: {e}")
+            return False
+        if path.exists():
+            # With access options Qt binds elsewhere and renames over 'path',
+            # which would silently take the socket from a running instance
+            probe = QLocalSocket()
+            probe.connectToServer(str(path))
+            if probe.waitForConnected(100):
+                probe.abort()
+                logger.warning(f"Control socket disabled: another instance is listening on {path}")
+                return False
+            # Left behind by an instance that did not shut down cleanly
+            QLocalServer.removeServer(str(path))
+        if not self._server.listen(str(path)):
+            logger.warning(f"Control socket disabled: {self._server.errorString()}")
+            return False
+        logger.info(f"Control socket listening on {path}")
+        return True
+
+    def close(self):
+        """Stop listening (removing the socket file) and disconnect every client."""
+        self._server.close()
+        for client in list(self._clients.values()):
+            self._drop(client)
+
+    def is_listening(self) -> bool:
+        return self._server.isListening()
+
+    @property
+    def path(self) -> str:
+        return self._server.fullServerName()
+
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def subscriber_count(self) -> int:
+        return sum(1 for client in self._clients.values() if client.events)
+
+    def _on_new_connection(self):
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            client = _Client(socket)
+            self._clients[socket] = client
+            socket.readyRead.connect(lambda client=client: self._on_ready_read(client))
+            socket.disconnected.connect(lambda client=client: self._drop(client))
+
+    def _drop(self, client: _Client):
+        if self._clients.pop(client.socket, None) is None:
+            return
+        client.socket.abort()
+        client.socket.deleteLater()
+
+    # --- Requests ---
+    def _on_ready_read(self, client: _Client):
+        client.pending += client.socket.readAll().data()
+        while client.socket in self._clients:
+            end = client.pending.find(b"\n")
+            if end < 0:
+                break
+            line = bytes(client.pending[:end])
+            del client.pending[:end + 1]
+            if line.strip():
+                self._handle_line(client, line)
+        if len(client.pending) > C.CONTROL_MAX_BUFFERED_BYTES:
+            logger.warning("Dropping control client: request too long")
+            self._drop(client)
+        elif client.socket in self._clients:
+            # Answer now rather than when control returns to the event loop
+            client.socket.flush()
+
+    def _handle_line(self, client: _Client, line: bytes):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            self._send_error(client, None, PARSE_ERROR, "Parse error")
+            return
+        if not isinstance(message, dict):
+            self._send_error(client, None, INVALID_REQUEST, "Invalid Request")
+            return
+        request_id = message.get("id")
+        params = message.get("params", {})
+        if message.get("jsonrpc") != "2.0" or not isinstance(message.get("method"), str):
+            self._send_error(client, request_id, INVALID_REQUEST, "Invalid Request")
+            return
+        method = self._methods.get(message["method"])
+        if method is None:
+            self._send_error(client, request_id, METHOD_NOT_FOUND, f"Method not found: {message['method']}")
+            return
+        if not isinstance(params, dict):
+            self._send_error(client, request_id, INVALID_PARAMS, "params must be an object")
+            return
+        self.requests_served += 1
+        # Without an id the request is a notification and gets no answer
+        wants_answer = "id" in message
+
+        def respond(result):
+            if not wants_answer:
+                return
+            if isinstance(result, RpcError):
+                self._send_error(client, request_id, result.code, str(result))
+            else:
+                self._send(client, {"jsonrpc": "2.0", "id": request_id, "result": result})
+
+        try:
+            method(client, params, respond)
+        except RpcError as e:
+            respond(e)
+        except Exception as e:
+            logger.exception(f"Control request '{message['method']}' failed")
+            respond(RpcError(INTERNAL_ERROR, f"Internal error: {e}"))
+
+    def _send_error(self, client: _Client, request_id, code: int, message: str):
+        self._send(client, {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}})
+
+    def _send(self, client: _Client, message: dict):
+        if client.socket in self._clients:
+            self._write(client, encode_message(message))
+            client.socket.flush()
+
+    def _write(self, client: _Client, data: bytes):
+        if client.socket.bytesToWrite() + len(data) > C.CONTROL_MAX_BUFFERED_BYTES:
+            logger.warning("Dropping control client that stopped reading")
+            self._drop(client)
+            return
+        client.socket.write(data)
+
+    def set_configs(self, configs: List, discovered: bool = True):
+        """The configs of the app's config discovery, or (discovered=False) of its cached index."""
+        self._known_configs = list(configs)
+        self._discovered = self._discovered or discovered
+
+    # --- Methods ---
+    def _configs(self) -> List:
+        if self._known_configs is not None:
+            return self._known_configs
+        # Scanning the config directories is the discovery's job, off this thread
+        return self.config_manager.cached_configs() or []
+
+    def _config_key(self, params: dict) -> str:
+        spec = params.get("config")
+        if not isinstance(spec, str) or not spec:
+            raise RpcError(INVALID_PARAMS, "'config' must be a config name or path")
+        path = find_config(spec, self._configs())
+        if path is None:
+            pending = "" if self._discovered else "; config discovery is still running"
+            raise RpcError(NO_SUCH_CONFIG, f"No config named '{spec}'{pending}")
+        return str(path)
+
+    def _connection_status(self, key: str) -> dict:
+        connection = self.vpn_manager.connection(key)
+        failure = connection.last_failure() if connection is not None else None
+        return {
+            "config": Path(key).name,
+            "path": key,
+            "state": self.vpn_manager.state(key).name,
+            "failure": failure.name if failure is not None else None,
+        }
+
+    def _list_configs(self, client, params, respond):
+        respond({
+            "configs": [
+                {"name": config.name, "path": str(config.path), "state": self.vpn_manager.state(config.path).name}
+                for config in self._configs()
+            ],
+            "discovery_pending": not self._discovered,
+        })
+
+    def _status(self, client, params, respond):
+        if "config" in params:
+            keys = [self._config_key(params)]
+        else:
+            keys = [str(connection.config_path) for connection in self.vpn_manager.connections()]
+        respond({"connections": [self._connection_status(key) for key in keys]})
+
+    def _connect(self, client, params, respond):
+        key = self._config_key(params)
+        username, password = params.get("username"), params.get("password")
+        if username is not None or password is not None:
+            if not isinstance(username, str) or not isinstance(password, str) or not username:
+                raise RpcError(INVALID_PARAMS, "'username' and 'password' must both be given")
+            self.vpn_manager.connect(key, username, password)
+            respond(self._connection_status(key))
+            return
+
+        def with_credentials(credentials):
+            username, password = credentials
+            if not username or not password:
+                respond(RpcError(NO_CREDENTIALS, f"No saved credentials for {Path(key).name}"))
+                return
+            self.vpn_manager.connect(key, username, password)
+            respond(self._connection_status(key))
+
+        # Usually answered from the cache; otherwise once the keyring worker has read it
+        self.credentials_manager.request_credentials(Path(key), with_credentials)
+
+    def _disconnect(self, client, params, respond):
+        if params.get("all"):
+            keys = [str(c.config_path) for c in self.vpn_manager.active_connections()]
+            self.vpn_manager.disconnect_all()
+        else:
+            if "config" in params:
+                key = self._config_key(params)
+                connection = self.vpn_manager.connection(key)
+                if connection is None or not connection.is_active():
+                    raise RpcError(NOT_CONNECTED, f"{Path(key).name} is not connected")
+            else:
+                active = self.vpn_manager.active_connections()
+                if len(active) != 1:
+                    raise RpcError(
+                        NOT_CONNECTED if not active else INVALID_PARAMS,
+                        "Not currently connected" if not active
+                        else "Several connections are active; give 'config' or 'all'",
+                    )
+                key = str(active[0].config_path)
+            keys = [key]
+            self.vpn_manager.disconnect(key)
+        respond({"connections": [self._connection_status(key) for key in keys]})
+
+    def _get_metrics(self, client, params, respond):
+        connections = {}
+        for connection in self.vpn_manager.connections():
+            buffer = connection.telemetry.buffer
+            rx_rate, tx_rate = buffer.current_rates()
+            connections[str(connection.config_path)] = {
+                "state": connection.state.name,
+                "rx_bytes": buffer.total_rx,
+                "tx_bytes": buffer.total_tx,
+                "rx_rate": rx_rate,
+                "tx_rate": tx_rate,
+                "peak_rx_rate": buffer.peak_rx_rate,
+                "peak_tx_rate": buffer.peak_tx_rate,
+                "samples": len(buffer),
+            }
+        timing_store = self.vpn_manager.timing_store
+        connect_timings = {
+            key: [
+                {"phase": stats.phase.key, "count": stats.count, "p50_s": stats.p50, "p95_s": stats.p95}
+                for stats in timing_store.summary(key)
+            ]
+            for key in timing_store.configs()
+        }
+        respond({
+            "connections": connections,
+            "connect_timings": connect_timings,
+            "control": {
+                "clients": self.client_count(),
+                "subscribers": self.subscriber_count(),
+                "requests": self.requests_served,
+            },
+        })
+
+    def _event_kinds(self, params: dict) -> Set[str]:
+        kinds = params.get("events", list(EVENT_KINDS))
+        if not isinstance(kinds, list) or not all(kind in EVENT_KINDS for kind in kinds):
+            raise RpcError(INVALID_PARAMS, f"'events' must be a list of {', '.join(EVENT_KINDS)}")
+        return set(kinds)
+
+    def _subscribe_events(self, client, params, respond):
+        client.events |= self._event_kinds(params)
+        respond({"events": sorted(client.events)})
+
+    def _unsubscribe_events(self, client, params, respond):
+        client.events -= self._event_kinds(params)
+        respond({"events": sorted(client.events)})
+
+    # --- Events ---
+    def _on_state_changed(self, key: str, state):
+        self._broadcast("state", lambda: {"config": Path(key).name, "path": key, "state": state.name})
+
+    def _on_connection_log(self, key: str, message: str):
+        self._broadcast("log", lambda: {"config": Path(key).name, "path": key, "message": message})
+
+    def _broadcast(self, kind: str, fields: Callable[[], dict]):
+        """Send an event to its subscribers; it is only built and encoded if there are any."""
+        subscribers = [client for client in self._clients.values() if kind in client.events]
+        if not subscribers:
+            return
+        params = {"event": kind, **fields(), "time": round(self._clock(), 3)}
+        data = encode_message({"jsonrpc": "2.0", "method": "event", "params": params})
+        for client in subscribers:
+            # Written when control returns to the event loop; the GUI does not wait on clients
+            self._write(client, data)
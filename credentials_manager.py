@@ -1,91 +1,398 @@
 # credentials_manager.py
+"""
+Saved VPN credentials in the system keyring.
+
+Each config has one keyring entry holding a versioned JSON record
+(username, password, optional metadata), so reading, saving and deleting
+are one keyring call each. Entries in the older format - username and
+password as two separate entries - are moved into a record the first time
+they are read.
+
+Keyring calls can block for seconds (the Secret Service backend talks
+D-Bus, and an unlock prompt waits on the user), so the GUI does not make
+them itself: lookups, saves and deletes run on a single worker, a lookup
+starts as soon as a config is selected, and what was read is kept in a
+short-lived in-memory cache that is wiped when the session locks and on
+quit. keyring itself is imported on the worker the first time it is needed;
+importing it pulls in the backend machinery, which start-up can do without.
+"""
 import hashlib
+import importlib.util
+import json
 import logging
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Tuple
-
-try:
-    import keyring
-    from keyring.errors import NoKeyringError
-except ImportError:
-    keyring = None
-    NoKeyringError = type("NoKeyringError", (Exception,), {})
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import constants as C
+from command_executor import CommandExecutor, CommandResult
 
 logger = logging.getLogger(__name__)
 
+# Set by _load_keyring(); the placeholders keep the except clauses valid until then
+keyring = None
+NoKeyringError = type("NoKeyringError", (Exception,), {})
+PasswordDeleteError = type("PasswordDeleteError", (Exception,), {})
+_keyring_lock = threading.Lock()
+
+Credentials = Tuple[Optional[str], Optional[str]]
+
+CREDENTIALS_RECORD_VERSION = 1
+# Keyring "username" of the entry holding a config's record
+RECORD_KEY = "credentials"
+# Entries of the format before the record, one per field
+LEGACY_KEYS = ("username", "password")
+
+
+def _load_keyring():
+    """Import keyring on first use. Raises ImportError when it is not installed."""
+    global keyring, NoKeyringError, PasswordDeleteError
+    with _keyring_lock:
+        if keyring is None:
+            import keyring as module
+            from keyring.errors import NoKeyringError as no_keyring, PasswordDeleteError as delete_error
+
+            NoKeyringError, PasswordDeleteError = no_keyring, delete_error
+            keyring = module
+    return keyring
+
+
+def _clean(value) -> Optional[str]:
+    """Trimmed string, None for missing or empty values."""
+    if not isinstance(value, str):
+        return None
+    return value.strip() or None
+
+
+@dataclass
+class CredentialRecord:
+    username: Optional[str] = None
+    password: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def credentials(self) -> Credentials:
+        return self.username, self.password
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "version": CREDENTIALS_RECORD_VERSION,
+                "username": self.username,
+                "password": self.password,
+                "metadata": self.metadata,
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "CredentialRecord":
+        """Raises ValueError for anything but a record of CREDENTIALS_RECORD_VERSION."""
+        data = json.loads(text)
+        if not isinstance(data, dict):
+            raise ValueError("credential record is not an object")
+        if data.get("version") != CREDENTIALS_RECORD_VERSION:
+            raise ValueError(f"unsupported credential record version {data.get('version')!r}")
+        metadata = data.get("metadata")
+        return cls(
+            _clean(data.get("username")),
+            _clean(data.get("password")),
+            metadata if isinstance(metadata, dict) else {},
+        )
+
 
 class CredentialsManager:
-    def __init__(self):
-        self.keyring_available = keyring is not None
+    def __init__(
+        self,
+        executor: Optional[CommandExecutor] = None,
+        cache_ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.keyring_available = importlib.util.find_spec("keyring") is not None
         if not self.keyring_available:
             logger.warning(
                 "`keyring` library is not installed. "
                 "Passwords will not be saved."
             )
+        # One worker: keyring backends are not meant to be called concurrently
+        self._executor = executor if executor is not None else CommandExecutor(max_threads=1)
+        self._cache_ttl = C.CREDENTIALS_CACHE_TTL_SECONDS if cache_ttl is None else cache_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # config path as given -> service name, so the path is resolved once
+        self._service_names: Dict[str, str] = {}
+        # service name -> (expiry, credentials)
+        self._cache: Dict[str, Tuple[float, Credentials]] = {}
+        # Bumped by clear_cache(), so lookups already running do not refill it
+        self._epoch = 0
+        # service name -> callbacks waiting for the lookup in flight
+        self._waiters: Dict[str, List[Callable[[Credentials], None]]] = {}
 
     def _get_service_name(self, config_path: Path) -> str:
         """Create a stable keyring service name for the config path."""
-        # Use a hash of the resolved path to ensure consistency and avoid
-        # special characters.
-        config_id = hashlib.sha256(
-            str(config_path.resolve()).encode()
-        ).hexdigest()
-        return f"{C.APP_NAME}-{config_id}"
+        key = str(config_path)
+        service_name = self._service_names.get(key)
+        if service_name is None:
+            # Use a hash of the resolved path to ensure consistency and avoid
+            # special characters.
+            config_id = hashlib.sha256(
+                str(config_path.resolve()).encode()
+            ).hexdigest()
+            service_name = self._service_names[key] = f"{C.APP_NAME}-{config_id}"
+        return service_name
+
+    # --- Cache ---
+    def cached_credentials(self, config_path: Path) -> Optional[Credentials]:
+        """The cached credentials of a config, or None when a lookup is needed."""
+        return self._cached(self._get_service_name(config_path))
 
+    def clear_cache(self):
+        """Forget every cached credential (session locked, quitting)."""
+        with self._lock:
+            self._cache.clear()
+            self._epoch += 1
+
+    def _cached(self, service_name: str) -> Optional[Credentials]:
+        with self._lock:
+            entry = self._cache.get(service_name)
+            if entry is None:
+                return None
+            expires, credentials = entry
+            if expires <= self._clock():
+                del self._cache[service_name]
+                return None
+            return credentials
+
+    def _store(self, service_name: str, credentials: Credentials, epoch: Optional[int] = None):
+        if self._cache_ttl <= 0:
+            return
+        with self._lock:
+            if epoch is None or epoch == self._epoch:
+                self._cache[service_name] = (self._clock() + self._cache_ttl, credentials)
+
+    def _current_epoch(self) -> int:
+        with self._lock:
+            return self._epoch
+
+    # --- Lookups ---
     def get_credentials(
         self, config_path: Path
     ) -> Tuple[Optional[str], Optional[str]]:
-        """Retrieve username and password for the given config path."""
+        """
+        Retrieve username and password for the given config path. Blocks on
+        the keyring unless they are cached; the GUI uses request_credentials().
+        """
+        return self.read_many([config_path])[config_path]
+
+    def get_record(self, config_path: Path) -> Optional[CredentialRecord]:
+        """The full saved record of a config, metadata included (blocking, not cached)."""
+        if not self.keyring_available:
+            return None
+        service_name = self._get_service_name(config_path)
+        try:
+            _load_keyring()
+            return self._read_record(config_path, service_name)
+        except NoKeyringError:
+            self.keyring_available = False
+        except Exception as e:
+            logger.error(f"Failed to retrieve credentials: {e}", exc_info=True)
+        return None
+
+    def read_many(self, config_paths: Iterable[Path]) -> Dict[Path, Credentials]:
+        """Credentials of several configs (blocking); cached ones are not read again."""
+        config_paths = list(config_paths)
+        if not self.keyring_available:
+            return {path: (None, None) for path in config_paths}
+        epoch = self._current_epoch()
+        found: Dict[Path, Credentials] = {}
+        for path in config_paths:
+            service_name = self._get_service_name(path)
+            cached = self._cached(service_name)
+            if cached is None:
+                cached, cacheable = self._read(path, service_name)
+                if cacheable:
+                    self._store(service_name, cached, epoch)
+            found[path] = cached
+        return found
+
+    def prefetch(self, config_path: Path):
+        """Start reading a config's credentials in the background, unless cached or already being read."""
+        self.prefetch_many([config_path])
+
+    def prefetch_many(self, config_paths: Iterable[Path]):
+        """Read the credentials of several configs in one background job."""
         if not self.keyring_available:
-            return None, None
+            return
+        wanted = {}
+        for path in config_paths:
+            service_name = self._get_service_name(path)
+            if service_name in self._waiters or self._cached(service_name) is not None:
+                continue
+            self._waiters[service_name] = []
+            wanted[service_name] = path
+        if wanted:
+            self._start_lookup(wanted)
 
+    def request_credentials(
+        self, config_path: Path, callback: Callable[[Credentials], None]
+    ):
+        """
+        Call callback((username, password)) on the GUI thread: right away
+        when cached, otherwise once the worker has read the keyring.
+        """
+        if not self.keyring_available:
+            callback((None, None))
+            return
         service_name = self._get_service_name(config_path)
+        cached = self._cached(service_name)
+        if cached is not None:
+            callback(cached)
+            return
+        waiters = self._waiters.get(service_name)
+        if waiters is not None:
+            waiters.append(callback)
+            return
+        self._waiters[service_name] = [callback]
+        self._start_lookup({service_name: config_path})
+
+    def _start_lookup(self, wanted: Dict[str, Path]):
+        """Read every service name -> config path of 'wanted' in one worker job."""
+        epoch = self._current_epoch()
+        self._executor.submit(
+            lambda ctx: {
+                service_name: self._read(path, service_name)
+                for service_name, path in wanted.items()
+            },
+            tag="keyring",
+            callback=lambda result: self._on_lookup_finished(wanted, epoch, result),
+        )
+
+    def _on_lookup_finished(self, wanted: Dict[str, Path], epoch: int, result: CommandResult):
+        if result.error is not None:
+            logger.error(f"Failed to retrieve credentials: {result.error}")
+        for service_name in wanted:
+            waiters = self._waiters.pop(service_name, [])
+            credentials: Credentials = (None, None)
+            if result.ok:
+                credentials, cacheable = result.value[service_name]
+                # A save or delete made while the lookup ran wins over what it read
+                if cacheable and self._cached(service_name) is None:
+                    self._store(service_name, credentials, epoch)
+            cached = self._cached(service_name)
+            if cached is not None:
+                credentials = cached
+            for callback in waiters:
+                try:
+                    callback(credentials)
+                except Exception as e:
+                    logger.error(f"Credentials callback failed: {e}", exc_info=True)
+
+    def _read(self, config_path: Path, service_name: str) -> Tuple[Credentials, bool]:
+        """Read the keyring; also returns whether the answer may be cached."""
         try:
-            username = keyring.get_password(service_name, "username")
-            password = keyring.get_password(service_name, "password")
-            # Normalize and trim
-            if username is not None:
-                username = username.strip()
-            if password is not None:
-                password = password.strip()
-            # Treat empty strings as missing
-            if username == "":
-                username = None
-            if password == "":
-                password = None
-            if username is not None or password is not None:
+            _load_keyring()
+            record = self._read_record(config_path, service_name)
+            if record is None:
+                return (None, None), True
+            if record.username is not None or record.password is not None:
                 logger.info(f"Retrieved credentials for {config_path.name}")
-            return username, password
+            return record.credentials, True
         except NoKeyringError:
             logger.warning(
                 "No keyring backend found. Cannot retrieve credentials."
             )
             self.keyring_available = False
-            return None, None
+            return (None, None), False
         except Exception as e:
+            # E.g. the unlock prompt was dismissed; ask again next time
             logger.error(f"Failed to retrieve credentials: {e}", exc_info=True)
-            return None, None
+            return (None, None), False
 
+    def _read_record(self, config_path: Path, service_name: str) -> Optional[CredentialRecord]:
+        text = keyring.get_password(service_name, RECORD_KEY)
+        if text is None:
+            return self._migrate_legacy(config_path, service_name)
+        try:
+            return CredentialRecord.from_json(text)
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable saved credentials for {config_path.name}: {e}")
+            return None
+
+    def _migrate_legacy(self, config_path: Path, service_name: str) -> Optional[CredentialRecord]:
+        """Move credentials saved as two entries into a record. Costs a keyring call when there are none."""
+        # A username without a password was never usable, so look at the password first
+        password = _clean(keyring.get_password(service_name, "password"))
+        if password is None:
+            return None
+        record = CredentialRecord(_clean(keyring.get_password(service_name, "username")), password)
+        if record.username is None:
+            return record
+        try:
+            keyring.set_password(service_name, RECORD_KEY, record.to_json())
+            self._delete_legacy(service_name)
+            logger.info(f"Moved saved credentials for {config_path.name} into a single keyring entry")
+        except Exception as e:
+            # Still usable as they are; try again next time
+            logger.warning(f"Could not migrate saved credentials for {config_path.name}: {e}")
+        return record
+
+    # --- Changes ---
     def save_credentials(
-        self, config_path: Path, username: str, password: str
+        self,
+        config_path: Path,
+        username: str,
+        password: str,
+        metadata: Optional[Dict[str, Any]] = None,
     ) -> None:
-        """Saves username and password to the keyring."""
+        """Saves username and password to the keyring (in the background)."""
         if not self.keyring_available:
             return
 
+        # Trim inputs
+        username = (username or "").strip()
+        password = (password or "").strip()
+        # Do not save empty credentials
+        if not username or not password:
+            logger.warning("Refusing to save empty credentials.")
+            return
         service_name = self._get_service_name(config_path)
+        record = CredentialRecord(username, password, dict(metadata or {}))
+        self._store(service_name, record.credentials)
+        self._executor.submit(
+            lambda ctx: self._write(config_path, service_name, record),
+            tag="keyring",
+        )
+
+    def delete_credentials(self, config_path: Path) -> None:
+        """Deletes credentials for a given config path from the keyring (in the background)."""
+        self.delete_many([config_path])
+
+    def delete_many(self, config_paths: Iterable[Path]) -> None:
+        """Deletes the credentials of several configs in one background job."""
+        if not self.keyring_available:
+            return
+
+        targets = {}
+        for path in config_paths:
+            service_name = self._get_service_name(path)
+            self._store(service_name, (None, None))
+            targets[service_name] = path
+        if targets:
+            self._executor.submit(
+                lambda ctx: [self._delete(path, name) for name, path in targets.items()],
+                tag="keyring",
+            )
+
+    def wait_for_pending(self, timeout: float) -> bool:
+        """Block until queued keyring writes are done (used on application shutdown)."""
+        return self._executor.wait_for_done(timeout)
+
+    def _write(self, config_path: Path, service_name: str, record: CredentialRecord):
         try:
-            # Trim inputs
-            username = (username or "").strip()
-            password = (password or "").strip()
-            # Do not save empty credentials
-            if not username or not password:
-                logger.warning("Refusing to save empty credentials.")
-                return
-            keyring.set_password(service_name, "username", username)
-            keyring.set_password(service_name, "password", password)
+            _load_keyring()
+            keyring.set_password(service_name, RECORD_KEY, record.to_json())
             logger.info(f"Saved credentials for {config_path.name}")
         except NoKeyringError:
             logger.warning(
@@ -94,25 +401,29 @@ class CredentialsManager:
             self.keyring_available = False
         except Exception as e:
             logger.error(f"Failed to save credentials: {e}", exc_info=True)
+            # Do not keep serving what never made it into the keyring
+            with self._lock:
+                self._cache.pop(service_name, None)
 
-    def delete_credentials(self, config_path: Path) -> None:
-        """Deletes credentials for a given config path from the keyring."""
-        if not self.keyring_available:
-            return
-
-        service_name = self._get_service_name(config_path)
+    def _delete(self, config_path: Path, service_name: str):
         try:
-            # It's safe to try to delete even if they don't exist
-            try:
-                keyring.delete_password(service_name, "username")
-            except Exception:
-                pass  # May not exist
+            _load_keyring()
             try:
-                keyring.delete_password(service_name, "password")
-            except Exception:
-                pass  # May not exist
+                keyring.delete_password(service_name, RECORD_KEY)
+            except PasswordDeleteError:
+                pass  # Never read since they were saved in the old format
+            # Also left behind by a migration that could not remove them; the
+            # next read would migrate them back
+            self._delete_legacy(service_name)
             logger.info(f"Deleted credentials for {config_path.name}")
         except NoKeyringError:
             pass  # Nothing to delete
         except Exception as e:
             logger.error(f"Failed to delete credentials: {e}", exc_info=True)
+
+    def _delete_legacy(self, service_name: str):
+        for key in LEGACY_KEYS:
+            try:
+                keyring.delete_password(service_name, key)
+            except PasswordDeleteError:
+                pass  # May not exist
@@ -0,0 +1,278 @@
+# headless.py
+"""
+'main.py --headless': connect, status and disconnect without a window, for
+servers and CI runners.
+
+The commands drive the GUI's VPNManager (the same connection state machine,
+status sweep and log tail) on a QCoreApplication; QtWidgets is never
+imported. Every event is printed to stdout as one JSON object per line:
+
+    {"event": "state", "config": "work.ovpn", "path": "/home/me/.config/...", "state": "CONNECTING", "time": 1760700000.123}
+
+Tunnels outlive the command that started them (the helper runs them as
+systemd units): 'connect' returns once connected, and a later 'status' or
+'disconnect' asks the helper about them. 'connect --follow' stays in the
+foreground instead, printing transitions until the tunnel ends or the
+process gets SIGINT/SIGTERM, which disconnects it.
+
+Exit status: 0 if the command succeeded, 1 if a tunnel failed or the helper
+could not be asked, 2 for usage errors (unknown config, no credentials).
+"""
+import argparse
+import json
+import logging
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, TextIO, Tuple
+
+from PyQt6.QtCore import QCoreApplication, QObject, QTimer, pyqtSignal
+
+import constants as C
+from config_manager import ConfigManager, find_config
+from helper_backend import backend_from_env
+from vpn_manager import VPNManager
+
+logger = logging.getLogger(__name__)
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+# States that end a command waiting on a config
+_SETTLED_STATES = (C.VpnState.DISCONNECTED, C.VpnState.ERROR, C.VpnState.AUTH_FAILED)
+
+
+class UsageError(Exception):
+    """A command that cannot run as given (exit status 2)."""
+
+
+def resolve_config(spec: str, config_manager: ConfigManager) -> Path:
+    """A config file path, or the name (with or without extension) of a discovered config."""
+    path = find_config(spec, config_manager.discover_configs())
+    if path is not None:
+        return path
+    raise UsageError(f"No config named '{spec}' in {', '.join(map(str, config_manager.config_dirs))}")
+
+
+def read_auth_file(source: str, stdin: TextIO = sys.stdin) -> Tuple[str, str]:
+    """Username and password from an OpenVPN auth-user-pass file ('-' for stdin)."""
+    try:
+        text = stdin.read() if source == "-" else Path(source).read_text()
+    except OSError as e:
+        raise UsageError(f"Cannot read {source}: {e}")
+    lines = text.splitlines()
+    if len(lines) < 2 or not lines[0]:
+        raise UsageError(f"{source}: expected the username on the first line and the password on the second")
+    return lines[0], lines[1]
+
+
+class HeadlessRunner(QObject):
+    """Runs one headless command against a VPNManager and prints its events."""
+
+    # Exit status, once every config the command waits on has settled
+    finished = pyqtSignal(int)
+
+    def __init__(
+        self,
+        manager: VPNManager,
+        out: TextIO = sys.stdout,
+        show_log: bool = False,
+        clock: Callable[[], float] = time.time,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self.manager = manager
+        self._out = out
+        self._clock = clock
+        # config path -> what its next settled state means: connect, follow or disconnect
+        self._pending: Dict[str, str] = {}
+        self._exit_code = EXIT_OK
+        self._finished = False
+        manager.connection_state_changed.connect(self._on_state_changed)
+        if show_log:
+            manager.connection_log_received.connect(
+                lambda key, message: self.print_event("log", **self._names(key), message=message)
+            )
+            manager.log_received.connect(lambda message: self.print_event("log", message=message))
+
+    def is_finished(self) -> bool:
+        return self._finished
+
+    def print_event(self, event: str, **fields):
+        fields = {"event": event, **fields, "time": round(self._clock(), 3)}
+        self._out.write(json.dumps(fields) + "\n")
+        self._out.flush()
+
+    @staticmethod
+    def _names(key: str) -> dict:
+        return {"config": Path(key).name, "path": key}
+
+    # --- Commands ---
+    def connect(self, config_path: Path, username: str, password: str, follow: bool = False):
+        key = str(config_path)
+        self._pending[key] = "follow" if follow else "connect"
+        status = self.manager.query_status([key])[key]
+        if status == "connected":
+            # Started earlier, e.g. by a previous 'connect'; nothing to start
+            self.manager.adopt(key)
+        else:
+            self.manager.connect(key, username, password)
+        self._finish_if_done()
+
+    def status(self, config_paths: Sequence[Path]):
+        for key, status in self.manager.query_status(config_paths).items():
+            if isinstance(status, BaseException):
+                self._exit_code = EXIT_FAILED
+                self.print_event("status", **self._names(key), status="unknown", error=str(status))
+            else:
+                self.print_event("status", **self._names(key), status=status)
+        self._finish_if_done()
+
+    def disconnect(self, config_paths: Sequence[Path], only_running: bool = False):
+        """Stop each config's tunnel; with only_running, configs without one are not reported."""
+        for key, status in self.manager.query_status(config_paths).items():
+            if isinstance(status, BaseException):
+                self._exit_code = EXIT_FAILED
+                self.print_event("error", **self._names(key), message=f"Could not check VPN status: {status}")
+            elif status == "disconnected":
+                if not only_running:
+                    self.print_event("state", **self._names(key), state=C.VpnState.DISCONNECTED.name)
+            else:
+                self._pending[key] = "disconnect"
+                self.manager.adopt(key)
+                self.manager.disconnect(key)
+        self._finish_if_done()
+
+    def stop(self):
+        """Disconnect what --follow keeps up (on SIGINT/SIGTERM)."""
+        for key, command in list(self._pending.items()):
+            if command == "follow":
+                self._pending[key] = "disconnect"
+                self.manager.disconnect(key)
+        self._finish_if_done()
+
+    # --- Internal ---
+    def _on_state_changed(self, key: str, state: C.VpnState):
+        self.print_event("state", **self._names(key), state=state.name)
+        command = self._pending.get(key)
+        if command is None:
+            return
+        if command == "connect" and state == C.VpnState.CONNECTED:
+            self._settle(key, EXIT_OK)
+        elif command == "follow" and state in _SETTLED_STATES:
+            # The tunnel ended on its own
+            self._settle(key, EXIT_FAILED)
+        elif state in _SETTLED_STATES:
+            failed = state != C.VpnState.DISCONNECTED or command == "connect"
+            self._settle(key, EXIT_FAILED if failed else EXIT_OK)
+
+    def _settle(self, key: str, exit_code: int):
+        del self._pending[key]
+        self._exit_code = max(self._exit_code, exit_code)
+        self._finish_if_done()
+
+    def _finish_if_done(self):
+        if not self._pending and not self._finished:
+            self._finished = True
+            self.finished.emit(self._exit_code)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="openvpn-py --headless",
+        description="Connect, check and disconnect VPN tunnels without a window. "
+        "Events are printed as JSON lines.",
+    )
+    parser.add_argument("--log", action="store_true", help="also print the connection log as 'log' events")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log diagnostics to stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    connect = commands.add_parser("connect", help="connect a config and wait until it is up")
+    connect.add_argument("config", help="config file, or the name of a discovered config")
+    connect.add_argument(
+        "--auth-file",
+        metavar="FILE",
+        help="username and password on two lines ('-' reads stdin); default: the saved credentials",
+    )
+    connect.add_argument(
+        "--follow",
+        action="store_true",
+        help="stay in the foreground until the tunnel ends; SIGINT/SIGTERM disconnects",
+    )
+
+    status = commands.add_parser("status", help="print the status of configs")
+    status.add_argument("configs", nargs="*", metavar="config", help="default: every discovered config")
+
+    disconnect = commands.add_parser("disconnect", help="disconnect configs and wait until they are down")
+    disconnect.add_argument("configs", nargs="*", metavar="config")
+    disconnect.add_argument("--all", action="store_true", help="every discovered config with a running tunnel")
+    return parser
+
+
+def _credentials(args, config_path: Path) -> Tuple[str, str]:
+    if args.auth_file:
+        return read_auth_file(args.auth_file)
+    # Imported here: only 'connect' without --auth-file needs the keyring
+    from credentials_manager import CredentialsManager
+    from command_executor import CommandExecutor
+
+    username, password = CredentialsManager(CommandExecutor(inline=True)).get_credentials(config_path)
+    if not username or password is None:
+        raise UsageError(f"No saved credentials for {config_path.name}; pass --auth-file")
+    return username, password
+
+
+def _start(args, runner: HeadlessRunner, config_manager: ConfigManager):
+    if args.command == "connect":
+        config_path = resolve_config(args.config, config_manager)
+        username, password = _credentials(args, config_path)
+        runner.connect(config_path, username, password, follow=args.follow)
+    elif args.command == "status":
+        if args.configs:
+            paths: List[Path] = [resolve_config(spec, config_manager) for spec in args.configs]
+        else:
+            paths = [config.path for config in config_manager.discover_configs()]
+        runner.status(paths)
+    else:
+        if args.all == bool(args.configs):
+            raise UsageError("disconnect needs either config names or --all")
+        if args.all:
+            runner.disconnect([config.path for config in config_manager.discover_configs()], only_running=True)
+        else:
+            runner.disconnect([resolve_config(spec, config_manager) for spec in args.configs])
+
+
+def main(argv: Sequence[str]) -> int:
+    args = build_parser().parse_args(argv)
+    # stdout carries the JSON lines; diagnostics go to stderr
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING, format=C.LOG_FORMAT, stream=sys.stderr
+    )
+    app = QCoreApplication.instance() or QCoreApplication([C.APP_NAME])
+    # Before anything runs the helper: as root, it would create the logs dir root-owned
+    C.ensure_user_dirs()
+    manager = VPNManager(backend_from_env())
+    runner = HeadlessRunner(manager, show_log=args.log)
+    exit_codes: List[int] = []
+    runner.finished.connect(exit_codes.append)
+    runner.finished.connect(lambda code: app.exit(code))
+
+    # Python runs signal handlers only between bytecodes; the idle timer
+    # hands control back to it while Qt's event loop waits
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: runner.stop())
+    wakeup = QTimer()
+    wakeup.timeout.connect(lambda: None)
+    wakeup.start(250)
+
+    try:
+        _start(args, runner, ConfigManager())
+    except UsageError as e:
+        runner.print_event("error", message=str(e))
+        return EXIT_USAGE
+    exit_code = exit_codes[0] if exit_codes else app.exec()
+    # A log archive may still be running
+    manager.wait_for_pending_commands(15)
+    return exit_code
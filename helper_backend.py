@@ -0,0 +1,339 @@
+# helper_backend.py
+"""
+What runs the helper's start/stop/status commands.
+
+A backend takes the commands of openvpn-gui-helper.sh ('start', 'stop',
+'status', 'status-all'; 'archive' is the script's stop branch) and returns a
+HelperResult, the way the script would. The helper daemon runs the real
+script through ScriptBackend; the GUI normally talks to the daemon or sudo
+directly (see VPNManager), but can be handed any backend instead.
+
+SimulatedHelperBackend needs neither root, systemd nor a VPN server: each
+started config gets a thread that writes a realistic OpenVPN log to the log
+path it was given, follows a scripted timeline (connect, authentication
+failure, TLS or resolve error, dropped link, or a hang) and answers status
+queries like the script does. It is meant for load tests (tens of
+thousands of log lines per second) and long connect/disconnect soak runs.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from helper_client import HelperResult, encode_status_all
+
+logger = logging.getLogger(__name__)
+
+
+class HelperBackend:
+    """Runs one helper command and reports its exit status and output."""
+
+    def run(
+        self,
+        command: str,
+        args: Sequence[str],
+        input: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> HelperResult:
+        raise NotImplementedError
+
+    def close(self):
+        """Release whatever the backend holds (threads, sockets)."""
+
+
+# --- Simulator ---
+
+OUTCOMES = ("connect", "auth_failed", "tls_error", "resolve_failed", "drop", "hang")
+
+
+@dataclass
+class SimulationProfile:
+    """How a simulated tunnel behaves once started."""
+
+    # connect | auth_failed | tls_error | resolve_failed | drop | hang
+    outcome: str = "connect"
+    # Seconds from start until the handshake finishes (or fails)
+    connect_delay: float = 1.0
+    # With outcome 'drop': seconds the tunnel stays up before the link dies
+    drop_after: float = 5.0
+    # Log lines per second while connected; 0 keeps the log quiet
+    lines_per_second: float = 0.0
+    # Like OpenVPN's --verb: 4+ adds option and cipher detail to the
+    # handshake, 5+ makes the steady-state lines per-packet traces
+    verb: int = 3
+    remote: str = "vpn.example.com"
+    remote_ip: str = "198.51.100.7"
+    port: int = 1194
+
+    def __post_init__(self):
+        if self.outcome not in OUTCOMES:
+            raise ValueError(f"Unknown simulated outcome '{self.outcome}', expected one of {OUTCOMES}")
+
+
+def profile_from_env(env: Optional[Dict[str, str]] = None) -> SimulationProfile:
+    """
+    A profile from OPENVPN_PY_SIM_OUTCOME, _CONNECT_DELAY, _DROP_AFTER,
+    _LINES_PER_SECOND and _VERB; unset variables keep the defaults.
+    """
+    env = os.environ if env is None else env
+    fields = {
+        "outcome": ("OPENVPN_PY_SIM_OUTCOME", str),
+        "connect_delay": ("OPENVPN_PY_SIM_CONNECT_DELAY", float),
+        "drop_after": ("OPENVPN_PY_SIM_DROP_AFTER", float),
+        "lines_per_second": ("OPENVPN_PY_SIM_LINES_PER_SECOND", float),
+        "verb": ("OPENVPN_PY_SIM_VERB", int),
+    }
+    values = {}
+    for field, (name, convert) in fields.items():
+        if env.get(name):
+            values[field] = convert(env[name])
+    return SimulationProfile(**values)
+
+
+def _handshake(profile: SimulationProfile, device: str) -> List[Tuple[float, str]]:
+    """(fraction of connect_delay, line) of a successful handshake up to PUSH_REPLY."""
+    peer = f"[AF_INET]{profile.remote_ip}:{profile.port}"
+    lines = [
+        (0.0, "OpenVPN 2.6.12 x86_64-pc-linux-gnu [SSL (OpenSSL)] [LZO] [LZ4] [EPOLL] [PKCS11] [MH/PKTINFO] [AEAD] [DCO]"),
+        (0.0, "library versions: OpenSSL 3.0.13 30 Jan 2024, LZO 2.10"),
+        (0.05, f"TCP/UDP: Preserving recently used remote address: {peer}"),
+        (0.05, "UDPv4 link local: (not bound)"),
+        (0.1, f"UDPv4 link remote: {peer}"),
+        (0.15, f"TLS: Initial packet from {peer}, sid=5d2c8d1a 0b6f1e77"),
+        (0.5, f"VERIFY OK: depth=1, CN={profile.remote} CA"),
+        (0.55, f"VERIFY OK: depth=0, CN={profile.remote}"),
+        (0.6, "Control Channel: TLSv1.3, cipher TLSv1.3 TLS_AES_256_GCM_SHA384, peer certificate: 2048 bits RSA"),
+        (0.6, f"[{profile.remote}] Peer Connection Initiated with {peer}"),
+        (0.65, "SENT CONTROL [server]: 'PUSH_REQUEST' (status=1)"),
+        (0.75, "PUSH: Received control message: 'PUSH_REPLY,redirect-gateway def1,dhcp-option DNS 10.8.0.1,"
+               "route-gateway 10.8.0.1,topology subnet,ping 10,ping-restart 60,ifconfig 10.8.0.2 255.255.255.0,"
+               "peer-id 0,cipher AES-256-GCM'"),
+    ]
+    if profile.verb >= 4:
+        lines += [
+            (0.0, "Current Parameter Settings:"),
+            (0.0, "  config = '[UNDEF]'"),
+            (0.0, f"  remote_list[0] = {{'{profile.remote}', '{profile.port}', 'udp'}}"),
+            (0.6, "Data Channel MTU parms [ mss_fix:0 max_frag:0 tun_mtu:1500 tun_max_mtu:1600 headroom:136 payload:1768 tailroom:562 ET:0 ]"),
+            (0.8, "OPTIONS IMPORT: timers and/or timeouts modified"),
+            (0.8, "OPTIONS IMPORT: --ifconfig/up options modified"),
+            (0.8, "OPTIONS IMPORT: route options modified"),
+            (0.8, "OPTIONS IMPORT: --ip-win32 and/or --dhcp-option options modified"),
+        ]
+    lines += [
+        (0.85, "Data Channel: cipher 'AES-256-GCM', peer-id: 0"),
+        (0.9, f"TUN/TAP device {device} opened"),
+        (0.9, f"net_iface_mtu_set: mtu 1500 for {device}"),
+        (0.95, f"net_addr_v4_add: 10.8.0.2/24 dev {device}"),
+        (0.95, f"net_route_v4_add: {profile.remote_ip}/32 via 192.168.1.1 dev [NULL] table 0 metric -1"),
+    ]
+    return sorted(lines, key=lambda item: item[0])
+
+
+def _steady_lines(profile: SimulationProfile, device: str) -> List[str]:
+    peer = f"[AF_INET]{profile.remote_ip}:{profile.port}"
+    if profile.verb >= 5:
+        return [
+            f"UDPv4 READ [1420] from {peer}: P_DATA_V2 kid=0 DATA len=1416",
+            "TUN WRITE [1392]",
+            "TUN READ [84]",
+            f"UDPv4 WRITE [108] to {peer}: P_DATA_V2 kid=0 DATA len=104",
+        ]
+    return [
+        f"PID_TEST: drop packet from {peer} (seq=1042 t=1714560000)",
+        f"{device}: keepalive sent",
+        "TLS: tls_multi_process: initial untrusted session promoted to trusted",
+        "Data Channel: using negotiated cipher 'AES-256-GCM'",
+    ]
+
+
+class _SimulatedUnit(threading.Thread):
+    """One simulated OpenVPN process, writing its log until stopped or it exits."""
+
+    TICK_SECONDS = 0.01
+
+    def __init__(self, name: str, log_path: Path, profile: SimulationProfile, device: str):
+        super().__init__(name=f"sim-{name}", daemon=True)
+        self.log_path = log_path
+        self.profile = profile
+        self.device = device
+        # What the helper's 'status' reports: connected while the unit is active
+        self.status = "connected"
+        self.lines_written = 0
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        try:
+            with open(self.log_path, "a", buffering=1024 * 1024) as log:
+                self._log = log
+                status = self._timeline()
+                if self._stop_event.is_set():
+                    self._write("SIGTERM[hard,] received, process exiting")
+                self.status = status
+        except OSError as e:
+            logger.warning(f"Simulated unit {self.name} cannot write {self.log_path}: {e}")
+            self.status = "error"
+
+    def _write(self, *lines: str):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._log.write("".join(f"{stamp} {line}\n" for line in lines))
+        self._log.flush()
+        self.lines_written += len(lines)
+
+    def _sleep_until(self, deadline: float) -> bool:
+        """Wait until 'deadline' (monotonic); False if the unit was stopped first."""
+        return not self._stop_event.wait(max(0.0, deadline - time.monotonic()))
+
+    def _timeline(self) -> str:
+        profile = self.profile
+        started = time.monotonic()
+        delay = profile.connect_delay
+        peer = f"[AF_INET]{profile.remote_ip}:{profile.port}"
+
+        if profile.outcome == "resolve_failed":
+            if not self._sleep_until(started + delay):
+                return "disconnected"
+            self._write(
+                f"RESOLVE: Cannot resolve host address: {profile.remote}:{profile.port} (Name or service not known)",
+                "Could not determine IPv4/IPv6 protocol",
+                "Exiting due to fatal error",
+            )
+            return "error"
+        if profile.outcome == "tls_error":
+            self._write(f"UDPv4 link remote: {peer}")
+            if not self._sleep_until(started + delay):
+                return "disconnected"
+            self._write(
+                "TLS Error: TLS key negotiation failed to occur within 60 seconds (check your network connectivity)",
+                "TLS Error: TLS handshake failed",
+                "SIGTERM[soft,tls-error] received, process exiting",
+            )
+            return "error"
+
+        for fraction, line in _handshake(profile, self.device):
+            if profile.outcome == "auth_failed" and "PUSH_REPLY" in line:
+                self._write("AUTH: Received control message: AUTH_FAILED",
+                            "SIGTERM[soft,auth-failure] received, process exiting")
+                return "error"
+            if not self._sleep_until(started + fraction * delay):
+                return "disconnected"
+            self._write(line)
+            if profile.outcome == "hang" and "link remote" in line:
+                # The server never answers; only a stop ends this
+                self._stop_event.wait()
+                return "disconnected"
+        if not self._sleep_until(started + delay):
+            return "disconnected"
+        self._write("Initialization Sequence Completed")
+        return self._steady_state()
+
+    def _steady_state(self) -> str:
+        profile = self.profile
+        lines = _steady_lines(profile, self.device)
+        since = time.monotonic()
+        written = 0
+        while self._sleep_until(time.monotonic() + self.TICK_SECONDS):
+            now = time.monotonic()
+            if profile.outcome == "drop" and now - since >= profile.drop_after:
+                self._write(
+                    "[server] Inactivity timeout (--ping-exit), exiting",
+                    "SIGTERM[soft,ping-exit] received, process exiting",
+                )
+                return "disconnected"
+            due = int((now - since) * profile.lines_per_second) - written
+            if due > 0:
+                self._write(*(lines[(written + i) % len(lines)] for i in range(due)))
+                written += due
+        return "disconnected"
+
+
+class SimulatedHelperBackend(HelperBackend):
+    """Stands in for openvpn-gui-helper.sh and the OpenVPN processes it starts."""
+
+    def __init__(
+        self,
+        profile: Optional[SimulationProfile] = None,
+        profiles: Optional[Dict[str, SimulationProfile]] = None,
+    ):
+        self.profile = profile or SimulationProfile()
+        # Per config file name; anything else uses 'profile'
+        self.profiles: Dict[str, SimulationProfile] = dict(profiles or {})
+        self.starts = 0
+        self._units: Dict[str, _SimulatedUnit] = {}
+        self._lock = threading.Lock()
+
+    def unit(self, config_name: str) -> Optional[_SimulatedUnit]:
+        with self._lock:
+            return self._units.get(config_name)
+
+    def run(self, command, args, input=None, env=None, timeout=None) -> HelperResult:
+        if command == "start":
+            return self._start(Path(args[0]), Path(args[1]), input or "")
+        if command in ("stop", "archive"):
+            return self._stop(Path(args[0]).name, timeout)
+        if command == "status":
+            return HelperResult(0, self._status(args[0]) + "\n", "")
+        if command == "status-all":
+            return HelperResult(0, encode_status_all({name: {"status": self._status(name)} for name in args}), "")
+        return HelperResult(1, "", f"ERROR: Unknown command '{command}'")
+
+    def close(self):
+        with self._lock:
+            units, self._units = list(self._units.values()), {}
+        for unit in units:
+            unit.stop()
+        for unit in units:
+            unit.join(timeout=2)
+
+    def _status(self, config_name: str) -> str:
+        unit = self.unit(Path(config_name).name)
+        return unit.status if unit is not None else "disconnected"
+
+    def _start(self, config_path: Path, log_path: Path, auth_input: str) -> HelperResult:
+        name = config_path.name
+        if len(auth_input.splitlines()) < 2:
+            return HelperResult(1, "", "ERROR: Expected username and password on stdin")
+        self._stop(name, timeout=2)
+        profile = self.profiles.get(name, self.profile)
+        with self._lock:
+            self.starts += 1
+            device = f"tun{len(self._units)}"
+            unit = _SimulatedUnit(name, log_path, profile, device)
+            self._units[name] = unit
+        # The unit appends; the file exists as soon as 'start' returns, like the script's
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_path.touch()
+        unit.start()
+        return HelperResult(0, "HELPER_PHASES=env_probe:0,preclean:0,prepare:0,unit_start:0\n", "")
+
+    def _stop(self, config_name: str, timeout: Optional[float]) -> HelperResult:
+        with self._lock:
+            unit = self._units.pop(config_name, None)
+        if unit is None:
+            return HelperResult(0, "", "")
+        unit.stop()
+        unit.join(timeout=timeout or 5)
+        return HelperResult(0, "HELPER_PHASES=unit_stop:0\n", "")
+
+
+def backend_from_env(env: Optional[Dict[str, str]] = None) -> Optional[HelperBackend]:
+    """
+    The backend named by OPENVPN_PY_HELPER_BACKEND: 'simulator' for a
+    SimulatedHelperBackend configured by profile_from_env(); unset (or
+    'system') for None, meaning the helper daemon with sudo as fallback.
+    """
+    env = os.environ if env is None else env
+    name = env.get("OPENVPN_PY_HELPER_BACKEND", "system")
+    if name == "simulator":
+        logger.warning("Using the simulated helper backend; no real tunnels will be started.")
+        return SimulatedHelperBackend(profile_from_env(env))
+    if name != "system":
+        logger.warning(f"Unknown helper backend '{name}'; using the system helper.")
+    return None
@@ -0,0 +1,205 @@
+# helper_client.py
+import json
+import logging
+import re
+import socket
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Commands understood by the helper daemon (see helper_daemon.py)
+HELPER_COMMANDS = ("start", "stop", "status", "status-all", "archive")
+
+# Version of the JSON document printed by the helper's 'status-all'
+STATUS_ALL_VERSION = 1
+
+# Optional 'start' flags after the config and log path: --remote=HOST,PORT,PROTO
+# gives the remotes to try, in order (see remote_probe.py). Kept strict, the
+# values end up on OpenVPN's command line as root; a host may not start with
+# '-' so it cannot be read as another option.
+REMOTE_FLAG_RE = re.compile(
+    r"--remote=[A-Za-z0-9.:_][A-Za-z0-9.:_-]{0,252},[0-9]{1,5},(udp|tcp)[46]?(-client)?"
+)
+
+
+class HelperError(Exception):
+    pass
+
+
+class HelperUnavailableError(HelperError):
+    """Raised when the helper daemon socket cannot be reached."""
+
+
+@dataclass
+class HelperResult:
+    returncode: int
+    stdout: str = ""
+    stderr: str = ""
+
+
+def encode_message(message: dict) -> bytes:
+    """Encode a protocol message as a single JSON line."""
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+def decode_message(line: bytes) -> dict:
+    """Decode a single JSON protocol line into a dict."""
+    message = json.loads(line.decode())
+    if not isinstance(message, dict):
+        raise HelperError("Malformed helper message")
+    return message
+
+
+def encode_status_all(configs: Mapping[str, Mapping]) -> str:
+    """The 'status-all' document for per-config entries ({"status": ..., ...})."""
+    return json.dumps(
+        {"version": STATUS_ALL_VERSION, "configs": {name: dict(entry) for name, entry in configs.items()}},
+        separators=(",", ":"),
+    ) + "\n"
+
+
+def parse_status_all(output: str) -> Dict[str, dict]:
+    """
+    Per-config entries of a 'status-all' document, each with at least a
+    'status' (connected, error or disconnected). Raises HelperError if the
+    output is not such a document.
+    """
+    try:
+        document = json.loads(output)
+    except ValueError as e:
+        raise HelperError(f"Malformed status-all output: {e}")
+    if (
+        not isinstance(document, dict)
+        or document.get("version") != STATUS_ALL_VERSION
+        or not isinstance(document.get("configs"), dict)
+    ):
+        raise HelperError("Unsupported status-all output")
+    entries = {}
+    for name, entry in document["configs"].items():
+        if isinstance(entry, dict):
+            entries[name] = dict(entry, status=str(entry.get("status") or "disconnected"))
+    return entries
+
+
+class HelperClient:
+    """
+    Client for the persistent privileged helper daemon.
+    Keeps one Unix socket connection open so that each request costs a
+    single round-trip instead of a sudo + bash process spawn.
+    """
+
+    def __init__(self, socket_path: Path, timeout: float = 5.0):
+        self.socket_path = Path(socket_path)
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """Return True if the daemon socket exists."""
+        try:
+            return self.socket_path.is_socket()
+        except OSError:
+            return False
+
+    def close(self):
+        with self._lock:
+            self._close_locked()
+
+    def _close_locked(self):
+        try:
+            if self._reader is not None:
+                self._reader.close()
+            if self._sock is not None:
+                self._sock.close()
+        except OSError:
+            pass
+        self._reader = None
+        self._sock = None
+
+    def _connect_locked(self):
+        if self._sock is not None:
+            return
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(str(self.socket_path))
+        except OSError as e:
+            sock.close()
+            raise HelperUnavailableError(
+                f"Helper daemon not reachable at {self.socket_path}: {e}"
+            )
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+
+    def request(
+        self, command: str, wait: Optional[float] = None, **params
+    ) -> dict:
+        """Send one request and wait up to 'wait' seconds for its response."""
+        with self._lock:
+            message = dict(params, command=command, id=self._next_id)
+            self._next_id += 1
+            # A stale connection (daemon restarted) is retried once
+            for attempt in (1, 2):
+                self._connect_locked()
+                try:
+                    # settimeout(0) would make the socket non-blocking
+                    self._sock.settimeout(max(wait, 0.01) if wait is not None else self.timeout)
+                    self._sock.sendall(encode_message(message))
+                    line = self._reader.readline()
+                    if not line:
+                        raise ConnectionResetError("Helper daemon closed the connection")
+                    response = decode_message(line)
+                    break
+                except (ValueError, HelperError) as e:
+                    # Mid-stream garbage: nothing after it on this connection can be trusted
+                    self._close_locked()
+                    raise HelperError(f"Malformed reply from the helper daemon: {e}")
+                except socket.timeout:
+                    # The reply may still arrive later; drop the connection to resync
+                    self._close_locked()
+                    raise HelperError(f"Helper daemon did not answer '{command}' in time")
+                except (ConnectionError, BrokenPipeError) as e:
+                    self._close_locked()
+                    if attempt == 2:
+                        raise HelperUnavailableError(str(e))
+            if response.get("id") != message["id"]:
+                # A late reply to an earlier request; every later one would be off by one
+                self._close_locked()
+                raise HelperError("Helper daemon response out of sequence")
+        if not response.get("ok", False):
+            raise HelperError(response.get("error", "Unknown helper error"))
+        return response
+
+    def run(
+        self,
+        command: str,
+        args: Sequence[str] = (),
+        input: Optional[str] = None,
+        timeout: Optional[float] = None,
+        env: Optional[Dict[str, str]] = None,
+        wait: Optional[float] = None,
+    ) -> HelperResult:
+        """Run a helper command through the daemon and return its outcome.
+        'wait' caps how long to wait for the reply (the caller's remaining budget).
+        """
+        params = {"args": list(args)}
+        if input is not None:
+            params["input"] = input
+        if env:
+            params["env"] = dict(env)
+        if timeout is not None:
+            params["timeout"] = timeout
+        # Give the daemon a moment beyond its own command timeout to answer
+        if timeout is not None:
+            wait = min(wait, timeout + 2.0) if wait is not None else timeout + 2.0
+        response = self.request(command, wait=wait, **params)
+        return HelperResult(
+            returncode=int(response.get("returncode", 0)),
+            stdout=response.get("stdout", ""),
+            stderr=response.get("stderr", ""),
+        )
@@ -0,0 +1,412 @@
+# helper_daemon.py
+"""
+Long-lived privileged helper service for OpenVPN-Py.
+
+Runs as root (installed as the systemd unit 'openvpn-py-helperd.service')
+and accepts newline-delimited JSON requests on a Unix socket. Start, stop
+and archive requests are delegated to openvpn-gui-helper.sh; status answers
+are served from a cache that a background thread keeps fresh with one
+'status-all' helper run for every watched config, so the GUI's periodic
+status poll costs one socket round-trip instead of a sudo + bash spawn.
+"""
+import argparse
+import grp
+import logging
+import os
+import pwd
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from helper_backend import HelperBackend, SimulatedHelperBackend, profile_from_env
+from helper_client import (
+    HELPER_COMMANDS,
+    REMOTE_FLAG_RE,
+    HelperError,
+    HelperResult,
+    decode_message,
+    encode_message,
+    encode_status_all,
+    parse_status_all,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = Path("/run/openvpn-py/helper.sock")
+DEFAULT_HELPER_PATH = Path("/usr/local/bin/openvpn-gui-helper.sh")
+DEFAULT_GROUP = "openvpn"
+
+# Environment variables a client may forward to the helper script.
+# Mirrors the env_keep list of the sudoers rule written by install.sh.
+FORWARDED_ENV_VARS = (
+    "OPENVPN_PY_FORCE_PLUGIN_PATH",
+    "OPENVPN_PY_DISABLE_EXTERNAL",
+    "OPENVPN_PY_ASSUME_AA_ENFORCE",
+    "OPENVPN_PY_VERB",
+    "OPENVPN_PY_ENFORCE_DNS_BLACKHOLE",
+    "OPENVPN_PY_TRY_RESOLVED_AFTER_START",
+    "OPENVPN_PY_STATIC_DNS",
+    "OPENVPN_PY_INTERFACE_HINT",
+    "OPENVPN_PY_PROBE_CACHE_SECONDS",
+)
+
+# Number of positional arguments expected by each helper command
+# (at least that many for 'start' and 'status-all')
+_EXPECTED_ARGS = {"start": 2, "stop": 2, "archive": 2, "status": 1, "status-all": 1}
+_VARIADIC_COMMANDS = ("start", "status-all")
+
+
+class ScriptBackend(HelperBackend):
+    """Executes openvpn-gui-helper.sh directly (the daemon already runs as root)."""
+
+    def __init__(self, helper_path: Path = DEFAULT_HELPER_PATH):
+        self.helper_path = Path(helper_path)
+
+    def run(
+        self,
+        command: str,
+        args,
+        input: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> HelperResult:
+        full_env = dict(os.environ)
+        full_env.update(env or {})
+        try:
+            result = subprocess.run(
+                [str(self.helper_path), command, *args],
+                input=input,
+                capture_output=True,
+                text=True,
+                env=full_env,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            return HelperResult(124, "", f"Helper command '{command}' timed out")
+        return HelperResult(result.returncode, result.stdout, result.stderr)
+
+
+class HelperService:
+    """
+    Dispatches protocol requests to a backend.
+    Status results are cached per config and refreshed in the background
+    for every config that a client asked about recently.
+    """
+
+    def __init__(
+        self,
+        backend,
+        refresh_interval: float = 1.0,
+        watch_seconds: float = 30.0,
+        command_timeout: float = 60.0,
+    ):
+        self.backend = backend
+        self.refresh_interval = refresh_interval
+        self.watch_seconds = watch_seconds
+        self.command_timeout = command_timeout
+        # Per config: the helper's status entry ({"status": ..., "unit": ...}) and when it was fetched
+        self._status_cache: Dict[str, Tuple[dict, float]] = {}
+        # Cleared once the backend turns out not to know 'status-all'
+        self._batch_status = True
+        self._watched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    def start_refresher(self):
+        if self._refresher is not None:
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, name="status-refresher", daemon=True
+        )
+        self._refresher.start()
+
+    def shutdown(self):
+        self._stop_event.set()
+
+    def _refresh_loop(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            now = time.monotonic()
+            with self._lock:
+                names = [
+                    n for n, seen in self._watched.items()
+                    if now - seen <= self.watch_seconds
+                ]
+                for n in list(self._watched):
+                    if n not in names:
+                        self._watched.pop(n, None)
+                        self._status_cache.pop(n, None)
+            if names:
+                try:
+                    self._refresh_statuses(names)
+                except Exception as e:
+                    logger.warning(f"Status refresh for {', '.join(names)} failed: {e}")
+
+    def _refresh_status(self, config_name: str, env=None) -> dict:
+        result = self.backend.run(
+            "status", [config_name], env=env, timeout=self.command_timeout
+        )
+        entry = {"status": result.stdout.strip() or "disconnected"}
+        with self._lock:
+            self._status_cache[config_name] = (entry, time.monotonic())
+        return entry
+
+    def _refresh_statuses(self, config_names: Sequence[str], env=None) -> Dict[str, dict]:
+        """Refresh several configs with one 'status-all'; one 'status' each if the backend lacks it."""
+        if self._batch_status:
+            result = self.backend.run(
+                "status-all", list(config_names), env=env, timeout=self.command_timeout
+            )
+            if result.returncode != 0:
+                logger.info(f"Helper has no usable 'status-all' ({result.stderr.strip()}); polling per config")
+                self._batch_status = False
+            else:
+                try:
+                    entries = parse_status_all(result.stdout)
+                except HelperError as e:
+                    logger.warning(f"Ignoring status-all output: {e}")
+                    entries = {}
+                now = time.monotonic()
+                with self._lock:
+                    for name, entry in entries.items():
+                        self._status_cache[name] = (entry, now)
+                missing = [n for n in config_names if n not in entries]
+                for name in missing:
+                    entries[name] = self._refresh_status(name, env=env)
+                return entries
+        return {name: self._refresh_status(name, env=env) for name in config_names}
+
+    def _invalidate(self, config_name: str):
+        with self._lock:
+            self._status_cache.pop(config_name, None)
+
+    def status(self, config_name: str, env=None) -> str:
+        return self.status_all([config_name], env=env)[config_name]["status"]
+
+    def status_all(self, config_names: List[str], env=None) -> Dict[str, dict]:
+        """Status entries of several configs: cached ones if fresh, the rest in one refresh."""
+        now = time.monotonic()
+        entries = {}
+        with self._lock:
+            for name in config_names:
+                self._watched[name] = now
+                cached = self._status_cache.get(name)
+                if cached is not None and now - cached[1] <= 2 * self.refresh_interval:
+                    entries[name] = cached[0]
+        stale = [n for n in dict.fromkeys(config_names) if n not in entries]
+        if stale:
+            entries.update(self._refresh_statuses(stale, env=env))
+        return {name: entries[name] for name in config_names}
+
+    def handle(self, message: dict, peer_user: Optional[str] = None) -> dict:
+        """Process one request and return the response message."""
+        request_id = message.get("id")
+        command = message.get("command")
+        if command == "ping":
+            return {"id": request_id, "ok": True}
+        if command not in HELPER_COMMANDS:
+            return {"id": request_id, "ok": False, "error": f"Unknown command: {command}"}
+
+        args = message.get("args") or []
+        expected = _EXPECTED_ARGS[command]
+        if (
+            not isinstance(args, list)
+            or len(args) < expected
+            or (len(args) > expected and command not in _VARIADIC_COMMANDS)
+            or not all(isinstance(a, str) and a for a in args)
+        ):
+            return {"id": request_id, "ok": False, "error": f"Invalid arguments for '{command}'"}
+        error = self._validate_args(command, args)
+        if error:
+            return {"id": request_id, "ok": False, "error": error}
+
+        env = {
+            k: str(v)
+            for k, v in (message.get("env") or {}).items()
+            if k in FORWARDED_ENV_VARS
+        }
+        if peer_user:
+            # The helper uses SUDO_USER to locate the user's Documents folder
+            env["SUDO_USER"] = peer_user
+
+        if command == "status":
+            status = self.status(args[0], env=env)
+            return {"id": request_id, "ok": True, "returncode": 0, "stdout": status, "stderr": ""}
+        if command == "status-all":
+            document = encode_status_all(self.status_all(args, env=env))
+            return {"id": request_id, "ok": True, "returncode": 0, "stdout": document, "stderr": ""}
+
+        timeout = message.get("timeout")
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            timeout = self.command_timeout
+        # 'archive' is the helper's stop branch: it stops leftovers and archives the log
+        helper_command = "stop" if command == "archive" else command
+        config_name = Path(args[0]).name
+        result = self.backend.run(
+            helper_command, args, input=message.get("input"), env=env, timeout=timeout
+        )
+        self._invalidate(config_name)
+        if command == "start":
+            with self._lock:
+                self._watched[config_name] = time.monotonic()
+        return {
+            "id": request_id,
+            "ok": True,
+            "returncode": result.returncode,
+            "stdout": result.stdout,
+            "stderr": result.stderr,
+        }
+
+    @staticmethod
+    def _validate_args(command: str, args) -> Optional[str]:
+        if command == "start":
+            config_path, log_path = Path(args[0]), Path(args[1])
+            if not config_path.is_absolute() or not log_path.is_absolute():
+                return "Config and log paths must be absolute"
+            if not all(REMOTE_FLAG_RE.fullmatch(flag) for flag in args[2:]):
+                return "Invalid start flag"
+        elif command == "status-all":
+            if any("/" in a for a in args):
+                return "Expected config file names, not paths"
+        else:
+            if "/" in args[0]:
+                return "Expected a config file name, not a path"
+            if len(args) > 1 and not Path(args[1]).is_absolute():
+                return "Log path must be absolute"
+        return None
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        peer_user = self.server.authorize(self.request)
+        if peer_user is False:
+            self.wfile.write(encode_message({"ok": False, "error": "Permission denied"}))
+            return
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                message = decode_message(line)
+            except Exception:
+                response = {"ok": False, "error": "Malformed request"}
+            else:
+                try:
+                    response = self.server.service.handle(message, peer_user)
+                except Exception as e:
+                    logger.error(f"Request failed: {e}", exc_info=True)
+                    response = {"id": message.get("id"), "ok": False, "error": str(e)}
+            try:
+                self.wfile.write(encode_message(response))
+                self.wfile.flush()
+            except OSError:
+                return
+
+
+class HelperServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server speaking the helper protocol (one JSON object per line)."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, service: HelperService, group: Optional[str] = None):
+        self.socket_path = Path(socket_path)
+        self.service = service
+        self.group = group
+        self._gid = None
+        if group:
+            try:
+                self._gid = grp.getgrnam(group).gr_gid
+            except KeyError:
+                logger.warning(f"Group '{group}' does not exist; only root may use the helper.")
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(str(self.socket_path), _RequestHandler)
+        if self._gid is not None:
+            os.chown(self.socket_path.parent, 0, self._gid)
+            os.chmod(self.socket_path.parent, 0o750)
+            os.chown(self.socket_path, 0, self._gid)
+            os.chmod(self.socket_path, 0o660)
+
+    def authorize(self, sock: socket.socket):
+        """Return the peer's user name, None if unknown, or False if not allowed."""
+        try:
+            creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+            _pid, uid, gid = struct.unpack("3i", creds)
+        except OSError:
+            return None if self.group is None else False
+        try:
+            user = pwd.getpwuid(uid).pw_name
+        except KeyError:
+            user = None
+        if self.group is None or uid == 0:
+            return user if uid != 0 else None
+        if user is None or self._gid is None:
+            return False
+        if self._gid in os.getgrouplist(user, gid):
+            return user
+        return False
+
+    def serve_in_thread(self, poll_interval: float = 0.1) -> threading.Thread:
+        thread = threading.Thread(
+            target=self.serve_forever, args=(poll_interval,), name="helper-server", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def server_close(self):
+        super().server_close()
+        try:
+            self.socket_path.unlink()
+        except OSError:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OpenVPN-Py privileged helper daemon")
+    parser.add_argument("--socket", type=Path, default=DEFAULT_SOCKET_PATH)
+    parser.add_argument("--helper", type=Path, default=DEFAULT_HELPER_PATH)
+    parser.add_argument("--group", default=DEFAULT_GROUP)
+    parser.add_argument("--refresh-interval", type=float, default=1.0)
+    parser.add_argument(
+        "--simulate",
+        action="store_true",
+        help="serve simulated tunnels (OPENVPN_PY_SIM_* settings) instead of running the helper; "
+        "needs no root",
+    )
+    opts = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    if opts.simulate:
+        backend = SimulatedHelperBackend(profile_from_env())
+    elif os.geteuid() != 0:
+        print("ERROR: The helper daemon must run as root.", file=sys.stderr)
+        return 1
+    else:
+        backend = ScriptBackend(opts.helper)
+
+    service = HelperService(backend, refresh_interval=opts.refresh_interval)
+    # Simulated tunnels need no root, so the socket stays owned by the invoking user
+    server = HelperServer(opts.socket, service, group=None if opts.simulate else opts.group)
+    service.start_refresher()
+    logger.info(f"Helper daemon listening on {opts.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.shutdown()
+        server.server_close()
+        backend.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+# log_archive.py
+import logging
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from log_classifier import LogEventKind, find_marked_lines
+
+logger = logging.getLogger(__name__)
+
+# openvpn-<config>-YYYYMMDD-HHMMSS.log, as written by the helper's 'stop' command.
+# The live symlinks (openvpn-<config>.log, openvpn-current.log) do not match.
+ARCHIVE_NAME_RE = re.compile(r"^openvpn-(?P<config>.+)-(?P<stamp>\d{8}-\d{6})\.log$")
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archives (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    config TEXT NOT NULL,
+    session_time INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS archives_config_time ON archives (config, session_time);
+CREATE TABLE IF NOT EXISTS events (
+    archive_id INTEGER NOT NULL REFERENCES archives (id) ON DELETE CASCADE,
+    lineno INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    line TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_kind ON events (kind, archive_id);
+CREATE INDEX IF NOT EXISTS events_archive ON events (archive_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS lines USING fts5 (
+    line,
+    archive_id UNINDEXED,
+    lineno UNINDEXED,
+    tokenize = 'unicode61'
+);
+"""
+
+
+@dataclass
+class ArchiveMatch:
+    path: Path
+    config: str
+    session_time: int  # epoch seconds, from the archive file name
+    lineno: int  # 1-based
+    line: str
+    kind: Optional[LogEventKind] = None
+
+
+def parse_archive_name(name: str) -> Optional[Tuple[str, int]]:
+    """Return (config, session epoch seconds) for an archive file name, else None."""
+    match = ARCHIVE_NAME_RE.match(name)
+    if not match:
+        return None
+    try:
+        stamp = time.mktime(time.strptime(match.group("stamp"), "%Y%m%d-%H%M%S"))
+    except (ValueError, OverflowError):
+        return None
+    return match.group("config"), int(stamp)
+
+
+class LogArchiveIndex:
+    """
+    On-disk search index (SQLite FTS5) over the archived session logs in
+    Documents/OpenVPN-Py. Archives are keyed by file name, mtime and size,
+    so update() only re-reads files that are new or changed and drops
+    the ones the helper pruned. Besides full-text search, every line the
+    log classifier recognises is stored with its kind, which makes
+    "all TLS errors for config X last month" a plain indexed lookup.
+
+    Each call opens its own connection, so the index can be updated from
+    a worker thread while the GUI queries it.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            # Only a cache of the archives; rebuild rather than migrate
+            conn.executescript(
+                "DROP TABLE IF EXISTS lines; DROP TABLE IF EXISTS events; DROP TABLE IF EXISTS archives;"
+            )
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+        return conn
+
+    def update(self, directory: Path) -> Tuple[int, int]:
+        """Bring the index in line with directory. Returns (indexed, removed) archive counts."""
+        directory = Path(directory)
+        on_disk = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    parsed = parse_archive_name(entry.name)
+                    if parsed is None or not entry.is_file(follow_symlinks=False):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                    on_disk[entry.name] = (parsed, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            pass
+
+        indexed = removed = 0
+        with closing(self._connect()) as conn:
+            known = {
+                name: (archive_id, mtime_ns, size)
+                for archive_id, name, mtime_ns, size in conn.execute(
+                    "SELECT id, name, mtime_ns, size FROM archives"
+                )
+            }
+            for name, (archive_id, _, _) in known.items():
+                if name not in on_disk:
+                    self._delete(conn, archive_id)
+                    removed += 1
+            for name, ((config, session_time), mtime_ns, size) in on_disk.items():
+                old = known.get(name)
+                if old is not None and old[1:] == (mtime_ns, size):
+                    continue
+                if old is not None:
+                    self._delete(conn, old[0])
+                try:
+                    self._index_file(conn, directory / name, name, config, session_time, mtime_ns, size)
+                    indexed += 1
+                except OSError as e:
+                    logger.warning(f"Could not index archived log {name}: {e}")
+            conn.commit()
+        if indexed or removed:
+            logger.info(f"Log archive index updated: {indexed} indexed, {removed} removed")
+        return indexed, removed
+
+    def _delete(self, conn: sqlite3.Connection, archive_id: int):
+        conn.execute("DELETE FROM lines WHERE archive_id = ?", (archive_id,))
+        conn.execute("DELETE FROM events WHERE archive_id = ?", (archive_id,))
+        conn.execute("DELETE FROM archives WHERE id = ?", (archive_id,))
+
+    def _index_file(self, conn, path: Path, name, config, session_time, mtime_ns, size):
+        with open(path, "rb") as fh:
+            data = fh.read()
+        cursor = conn.execute(
+            "INSERT INTO archives (name, config, session_time, mtime_ns, size) VALUES (?, ?, ?, ?, ?)",
+            (name, config, session_time, mtime_ns, size),
+        )
+        archive_id = cursor.lastrowid
+        rows = [
+            (raw.decode(errors="replace").rstrip("\r"), archive_id, lineno)
+            for lineno, raw in enumerate(data.split(b"\n"), start=1)
+            if raw.strip()
+        ]
+        events = []
+        lineno, counted = 1, 0
+        for start, end, kind in find_marked_lines(data):
+            lineno += data.count(b"\n", counted, start)
+            counted = start
+            line = data[start:end].decode(errors="replace").rstrip("\r")
+            events.append((archive_id, lineno, kind.name, line))
+        conn.executemany("INSERT INTO lines (line, archive_id, lineno) VALUES (?, ?, ?)", rows)
+        conn.executemany("INSERT INTO events (archive_id, lineno, kind, line) VALUES (?, ?, ?, ?)", events)
+
+    def configs(self) -> List[str]:
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT config FROM archives ORDER BY config")]
+
+    def archive_count(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM archives").fetchone()[0]
+
+    def search(
+        self,
+        directory: Path,
+        text: str = "",
+        config: Optional[str] = None,
+        kinds: Optional[Iterable[LogEventKind]] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 1000,
+    ) -> List[ArchiveMatch]:
+        """
+        Find archived log lines, newest session first. 'text' is matched as
+        words (each term must occur, prefix match on the last one); kinds,
+        config and the session time window narrow the result further.
+        """
+        where, params = [], []
+        if config:
+            where.append("a.config = ?")
+            params.append(config)
+        if since is not None:
+            where.append("a.session_time >= ?")
+            params.append(int(since))
+        if until is not None:
+            where.append("a.session_time < ?")
+            params.append(int(until))
+        kind_names = [k.name for k in kinds] if kinds else []
+        query = _fts_query(text)
+
+        if query:
+            sql = (
+                "SELECT a.name, a.config, a.session_time, l.lineno, l.line, e.kind "
+                "FROM lines l JOIN archives a ON a.id = l.archive_id "
+                "LEFT JOIN events e ON e.archive_id = l.archive_id AND e.lineno = l.lineno "
+                "WHERE lines MATCH ?"
+            )
+            params.insert(0, query)
+            if kind_names:
+                where.append(f"e.kind IN ({','.join('?' * len(kind_names))})")
+                params.extend(kind_names)
+        elif kind_names:
+            sql = (
+                "SELECT a.name, a.config, a.session_time, e.lineno, e.line, e.kind "
+                "FROM events e JOIN archives a ON a.id = e.archive_id "
+                f"WHERE e.kind IN ({','.join('?' * len(kind_names))})"
+            )
+            params = kind_names + params
+        else:
+            # No text and no kind: list the classified lines of the matching sessions
+            sql = (
+                "SELECT a.name, a.config, a.session_time, e.lineno, e.line, e.kind "
+                "FROM events e JOIN archives a ON a.id = e.archive_id WHERE 1"
+            )
+        if where:
+            sql += " AND " + " AND ".join(where)
+        sql += " ORDER BY a.session_time DESC, 4 ASC LIMIT ?"
+        params.append(limit)
+
+        directory = Path(directory)
+        with closing(self._connect()) as conn:
+            return [
+                ArchiveMatch(
+                    directory / name,
+                    config_name,
+                    session_time,
+                    lineno,
+                    line,
+                    LogEventKind[kind] if kind else None,
+                )
+                for name, config_name, session_time, lineno, line, kind in conn.execute(sql, params)
+            ]
+
+
+def _fts_query(text: str) -> str:
+    """Turn user input into a safe FTS5 query: quoted terms, last one as a prefix."""
+    terms = re.findall(r"\w+", text or "")
+    if not terms:
+        return ""
+    quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
@@ -0,0 +1,224 @@
+# log_classifier.py
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class LogEventKind(Enum):
+    AUTH_FAILED = auto()
+    TLS_ERROR = auto()
+    RESOLVE_FAILED = auto()
+    NETWORK_UNREACHABLE = auto()
+    OPTIONS_ERROR = auto()
+    FATAL = auto()
+    INIT_COMPLETE = auto()
+    # Progress of a connection attempt, used to time its phases
+    LINK_UP = auto()
+    TLS_DONE = auto()
+    PUSH_REPLY = auto()
+    DNS_FIXED = auto()
+
+
+# Markers are matched case-insensitively. When one line matches several
+# markers the kind listed first in LogEventKind wins (an AUTH_FAILED line
+# that also says "fatal" is reported as AUTH_FAILED).
+LOG_MARKERS: Dict[LogEventKind, Tuple[str, ...]] = {
+    LogEventKind.AUTH_FAILED: (
+        "AUTH_FAILED",
+        "AUTH FAILURE",
+        "AUTH FAILED",
+        "AUTHENTICATION FAILED",
+    ),
+    LogEventKind.TLS_ERROR: ("TLS ERROR", "VERIFY ERROR"),
+    LogEventKind.RESOLVE_FAILED: ("CANNOT RESOLVE", "RESOLVE:"),
+    LogEventKind.NETWORK_UNREACHABLE: ("NETWORK IS UNREACHABLE",),
+    LogEventKind.OPTIONS_ERROR: ("OPTIONS ERROR",),
+    LogEventKind.FATAL: ("FATAL", "EXITING DUE TO FATAL ERROR"),
+    LogEventKind.INIT_COMPLETE: ("INITIALIZATION SEQUENCE COMPLETED",),
+    LogEventKind.LINK_UP: ("LINK REMOTE:",),
+    LogEventKind.TLS_DONE: ("PEER CONNECTION INITIATED WITH",),
+    LogEventKind.PUSH_REPLY: ("PUSH_REPLY",),
+    LogEventKind.DNS_FIXED: ("POST-START DNS FIX: DONE",),
+}
+
+# Kinds that mean the connection attempt cannot succeed
+FAILURE_KINDS = frozenset(
+    {
+        LogEventKind.TLS_ERROR,
+        LogEventKind.RESOLVE_FAILED,
+        LogEventKind.NETWORK_UNREACHABLE,
+        LogEventKind.OPTIONS_ERROR,
+        LogEventKind.FATAL,
+    }
+)
+
+_PRIORITY = {kind: index for index, kind in enumerate(LogEventKind)}
+
+
+class MarkerAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of byte patterns. The goto and
+    failure links are folded into one transition table, so scanning is a
+    single dict lookup per input byte regardless of how many patterns exist.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[bytes, object]]):
+        self._delta: List[Dict[int, int]] = [{}]
+        self._outputs: List[Tuple[object, ...]] = [()]
+
+        for pattern, value in patterns:
+            state = 0
+            for byte in pattern:
+                nxt = self._delta[state].get(byte)
+                if nxt is None:
+                    nxt = len(self._delta)
+                    self._delta.append({})
+                    self._outputs.append(())
+                    self._delta[state][byte] = nxt
+                state = nxt
+            self._outputs[state] += (value,)
+
+        # Breadth-first: fill in failure links and inherit their transitions
+        fail = [0] * len(self._delta)
+        queue = list(self._delta[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for byte, nxt in list(self._delta[state].items()):
+                queue.append(nxt)
+                f = fail[state]
+                while f and byte not in self._delta[f]:
+                    f = fail[f]
+                candidate = self._delta[f].get(byte, 0)
+                fail[nxt] = candidate if candidate != nxt else 0
+                self._outputs[nxt] += self._outputs[fail[nxt]]
+            for byte, target in self._delta[fail[state]].items():
+                self._delta[state].setdefault(byte, target)
+
+    def search(self, data: bytes) -> List[object]:
+        """Return the values of all patterns occurring in data, in match order."""
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        found: List[object] = []
+        for byte in data:
+            state = delta[state].get(byte, 0)
+            if outputs[state]:
+                found.extend(outputs[state])
+        return found
+
+
+_MARKER_BYTES = [marker.encode() for markers in LOG_MARKERS.values() for marker in markers]
+_AUTOMATON = MarkerAutomaton(
+    (marker.encode(), kind) for kind, markers in LOG_MARKERS.items() for marker in markers
+)
+
+
+def classify_line(line: bytes) -> Optional[LogEventKind]:
+    """Classify a single log line, or return None if it contains no marker."""
+    matches = _AUTOMATON.search(line.upper())
+    if not matches:
+        return None
+    return min(matches, key=_PRIORITY.__getitem__)
+
+
+def find_marked_lines(data: bytes) -> List[Tuple[int, int, LogEventKind]]:
+    """
+    Classify every line of a block of log text at once. Returns
+    (line start, line end, kind) for the lines containing a marker, in order.
+
+    Candidate lines are located with C-level substring search, so text without
+    markers - nearly all of it - never goes through the per-byte automaton.
+    """
+    upper = data.upper()
+    starts = set()
+    for marker in _MARKER_BYTES:
+        pos = upper.find(marker)
+        while pos != -1:
+            starts.add(upper.rfind(b"\n", 0, pos) + 1)
+            pos = upper.find(marker, pos + 1)
+    found = []
+    for start in sorted(starts):
+        end = data.find(b"\n", start)
+        if end < 0:
+            end = len(data)
+        kind = classify_line(data[start:end])
+        if kind is not None:
+            found.append((start, end, kind))
+    return found
+
+
+@dataclass
+class LogEvent:
+    kind: LogEventKind
+    line: str
+    offset: int  # byte offset of the line start in the stream
+
+
+class LogClassifier:
+    """
+    Streaming classifier for the OpenVPN log. Feed it the bytes the log tail
+    reads; it keeps only the stream offset and the unfinished last line, and
+    returns an event for every complete line that contains a known marker.
+    """
+
+    def __init__(self, max_line_length: int = 16 * 1024):
+        self.max_line_length = max_line_length
+        self.reset()
+
+    def reset(self):
+        """Forget everything, e.g. when the log file was replaced or truncated."""
+        self.offset = 0
+        self._carry = b""
+        self._carry_offset = 0
+        self._first: Dict[LogEventKind, LogEvent] = {}
+
+    def feed(self, data: bytes) -> List[LogEvent]:
+        events: List[LogEvent] = []
+        if not data:
+            return events
+        line_offset = self._carry_offset
+        buffer = self._carry + data
+        self.offset += len(data)
+
+        complete = buffer.rfind(b"\n") + 1
+        self._classify_block(buffer[:complete], line_offset, events)
+
+        rest = buffer[complete:]
+        rest_offset = line_offset + complete
+        if len(rest) > self.max_line_length:
+            # Runaway line without a newline: classify what we have and move on
+            self._classify_block(rest, rest_offset, events)
+            rest_offset += len(rest)
+            rest = b""
+        self._carry = rest
+        self._carry_offset = rest_offset
+        return events
+
+    def flush(self) -> List[LogEvent]:
+        """Classify the pending partial line (at end of stream)."""
+        events: List[LogEvent] = []
+        if self._carry:
+            self._classify_block(self._carry, self._carry_offset, events)
+            self._carry_offset += len(self._carry)
+            self._carry = b""
+        return events
+
+    def seen(self, *kinds: LogEventKind) -> bool:
+        return any(kind in self._first for kind in kinds)
+
+    def first(self, kind: LogEventKind) -> Optional[LogEvent]:
+        return self._first.get(kind)
+
+    def first_failure(self) -> Optional[LogEvent]:
+        """Earliest event that indicates a failed connection attempt."""
+        failures = [e for k, e in self._first.items() if k in FAILURE_KINDS]
+        return min(failures, key=lambda e: e.offset) if failures else None
+
+    def _classify_block(self, block: bytes, offset: int, events: List[LogEvent]):
+        for start, end, kind in find_marked_lines(block):
+            line = block[start:end].decode(errors="replace").rstrip("\r")
+            event = LogEvent(kind, line, offset + start)
+            self._first.setdefault(kind, event)
+            events.append(event)
@@ -0,0 +1,199 @@
+# log_tailer.py
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, QCoreApplication, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+
+class LogTailer(QObject):
+    """
+    Follows a growing log file (normally the helper's symlink into /run/openvpn)
+    and emits every newly appended byte.
+
+    The file stays open between reads. Change notifications come from
+    QFileSystemWatcher (inotify on Linux) on the file and on the directory
+    holding the symlink, so retargeting the link is noticed as well; each
+    wake-up drains everything available. When the path cannot be watched
+    it falls back to polling on a timer.
+    """
+
+    data_received = pyqtSignal(bytes)
+    # The file was replaced or truncated; data now starts again at offset 0
+    reset = pyqtSignal()
+
+    def __init__(
+        self,
+        path: Path,
+        parent=None,
+        poll_interval_ms: int = 800,
+        chunk_size: int = 256 * 1024,
+    ):
+        super().__init__(parent)
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self._file = None
+        self._identity = None  # (st_dev, st_ino) of the open file
+        self._position = 0
+        self._running = False
+        self._watcher: Optional[QFileSystemWatcher] = None
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(poll_interval_ms)
+        self._poll_timer.timeout.connect(self.drain)
+
+        # Bursts of notifications collapse into one drain per event loop pass
+        self._drain_timer = QTimer(self)
+        self._drain_timer.setSingleShot(True)
+        self._drain_timer.setInterval(0)
+        self._drain_timer.timeout.connect(self.drain)
+
+    @property
+    def position(self) -> int:
+        return self._position
+
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    def is_watching(self) -> bool:
+        """True when change notifications drive the tail instead of the poll timer."""
+        return self._watcher is not None
+
+    def set_path(self, path: Path):
+        path = Path(path)
+        if path == self.path:
+            return
+        running = self._running
+        self.stop()
+        self.close()
+        self.path = path
+        if running:
+            self.start()
+
+    def start(self):
+        """Begin following the file. Requires a Qt application for notifications."""
+        if self._running:
+            return
+        self._running = True
+        if QCoreApplication.instance() is None:
+            return
+        if not self._start_watching():
+            logger.info(f"Cannot watch {self.path}; polling the log instead")
+            self._poll_timer.start()
+        self.drain()
+
+    def stop(self):
+        self._running = False
+        self._poll_timer.stop()
+        self._drain_timer.stop()
+        if self._watcher is not None:
+            self._watcher.deleteLater()
+            self._watcher = None
+
+    def close(self):
+        """Close the file; the next drain reopens it and starts from offset 0."""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+        self._identity = None
+        self._position = 0
+
+    def drain(self) -> int:
+        """Read everything appended since the last call. Returns the byte count."""
+        if not self._sync_file():
+            return 0
+        total = 0
+        while True:
+            try:
+                chunk = self._file.read(self.chunk_size)
+            except OSError:
+                return total
+            if not chunk:
+                return total
+            self._position += len(chunk)
+            total += len(chunk)
+            self.data_received.emit(chunk)
+            if self._file is None:
+                # A receiver closed us (e.g. the session ended)
+                return total
+
+    def _sync_file(self) -> bool:
+        """Make sure the open file is the one the path points to."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            # Link removed or target gone: wait for the helper to create a new one
+            if self._file is not None:
+                self.close()
+            return False
+
+        identity = (st.st_dev, st.st_ino)
+        if self._file is not None and identity != self._identity:
+            # Symlink retargeted to a new session log
+            self.close()
+            self.reset.emit()
+        if self._file is None:
+            try:
+                self._file = open(self.path, "rb")
+            except OSError:
+                return False
+            opened = os.fstat(self._file.fileno())
+            self._identity = (opened.st_dev, opened.st_ino)
+            self._position = 0
+            self._refresh_watches()
+            return True
+
+        if st.st_size < self._position:
+            # Truncated in place
+            self._file.seek(0)
+            self._position = 0
+            self.reset.emit()
+        return True
+
+    def _start_watching(self) -> bool:
+        watcher = QFileSystemWatcher(self)
+        if not watcher.addPath(str(self.path.parent)):
+            watcher.deleteLater()
+            return False
+        watcher.fileChanged.connect(self._on_changed)
+        watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watcher = watcher
+        self._refresh_watches()
+        return True
+
+    def _refresh_watches(self):
+        """(Re)watch the link and the directory of its current target."""
+        if self._watcher is None:
+            return
+        wanted = {str(self.path.parent)}
+        try:
+            target = self.path.resolve(strict=True)
+            wanted.add(str(self.path))
+            wanted.add(str(target.parent))
+        except OSError:
+            pass
+        watched = set(self._watcher.files()) | set(self._watcher.directories())
+        stale = list(watched - wanted)
+        if stale:
+            self._watcher.removePaths(stale)
+        # A file watch sticks to the inode; re-add it so a retargeted link is followed
+        if str(self.path) in self._watcher.files():
+            self._watcher.removePath(str(self.path))
+        missing = [p for p in wanted if p not in self._watcher.files() and p not in self._watcher.directories()]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def _on_changed(self, _path: str):
+        if self._running:
+            self._drain_timer.start()
+
+    def _on_directory_changed(self, _path: str):
+        if not self._running:
+            return
+        self._refresh_watches()
+        self._drain_timer.start()
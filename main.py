@@ -1,30 +1,93 @@
 # main.py
+# Imported first: start-up phases are timed from here (see --profile-startup)
+import startup_profile
+import argparse
+import json
 import sys
 import logging
-from PyQt6.QtWidgets import QApplication
+
 import constants as C
-from translation import install_translator
-from main_window import MainWindow
+
+
+def parse_args(argv):
+    """Our own options; everything else is left for Qt."""
+    parser = argparse.ArgumentParser(prog="openvpn-py", add_help=False)
+    parser.add_argument(
+        "--profile-startup",
+        nargs="?",
+        const="text",
+        choices=("text", "json"),
+        help="start, report how long each start-up phase and import took, and quit",
+    )
+    parser.add_argument(
+        "--headless",
+        nargs=argparse.REMAINDER,
+        metavar="COMMAND",
+        help="run connect, status or disconnect without a window (see headless.py)",
+    )
+    return parser.parse_known_args(argv[1:])
 
 
 def main():
+    args, qt_args = parse_args(sys.argv)
+    if args.headless is not None:
+        # QtCore only: neither QtWidgets nor the window modules are imported
+        import headless
+
+        sys.exit(headless.main(args.headless))
+    if args.profile_startup and "importtime" not in sys._xoptions:
+        # Import costs need -X importtime; run again with it and report
+        report = startup_profile.run_profiled(sys.argv[1:])
+        if args.profile_startup == "json":
+            print(json.dumps(report))
+        else:
+            print(startup_profile.format_report(report))
+        return
+
+    with startup_profile.phase("import Qt"):
+        from PyQt6.QtWidgets import QApplication
+        from PyQt6.QtCore import QTimer
+    with startup_profile.phase("import application modules"):
+        from translation import install_translator
+        from main_window import MainWindow
+
     # Setup logging
     logging.basicConfig(level=logging.INFO, format=C.LOG_FORMAT)
 
     # Create the application instance
-    app = QApplication(sys.argv)
-    app.setApplicationName(C.APP_NAME)
-    app.setApplicationVersion(C.VERSION)
+    with startup_profile.phase("create application"):
+        app = QApplication(sys.argv[:1] + qt_args)
+        app.setApplicationName(C.APP_NAME)
+        app.setApplicationVersion(C.VERSION)
 
     # The translator must be stored in a variable to avoid garbage collection
-    translator = install_translator(C.APP_NAME)
+    with startup_profile.phase("install translator"):
+        translator = install_translator(C.APP_NAME)
 
     # Create and show the main window
-    window = MainWindow()
-    window.show()
+    with startup_profile.phase("create main window"):
+        window = MainWindow()
+    with startup_profile.phase("show main window"):
+        window.show()
+
+    def on_first_paint():
+        profiler = startup_profile.profiler
+        profiler.mark_first_paint()
+        profiler.finish()
+        logging.getLogger(__name__).info(f"Main window shown {profiler.first_paint * 1000:.0f} ms after start")
+        if args.profile_startup:
+            print(startup_profile.STARTUP_PROFILE_PREFIX + json.dumps(profiler.report()), flush=True)
+            # exit(), not quit(): quit() would ask to confirm closing the window
+            QTimer.singleShot(0, lambda: app.exit(0))
+
+    window.first_painted.connect(on_first_paint)
 
     # Start the event loop
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    if args.profile_startup:
+        # Quit without the confirmation of closeEvent; let background work end first
+        window.wait_for_background_work(5)
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -13,24 +13,34 @@ from PyQt6.QtWidgets import (
     QSystemTrayIcon,
 )
 from PyQt6.QtGui import QIcon, QAction, QDesktopServices
-from PyQt6.QtCore import Qt, pyqtSignal, QUrl, QSettings
-from typing import Optional
+from PyQt6.QtCore import Qt, pyqtSignal, QUrl, QSettings, QTimer, QCoreApplication
+from typing import Optional, Set
 import constants as C
+import startup_profile
 from ui.config_list import ConfigList
 from ui.control_panel import ControlPanel
 from ui.log_viewer import LogViewer
-from ui.logs_window import LogsWindow
+from command_executor import CommandExecutor, CommandResult
 from vpn_manager import VPNManager
+from helper_backend import backend_from_env
+from reconnect import ReconnectScheduler
 from config_manager import ConfigManager, ConfigExistsError
 from credentials_manager import CredentialsManager
-from credentials_dialog import CredentialsDialog
+
+# The logs window, archive search, timing panel, credentials dialog and
+# session lock watcher are imported when first used, not before the window
+# is shown (see 'main.py --profile-startup').
 
 logger = logging.getLogger(__name__)
 
 
 class MainWindow(QMainWindow):
+    # Once, when the window has been painted for the first time
+    first_painted = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._painted = False
         self.setWindowTitle(C.APP_NAME)
         self.setMinimumSize(800, 600)
         try:
@@ -39,33 +49,78 @@ class MainWindow(QMainWindow):
             pass
 
         # --- Manager Classes ---
-        self.config_manager = ConfigManager()
-        self.vpn_manager = VPNManager()
-        self.credentials_manager = CredentialsManager()
+        with startup_profile.phase("create managers"):
+            self.config_manager = ConfigManager()
+            # OPENVPN_PY_HELPER_BACKEND=simulator runs against simulated tunnels
+            self.vpn_manager = VPNManager(backend_from_env())
+            # Keyring access runs on its own worker; see credentials_manager.py
+            self.credentials_manager = CredentialsManager(CommandExecutor(self, max_threads=1))
+            # Created after the first paint (see _finish_startup)
+            self.session_lock = None
+            self.tray = None
+            self.control_server = None
+            # Opt-in per config: reconnect with the saved credentials after a drop
+            self.reconnect_scheduler = ReconnectScheduler(
+                self.vpn_manager, self.credentials_manager.request_credentials, parent=self
+            )
+        # Counts down the next reconnect attempt in the control panel
+        self._reconnect_ticker = QTimer(self)
+        self._reconnect_ticker.setInterval(1000)
+        self._reconnect_ticker.timeout.connect(self._refresh_reconnect_status)
+        # Config discovery runs off the GUI thread
+        self._executor = CommandExecutor(self, max_threads=1)
 
         # --- UI Widgets ---
-        self.config_list = ConfigList()
-        self.control_panel = ControlPanel()
-        self.log_viewer = LogViewer()
+        with startup_profile.phase("create widgets"):
+            self.config_list = ConfigList()
+            self.control_panel = ControlPanel()
+            self.log_viewer = LogViewer()
 
-        # Logs window (lazy-created)
+        # Logs window, archive search and connect timing (lazy-created)
         self.logs_window = None
+        self.archive_browser = None
+        self.timing_panel = None
 
         # --- State Variables ---
         self.selected_config_path: Optional[str] = None
-
-        self.init_ui()
-        self.connect_signals()
-        self._init_tray()
-
-        # Load initial configurations
-        self.load_configs()
-        self.control_panel.update_state(C.VpnState.NO_CONFIG_SELECTED)
-        # Ensure tray reflects initial state
-        try:
-            self._update_tray_from_state(C.VpnState.NO_CONFIG_SELECTED)
-        except Exception:
-            pass
+        # Configs whose Connect click waits for the keyring
+        self._awaiting_credentials: Set[str] = set()
+
+        with startup_profile.phase("lay out window"):
+            self.init_ui()
+            self.connect_signals()
+            self.control_panel.update_state(C.VpnState.NO_CONFIG_SELECTED)
+
+        # Everything else waits until the window is on screen
+        self.first_painted.connect(lambda: QTimer.singleShot(0, self._finish_startup))
+
+    def _finish_startup(self):
+        """Start-up work that does not have to happen before the first paint."""
+        from control_server import ControlServer
+        from session_lock import SessionLockWatcher
+
+        with startup_profile.phase("deferred start-up"):
+            C.ensure_user_dirs()
+            self._load_auto_reconnect_settings()
+            # Scripts drive the running app over a local JSON-RPC socket; created
+            # first so that it is handed the configs the discovery finds
+            self.control_server = ControlServer(
+                self.vpn_manager, self.config_manager, self.credentials_manager, self
+            )
+            # Load initial configurations
+            self.load_configs()
+            # Cached credentials do not outlive an unlocked session
+            self.session_lock = SessionLockWatcher(self)
+            self.session_lock.locked.connect(self.credentials_manager.clear_cache)
+            self._init_tray()
+            if self.control_server.listen():
+                # Also when quitting without closing the window (e.g. --profile-startup)
+                QCoreApplication.instance().aboutToQuit.connect(self.control_server.close)
+            # Ensure tray reflects initial state
+            try:
+                self._update_tray_from_state(self._selected_state())
+            except Exception:
+                pass
 
     def init_ui(self):
         # --- Layout ---
@@ -90,6 +145,8 @@ class MainWindow(QMainWindow):
         view_menu = menubar.addMenu(self.tr("View"))
         self.open_logs_action = view_menu.addAction(self.tr("Open Logs Window"))
         self.open_logs_folder_action = view_menu.addAction(self.tr("Open Logs Folder"))
+        self.search_archives_action = view_menu.addAction(self.tr("Search Archived Logs"))
+        self.connection_timing_action = view_menu.addAction(self.tr("Connection Timing"))
 
     def connect_signals(self):
         # ConfigList signals
@@ -102,47 +159,100 @@ class MainWindow(QMainWindow):
             self.on_connect_clicked
         )
         self.control_panel.disconnect_button.clicked.connect(
-            self.vpn_manager.disconnect
+            self.on_disconnect_clicked
+        )
+        self.control_panel.auto_reconnect_checkbox.toggled.connect(
+            self.on_auto_reconnect_toggled
+        )
+        self.control_panel.export_traffic_button.clicked.connect(
+            self.on_export_traffic
         )
 
-        # VPNManager signals
-        self.vpn_manager.state_changed.connect(self.control_panel.update_state)
-        self.vpn_manager.state_changed.connect(self.on_state_changed)
+        # VPNManager signals (one stream per connection, tagged with its config path)
+        self.vpn_manager.connection_state_changed.connect(self.on_state_changed)
+        self.vpn_manager.connection_log_received.connect(self.on_connection_log_received)
+        self.vpn_manager.connection_telemetry_updated.connect(self.on_telemetry_updated)
+        self.vpn_manager.connection_timing_recorded.connect(self.on_timing_recorded)
         self.vpn_manager.log_received.connect(self.on_log_received)
 
+        # ReconnectScheduler signals
+        self.reconnect_scheduler.reconnect_scheduled.connect(self.on_reconnect_scheduled)
+        self.reconnect_scheduler.reconnect_started.connect(self.on_reconnect_started)
+        self.reconnect_scheduler.reconnect_gave_up.connect(self.on_reconnect_gave_up)
+
         # Actions
         self.open_logs_action.triggered.connect(self.open_logs_window)
         self.open_logs_folder_action.triggered.connect(self.open_logs_folder)
+        self.search_archives_action.triggered.connect(self.open_archive_browser)
+        self.connection_timing_action.triggered.connect(self.open_timing_panel)
 
     def load_configs(self):
-        self.config_list.clear_configs()
-        try:
-            configs = self.config_manager.discover_configs()
-            for config in configs:
-                self.config_list.add_config(config)
-            # Try to restore last selected config
+        """
+        Show the configs from the cached index right away (first start only)
+        and reconcile with the config directories in the background.
+        """
+        if not self.config_list.configs:
             try:
-                settings = QSettings(C.APP_NAME, C.APP_NAME)
-                last = settings.value("last_config_path", None)
-                if isinstance(last, str) and last:
-                    if not self.config_list.select_config_by_path(last):
-                        # Remove stale setting if file no longer exists in list
-                        settings.remove("last_config_path")
-            except Exception:
-                pass
-        except Exception as e:
-            logger.error(f"Failed to discover configs: {e}")
+                cached = self.config_manager.cached_configs()
+            except Exception as e:
+                logger.warning(f"Could not read cached config index: {e}")
+                cached = None
+            if cached:
+                self._show_configs(cached, authoritative=False)
+                if self.control_server is not None:
+                    self.control_server.set_configs(cached, discovered=False)
+        self._executor.submit(
+            lambda ctx: self.config_manager.discover_configs(),
+            tag="configs",
+            callback=self._on_configs_discovered,
+        )
+
+    def _on_configs_discovered(self, result: CommandResult):
+        if result.error is not None:
+            logger.error(f"Failed to discover configs: {result.error}")
             self.show_error_message(
                 self.tr("Error Loading Configurations"),
                 self.tr("Could not load VPN configurations: {0}").format(
-                    str(e)
+                    str(result.error)
                 ),
             )
+            return
+        if not result.ok:
+            return
+        if self.control_server is not None:
+            self.control_server.set_configs(result.value)
+        if result.value != self.config_list.configs:
+            self._show_configs(result.value, authoritative=True)
+
+    def _show_configs(self, configs, authoritative: bool):
+        # Keep what the user picked while the scan was running
+        current = self.config_list.get_selected_config_path()
+        self.config_list.sync_configs(configs)
+        if current and self.config_list.select_config_by_path(current):
+            return
+        # Try to restore last selected config
+        try:
+            settings = QSettings(C.APP_NAME, C.APP_NAME)
+            last = settings.value("last_config_path", None)
+            if isinstance(last, str) and last:
+                if not self.config_list.select_config_by_path(last) and authoritative:
+                    # Remove stale setting if file no longer exists in list
+                    settings.remove("last_config_path")
+        except Exception:
+            pass
 
     def on_config_selected(self, config_path: str):
         logger.info(f"Config selected: {config_path}")
         self.selected_config_path = config_path
-        self.control_panel.update_state(C.VpnState.DISCONNECTED)
+        # Read the saved credentials now, so Connect does not wait on the keyring
+        self.credentials_manager.prefetch(Path(config_path))
+        self.control_panel.update_state(self.vpn_manager.state(config_path))
+        checkbox = self.control_panel.auto_reconnect_checkbox
+        checkbox.blockSignals(True)
+        checkbox.setChecked(self.reconnect_scheduler.is_enabled(config_path))
+        checkbox.blockSignals(False)
+        self._refresh_reconnect_status()
+        self._refresh_traffic()
         try:
             settings = QSettings(C.APP_NAME, C.APP_NAME)
             settings.setValue("last_config_path", config_path)
@@ -150,9 +260,12 @@ class MainWindow(QMainWindow):
             pass
         # Ensure tray reflects that a config is now selected
         try:
-            self._update_tray_from_state(C.VpnState.DISCONNECTED)
+            self._update_tray_from_state(self.vpn_manager.state(config_path))
         except Exception:
             pass
+        # The logs window follows the selected connection
+        if self.logs_window is not None and self.logs_window.isVisible():
+            self.logs_window.load_from_file(C.connection_log_path(config_path))
 
     def on_connect_clicked(self):
         if not self.selected_config_path:
@@ -162,12 +275,25 @@ class MainWindow(QMainWindow):
             )
             return
 
-        username, password = self.credentials_manager.get_credentials(
-            Path(self.selected_config_path)
+        config_path = self.selected_config_path
+        if config_path in self._awaiting_credentials:
+            return
+        self._awaiting_credentials.add(config_path)
+        # Usually answered at once from what selecting the config prefetched
+        self.credentials_manager.request_credentials(
+            Path(config_path),
+            lambda credentials: self._connect_with_credentials(config_path, *credentials),
         )
+        if config_path in self._awaiting_credentials:
+            self.on_log_received(self.tr("Waiting for the keyring..."))
+
+    def _connect_with_credentials(self, config_path: str, username, password):
+        self._awaiting_credentials.discard(config_path)
 
         # Ensure both present; otherwise, prompt
         if not username or not password:
+            from credentials_dialog import CredentialsDialog
+
             dialog = CredentialsDialog(
                 self,
                 keyring_available=self.credentials_manager.keyring_available,
@@ -176,33 +302,148 @@ class MainWindow(QMainWindow):
                 username, password, save_creds = dialog.get_credentials()
                 if save_creds:
                     self.credentials_manager.save_credentials(
-                        Path(self.selected_config_path), username, password
+                        Path(config_path), username, password
                     )
             else:
                 # User cancelled credentials dialog
                 return
 
-        self.vpn_manager.connect(self.selected_config_path, username, password)
+        self.vpn_manager.connect(config_path, username, password)
+
+    def on_disconnect_clicked(self):
+        self.vpn_manager.disconnect(self.selected_config_path)
+
+    def on_telemetry_updated(self, config_path: str):
+        if config_path == self.selected_config_path:
+            self._refresh_traffic()
+
+    def on_timing_recorded(self, config_path: str):
+        if self.timing_panel is not None and self.timing_panel.isVisible():
+            self.timing_panel.show_config(self.timing_panel.config_combo.currentData() or config_path)
 
-    def on_state_changed(self, state):
+    def _refresh_traffic(self):
+        connection = self._selected_connection()
+        if connection is None or not len(connection.telemetry.buffer):
+            self.control_panel.clear_traffic()
+            return
+        buffer = connection.telemetry.buffer
+        self.control_panel.show_traffic(
+            buffer.current_rates(),
+            (buffer.peak_rx_rate, buffer.peak_tx_rate),
+            buffer.rates(C.TELEMETRY_SPARKLINE_SAMPLES),
+        )
+
+    def on_export_traffic(self):
+        connection = self._selected_connection()
+        if connection is None:
+            return
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            self.tr("Export Traffic History"),
+            str(Path.home() / f"{connection.config_path.stem}-traffic.csv"),
+            self.tr("CSV Files (*.csv);;All Files (*)"),
+        )
+        if file_path:
+            try:
+                connection.telemetry.buffer.export_csv(Path(file_path))
+            except OSError as e:
+                logger.error(f"Failed to export traffic history: {e}")
+                self.show_error_message(self.tr("Export Failed"), str(e))
+
+    def on_auto_reconnect_toggled(self, checked: bool):
+        if not self.selected_config_path:
+            return
+        self.reconnect_scheduler.set_enabled(self.selected_config_path, checked)
+        self._refresh_reconnect_status()
+        self._save_auto_reconnect_settings()
+
+    def _load_auto_reconnect_settings(self):
+        try:
+            settings = QSettings(C.APP_NAME, C.APP_NAME)
+            paths = settings.value("auto_reconnect_configs", [], type=list)
+            self.reconnect_scheduler.set_enabled_configs(p for p in paths if isinstance(p, str))
+        except Exception:
+            pass
+
+    def _save_auto_reconnect_settings(self):
+        try:
+            settings = QSettings(C.APP_NAME, C.APP_NAME)
+            settings.setValue(
+                "auto_reconnect_configs", sorted(self.reconnect_scheduler.enabled_configs())
+            )
+        except Exception:
+            pass
+
+    def on_reconnect_scheduled(self, config_path: str, attempt: int, delay: float):
+        # The attempt requests the saved credentials; have them cached (or on their way) by then
+        self.credentials_manager.prefetch(Path(config_path))
+        self.on_log_received(
+            self.tr("Reconnecting {0} in {1:.1f} s (attempt {2} of {3}).").format(
+                Path(config_path).name, delay, attempt, self.reconnect_scheduler.policy.max_attempts
+            )
+        )
+        self._reconnect_ticker.start()
+        self._refresh_reconnect_status()
+
+    def on_reconnect_started(self, config_path: str, attempt: int):
+        self._refresh_reconnect_status()
+
+    def on_reconnect_gave_up(self, config_path: str, reason: str):
+        self.on_log_received(
+            self.tr("Not reconnecting {0}: {1}.").format(Path(config_path).name, reason)
+        )
+        self._refresh_reconnect_status()
+
+    def _refresh_reconnect_status(self):
+        pending = (
+            self.reconnect_scheduler.pending(self.selected_config_path)
+            if self.selected_config_path
+            else None
+        )
+        if pending is None:
+            self.control_panel.clear_reconnect()
+        else:
+            attempt, seconds_left = pending
+            self.control_panel.show_reconnect(
+                attempt, self.reconnect_scheduler.policy.max_attempts, seconds_left
+            )
+        if not self.reconnect_scheduler.has_pending():
+            self._reconnect_ticker.stop()
+
+    def on_state_changed(self, config_path: str, state):
+        self.config_list.set_config_state(config_path, state)
+        if config_path == self.selected_config_path:
+            self.control_panel.update_state(state)
         # If authentication failed, offer to re-enter and update saved credentials
         try:
-            if state == C.VpnState.AUTH_FAILED and self.selected_config_path:
+            if state == C.VpnState.AUTH_FAILED:
+                from credentials_dialog import CredentialsDialog
+
                 dialog = CredentialsDialog(
                     self,
                     keyring_available=self.credentials_manager.keyring_available,
                 )
-                dialog.setWindowTitle(self.tr("Authentication failed - enter correct VPN credentials"))
+                dialog.setWindowTitle(
+                    self.tr("Authentication failed - enter correct VPN credentials")
+                    + f" ({Path(config_path).name})"
+                )
                 if dialog.exec():
                     username, password, save_creds = dialog.get_credentials()
                     if save_creds:
                         self.credentials_manager.save_credentials(
-                            Path(self.selected_config_path), username, password
+                            Path(config_path), username, password
                         )
                     # Try reconnecting immediately with new credentials
-                    self.vpn_manager.connect(self.selected_config_path, username, password)
+                    self.vpn_manager.connect(config_path, username, password)
             # Update tray tooltip and actions for any state change
-            self._update_tray_from_state(state)
+            self._update_tray_from_state(self._selected_state())
+            # A finished session has just been archived; keep the search current
+            if (
+                state in (C.VpnState.DISCONNECTED, C.VpnState.ERROR, C.VpnState.AUTH_FAILED)
+                and self.archive_browser is not None
+                and self.archive_browser.isVisible()
+            ):
+                self.archive_browser.refresh_index()
         except Exception:
             pass
 
@@ -240,13 +481,16 @@ class MainWindow(QMainWindow):
         )
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                config_to_delete = next(
-                    c
-                    for c in self.config_list.configs
-                    if str(c.path) == config_path_str
-                )
+                model = self.config_list.model
+                config_to_delete = model.config_at(model.row_for_path(config_path_str))
+                if config_to_delete is None:
+                    raise ValueError(f"Unknown configuration: {config_path_str}")
                 self.config_manager.delete_config(config_to_delete)
+                self.config_list.remove_config(config_path_str)
                 self.credentials_manager.delete_credentials(config_path)
+                if self.reconnect_scheduler.is_enabled(config_path_str):
+                    self.reconnect_scheduler.set_enabled(config_path_str, False)
+                    self._save_auto_reconnect_settings()
                 # Clear persisted selection if it matches the deleted config
                 try:
                     settings = QSettings(C.APP_NAME, C.APP_NAME)
@@ -269,13 +513,42 @@ class MainWindow(QMainWindow):
 
     def open_logs_window(self):
         if self.logs_window is None:
+            from ui.logs_window import LogsWindow
+
             self.logs_window = LogsWindow(self)
-        # Refresh content from file on show
-        self.logs_window.load_from_file()
+        # Refresh content from file on show; each connection has its own log
+        self.logs_window.load_from_file(
+            C.connection_log_path(self.selected_config_path)
+            if self.selected_config_path
+            else None
+        )
         self.logs_window.show()
         self.logs_window.raise_()
         self.logs_window.activateWindow()
 
+    def open_archive_browser(self):
+        if self.archive_browser is None:
+            from log_archive import LogArchiveIndex
+            from ui.archive_browser import ArchiveBrowser
+
+            self.archive_browser = ArchiveBrowser(
+                self._logs_documents_dir(), LogArchiveIndex(C.LOG_ARCHIVE_INDEX_PATH), self
+            )
+        self.archive_browser.refresh_index()
+        self.archive_browser.show()
+        self.archive_browser.raise_()
+        self.archive_browser.activateWindow()
+
+    def open_timing_panel(self):
+        if self.timing_panel is None:
+            from ui.timing_panel import TimingPanel
+
+            self.timing_panel = TimingPanel(self.vpn_manager.timing_store, self)
+        self.timing_panel.show_config(self.selected_config_path)
+        self.timing_panel.show()
+        self.timing_panel.raise_()
+        self.timing_panel.activateWindow()
+
     def open_logs_folder(self):
         try:
             path = self._logs_documents_dir()
@@ -284,6 +557,21 @@ class MainWindow(QMainWindow):
             logger.error(f"Failed to open logs folder: {e}")
             self.show_error_message(self.tr("Open Logs Folder"), str(e))
 
+    def on_connection_log_received(self, config_path: str, message: str):
+        # Tell the streams apart once more than one tunnel is up
+        if len(self.vpn_manager.active_connections()) > 1:
+            message = f"[{Path(config_path).name}] {message}"
+        self.log_viewer.add_log(message)
+        try:
+            if (
+                self.logs_window is not None
+                and self.logs_window.isVisible()
+                and self.logs_window.log_path == C.connection_log_path(config_path)
+            ):
+                self.logs_window.append_log(message)
+        except Exception:
+            pass
+
     def on_log_received(self, message: str):
         # Always append to inline viewer
         self.log_viewer.add_log(message)
@@ -297,20 +585,37 @@ class MainWindow(QMainWindow):
     def show_error_message(self, title, text):
         QMessageBox.critical(self, title, text)
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            self.first_painted.emit()
+
+    def wait_for_background_work(self, timeout: float):
+        """Block until config discovery, helper commands and keyring writes have returned."""
+        self._executor.wait_for_done(timeout)
+        self.vpn_manager.wait_for_pending_commands(timeout)
+        self.credentials_manager.wait_for_pending(timeout)
+
     def closeEvent(self, event):
         reply = QMessageBox.question(
             self,
             self.tr("Confirm Quit"),
             self.tr(
                 "Are you sure you want to quit? "
-                "Any active VPN connection will be disconnected."
+                "All active VPN connections will be disconnected."
             ),
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.No,
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            self.vpn_manager.disconnect()
+            self.vpn_manager.disconnect_all()
+            # Helper commands run in the background; let the stops finish before exiting
+            self.vpn_manager.wait_for_pending_commands(20)
+            # Let credential saves finish, then drop what is held in memory
+            self.credentials_manager.wait_for_pending(5)
+            self.credentials_manager.clear_cache()
             event.accept()
         else:
             event.ignore()
@@ -346,17 +651,20 @@ class MainWindow(QMainWindow):
             menu = QMenu(self)
             self.tray_show_action = QAction(self.tr("Show/Hide Window"), self)
             self.tray_connect_action = QAction(self.tr("Connect"), self)
+            self.tray_disconnect_all_action = QAction(self.tr("Disconnect All"), self)
             self.tray_logs_action = QAction(self.tr("Open Logs Folder"), self)
             self.tray_quit_action = QAction(self.tr("Quit"), self)
 
             self.tray_show_action.triggered.connect(self._toggle_window_visibility)
             self.tray_connect_action.triggered.connect(self._tray_connect_or_disconnect)
+            self.tray_disconnect_all_action.triggered.connect(self.vpn_manager.disconnect_all)
             self.tray_logs_action.triggered.connect(self.open_logs_folder)
             self.tray_quit_action.triggered.connect(self.close)
 
             menu.addAction(self.tray_show_action)
             menu.addSeparator()
             menu.addAction(self.tray_connect_action)
+            menu.addAction(self.tray_disconnect_all_action)
             menu.addAction(self.tray_logs_action)
             menu.addSeparator()
             menu.addAction(self.tray_quit_action)
@@ -367,15 +675,33 @@ class MainWindow(QMainWindow):
             # Tray may not be available in some environments
             pass
 
+    def _selected_connection(self):
+        if not self.selected_config_path:
+            return None
+        return self.vpn_manager.connection(self.selected_config_path)
+
+    def _selected_state(self) -> C.VpnState:
+        if not self.selected_config_path:
+            return C.VpnState.NO_CONFIG_SELECTED
+        return self.vpn_manager.state(self.selected_config_path)
+
     def _update_tray_from_state(self, state):
+        """'state' is the selected config's; the tooltip lists every active connection."""
         try:
             if not hasattr(self, "tray") or self.tray is None:
                 return
             # Tooltip
-            tip = state.name.replace("_", " ").title()
-            if self.selected_config_path:
-                tip = f"{tip} - {Path(self.selected_config_path).name}"
+            active = self.vpn_manager.active_connections()
+            if active:
+                tip = "\n".join(
+                    f"{c.state.name.replace('_', ' ').title()} - {c.name}" for c in active
+                )
+            else:
+                tip = state.name.replace("_", " ").title()
+                if self.selected_config_path:
+                    tip = f"{tip} - {Path(self.selected_config_path).name}"
             self.tray.setToolTip(tip)
+            self.tray_disconnect_all_action.setEnabled(bool(active))
             # Connect/Disconnect action label
             if state in (C.VpnState.CONNECTED, C.VpnState.CONNECTING):
                 self.tray_connect_action.setText(self.tr("Disconnect"))
@@ -400,9 +726,9 @@ class MainWindow(QMainWindow):
 
     def _tray_connect_or_disconnect(self):
         try:
-            state = getattr(self.vpn_manager, "_state", C.VpnState.DISCONNECTED)
+            state = self._selected_state()
             if state in (C.VpnState.CONNECTED, C.VpnState.CONNECTING):
-                self.vpn_manager.disconnect()
+                self.vpn_manager.disconnect(self.selected_config_path)
             else:
                 self.on_connect_clicked()
         except Exception:
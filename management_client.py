@@ -0,0 +1,185 @@
+# management_client.py
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+from PyQt6.QtNetwork import QLocalSocket
+
+logger = logging.getLogger(__name__)
+
+# Prefix printed by openvpn-gui-helper.sh on stdout after a successful start
+MANAGEMENT_SOCKET_PREFIX = "MANAGEMENT_SOCKET="
+
+
+@dataclass
+class ManagementEvent:
+    """A parsed real-time message from the OpenVPN management interface."""
+
+    kind: str  # STATE, BYTECOUNT, LOG, PASSWORD, FATAL, HOLD, INFO, ...
+    payload: str
+    fields: List[str] = field(default_factory=list)
+
+
+def parse_management_line(line: str) -> Optional[ManagementEvent]:
+    """Parse a '>TYPE:payload' notification. Returns None for other lines."""
+    if not line.startswith(">") or ":" not in line:
+        return None
+    kind, payload = line[1:].split(":", 1)
+    if kind in ("STATE", "BYTECOUNT"):
+        fields = payload.split(",")
+    elif kind == "LOG":
+        # time,flags,message - the message itself may contain commas
+        fields = payload.split(",", 2)
+    else:
+        fields = [payload]
+    return ManagementEvent(kind, payload, fields)
+
+
+def find_management_socket(helper_output: str) -> Optional[Path]:
+    """Extract the management socket path announced by the helper's start command."""
+    for line in helper_output.splitlines():
+        line = line.strip()
+        if line.startswith(MANAGEMENT_SOCKET_PREFIX):
+            value = line[len(MANAGEMENT_SOCKET_PREFIX):].strip()
+            if value:
+                return Path(value)
+    return None
+
+
+class ManagementClient(QObject):
+    """
+    Asynchronous client for OpenVPN's management interface on a Unix socket.
+    Subscribes to state, byte count and log notifications and re-emits them
+    as Qt signals as soon as they arrive.
+    """
+
+    state_changed = pyqtSignal(str, str)  # OpenVPN state name, description
+    bytecount = pyqtSignal(int, int)  # bytes in, bytes out (totals)
+    log_line = pyqtSignal(str, str)  # flags, message
+    password_event = pyqtSignal(str)  # e.g. "Verification Failed: 'Auth'"
+    fatal = pyqtSignal(str)
+    connected = pyqtSignal()
+    disconnected = pyqtSignal()
+
+    def __init__(
+        self,
+        socket_path: Path,
+        parent=None,
+        bytecount_interval: int = 1,
+        max_connect_attempts: int = 50,
+        retry_interval_ms: int = 200,
+    ):
+        super().__init__(parent)
+        self.socket_path = Path(socket_path)
+        self.bytecount_interval = bytecount_interval
+        self.max_connect_attempts = max_connect_attempts
+        self._attempts = 0
+        self._buffer = b""
+        # 'state on all' answers with history records terminated by END
+        self._in_state_history = False
+        self._closing = False
+        self.last_state: Optional[str] = None
+
+        self._socket = QLocalSocket(self)
+        self._socket.connected.connect(self._on_connected)
+        self._socket.disconnected.connect(self._on_disconnected)
+        self._socket.readyRead.connect(self._on_ready_read)
+        self._socket.errorOccurred.connect(self._on_error)
+
+        # OpenVPN creates the socket a moment after the helper returns
+        self._retry_timer = QTimer(self)
+        self._retry_timer.setSingleShot(True)
+        self._retry_timer.setInterval(retry_interval_ms)
+        self._retry_timer.timeout.connect(self._try_connect)
+
+    def open(self):
+        self._closing = False
+        self._attempts = 0
+        self._try_connect()
+
+    def close(self):
+        self._closing = True
+        self._retry_timer.stop()
+        if self._socket.state() != QLocalSocket.LocalSocketState.UnconnectedState:
+            self._socket.abort()
+
+    def is_connected(self) -> bool:
+        return self._socket.state() == QLocalSocket.LocalSocketState.ConnectedState
+
+    def send_command(self, command: str):
+        if self.is_connected():
+            self._socket.write((command + "\n").encode())
+
+    def _try_connect(self):
+        if self._closing:
+            return
+        self._attempts += 1
+        self._socket.abort()
+        self._socket.connectToServer(str(self.socket_path))
+
+    def _on_error(self, _error):
+        if self._closing or self.is_connected():
+            return
+        if self._attempts < self.max_connect_attempts:
+            self._retry_timer.start()
+        else:
+            logger.warning(
+                f"Giving up on management socket {self.socket_path}: {self._socket.errorString()}"
+            )
+
+    def _on_connected(self):
+        logger.info(f"Connected to OpenVPN management interface at {self.socket_path}")
+        self._buffer = b""
+        self._in_state_history = True
+        self.send_command("state on all")
+        self.send_command(f"bytecount {self.bytecount_interval}")
+        self.send_command("log on")
+        self.connected.emit()
+
+    def _on_disconnected(self):
+        self._in_state_history = False
+        if not self._closing:
+            self.disconnected.emit()
+
+    def _on_ready_read(self):
+        self._buffer += bytes(self._socket.readAll())
+        *lines, self._buffer = self._buffer.split(b"\n")
+        for raw in lines:
+            self._handle_line(raw.decode(errors="replace").rstrip("\r"))
+
+    def _handle_line(self, line: str):
+        if not line:
+            return
+        if self._in_state_history and not line.startswith(">"):
+            if line == "END":
+                self._in_state_history = False
+                return
+            if line.startswith(("SUCCESS:", "ERROR:")):
+                return
+            # History record: time,state,description,...
+            parts = line.split(",")
+            if len(parts) >= 2:
+                self._emit_state(parts[1], parts[2] if len(parts) > 2 else "")
+            return
+
+        event = parse_management_line(line)
+        if event is None:
+            return
+        if event.kind == "STATE" and len(event.fields) >= 2:
+            self._emit_state(event.fields[1], event.fields[2] if len(event.fields) > 2 else "")
+        elif event.kind == "BYTECOUNT" and len(event.fields) >= 2:
+            try:
+                self.bytecount.emit(int(event.fields[0]), int(event.fields[1]))
+            except ValueError:
+                pass
+        elif event.kind == "LOG" and len(event.fields) == 3:
+            self.log_line.emit(event.fields[1], event.fields[2])
+        elif event.kind == "PASSWORD":
+            self.password_event.emit(event.payload)
+        elif event.kind == "FATAL":
+            self.fatal.emit(event.payload)
+
+    def _emit_state(self, state: str, description: str):
+        self.last_state = state
+        self.state_changed.emit(state, description)
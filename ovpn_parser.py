@@ -0,0 +1,316 @@
+# ovpn_parser.py
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Defaults OpenVPN applies when a config does not say otherwise
+DEFAULT_PORT = 1194
+DEFAULT_PROTO = "udp"
+
+# Scripts the helper has to treat specially (see openvpn-gui-helper.sh)
+SCRIPT_OPTIONS = frozenset({"up", "down", "route-up", "route-pre-down", "ipchange", "learn-address"})
+RESOLV_SCRIPTS = ("update-resolv-conf", "update-systemd-resolved")
+
+_COMMENT_CHARS = (ord("#"), ord(";"))
+_OPEN_TAG_RE = re.compile(rb"<([A-Za-z0-9_-]+)>")
+
+
+class OvpnParseError(ValueError):
+    """The config file cannot be read as an OpenVPN config."""
+
+
+class InlineBlock:
+    """
+    The body of an inline <tag>...</tag> block. Only offsets into the file
+    contents are kept; the bytes are sliced out when first asked for.
+    """
+
+    __slots__ = ("tag", "_source", "_start", "_end")
+
+    def __init__(self, tag: str, source: bytes, start: int, end: int):
+        self.tag = tag
+        self._source = source
+        self._start = start
+        self._end = end
+
+    @property
+    def data(self) -> bytes:
+        return self._source[self._start:self._end]
+
+    @property
+    def text(self) -> str:
+        return self.data.decode(errors="replace")
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __repr__(self):
+        return f"InlineBlock({self.tag!r}, {len(self)} bytes)"
+
+
+@dataclass(frozen=True)
+class Remote:
+    host: str
+    port: int
+    proto: str
+
+
+@dataclass
+class OvpnConfig:
+    """
+    The facts other components need from an .ovpn file. 'options' keeps
+    every directive in file order (name -> list of argument lists), so
+    anything not modelled explicitly can still be looked up.
+    """
+
+    path: Optional[Path] = None
+    remotes: List[Remote] = field(default_factory=list)
+    proto: str = DEFAULT_PROTO
+    port: int = DEFAULT_PORT
+    dev: Optional[str] = None
+    auth_user_pass: bool = False
+    auth_user_pass_file: Optional[str] = None
+    data_ciphers: List[str] = field(default_factory=list)
+    cipher: Optional[str] = None
+    user: Optional[str] = None
+    group: Optional[str] = None
+    verb: Optional[int] = None
+    remote_random: bool = False
+    inline: Dict[str, InlineBlock] = field(default_factory=dict)
+    options: Dict[str, List[List[str]]] = field(default_factory=dict)
+
+    def option(self, name: str) -> Optional[List[str]]:
+        """Arguments of the first occurrence of a directive, or None if absent."""
+        values = self.options.get(name)
+        return values[0] if values else None
+
+    def has_option(self, name: str) -> bool:
+        return name in self.options
+
+    @property
+    def has_scripts(self) -> bool:
+        """Whether the config runs up/down style scripts of its own."""
+        return any(name in self.options for name in SCRIPT_OPTIONS)
+
+    @property
+    def uses_resolv_script(self) -> bool:
+        for name in ("up", "down"):
+            for args in self.options.get(name, ()):
+                if any(script in arg for arg in args for script in RESOLV_SCRIPTS):
+                    return True
+        return False
+
+    @property
+    def dns_servers(self) -> List[str]:
+        return [
+            args[1]
+            for args in self.options.get("dhcp-option", ())
+            if len(args) >= 2 and args[0].upper() == "DNS"
+        ]
+
+
+def parse_ovpn(data: bytes, path: Optional[Path] = None) -> OvpnConfig:
+    """Parse the contents of an OpenVPN config file."""
+    config = OvpnConfig(path=Path(path) if path is not None else None)
+    raw_remotes: List[Tuple[List[str], Optional[str], Optional[int]]] = []
+    _parse_block(data, 0, len(data), config, raw_remotes)
+
+    port_args = config.option("rport") or config.option("port")
+    if port_args:
+        config.port = _parse_port(port_args[0], config.port)
+    proto_args = config.option("proto")
+    if proto_args:
+        config.proto = proto_args[0].lower()
+    config.remotes = [
+        Remote(
+            host=args[0],
+            port=_parse_port(args[1], port or config.port) if len(args) > 1 else (port or config.port),
+            proto=args[2].lower() if len(args) > 2 else (proto or config.proto),
+        )
+        for args, proto, port in raw_remotes
+        if args
+    ]
+
+    auth = config.option("auth-user-pass")
+    if auth is not None:
+        config.auth_user_pass = True
+        config.auth_user_pass_file = auth[0] if auth else None
+    ciphers = config.option("data-ciphers") or config.option("ncp-ciphers")
+    if ciphers:
+        config.data_ciphers = [c for c in ciphers[0].split(":") if c]
+    cipher = config.option("cipher")
+    config.cipher = cipher[0] if cipher else None
+    dev = config.option("dev")
+    config.dev = dev[0] if dev else None
+    user = config.option("user")
+    config.user = user[0] if user else None
+    group = config.option("group")
+    config.group = group[0] if group else None
+    verb = config.option("verb")
+    if verb:
+        try:
+            config.verb = int(verb[0])
+        except ValueError:
+            pass
+    config.remote_random = config.has_option("remote-random")
+    return config
+
+
+def _parse_block(data: bytes, pos: int, end: int, config: OvpnConfig, raw_remotes):
+    """Parse the directives in data[pos:end], collecting (args, proto, port) per remote."""
+    while pos < end:
+        eol = data.find(b"\n", pos, end)
+        if eol < 0:
+            eol = end
+        line = data[pos:eol].strip()
+        pos = eol + 1
+        if not line or line[0] in _COMMENT_CHARS:
+            continue
+
+        opening = _OPEN_TAG_RE.fullmatch(line) if line[0] == ord("<") else None
+        if opening:
+            tag = opening.group(1).decode()
+            closing = b"</" + opening.group(1) + b">"
+            close = data.find(closing, pos, end)
+            if close < 0:
+                raise OvpnParseError(f"Unterminated inline block <{tag}>")
+            if tag == "connection":
+                inner: Dict[str, List[List[str]]] = {}
+                scratch = OvpnConfig(options=inner)
+                nested: list = []
+                _parse_block(data, pos, close, scratch, nested)
+                proto = inner.get("proto", [[None]])[0]
+                port = inner.get("port", [[None]])[0]
+                proto = proto[0].lower() if proto and proto[0] else None
+                port = _parse_port(port[0], None) if port and port[0] else None
+                raw_remotes.extend((args, proto, port) for args, _, _ in nested)
+            else:
+                config.inline[tag] = InlineBlock(tag, data, pos, close)
+            pos = data.find(b"\n", close, end)
+            pos = end if pos < 0 else pos + 1
+            continue
+
+        tokens = _split(line.decode(errors="replace"))
+        name = tokens[0].lower()
+        if name.startswith("--"):
+            name = name[2:]
+        args = tokens[1:]
+        config.options.setdefault(name, []).append(args)
+        if name == "remote":
+            raw_remotes.append((args, None, None))
+
+
+def _split(line: str) -> List[str]:
+    """
+    Split a directive the way OpenVPN does: whitespace, quotes and backslash
+    escapes; a token starting with '#' or ';' begins a trailing comment.
+    """
+    if '"' not in line and "'" not in line and "\\" not in line:
+        tokens = line.split()
+        if "#" in line or ";" in line:
+            for i, token in enumerate(tokens):
+                if token[0] in "#;":
+                    return tokens[:i]
+        return tokens
+    tokens: List[str] = []
+    current: List[str] = []
+    quote = None
+    in_token = False
+    i = 0
+    while i < len(line):
+        ch = line[i]
+        if quote == "'":
+            if ch == "'":
+                quote = None
+            else:
+                current.append(ch)
+        elif ch == "\\" and i + 1 < len(line):
+            i += 1
+            current.append(line[i])
+            in_token = True
+        elif quote == '"':
+            if ch == '"':
+                quote = None
+            else:
+                current.append(ch)
+        elif ch in "\"'":
+            quote = ch
+            in_token = True
+        elif ch.isspace():
+            if in_token:
+                tokens.append("".join(current))
+                current, in_token = [], False
+        elif ch in "#;" and not in_token:
+            break
+        else:
+            current.append(ch)
+            in_token = True
+        i += 1
+    if in_token:
+        tokens.append("".join(current))
+    return tokens
+
+
+def _parse_port(value: str, default):
+    try:
+        port = int(value)
+    except (TypeError, ValueError):
+        return default
+    return port if 0 < port < 65536 else default
+
+
+class OvpnConfigCache:
+    """
+    Parsed configs memoized by file identity (device, inode, mtime, size).
+    A lookup costs one stat(); the file is only read again after it changed.
+    Safe to use from worker threads.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[tuple, OvpnConfig]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path) -> OvpnConfig:
+        path = Path(path)
+        key = str(path)
+        st = os.stat(path)
+        stamp = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except OSError as e:
+            raise OvpnParseError(f"Cannot read {path}: {e}") from e
+        config = parse_ovpn(data, path)
+        with self._lock:
+            self._entries[key] = (stamp, config)
+        return config
+
+    def forget(self, path):
+        with self._lock:
+            self._entries.pop(str(path), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = OvpnConfigCache()
+
+
+def load_ovpn(path) -> OvpnConfig:
+    """Parsed config for path, from the shared cache when the file is unchanged."""
+    return _cache.get(path)
+
+
+def forget_ovpn(path):
+    _cache.forget(path)
@@ -0,0 +1,199 @@
+# reconnect.py
+"""
+Opt-in automatic reconnect for configs whose tunnel dropped.
+
+When an established connection goes away without the user asking for it,
+the scheduler connects the config again after an exponentially growing,
+jittered delay, up to a fixed number of attempts. Failures that another
+attempt cannot fix (rejected credentials, a broken config) stop it at once.
+"""
+import logging
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+import constants as C
+from log_classifier import LogEventKind
+
+logger = logging.getLogger(__name__)
+
+# Failures that reconnecting would only repeat
+PERMANENT_FAILURES = {
+    LogEventKind.AUTH_FAILED: "authentication failed",
+    LogEventKind.OPTIONS_ERROR: "the configuration has errors",
+}
+
+Credentials = Tuple[Optional[str], Optional[str]]
+# request(config path, callback): calls callback((username, password)) on the
+# GUI thread once known, like CredentialsManager.request_credentials
+CredentialsRequest = Callable[[Path, Callable[[Credentials], None]], None]
+
+
+@dataclass
+class ReconnectPolicy:
+    initial_delay: float = C.RECONNECT_INITIAL_DELAY_SECONDS
+    max_delay: float = C.RECONNECT_MAX_DELAY_SECONDS
+    jitter: float = C.RECONNECT_JITTER
+    max_attempts: int = C.RECONNECT_MAX_ATTEMPTS
+
+    def delay(self, attempt: int, rng: random.Random) -> float:
+        """Seconds to wait before attempt number 'attempt' (1-based)."""
+        base = min(self.max_delay, self.initial_delay * 2 ** (attempt - 1))
+        # Spread reconnects of several tunnels (and clients) that dropped together
+        return base * (1 - self.jitter + 2 * self.jitter * rng.random())
+
+
+class _Plan:
+    def __init__(self, timer: QTimer):
+        self.timer = timer
+        self.attempt = 0  # attempts started so far
+        self.due: Optional[float] = None  # monotonic time of the next attempt
+
+
+class ReconnectScheduler(QObject):
+    # config path, attempt number (1-based), delay in seconds
+    reconnect_scheduled = pyqtSignal(str, int, float)
+    reconnect_started = pyqtSignal(str, int)
+    # config path, reason
+    reconnect_gave_up = pyqtSignal(str, str)
+
+    def __init__(
+        self,
+        vpn_manager,
+        credentials: CredentialsRequest,
+        policy: Optional[ReconnectPolicy] = None,
+        rng: Optional[random.Random] = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.vpn_manager = vpn_manager
+        self.policy = policy or ReconnectPolicy()
+        self._credentials = credentials
+        self._rng = rng or random.Random()
+        self._enabled: Set[str] = set()
+        self._plans: Dict[str, _Plan] = {}
+        self._previous: Dict[str, C.VpnState] = {}
+        vpn_manager.connection_state_changed.connect(self._on_state_changed)
+
+    # --- Opt-in ---
+    def set_enabled(self, config_path: str, enabled: bool):
+        if enabled:
+            self._enabled.add(config_path)
+        else:
+            self._enabled.discard(config_path)
+            self.cancel(config_path)
+
+    def set_enabled_configs(self, config_paths: Iterable[str]):
+        for config_path in self._enabled - set(config_paths):
+            self.cancel(config_path)
+        self._enabled = set(config_paths)
+
+    def is_enabled(self, config_path: str) -> bool:
+        return config_path in self._enabled
+
+    def enabled_configs(self) -> Set[str]:
+        return set(self._enabled)
+
+    # --- Plans ---
+    def pending(self, config_path: str) -> Optional[Tuple[int, float]]:
+        """(next attempt number, seconds until it) while a reconnect is scheduled."""
+        plan = self._plans.get(config_path)
+        if plan is None or plan.due is None:
+            return None
+        return plan.attempt + 1, max(0.0, plan.due - time.monotonic())
+
+    def has_pending(self) -> bool:
+        return any(plan.due is not None for plan in self._plans.values())
+
+    def cancel(self, config_path: str):
+        plan = self._plans.pop(config_path, None)
+        if plan is not None:
+            plan.timer.stop()
+            plan.timer.deleteLater()
+
+    def _on_state_changed(self, config_path: str, state: C.VpnState):
+        previous = self._previous.get(config_path)
+        self._previous[config_path] = state
+        if config_path not in self._enabled:
+            return
+
+        if state == C.VpnState.CONNECTED:
+            # Back up: the next drop starts a fresh backoff
+            self.cancel(config_path)
+        elif state == C.VpnState.DISCONNECTING:
+            # The user asked for it
+            self.cancel(config_path)
+        elif state in (C.VpnState.DISCONNECTED, C.VpnState.ERROR, C.VpnState.AUTH_FAILED):
+            dropped = previous == C.VpnState.CONNECTED
+            retrying = config_path in self._plans
+            if not (dropped or retrying):
+                # A first connect that failed, or the end of a user disconnect
+                return
+            connection = self.vpn_manager.connection(config_path)
+            kind = connection.last_failure() if connection is not None else None
+            if kind in PERMANENT_FAILURES:
+                self._give_up(config_path, PERMANENT_FAILURES[kind])
+            else:
+                self._schedule(config_path)
+
+    def _schedule(self, config_path: str):
+        plan = self._plans.get(config_path)
+        if plan is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda: self._attempt(config_path))
+            plan = self._plans[config_path] = _Plan(timer)
+        if plan.attempt >= self.policy.max_attempts:
+            self._give_up(config_path, f"no success after {plan.attempt} attempts")
+            return
+        delay = self.policy.delay(plan.attempt + 1, self._rng)
+        plan.due = time.monotonic() + delay
+        plan.timer.start(int(delay * 1000))
+        logger.info(
+            f"Reconnecting {Path(config_path).name} in {delay:.1f}s "
+            f"(attempt {plan.attempt + 1} of {self.policy.max_attempts})"
+        )
+        self.reconnect_scheduled.emit(config_path, plan.attempt + 1, delay)
+
+    def _attempt(self, config_path: str):
+        plan = self._plans.get(config_path)
+        if plan is None:
+            return
+        plan.due = None
+        connection = self.vpn_manager.connection(config_path)
+        if connection is not None and connection.is_active():
+            # Connected again by hand in the meantime
+            return
+        # The keyring may be locked (and prompt) after a suspend; never wait on it here
+        try:
+            self._credentials(
+                Path(config_path), lambda credentials: self._connect(config_path, plan, credentials)
+            )
+        except Exception as e:
+            logger.warning(f"Could not read credentials for {config_path}: {e}")
+            self._connect(config_path, plan, (None, None))
+
+    def _connect(self, config_path: str, plan: _Plan, credentials: Credentials):
+        """Start the attempt once the saved credentials are known."""
+        if self._plans.get(config_path) is not plan:
+            # Cancelled or disabled while the keyring was read
+            return
+        connection = self.vpn_manager.connection(config_path)
+        if connection is not None and connection.is_active():
+            return
+        username, password = credentials
+        if not username or not password:
+            self._give_up(config_path, "no saved credentials")
+            return
+        plan.attempt += 1
+        self.reconnect_started.emit(config_path, plan.attempt)
+        self.vpn_manager.connect(config_path, username, password)
+
+    def _give_up(self, config_path: str, reason: str):
+        self.cancel(config_path)
+        logger.info(f"Not reconnecting {Path(config_path).name}: {reason}")
+        self.reconnect_gave_up.emit(config_path, reason)
@@ -0,0 +1,273 @@
+# remote_probe.py
+"""
+Pre-connect latency probing of a config's 'remote' entries.
+
+OpenVPN tries remotes one after another and waits out connect-retry on
+every dead one. Probing them all at once first - a TCP connect for TCP
+remotes, an OpenVPN P_CONTROL_HARD_RESET_CLIENT_V2 packet for UDP ones -
+lets the helper start with the fastest remote that actually answers.
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ovpn_parser import OvpnConfig, Remote
+
+logger = logging.getLogger(__name__)
+
+# Control channel opcodes (high 5 bits of the first byte, key id 0)
+P_CONTROL_HARD_RESET_CLIENT_V2 = 7
+P_CONTROL_HARD_RESET_SERVER_V2 = 8
+
+# OpenVPN's default 'auth' digest for tls-auth HMACs
+DEFAULT_TLS_AUTH_DIGEST = "sha1"
+
+
+@dataclass
+class ProbeResult:
+    remote: Remote
+    rtt: Optional[float] = None  # seconds; None when the remote did not answer
+    address: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def reachable(self) -> bool:
+        return self.rtt is not None
+
+    @property
+    def failed(self) -> bool:
+        """Known dead (unresolvable, refused), as opposed to silent."""
+        return self.rtt is None and self.error is not None and self.error != "timeout"
+
+
+@dataclass
+class TlsAuthKey:
+    """The outgoing HMAC key of a tls-auth static key, for signing UDP probes."""
+
+    key: bytes
+    digest: str = DEFAULT_TLS_AUTH_DIGEST
+
+    @classmethod
+    def from_config(cls, config: OvpnConfig) -> Optional["TlsAuthKey"]:
+        block = config.inline.get("tls-auth")
+        if block is None:
+            return None
+        key_direction = config.option("key-direction")
+        digest = (config.option("auth") or [DEFAULT_TLS_AUTH_DIGEST])[0].lower().replace("-", "")
+        try:
+            static_key = parse_static_key(block.data)
+            size = hashlib.new(digest).digest_size
+        except ValueError as e:
+            logger.debug(f"Cannot use tls-auth key for probing: {e}")
+            return None
+        # Static key = 4 x 64 bytes: cipher 0, hmac 0, cipher 1, hmac 1.
+        # The client (key-direction 1) signs with hmac 1; bidirectional uses hmac 0.
+        slot = 1 if key_direction and key_direction[0] == "1" else 0
+        offset = 64 + slot * 128
+        return cls(static_key[offset:offset + size], digest)
+
+
+def parse_static_key(data: bytes) -> bytes:
+    """Decode an 'OpenVPN Static key V1' block into its 256 key bytes."""
+    hex_lines = []
+    inside = False
+    for line in data.decode(errors="replace").splitlines():
+        line = line.strip()
+        if line.startswith("-----BEGIN"):
+            inside = True
+        elif line.startswith("-----END"):
+            inside = False
+        elif inside and line and not line.startswith("#"):
+            hex_lines.append(line)
+    key = bytes.fromhex("".join(hex_lines))
+    if len(key) != 256:
+        raise ValueError(f"static key has {len(key)} bytes, expected 256")
+    return key
+
+
+def build_hard_reset(session_id: bytes, tls_auth: Optional[TlsAuthKey] = None, now: Optional[int] = None) -> bytes:
+    """A P_CONTROL_HARD_RESET_CLIENT_V2 packet as the first UDP datagram of a session."""
+    op = bytes([P_CONTROL_HARD_RESET_CLIENT_V2 << 3])
+    ack_and_message_id = b"\x00" + struct.pack("!I", 0)
+    if tls_auth is None:
+        return op + session_id + ack_and_message_id
+    # tls-auth: replay packet id + timestamp follow the HMAC, which covers them first
+    replay = struct.pack("!II", 1, int(time.time() if now is None else now))
+    mac = hmac.new(tls_auth.key, replay + op + session_id + ack_and_message_id, tls_auth.digest).digest()
+    return op + session_id + mac + replay + ack_and_message_id
+
+
+def remote_flag(remote: Remote) -> str:
+    """The helper's start flag for one remote, in probe order."""
+    return f"--remote={remote.host},{remote.port},{remote.proto}"
+
+
+class _UdpProbe(asyncio.DatagramProtocol):
+    def __init__(self, waiter: asyncio.Future):
+        self.waiter = waiter
+
+    def datagram_received(self, data, addr):
+        if not self.waiter.done():
+            if data and data[0] >> 3 == P_CONTROL_HARD_RESET_SERVER_V2:
+                self.waiter.set_result(True)
+
+    def error_received(self, exc):
+        if not self.waiter.done():
+            self.waiter.set_exception(exc)
+
+    def connection_lost(self, exc):
+        if not self.waiter.done():
+            self.waiter.set_exception(exc or ConnectionError("closed"))
+
+
+async def probe_remote(remote: Remote, timeout: float, tls_auth: Optional[TlsAuthKey] = None) -> ProbeResult:
+    loop = asyncio.get_running_loop()
+    udp = remote.proto.startswith("udp")
+    proto = remote.proto.removesuffix("-client")
+    family = {"4": socket.AF_INET, "6": socket.AF_INET6}.get(proto[-1:], socket.AF_UNSPEC)
+    result = ProbeResult(remote)
+    deadline = loop.time() + timeout
+    try:
+        infos = await asyncio.wait_for(
+            loop.getaddrinfo(
+                remote.host, remote.port, family=family,
+                type=socket.SOCK_DGRAM if udp else socket.SOCK_STREAM,
+            ),
+            timeout,
+        )
+    except (OSError, asyncio.TimeoutError) as e:
+        result.error = f"resolve: {e or 'timeout'}"
+        return result
+    if not infos:
+        result.error = "resolve: no addresses"
+        return result
+    family, _, _, _, sockaddr = infos[0]
+    result.address = sockaddr[0]
+    remaining = max(deadline - loop.time(), 0.05)
+
+    started = time.perf_counter()
+    try:
+        if udp:
+            waiter = loop.create_future()
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _UdpProbe(waiter), remote_addr=sockaddr[:2], family=family
+            )
+            try:
+                transport.sendto(build_hard_reset(os.urandom(8), tls_auth))
+                await asyncio.wait_for(waiter, remaining)
+            finally:
+                transport.close()
+        else:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(sockaddr[0], sockaddr[1], family=family), remaining
+            )
+            writer.close()
+        result.rtt = time.perf_counter() - started
+    except asyncio.TimeoutError:
+        result.error = "timeout"
+    except OSError as e:
+        result.error = str(e) or type(e).__name__
+    return result
+
+
+async def probe_remotes(
+    remotes: Sequence[Remote], timeout: float, tls_auth: Optional[TlsAuthKey] = None
+) -> List[ProbeResult]:
+    """Probe all remotes concurrently; results are in the input order."""
+    return list(await asyncio.gather(*(probe_remote(r, timeout, tls_auth) for r in remotes)))
+
+
+def rank(results: Sequence[ProbeResult]) -> List[ProbeResult]:
+    """
+    Answering remotes by RTT, then silent ones (tls-crypt servers, filtered
+    UDP) in config order, then the ones known to be dead.
+    """
+    # sorted() is stable, so equal keys keep the config order
+    return sorted(results, key=lambda r: (0, r.rtt) if r.reachable else (2 if r.failed else 1, 0))
+
+
+def current_network_id() -> str:
+    """Identify the network we are on by its default routes (interface + gateway)."""
+    routes = []
+    try:
+        with open("/proc/net/route") as fh:
+            next(fh, None)
+            for line in fh:
+                fields = line.split()
+                if len(fields) > 2 and fields[1] == "00000000":
+                    routes.append(f"{fields[0]}/{fields[2]}")
+    except OSError:
+        pass
+    return ",".join(sorted(routes)) or "unknown"
+
+
+class RemoteProber:
+    """
+    Ranks a config's remotes, caching the result per network for 'ttl'
+    seconds. rank_remotes() blocks for at most about 'timeout' seconds and
+    is meant to run on a worker thread.
+    """
+
+    def __init__(self, timeout: float = 1.5, ttl: float = 600.0, network_id=current_network_id):
+        self.timeout = timeout
+        self.ttl = ttl
+        self._network_id = network_id
+        self._cache: Dict[Tuple[str, Tuple[Remote, ...]], Tuple[float, List[ProbeResult]]] = {}
+        self._lock = threading.Lock()
+
+    def rank_remotes(self, config: OvpnConfig) -> List[ProbeResult]:
+        remotes = tuple(config.remotes)
+        if not remotes:
+            return []
+        key = (self._network_id(), remotes)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None and now - cached[0] < self.ttl:
+            return cached[1]
+
+        tls_auth = TlsAuthKey.from_config(config)
+        started = time.perf_counter()
+        # Not asyncio.run(): it would wait for getaddrinfo threads stuck on a slow resolver
+        loop = asyncio.new_event_loop()
+        try:
+            results = rank(loop.run_until_complete(probe_remotes(remotes, self.timeout, tls_auth)))
+        finally:
+            loop.close()
+        logger.info(
+            f"Probed {len(remotes)} remotes in {(time.perf_counter() - started) * 1000:.0f} ms: "
+            + ", ".join(
+                f"{r.remote.host}:{r.remote.port}/{r.remote.proto}="
+                + (f"{r.rtt * 1000:.0f}ms" if r.reachable else r.error or "?")
+                for r in results
+            )
+        )
+        with self._lock:
+            self._cache[key] = (now, results)
+        return results
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def preferred_remote_order(config: OvpnConfig, prober: RemoteProber) -> Optional[List[Remote]]:
+    """
+    The remotes in the order the helper should try them, or None to keep the
+    config as it is: a single remote, <connection> blocks (their per-block
+    options cannot be expressed as --remote), or no remote answered.
+    """
+    if len(config.remotes) < 2 or len(config.options.get("remote", ())) != len(config.remotes):
+        return None
+    results = prober.rank_remotes(config)
+    if not any(r.reachable for r in results):
+        return None
+    return [r.remote for r in results]
@@ -9,6 +9,7 @@ HELPER_SCRIPT_NAME="openvpn-gui-helper.sh"
 DESKTOP_ENTRY_NAME="openvpn-py.desktop"
 SUDOERS_FILE_NAME="openvpn-py-sudoers"
 ICON_NAME="openvpn-py.png"
+HELPERD_UNIT_NAME="openvpn-py-helperd.service"
 VENV_DIR="$INSTALL_DIR/.venv"
 
 # Check for root privileges
@@ -230,11 +231,11 @@ SUDOERS_FILE="/etc/sudoers.d/$SUDOERS_FILE_NAME"
   echo "# Allows users in the 'openvpn' group to run the helper script without a password"
   echo "%openvpn ALL=(ALL) NOPASSWD: $BIN_DIR/$HELPER_SCRIPT_NAME *"
   echo "# Preserve selected environment variables for the helper"
-  echo "Defaults:%openvpn env_keep += \"OPENVPN_PY_FORCE_PLUGIN_PATH OPENVPN_PY_DISABLE_EXTERNAL OPENVPN_PY_ASSUME_AA_ENFORCE OPENVPN_PY_VERB OPENVPN_PY_ENFORCE_DNS_BLACKHOLE OPENVPN_PY_TRY_RESOLVED_AFTER_START OPENVPN_PY_STATIC_DNS OPENVPN_PY_INTERFACE_HINT\""
+  echo "Defaults:%openvpn env_keep += \"OPENVPN_PY_FORCE_PLUGIN_PATH OPENVPN_PY_DISABLE_EXTERNAL OPENVPN_PY_ASSUME_AA_ENFORCE OPENVPN_PY_VERB OPENVPN_PY_ENFORCE_DNS_BLACKHOLE OPENVPN_PY_TRY_RESOLVED_AFTER_START OPENVPN_PY_STATIC_DNS OPENVPN_PY_INTERFACE_HINT OPENVPN_PY_PROBE_CACHE_SECONDS\""
   if [ -n "${SUDO_USER:-}" ]; then
     echo "# Also allow the installing user to run it immediately (no relogin needed)"
     echo "$SUDO_USER ALL=(ALL) NOPASSWD: $BIN_DIR/$HELPER_SCRIPT_NAME *"
-    echo "Defaults:$SUDO_USER env_keep += \"OPENVPN_PY_FORCE_PLUGIN_PATH OPENVPN_PY_DISABLE_EXTERNAL OPENVPN_PY_ASSUME_AA_ENFORCE OPENVPN_PY_VERB OPENVPN_PY_ENFORCE_DNS_BLACKHOLE OPENVPN_PY_TRY_RESOLVED_AFTER_START OPENVPN_PY_STATIC_DNS OPENVPN_PY_INTERFACE_HINT\""
+    echo "Defaults:$SUDO_USER env_keep += \"OPENVPN_PY_FORCE_PLUGIN_PATH OPENVPN_PY_DISABLE_EXTERNAL OPENVPN_PY_ASSUME_AA_ENFORCE OPENVPN_PY_VERB OPENVPN_PY_ENFORCE_DNS_BLACKHOLE OPENVPN_PY_TRY_RESOLVED_AFTER_START OPENVPN_PY_STATIC_DNS OPENVPN_PY_INTERFACE_HINT OPENVPN_PY_PROBE_CACHE_SECONDS\""
   fi
 } > "$SUDOERS_FILE"
 # Set correct permissions for the sudoers file
@@ -261,6 +262,27 @@ else
   ADDED_USER=0
 fi
 
+# --- Install the persistent helper daemon ---
+# The GUI talks to it over a Unix socket instead of spawning sudo for every status poll.
+echo "Installing helper daemon service ($HELPERD_UNIT_NAME)..."
+cat << EOF > "/etc/systemd/system/$HELPERD_UNIT_NAME"
+[Unit]
+Description=OpenVPN-Py privileged helper daemon
+After=network.target
+
+[Service]
+Type=simple
+ExecStart=$VENV_DIR/bin/python $INSTALL_DIR/helper_daemon.py --socket /run/openvpn-py/helper.sock --helper $BIN_DIR/$HELPER_SCRIPT_NAME --group openvpn
+RuntimeDirectory=openvpn-py
+RuntimeDirectoryPreserve=yes
+Restart=on-failure
+
+[Install]
+WantedBy=multi-user.target
+EOF
+systemctl daemon-reload || true
+systemctl enable --now "$HELPERD_UNIT_NAME" || echo "Warning: could not start $HELPERD_UNIT_NAME; the GUI will fall back to sudo."
+
 echo ""
 echo "--------------------------------------------------------"
 echo "Installation complete!"
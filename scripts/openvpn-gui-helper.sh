@@ -10,6 +10,11 @@ log() {
     echo "$(date '+%Y-%m-%d %H:%M:%S') - HELPER: ${message}" >> "$log_file_path"
 }
 
+now_ms() {
+    # Milliseconds since the epoch, for the phase timings reported by 'start'
+    date +%s%3N
+}
+
 handle_error() {
     # Since we can't be sure which log file to use, error to stderr
     local exit_code=$?
@@ -43,7 +48,8 @@ list_matching_units() {
 
     while IFS= read -r unit; do
         # Match exact and suffixed forms: base.service or base-*.service
-        if [[ "$unit" == "${base_unit_name}.service" || "$unit" == ${base_unit_name}-*.service ]]; then
+        # The base is quoted: escaped instance names contain backslashes (\x2d)
+        if [[ "$unit" == "${base_unit_name}.service" || "$unit" == "${base_unit_name}"-*.service ]]; then
             matches+=("$unit")
         fi
     done <<< "$list_output"
@@ -51,6 +57,131 @@ list_matching_units() {
     printf '%s\n' "${matches[@]:-}"
 }
 
+# Load the state of every loaded GUI unit with a single systemctl call into
+# GUI_UNITS (names) and GUI_UNIT_<PROPERTY> (associative, keyed by unit name)
+load_gui_units() {
+    GUI_UNITS=()
+    declare -gA GUI_UNIT_ACTIVE=() GUI_UNIT_SUB=() GUI_UNIT_RESULT=() GUI_UNIT_MAIN_STATUS=() GUI_UNIT_MAIN_CODE=()
+    local show_output line key value
+    local id="" active="" sub="" result="" main_status="" main_code=""
+    show_output="$(
+        systemctl show --no-pager --property=Id,ActiveState,SubState,Result,ExecMainStatus,ExecMainCode \
+            'openvpn-py-gui@*.service' 2>/dev/null || true
+    )"
+    # One KEY=VALUE block per unit, blocks separated by an empty line; a final
+    # empty line flushes the last block
+    while IFS= read -r line; do
+        if [ -z "$line" ]; then
+            if [ -n "$id" ]; then
+                GUI_UNITS+=("$id")
+                GUI_UNIT_ACTIVE["$id"]="$active"
+                GUI_UNIT_SUB["$id"]="$sub"
+                GUI_UNIT_RESULT["$id"]="$result"
+                GUI_UNIT_MAIN_STATUS["$id"]="$main_status"
+                GUI_UNIT_MAIN_CODE["$id"]="$main_code"
+            fi
+            id=""; active=""; sub=""; result=""; main_status=""; main_code=""
+            continue
+        fi
+        key="${line%%=*}"
+        value="${line#*=}"
+        case "$key" in
+            Id) id="$value" ;;
+            ActiveState) active="$value" ;;
+            SubState) sub="$value" ;;
+            Result) result="$value" ;;
+            ExecMainStatus) main_status="$value" ;;
+            ExecMainCode) main_code="$value" ;;
+        esac
+    done <<< "$show_output"$'\n'
+}
+
+# Sets MATCHING_UNITS to the loaded GUI units of one config (base.service and
+# base-*.service, base being openvpn-py-gui@<escaped instance>); needs load_gui_units
+gui_units_matching() {
+    local base="$1" u
+    MATCHING_UNITS=()
+    for u in "${GUI_UNITS[@]:-}"; do
+        if [[ -n "$u" && ( "$u" == "${base}.service" || "$u" == "${base}"-*.service ) ]]; then
+            MATCHING_UNITS+=("$u")
+        fi
+    done
+}
+
+# Sets UNIT_LOAD_STATE, UNIT_ACTIVE_STATE, UNIT_FRAGMENT_PATH and UNIT_DROP_IN_PATHS
+# of one unit with a single systemctl call
+unit_show_props() {
+    UNIT_LOAD_STATE=""
+    UNIT_ACTIVE_STATE=""
+    UNIT_FRAGMENT_PATH=""
+    UNIT_DROP_IN_PATHS=""
+    local line
+    while IFS= read -r line; do
+        case "$line" in
+            LoadState=*) UNIT_LOAD_STATE="${line#*=}" ;;
+            ActiveState=*) UNIT_ACTIVE_STATE="${line#*=}" ;;
+            FragmentPath=*) UNIT_FRAGMENT_PATH="${line#*=}" ;;
+            DropInPaths=*) UNIT_DROP_IN_PATHS="${line#*=}" ;;
+        esac
+    done <<< "$(systemctl show --no-pager --property=LoadState,ActiveState,FragmentPath,DropInPaths "$1" 2>/dev/null || true)"
+}
+
+# Whether the unit last queried by unit_show_props has a fragment or drop-in
+# outside /run/systemd/transient (a persistent or generated unit of that name)
+unit_has_persistent_fragment() {
+    local path
+    for path in $UNIT_FRAGMENT_PATH $UNIT_DROP_IN_PATHS; do
+        if [[ "$path" == /* && "$path" != /run/systemd/transient/* ]]; then
+            return 0
+        fi
+    done
+    return 1
+}
+
+# Whether a unit's properties (ActiveState SubState Result ExecMainStatus ExecMainCode)
+# say it failed; same rules as the per-config 'status' command
+unit_state_failed() {
+    local active="$1" sub="$2" result="$3" main_status="$4" main_code="$5"
+    if [ "$active" = "failed" ] || [ "$result" = "failed" ] || [ "$result" = "exit-code" ]; then
+        return 0
+    fi
+    if [ "$active" = "inactive" ] && [ "$sub" = "dead" ]; then
+        if [ -n "$main_status" ] && [ "$main_status" != "0" ]; then
+            return 0
+        fi
+        if [ -n "$main_code" ] && [ "$main_code" != "0" ]; then
+            return 0
+        fi
+    fi
+    return 1
+}
+
+# Whether the newest log of a config's units ends in a fatal or authentication
+# error; catches failures of units that were already garbage-collected
+latest_log_failed() {
+    local prefix_esc="$1" prefix_raw="$2" latest_log content_upper
+    latest_log="$(ls -t "$LOG_DIR/${prefix_esc}.service.log" "$LOG_DIR/${prefix_esc}-"*.service.log "$LOG_DIR/${prefix_raw}.service.log" "$LOG_DIR/${prefix_raw}-"*.service.log 2>/dev/null | head -n1 || true)"
+    if [ -z "${latest_log:-}" ] || [ ! -f "$latest_log" ]; then
+        return 1
+    fi
+    # Read last lines and look for fatal/auth markers
+    content_upper="$(tail -n 200 "$latest_log" 2>/dev/null | tr '[:lower:]' '[:upper:]' || true)"
+    grep -Eq "AUTH_FAILED|AUTH[ _]FAILURE|AUTH FAILED|AUTHENTICATION FAILED|FATAL|FAILED RUNNING COMMAND|ACCESS DENIED|TLS ERROR|VERIFY ERROR|CANNOT RESOLVE|NETWORK IS UNREACHABLE|EXITING DUE TO FATAL ERROR|OPTIONS ERROR|RESOLVE:" <<< "$content_upper"
+}
+
+# Set the variable named $1 to a JSON string literal of $2 (no subshell per value)
+json_string() {
+    local s="$2"
+    s="${s//\\/\\\\}"
+    s="${s//\"/\\\"}"
+    s="${s//$'\t'/\\t}"
+    s="${s//$'\n'/\\n}"
+    s="${s//$'\r'/\\r}"
+    # Drop any other control characters
+    s="${s//[$'\001'-$'\037']/}"
+    printf -v "$1" '"%s"' "$s"
+}
+
 # Directory for credential files (root-only) – AppArmor-friendly location
 AUTH_DIR="/etc/openvpn/openvpn-py"
 # Directory for transient logs readable by GUI via symlink
@@ -67,35 +198,161 @@ if [[ $EUID -ne 0 ]]; then
    exit 1
 fi
 
-# Resolve openvpn binary dynamically (systemd-run has limited PATH)
-OPENVPN_BIN="$(command -v openvpn || true)"
-if [[ -z "$OPENVPN_BIN" ]]; then
-    # Fallback to common path
-    if [[ -x "/usr/sbin/openvpn" ]]; then
-        OPENVPN_BIN="/usr/sbin/openvpn"
-    elif [[ -x "/usr/bin/openvpn" ]]; then
-        OPENVPN_BIN="/usr/bin/openvpn"
+# --- Environment probes (start only) ---
+# The OpenVPN binary and version, AppArmor's view of OpenVPN and the DNS
+# integration plugin/scripts rarely change between runs but cost tens to
+# hundreds of ms to probe (openvpn --version, aa-status). They are cached in
+# a root-only file, valid while none of the probed paths changed and for at
+# most OPENVPN_PY_PROBE_CACHE_SECONDS (default 600; 0 disables the cache).
+PROBE_CACHE_FILE="$LOG_DIR/.openvpn-py-probes"
+PROBE_CACHE_VERSION=1
+PROBED_VARS=(OPENVPN_BIN OVPN_VER_MAJ OVPN_VER_MIN RESOLVED_SCRIPT PROBED_PLUGIN_PATH RESOLVCONF_SCRIPT INTERNAL_DNS_SCRIPT AA_PROBE)
+OPENVPN_AA_PROFILE="/etc/apparmor.d/usr.sbin.openvpn"
+RESOLVED_SCRIPT_CANDIDATES=(
+    "/etc/openvpn/update-systemd-resolved"
+    "/etc/openvpn/scripts/update-systemd-resolved"
+    "/usr/libexec/openvpn/update-systemd-resolved"
+    "/usr/lib/openvpn/plugins/update-systemd-resolved"
+)
+PLUGIN_CANDIDATES=(
+    "/usr/lib/x86_64-linux-gnu/openvpn/plugins/openvpn-plugin-systemd-resolved.so"
+    "/usr/lib/openvpn/plugins/openvpn-plugin-systemd-resolved.so"
+    "/usr/lib64/openvpn/plugins/openvpn-plugin-systemd-resolved.so"
+    "/lib/openvpn/plugins/openvpn-plugin-systemd-resolved.so"
+    "/usr/lib64/openvpn/plugins/systemd-resolved/openvpn-plugin-systemd-resolved.so"
+)
+RESOLVCONF_SCRIPT_CANDIDATES=(
+    "/etc/openvpn/update-resolv-conf"
+    "/usr/libexec/openvpn/update-resolv-conf"
+    "/etc/openvpn/scripts/update-resolv-conf"
+)
+# Prefer AppArmor-friendly location if present
+INTERNAL_DNS_SCRIPT_CANDIDATES=(
+    "/etc/openvpn/scripts/openvpn-py-dns-fallback.sh"
+    "/usr/local/share/openvpn-py/scripts/dns-fallback.sh"
+)
+
+# What the cached probes depend on: every probed path that exists, with its mtime
+probe_cache_key() {
+    local paths=(
+        "$(command -v openvpn || true)" /usr/sbin/openvpn /usr/bin/openvpn
+        "$OPENVPN_AA_PROFILE" "$(command -v aa-status || true)" /usr/sbin/aa-status
+        "$(command -v resolvectl || true)" "$(command -v systemd-resolve || true)"
+        "${RESOLVED_SCRIPT_CANDIDATES[@]}" "${PLUGIN_CANDIDATES[@]}"
+        "${RESOLVCONF_SCRIPT_CANDIDATES[@]}" "${INTERNAL_DNS_SCRIPT_CANDIDATES[@]}"
+    )
+    local existing=()
+    for p in "${paths[@]}"; do
+        if [ -n "$p" ] && [ -e "$p" ]; then
+            existing+=("$p")
+        fi
+    done
+    echo "v${PROBE_CACHE_VERSION} $(stat -L -c '%n:%Y' "${existing[@]}" 2>/dev/null | tr '\n' ' ' || true)"
+}
+
+# Sets PROBED_VARS, from the cache when it is valid (PROBES_CACHED=1) or by probing
+probe_environment() {
+    local ttl="${OPENVPN_PY_PROBE_CACHE_SECONDS:-600}" key now
+    [[ "$ttl" =~ ^[0-9]+$ ]] || ttl=600
+    printf -v now '%(%s)T' -1
+    key="$(probe_cache_key)"
+    PROBES_CACHED=0
+    if [ "$ttl" -gt 0 ] && [ -f "$PROBE_CACHE_FILE" ] && [ -O "$PROBE_CACHE_FILE" ]; then
+        CACHED_PROBE_KEY=""
+        CACHED_PROBE_TIME=0
+        # shellcheck disable=SC1090
+        source "$PROBE_CACHE_FILE" 2>/dev/null || true
+        if [ "$CACHED_PROBE_KEY" = "$key" ] && [ $((now - CACHED_PROBE_TIME)) -lt "$ttl" ] && [ -x "${OPENVPN_BIN:-}" ]; then
+            PROBES_CACHED=1
+            return 0
+        fi
+    fi
+
+    # Resolve openvpn binary dynamically (systemd-run has limited PATH)
+    OPENVPN_BIN="$(command -v openvpn || true)"
+    if [[ -z "$OPENVPN_BIN" ]]; then
+        # Fallback to common path
+        if [[ -x "/usr/sbin/openvpn" ]]; then
+            OPENVPN_BIN="/usr/sbin/openvpn"
+        elif [[ -x "/usr/bin/openvpn" ]]; then
+            OPENVPN_BIN="/usr/bin/openvpn"
+        else
+            return 1
+        fi
+    fi
+
+    # Determine OpenVPN version (for feature gating like DOMAIN-ROUTE)
+    local ver_raw parts
+    ver_raw="$($OPENVPN_BIN --version 2>/dev/null | head -n1 | sed -E 's/.*OpenVPN[[:space:]]+([0-9]+)\.([0-9]+)(\.[0-9]+)?[[:space:]].*/\1 \2/;t;d')"
+    OVPN_VER_MAJ=0
+    OVPN_VER_MIN=0
+    if [[ -n "$ver_raw" ]]; then
+        # shellcheck disable=SC2206
+        parts=( $ver_raw )
+        OVPN_VER_MAJ="${parts[0]:-0}"
+        OVPN_VER_MIN="${parts[1]:-0}"
+    fi
+
+    RESOLVED_SCRIPT=""
+    for p in "${RESOLVED_SCRIPT_CANDIDATES[@]}"; do
+        if [ -x "$p" ]; then RESOLVED_SCRIPT="$p"; break; fi
+    done
+    # The optional systemd-resolved OpenVPN plugin
+    PROBED_PLUGIN_PATH=""
+    for p in "${PLUGIN_CANDIDATES[@]}"; do
+        if [ -f "$p" ]; then PROBED_PLUGIN_PATH="$p"; break; fi
+    done
+    RESOLVCONF_SCRIPT=""
+    for p in "${RESOLVCONF_SCRIPT_CANDIDATES[@]}"; do
+        if [ -x "$p" ]; then RESOLVCONF_SCRIPT="$p"; break; fi
+    done
+    INTERNAL_DNS_SCRIPT=""
+    for p in "${INTERNAL_DNS_SCRIPT_CANDIDATES[@]}"; do
+        if [ -x "$p" ]; then INTERNAL_DNS_SCRIPT="$p"; break; fi
+    done
+    # The internal fallback needs resolvectl (or systemd-resolve)
+    if [ -n "$INTERNAL_DNS_SCRIPT" ] && ! command -v resolvectl >/dev/null 2>&1 && ! command -v systemd-resolve >/dev/null 2>&1; then
+        INTERNAL_DNS_SCRIPT=""
+    fi
+
+    # Whether AppArmor enforces an OpenVPN profile: no_profile, enforcing,
+    # not_enforcing, no_enforce_mode or no_aa_status (decided by the caller)
+    local aa_status_bin aa_out
+    aa_status_bin="$(command -v aa-status 2>/dev/null || true)"
+    if [[ -z "$aa_status_bin" && -x "/usr/sbin/aa-status" ]]; then
+        aa_status_bin="/usr/sbin/aa-status"
+    fi
+    if [[ ! -e "$OPENVPN_AA_PROFILE" ]]; then
+        AA_PROBE="no_profile"
+    elif [[ -n "$aa_status_bin" ]]; then
+        aa_out="$($aa_status_bin 2>/dev/null || true)"
+        if echo "$aa_out" | grep -qE 'profiles are in enforce mode'; then
+            # Check if openvpn is among the enforcing profiles section (match exact token or full path)
+            if echo "$aa_out" | awk '/profiles are in enforce mode/{flag=1; next} /profiles are in complain mode/{flag=0} flag' | grep -qE '(^|[[:space:]])(/usr/sbin/openvpn|usr\.sbin\.openvpn)([[:space:]]|$)'; then
+                AA_PROBE="enforcing"
+            else
+                AA_PROBE="not_enforcing"
+            fi
+        else
+            AA_PROBE="no_enforce_mode"
+        fi
     else
-        echo "ERROR: 'openvpn' binary not found. Please install OpenVPN (e.g., 'sudo apt install openvpn')." >&2
-        exit 1
+        AA_PROBE="no_aa_status"
     fi
-fi
 
-# Determine OpenVPN version (for feature gating like DOMAIN-ROUTE)
-OVPN_VER_RAW="$($OPENVPN_BIN --version 2>/dev/null | head -n1 | sed -E 's/.*OpenVPN[[:space:]]+([0-9]+)\.([0-9]+)(\.[0-9]+)?[[:space:]].*/\1 \2/;t;d')"
-OVPN_VER_MAJ=0
-OVPN_VER_MIN=0
-if [[ -n "$OVPN_VER_RAW" ]]; then
-    # shellcheck disable=SC2206
-    parts=( $OVPN_VER_RAW )
-    OVPN_VER_MAJ="${parts[0]:-0}"
-    OVPN_VER_MIN="${parts[1]:-0}"
-fi
-# DOMAIN-ROUTE dhcp-option is supported since OpenVPN 2.5
-SUPPORTS_DOMAIN_ROUTE=0
-if [[ "$OVPN_VER_MAJ" -gt 2 ]] || { [[ "$OVPN_VER_MAJ" -eq 2 ]] && [[ "$OVPN_VER_MIN" -ge 5 ]]; }; then
-    SUPPORTS_DOMAIN_ROUTE=1
-fi
+    if [ "$ttl" -gt 0 ]; then
+        local tmp="${PROBE_CACHE_FILE}.$$"
+        mkdir -p "$LOG_DIR" 2>/dev/null || true
+        {
+            printf 'declare -g CACHED_PROBE_KEY=%q\n' "$key"
+            printf 'declare -g CACHED_PROBE_TIME=%q\n' "$now"
+            for v in "${PROBED_VARS[@]}"; do
+                printf 'declare -g %s=%q\n' "$v" "${!v}"
+            done
+        } > "$tmp" 2>/dev/null && chmod 0600 "$tmp" 2>/dev/null && mv -f "$tmp" "$PROBE_CACHE_FILE" 2>/dev/null || rm -f "$tmp" 2>/dev/null || true
+    fi
+    return 0
+}
 
 COMMAND=$1
 shift
@@ -108,11 +365,21 @@ case "$COMMAND" in
         # Optional flags after LOG_PATH
         DISABLE_EXTERNAL_FLAG=0
         FORCE_PLUGIN_PATH=""
+        REMOTE_ARGS=()
         while [ $# -gt 0 ]; do
             case "$1" in
                 --disable-external)
                     DISABLE_EXTERNAL_FLAG=1
                     ;;
+                --remote=*)
+                    # Remote to try, in order, as HOST,PORT,PROTO (ranked by the GUI's pre-connect probe)
+                    if [[ "${1#*=}" =~ ^([A-Za-z0-9.:_][A-Za-z0-9.:_-]{0,252}),([0-9]{1,5}),((udp|tcp)[46]?(-client)?)$ ]]; then
+                        REMOTE_ARGS+=(--remote "${BASH_REMATCH[1]}" "${BASH_REMATCH[2]}" "${BASH_REMATCH[3]}")
+                    else
+                        echo "ERROR: Invalid remote flag: $1" >&2
+                        exit 1
+                    fi
+                    ;;
                 --force-plugin=*)
                     FORCE_PLUGIN_PATH="${1#*=}"
                     ;;
@@ -123,6 +390,7 @@ case "$COMMAND" in
             shift || true
         done
 
+        PHASE_START_MS="$(now_ms)"
         log "$LOG_PATH" "Start command received for config: $CONFIG_PATH"
 
         if [ ! -f "$CONFIG_PATH" ]; then
@@ -131,6 +399,21 @@ case "$COMMAND" in
             exit 1
         fi
 
+        if ! probe_environment; then
+            log "$LOG_PATH" "ERROR: 'openvpn' binary not found."
+            echo "ERROR: 'openvpn' binary not found. Please install OpenVPN (e.g., 'sudo apt install openvpn')." >&2
+            exit 1
+        fi
+        if [ "$PROBES_CACHED" -eq 1 ]; then
+            log "$LOG_PATH" "Using cached environment probes ($OPENVPN_BIN ${OVPN_VER_MAJ}.${OVPN_VER_MIN}, AppArmor: $AA_PROBE)."
+        fi
+        # DOMAIN-ROUTE dhcp-option is supported since OpenVPN 2.5
+        SUPPORTS_DOMAIN_ROUTE=0
+        if [[ "$OVPN_VER_MAJ" -gt 2 ]] || { [[ "$OVPN_VER_MAJ" -eq 2 ]] && [[ "$OVPN_VER_MIN" -ge 5 ]]; }; then
+            SUPPORTS_DOMAIN_ROUTE=1
+        fi
+        PHASE_PROBED_MS="$(now_ms)"
+
         # Use the config filename (without extension) for the service name
         CONFIG_NAME=$(basename "$CONFIG_PATH")
         CONFIG_INSTANCE_RAW="${CONFIG_NAME%.*}"
@@ -140,27 +423,42 @@ case "$COMMAND" in
         SERVICE_UNIT_NAME="$BASE_UNIT_PREFIX_ESC"
         SERVICE_FULL="${SERVICE_UNIT_NAME}.service"
 
-        log "$LOG_PATH" "Pre-cleaning possible stale unit: $SERVICE_FULL"
-        systemctl stop "$SERVICE_FULL" || true
-        systemctl kill "$SERVICE_FULL" || true
-        systemctl reset-failed "$SERVICE_FULL" || true
-        if [ -f "/run/systemd/transient/$SERVICE_FULL" ]; then
-            rm -f "/run/systemd/transient/$SERVICE_FULL" || true
+        # One query tells whether anything is left of a previous run. A unit systemd
+        # does not know and no transient unit file means nothing to clean up: skip
+        # stop/kill/reset-failed and, above all, daemon-reload (hundreds of ms).
+        unit_show_props "$SERVICE_FULL"
+        TRANSIENT_FILE="/run/systemd/transient/$SERVICE_FULL"
+        if [ "$UNIT_LOAD_STATE" = "not-found" ] && [ ! -e "$TRANSIENT_FILE" ]; then
+            PRECLEAN_MODE="skipped"
+        else
+            PRECLEAN_MODE="done"
+            log "$LOG_PATH" "Pre-cleaning possible stale unit: $SERVICE_FULL"
+            case "$UNIT_ACTIVE_STATE" in
+                active|activating|deactivating|reloading)
+                    systemctl stop "$SERVICE_FULL" || true
+                    systemctl kill "$SERVICE_FULL" 2>/dev/null || true
+                    ;;
+            esac
+            systemctl reset-failed "$SERVICE_FULL" 2>/dev/null || true
+            if [ -e "$TRANSIENT_FILE" ]; then
+                # Only a removed unit file needs systemd to reload
+                rm -f "$TRANSIENT_FILE" || true
+                systemctl daemon-reload || true
+                PRECLEAN_MODE="reloaded"
+                unit_show_props "$SERVICE_FULL"
+            fi
         fi
-        systemctl daemon-reload || true
 
         # Detect persistent fragment conflict for this unit name
-        if systemctl cat "$SERVICE_FULL" >/tmp/.ovpnpy.unit.$$ 2>/dev/null; then
-            if grep -E '^#\s+/' /tmp/.ovpnpy.unit.$$ | grep -vq "/run/systemd/transient/"; then
-                # Persistent or generated fragment exists; choose a unique transient name to avoid collision
-                UNIQUE_SUFFIX="$(date +%s)-$$"
-                SERVICE_UNIT_NAME="${SERVICE_UNIT_NAME}-${UNIQUE_SUFFIX}"
-                SERVICE_FULL="${SERVICE_UNIT_NAME}.service"
-                log "$LOG_PATH" "Detected persistent fragment conflict. Using unique unit: $SERVICE_FULL"
-            fi
-            rm -f /tmp/.ovpnpy.unit.$$ || true
+        if unit_has_persistent_fragment; then
+            # Persistent or generated fragment exists; choose a unique transient name to avoid collision
+            UNIQUE_SUFFIX="$(date +%s)-$$"
+            SERVICE_UNIT_NAME="${SERVICE_UNIT_NAME}-${UNIQUE_SUFFIX}"
+            SERVICE_FULL="${SERVICE_UNIT_NAME}.service"
+            log "$LOG_PATH" "Detected persistent fragment conflict. Using unique unit: $SERVICE_FULL"
         fi
 
+        PHASE_PRECLEANED_MS="$(now_ms)"
         log "$LOG_PATH" "Starting OpenVPN service '$SERVICE_UNIT_NAME' using '$OPENVPN_BIN'..."
 
         # Read credentials from stdin and write to a root-only temp file
@@ -257,34 +555,14 @@ case "$COMMAND" in
             HAS_RESOLV_SCRIPTS=1
         fi
 
-        # Prefer systemd-resolved integration when available
+        # Prefer systemd-resolved integration when available (located by probe_environment)
         HAVE_RESOLVED_SCRIPT=0
-        RESOLVED_SCRIPT=""
-        for s in \
-            "/etc/openvpn/update-systemd-resolved" \
-            "/etc/openvpn/scripts/update-systemd-resolved" \
-            "/usr/libexec/openvpn/update-systemd-resolved" \
-            "/usr/lib/openvpn/plugins/update-systemd-resolved"; do
-            if [ -x "$s" ]; then
-                RESOLVED_SCRIPT="$s"
-                HAVE_RESOLVED_SCRIPT=1
-                break
-            fi
-        done
+        if [ -n "$RESOLVED_SCRIPT" ]; then
+            HAVE_RESOLVED_SCRIPT=1
+        fi
 
-        # Try to locate the optional systemd-resolved OpenVPN plugin
-        PLUGIN_PATH=""
-        for p in \
-            "/usr/lib/x86_64-linux-gnu/openvpn/plugins/openvpn-plugin-systemd-resolved.so" \
-            "/usr/lib/openvpn/plugins/openvpn-plugin-systemd-resolved.so" \
-            "/usr/lib64/openvpn/plugins/openvpn-plugin-systemd-resolved.so" \
-            "/lib/openvpn/plugins/openvpn-plugin-systemd-resolved.so" \
-            "/usr/lib64/openvpn/plugins/systemd-resolved/openvpn-plugin-systemd-resolved.so"; do
-            if [ -f "$p" ]; then
-                PLUGIN_PATH="$p"
-                break
-            fi
-        done
+        # The optional systemd-resolved OpenVPN plugin
+        PLUGIN_PATH="$PROBED_PLUGIN_PATH"
 
         # Allow forcing a specific plugin path via environment or flag
         if [ -z "$PLUGIN_PATH" ] && [ -n "${OPENVPN_PY_FORCE_PLUGIN_PATH:-}" ] && [ -f "${OPENVPN_PY_FORCE_PLUGIN_PATH}" ]; then
@@ -296,78 +574,47 @@ case "$COMMAND" in
             log "$LOG_PATH" "--force-plugin flag set; using plugin at $PLUGIN_PATH."
         fi
 
-        # Also detect legacy resolvconf integration script as a secondary fallback
+        # Also the legacy resolvconf integration script as a secondary fallback
         HAVE_RESOLVCONF_SCRIPT=0
-        RESOLVCONF_SCRIPT=""
-        for s in \
-            "/etc/openvpn/update-resolv-conf" \
-            "/usr/libexec/openvpn/update-resolv-conf" \
-            "/etc/openvpn/scripts/update-resolv-conf"; do
-            if [ -x "$s" ]; then
-                RESOLVCONF_SCRIPT="$s"
-                HAVE_RESOLVCONF_SCRIPT=1
-                break
-            fi
-        done
+        if [ -n "$RESOLVCONF_SCRIPT" ]; then
+            HAVE_RESOLVCONF_SCRIPT=1
+        fi
 
-        # Detect internal resolvectl-based fallback script (installed by our installer)
+        # Internal resolvectl-based fallback script (installed by our installer; only
+        # probed as present when resolvectl or systemd-resolve exists)
         HAVE_INTERNAL_DNS_FALLBACK=0
-        INTERNAL_DNS_SCRIPT=""
-        # Prefer AppArmor-friendly location if present
-        for s in \
-            "/etc/openvpn/scripts/openvpn-py-dns-fallback.sh" \
-            "/usr/local/share/openvpn-py/scripts/dns-fallback.sh"; do
-            if [ -x "$s" ]; then
-                INTERNAL_DNS_SCRIPT="$s"
-                HAVE_INTERNAL_DNS_FALLBACK=1
-                break
-            fi
-        done
-        # Check that resolvectl (or systemd-resolve) exists before advertising fallback
-        if [ "$HAVE_INTERNAL_DNS_FALLBACK" -eq 1 ]; then
-            if ! command -v resolvectl >/dev/null 2>&1 && ! command -v systemd-resolve >/dev/null 2>&1; then
-                HAVE_INTERNAL_DNS_FALLBACK=0
-                INTERNAL_DNS_SCRIPT=""
-            fi
+        if [ -n "$INTERNAL_DNS_SCRIPT" ]; then
+            HAVE_INTERNAL_DNS_FALLBACK=1
         fi
 
-        # Detect if AppArmor is enforcing OpenVPN profile; if so, running external scripts will likely be denied
+        # If AppArmor enforces the OpenVPN profile, running external scripts will likely be denied
         # Pragmatic default: if detection is uncertain, assume NOT enforcing to allow DNS integration.
         # Can be overridden by OPENVPN_PY_ASSUME_AA_ENFORCE=1
         APPARMOR_OPENVPN_ENFORCE=0
-        OPENVPN_AA_PROFILE="/etc/apparmor.d/usr.sbin.openvpn"
-        AA_STATUS_BIN="$(command -v aa-status 2>/dev/null || true)"
-        if [[ -z "$AA_STATUS_BIN" && -x "/usr/sbin/aa-status" ]]; then
-            AA_STATUS_BIN="/usr/sbin/aa-status"
-        fi
-        if [[ ! -e "$OPENVPN_AA_PROFILE" ]]; then
-            # If there is no explicit OpenVPN AppArmor profile on disk, do not treat as enforcing
-            APPARMOR_OPENVPN_ENFORCE=0
-            log "$LOG_PATH" "AppArmor: No OpenVPN profile file at $OPENVPN_AA_PROFILE; treating as not enforcing."
-        elif [[ -n "$AA_STATUS_BIN" ]]; then
-            AA_OUT="$($AA_STATUS_BIN 2>/dev/null || true)"
-            if echo "$AA_OUT" | grep -qE 'profiles are in enforce mode'; then
-                # Check if openvpn is among the enforcing profiles section (match exact token or full path)
-                if echo "$AA_OUT" | awk '/profiles are in enforce mode/{flag=1; next} /profiles are in complain mode/{flag=0} flag' | grep -qE '(^|[[:space:]])(/usr/sbin/openvpn|usr\.sbin\.openvpn)([[:space:]]|$)'; then
+        case "$AA_PROBE" in
+            no_profile)
+                # If there is no explicit OpenVPN AppArmor profile on disk, do not treat as enforcing
+                log "$LOG_PATH" "AppArmor: No OpenVPN profile file at $OPENVPN_AA_PROFILE; treating as not enforcing."
+                ;;
+            enforcing)
+                APPARMOR_OPENVPN_ENFORCE=1
+                log "$LOG_PATH" "AppArmor: OpenVPN profile is enforcing. External up/down scripts will be avoided."
+                ;;
+            not_enforcing)
+                log "$LOG_PATH" "AppArmor: No enforcing OpenVPN profile detected."
+                ;;
+            no_enforce_mode)
+                log "$LOG_PATH" "AppArmor: No profiles in enforce mode."
+                ;;
+            *)
+                if [[ "${OPENVPN_PY_ASSUME_AA_ENFORCE:-0}" = "1" ]]; then
                     APPARMOR_OPENVPN_ENFORCE=1
-                    log "$LOG_PATH" "AppArmor: OpenVPN profile is enforcing. External up/down scripts will be avoided."
+                    log "$LOG_PATH" "AppArmor: aa-status not found; respecting OPENVPN_PY_ASSUME_AA_ENFORCE=1 (treating as enforcing)."
                 else
-                    APPARMOR_OPENVPN_ENFORCE=0
-                    log "$LOG_PATH" "AppArmor: No enforcing OpenVPN profile detected."
+                    log "$LOG_PATH" "AppArmor: aa-status not found; assuming not enforcing to allow DNS integration. Set OPENVPN_PY_ASSUME_AA_ENFORCE=1 to override."
                 fi
-            else
-                APPARMOR_OPENVPN_ENFORCE=0
-                log "$LOG_PATH" "AppArmor: No profiles in enforce mode."
-            fi
-        else
-            if [[ "${OPENVPN_PY_ASSUME_AA_ENFORCE:-0}" = "1" ]]; then
-                APPARMOR_OPENVPN_ENFORCE=1
-                log "$LOG_PATH" "AppArmor: aa-status not found; respecting OPENVPN_PY_ASSUME_AA_ENFORCE=1 (treating as enforcing)."
-            else
-                APPARMOR_OPENVPN_ENFORCE=0
-                log "$LOG_PATH" "AppArmor: aa-status not found; assuming not enforcing to allow DNS integration. Set OPENVPN_PY_ASSUME_AA_ENFORCE=1 to override."
-            fi
-        fi
+                ;;
+        esac
 
         # Decide DNS handling strategy
         DNS_ARGS=()
@@ -432,7 +679,7 @@ case "$COMMAND" in
             UPDOWN_ARGS+=(--script-security 0)
             if [ -z "$PLUGIN_PATH" ]; then
                 log "$LOG_PATH" "No systemd-resolved plugin found in standard paths. External scripts unavailable or blocked; disabling scripts. DNS may leak."
-                log "$LOG_PATH" "Searched plugin paths: /usr/lib/x86_64-linux-gnu/openvpn/plugins/openvpn-plugin-systemd-resolved.so, /usr/lib/openvpn/plugins/openvpn-plugin-systemd-resolved.so, /usr/lib64/openvpn/plugins/openvpn-plugin-systemd-resolved.so, /lib/openvpn/plugins/openvpn-plugin-systemd-resolved.so, /usr/lib64/openvpn/plugins/systemd-resolved/openvpn-plugin-systemd-resolved.so"
+                log "$LOG_PATH" "Searched plugin paths: ${PLUGIN_CANDIDATES[*]}"
             fi
             if [ "$HAS_UPDOWN" -eq 1 ] || [ "$HAS_RESOLV_SCRIPTS" -eq 1 ]; then
                 log "$LOG_PATH" "Config contains up/down or resolv scripts but no compatible DNS integration found (or AppArmor enforcing). Disabling scripts and sanitizing config. DNS may leak."
@@ -459,6 +706,22 @@ case "$COMMAND" in
             fi
         fi
 
+        # Probed remote order: drop the config's own remote/remote-random lines so OpenVPN
+        # tries exactly the --remote list below, fastest first
+        if [ "${#REMOTE_ARGS[@]}" -gt 0 ]; then
+            ORDERED_DIR="/etc/openvpn/openvpn-py/sanitized"
+            ORDERED_CONFIG="$ORDERED_DIR/${CONFIG_NAME}.ordered.ovpn"
+            mkdir -p "$ORDERED_DIR" 2>/dev/null || true
+            chmod 0750 "$ORDERED_DIR" 2>/dev/null || true
+            if sed -E '/^[[:space:]]*(remote|remote-random)([[:space:]]|$)/d' "$EFFECTIVE_CONFIG" > "$ORDERED_CONFIG" 2>/dev/null; then
+                EFFECTIVE_CONFIG="$ORDERED_CONFIG"
+                log "$LOG_PATH" "Using probed remote order: $((${#REMOTE_ARGS[@]} / 4)) remotes, fastest first."
+            else
+                log "$LOG_PATH" "Failed to write config with probed remote order; keeping the config's own order."
+                REMOTE_ARGS=()
+            fi
+        fi
+
         # Determine verbosity: default to very detailed unless config already sets 'verb'
         # Allow override via environment variable OPENVPN_PY_VERB
         VERB_ARGS=()
@@ -470,6 +733,13 @@ case "$COMMAND" in
             log "$LOG_PATH" "Config defines 'verb'; leaving verbosity as configured."
         fi
 
+        # Expose OpenVPN's management interface on a Unix socket so the GUI receives
+        # state, byte count and log notifications as they happen instead of polling.
+        MGMT_SOCKET="$LOG_DIR/${SERVICE_FULL}.mgmt"
+        rm -f "$MGMT_SOCKET" 2>/dev/null || true
+        MGMT_ARGS=(--management "$MGMT_SOCKET" unix)
+
+        PHASE_PREPARED_MS="$(now_ms)"
         # Start OpenVPN as a transient service. Redirect stdout/stderr to our log via systemd
         # to avoid AppArmor denials when OpenVPN writes logs itself.
         # Do NOT use --collect so the unit remains in systemd and can be queried after exit
@@ -480,13 +750,35 @@ case "$COMMAND" in
             "$OPENVPN_BIN" \
             --config "$EFFECTIVE_CONFIG" \
             "${VERB_ARGS[@]}" \
+            "${MGMT_ARGS[@]}" \
             "${DNS_ARGS[@]}" \
             "${UPDOWN_ARGS[@]}" \
+            "${REMOTE_ARGS[@]}" \
             --auth-user-pass "$AUTH_FILE" \
             --auth-nocache
 
+        PHASE_UNIT_STARTED_MS="$(now_ms)"
         log "$LOG_PATH" "systemd-run command issued for $SERVICE_UNIT_NAME."
 
+        # OpenVPN creates the management socket with root ownership; hand it to the GUI user.
+        # Detached from our stdout so callers reading it are not held up.
+        (
+            for _ in $(seq 1 50); do
+                if [ -S "$MGMT_SOCKET" ]; then
+                    chown "${SUDO_USER:-root}":openvpn "$MGMT_SOCKET" 2>/dev/null || chown "${SUDO_USER:-root}" "$MGMT_SOCKET" 2>/dev/null || true
+                    chmod 0660 "$MGMT_SOCKET" 2>/dev/null || true
+                    break
+                fi
+                sleep 0.1
+            done
+        ) </dev/null >/dev/null 2>&1 & disown
+        echo "MANAGEMENT_SOCKET=$MGMT_SOCKET"
+        # Where this command spent its time (ms), so the GUI can tell it apart from sudo/daemon overhead
+        echo "HELPER_PHASES=env_probe:$((PHASE_PROBED_MS - PHASE_START_MS)),preclean:$((PHASE_PRECLEANED_MS - PHASE_PROBED_MS)),prepare:$((PHASE_PREPARED_MS - PHASE_PRECLEANED_MS)),unit_start:$((PHASE_UNIT_STARTED_MS - PHASE_PREPARED_MS))"
+        PROBE_MODE="probed"
+        if [ "$PROBES_CACHED" -eq 1 ]; then PROBE_MODE="cached"; fi
+        log "$LOG_PATH" "Start command took $((PHASE_UNIT_STARTED_MS - PHASE_START_MS)) ms (environment probes $PROBE_MODE, pre-clean $PRECLEAN_MODE)."
+
         # Best-effort DNS fix without up/down scripts: if we could not attach any DNS integration
         # (plugin/script/fallback) and resolvectl is available, try to configure DNS after start
         # by parsing the live log for pushed DNS and device name. Can be disabled via env.
@@ -519,6 +811,7 @@ case "$COMMAND" in
                                 $RESOLV_BIN dns "$DEV_GUESS" "${dns_arr[@]}" || true
                                 $RESOLV_BIN domain "$DEV_GUESS" '~.' || true
                                 if $RESOLV_BIN help 2>/dev/null | grep -q "default-route"; then $RESOLV_BIN default-route "$DEV_GUESS" yes || true; fi
+                                echo "$(date '+%F %T') - HELPER: Post-start DNS fix: done" >> "$SERVICE_LOG"
                                 dns_done=1
                                 break
                             fi
@@ -527,7 +820,7 @@ case "$COMMAND" in
                         if [ $dns_done -eq 0 ]; then
                             echo "$(date '+%F %T') - HELPER: Post-start DNS fix: could not determine DNS or device; leaving as-is" >> "$SERVICE_LOG"
                         fi
-                    ) & disown
+                    ) </dev/null >/dev/null 2>&1 & disown
                 else
                     log "$LOG_PATH" "Post-start resolvectl DNS fix disabled via OPENVPN_PY_TRY_RESOLVED_AFTER_START=0"
                 fi
@@ -546,11 +839,12 @@ case "$COMMAND" in
         SERVICE_UNIT_NAME="$BASE_UNIT_PREFIX_ESC"
         SERVICE_FULL="${SERVICE_UNIT_NAME}.service"
 
+        STOP_START_MS="$(now_ms)"
         log "$LOG_PATH" "Stop command received for service base: $SERVICE_UNIT_NAME"
 
-        # Find and stop all matching instances
-        declare -a MATCHING_UNITS=()
-        mapfile -t MATCHING_UNITS < <(list_matching_units "$SERVICE_UNIT_NAME") || true
+        # Find and stop all matching instances; one systemctl call gives their states
+        load_gui_units
+        gui_units_matching "$SERVICE_UNIT_NAME"
         if [ "${#MATCHING_UNITS[@]}" -eq 0 ]; then
             # Fallback to the base unit name
             MATCHING_UNITS=("$SERVICE_FULL")
@@ -566,6 +860,8 @@ case "$COMMAND" in
         fi
 
         any_stopped=0
+        # daemon-reload is only needed once a transient unit file was removed
+        reload_needed=0
 
         # Prepare Documents folder for archiving logs
         DOCS_APP_DIR=""
@@ -585,14 +881,23 @@ case "$COMMAND" in
         fi
 
         for u in "${MATCHING_UNITS[@]}"; do
-            if systemctl is-active --quiet "$u" 2>/dev/null; then
-                systemctl stop "$u" 2>/dev/null || true
-                any_stopped=1
-                log "$LOG_PATH" "Service '$u' stopped."
+            if [ -n "${GUI_UNIT_ACTIVE[$u]+x}" ]; then
+                unit_active="${GUI_UNIT_ACTIVE[$u]}"
+            else
+                # Not among the loaded units systemd listed (or the listing failed): ask directly
+                unit_active="$(systemctl is-active "$u" 2>/dev/null || true)"
             fi
+            case "$unit_active" in
+                active|activating|reloading)
+                    systemctl stop "$u" 2>/dev/null || true
+                    any_stopped=1
+                    log "$LOG_PATH" "Service '$u' stopped."
+                    ;;
+            esac
             systemctl reset-failed "$u" 2>/dev/null || true
             if [ -f "/run/systemd/transient/$u" ]; then
                 rm -f "/run/systemd/transient/$u" || true
+                reload_needed=1
             fi
 
             # Best-effort DNS revert if we configured resolvectl outside of OpenVPN
@@ -629,13 +934,16 @@ case "$COMMAND" in
                 fi
             fi
         done
-        systemctl daemon-reload || true
+        if [ "$reload_needed" -eq 1 ]; then
+            systemctl daemon-reload || true
+        fi
 
         # Remove any auth files and transient logs associated with the unit(s)
         if [ "${#MATCHING_UNITS[@]}" -gt 0 ]; then
             for u in "${MATCHING_UNITS[@]}"; do
                 rm -f "$AUTH_DIR/${u}.auth" || true
                 rm -f "$LOG_DIR/${u}.log" || true
+                rm -f "$LOG_DIR/${u}.mgmt" || true
                 # Cleanup legacy location if present
                 rm -f "/run/openvpn-py/${u}.auth" || true
             done
@@ -650,6 +958,11 @@ case "$COMMAND" in
             log "$LOG_PATH" "No running matching services were found for base '$SERVICE_UNIT_NAME'."
             echo "INFO: Service was not running." >&2
         fi
+        STOP_DONE_MS="$(now_ms)"
+        RELOAD_MODE="skipped"
+        if [ "$reload_needed" -eq 1 ]; then RELOAD_MODE="done"; fi
+        log "$LOG_PATH" "Stop command took $((STOP_DONE_MS - STOP_START_MS)) ms (daemon-reload $RELOAD_MODE)."
+        echo "HELPER_PHASES=unit_stop:$((STOP_DONE_MS - STOP_START_MS))"
         ;;
     status)
         CONFIG_NAME="$1" # Expects just the filename
@@ -711,20 +1024,101 @@ case "$COMMAND" in
         done
 
         # Fallback: inspect latest log file for this instance prefix (check escaped first, then raw) to detect errors even if unit was GC'd
-        BASE_UNIT_PREFIX_ESC="openvpn-py-gui@${CONFIG_INSTANCE_ESC}"
-        BASE_UNIT_PREFIX_RAW="openvpn-py-gui@${CONFIG_INSTANCE_RAW}"
-        latest_log="$(ls -t "$LOG_DIR/${BASE_UNIT_PREFIX_ESC}.service.log" "$LOG_DIR/${BASE_UNIT_PREFIX_ESC}-"*.service.log "$LOG_DIR/${BASE_UNIT_PREFIX_RAW}.service.log" "$LOG_DIR/${BASE_UNIT_PREFIX_RAW}-"*.service.log 2>/dev/null | head -n1 || true)"
-        if [ -n "${latest_log:-}" ] && [ -f "$latest_log" ]; then
-            # Read last lines and look for fatal/auth markers
-            content_upper="$(tail -n 200 "$latest_log" 2>/dev/null | tr '[:lower:]' '[:upper:]' || true)"
-            if echo "$content_upper" | grep -Eq "AUTH_FAILED|AUTH[ _]FAILURE|AUTH FAILED|AUTHENTICATION FAILED|FATAL|FAILED RUNNING COMMAND|ACCESS DENIED|TLS ERROR|VERIFY ERROR|CANNOT RESOLVE|NETWORK IS UNREACHABLE|EXITING DUE TO FATAL ERROR|OPTIONS ERROR|RESOLVE:"; then
-                echo "error"
-                exit 0
-            fi
+        if latest_log_failed "$BASE_UNIT_PREFIX_ESC" "$BASE_UNIT_PREFIX_RAW"; then
+            echo "error"
+            exit 0
         fi
 
         echo "disconnected"
         ;;
+    status-all)
+        # Status of every config named on the command line from one systemctl query,
+        # as a single JSON object for the GUI's status poll:
+        # {"version":1,"configs":{"<name>":{"status":"connected|error|disconnected","unit":...,
+        #  "active_state":...,"sub_state":...,"result":...}}}
+        if [ "$#" -eq 0 ]; then
+            echo "ERROR: status-all expects one or more config file names." >&2
+            exit 1
+        fi
+        load_gui_units
+
+        declare -a CONFIG_NAMES=("$@")
+        declare -a INSTANCES_RAW=()
+        for CONFIG_NAME in "${CONFIG_NAMES[@]}"; do
+            INSTANCES_RAW+=("${CONFIG_NAME%.*}")
+        done
+        declare -a INSTANCES_ESC=()
+        if command -v systemd-escape >/dev/null 2>&1; then
+            # One process for all names instead of one per config. It prints them
+            # space-separated on one line; escaped names never contain spaces
+            read -r -a INSTANCES_ESC < <(systemd-escape -- "${INSTANCES_RAW[@]}")
+        fi
+        if [ "${#INSTANCES_ESC[@]}" -ne "${#INSTANCES_RAW[@]}" ]; then
+            INSTANCES_ESC=()
+            for inst in "${INSTANCES_RAW[@]}"; do
+                INSTANCES_ESC+=("$(escape_instance "$inst")")
+            done
+        fi
+
+        printf '{"version":1,"configs":{'
+        for i in "${!INSTANCES_RAW[@]}"; do
+            CONFIG_NAME="${CONFIG_NAMES[$i]}"
+            BASE_UNIT_PREFIX_RAW="openvpn-py-gui@${INSTANCES_RAW[$i]}"
+            BASE_UNIT_PREFIX_ESC="openvpn-py-gui@${INSTANCES_ESC[$i]}"
+
+            # Matching units: base.service or base-*.service, plus the persisted last unit
+            gui_units_matching "$BASE_UNIT_PREFIX_ESC"
+            LASTUNIT_FILE="$LOG_DIR/${BASE_UNIT_PREFIX_RAW}.lastunit"
+            if [ -f "$LASTUNIT_FILE" ]; then
+                LASTUNIT_NAME="$(<"$LASTUNIT_FILE")" || LASTUNIT_NAME=""
+                if [ -n "$LASTUNIT_NAME" ] && [ -n "${GUI_UNIT_ACTIVE[$LASTUNIT_NAME]+x}" ]; then
+                    MATCHING_UNITS+=("$LASTUNIT_NAME")
+                fi
+            fi
+
+            state="disconnected"
+            unit=""
+            for u in "${MATCHING_UNITS[@]:-}"; do
+                if [ -n "$u" ] && [ "${GUI_UNIT_ACTIVE[$u]}" = "active" ]; then
+                    state="connected"
+                    unit="$u"
+                    break
+                fi
+            done
+            if [ "$state" = "disconnected" ]; then
+                for u in "${MATCHING_UNITS[@]:-}"; do
+                    if [ -n "$u" ] && unit_state_failed "${GUI_UNIT_ACTIVE[$u]}" "${GUI_UNIT_SUB[$u]}" \
+                        "${GUI_UNIT_RESULT[$u]}" "${GUI_UNIT_MAIN_STATUS[$u]}" "${GUI_UNIT_MAIN_CODE[$u]}"; then
+                        state="error"
+                        unit="$u"
+                        break
+                    fi
+                done
+            fi
+            if [ "$state" = "disconnected" ]; then
+                unit="${MATCHING_UNITS[0]:-}"
+                if latest_log_failed "$BASE_UNIT_PREFIX_ESC" "$BASE_UNIT_PREFIX_RAW"; then
+                    state="error"
+                fi
+            fi
+
+            active_state=""; sub_state=""; result=""
+            if [ -n "$unit" ]; then
+                active_state="${GUI_UNIT_ACTIVE[$unit]:-}"
+                sub_state="${GUI_UNIT_SUB[$unit]:-}"
+                result="${GUI_UNIT_RESULT[$unit]:-}"
+            fi
+            json_string name_json "$CONFIG_NAME"
+            json_string unit_json "$unit"
+            json_string active_json "$active_state"
+            json_string sub_json "$sub_state"
+            json_string result_json "$result"
+            [ "$i" -eq 0 ] || printf ','
+            printf '%s:{"status":"%s","unit":%s,"active_state":%s,"sub_state":%s,"result":%s}' \
+                "$name_json" "$state" "$unit_json" "$active_json" "$sub_json" "$result_json"
+        done
+        printf '}}\n'
+        ;;
     *)
         echo "ERROR: Invalid command '$COMMAND'." >&2
         exit 1
@@ -8,6 +8,7 @@ APP_NAME="openvpn-py"
 HELPER_SCRIPT_NAME="openvpn-gui-helper.sh"
 DESKTOP_ENTRY_NAME="openvpn-py.desktop"
 SUDOERS_FILE_NAME="openvpn-py-sudoers"
+HELPERD_UNIT_NAME="openvpn-py-helperd.service"
 
 # Check for root privileges
 if [ "$(id -u)" -ne 0 ]; then
@@ -35,6 +36,13 @@ else
   echo "No running GUI-managed OpenVPN services found."
 fi
 
+# --- Stop and remove the helper daemon ---
+if [ -f "/etc/systemd/system/$HELPERD_UNIT_NAME" ]; then
+    echo "Removing helper daemon service: $HELPERD_UNIT_NAME"
+    systemctl disable --now "$HELPERD_UNIT_NAME" || true
+    rm -f "/etc/systemd/system/$HELPERD_UNIT_NAME"
+fi
+
 # Also kill any remaining openvpn processes that include our unit hint (very best-effort)
 pgrep -a openvpn | grep -E 'openvpn-py-gui@' | awk '{print $1}' | xargs -r kill || true
 
@@ -0,0 +1,73 @@
+# session_lock.py
+"""
+Notices when the user's session is locked, so secrets kept in memory can
+be dropped. Listens for logind's Lock signal of this session on the system
+bus and for the screen saver turning on (ActiveChanged(true), freedesktop
+and GNOME interfaces) on the session bus. Without D-Bus it never fires.
+"""
+import logging
+import os
+from typing import Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+
+try:
+    from PyQt6.QtDBus import QDBusConnection
+except ImportError:
+    QDBusConnection = None
+
+logger = logging.getLogger(__name__)
+
+LOGIND_SERVICE = "org.freedesktop.login1"
+LOGIND_SESSION_INTERFACE = "org.freedesktop.login1.Session"
+SCREENSAVER_INTERFACES = ("org.freedesktop.ScreenSaver", "org.gnome.ScreenSaver")
+
+
+def logind_session_path(session_id: Optional[str]) -> str:
+    """
+    Object path of a logind session (sd_bus_path_encode of the id), or ""
+    - any session - when the id is unknown.
+    """
+    if not session_id:
+        return ""
+    label = "".join(
+        c if c.isascii() and (c.isalpha() or (c.isdigit() and i > 0)) else f"_{ord(c):02x}"
+        for i, c in enumerate(session_id)
+    )
+    return f"/org/freedesktop/login1/session/{label}"
+
+
+class SessionLockWatcher(QObject):
+    locked = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.listening = False
+        if QDBusConnection is None:
+            return
+        system_bus = QDBusConnection.systemBus()
+        if system_bus.isConnected():
+            self.listening |= system_bus.connect(
+                LOGIND_SERVICE,
+                logind_session_path(os.environ.get("XDG_SESSION_ID")),
+                LOGIND_SESSION_INTERFACE,
+                "Lock",
+                self._on_session_lock,
+            )
+        session_bus = QDBusConnection.sessionBus()
+        if session_bus.isConnected():
+            for interface in SCREENSAVER_INTERFACES:
+                self.listening |= session_bus.connect(
+                    "", "", interface, "ActiveChanged", self._on_screensaver_active_changed
+                )
+        if not self.listening:
+            logger.info("Session lock notifications unavailable; credentials are dropped on quit only.")
+
+    @pyqtSlot()
+    def _on_session_lock(self):
+        self.locked.emit()
+
+    @pyqtSlot(bool)
+    def _on_screensaver_active_changed(self, active: bool):
+        if active:
+            self.locked.emit()
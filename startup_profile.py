@@ -0,0 +1,148 @@
+# startup_profile.py
+"""
+Where start-up time goes, for 'main.py --profile-startup'.
+
+Phases are timed in-process from the moment this module was imported
+(main.py imports it first) up to the first paint of the main window; the
+interpreter's own start-up before that is read from /proc. Import costs
+come from CPython's -X importtime output: without that option,
+--profile-startup runs main.py again with it and merges the child's
+phases with the import times it wrote to stderr.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Optional
+
+STARTUP_PROFILE_VERSION = 1
+# Line the profiled child prints on stdout with its phases as JSON
+STARTUP_PROFILE_PREFIX = "STARTUP_PROFILE="
+
+_STARTED = time.perf_counter()
+
+_IMPORT_TIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+class ImportCost(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    # 0 for modules imported by main.py or lazily at run time, 1 for what those import, ...
+    depth: int
+
+
+class StartupProfiler:
+    """Durations of named start-up phases, recorded until finish()."""
+
+    def __init__(self, started: float):
+        self.started = started
+        self.phases: List[tuple] = []  # (name, seconds)
+        self.first_paint: Optional[float] = None  # seconds after 'started'
+        self.finished = False
+
+    @contextmanager
+    def phase(self, name: str):
+        phase_started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if not self.finished:
+                self.phases.append((name, time.perf_counter() - phase_started))
+
+    def mark_first_paint(self):
+        if self.first_paint is None:
+            self.first_paint = time.perf_counter() - self.started
+
+    def finish(self):
+        self.finished = True
+
+    def report(self) -> dict:
+        return {
+            "version": STARTUP_PROFILE_VERSION,
+            "interpreter_s": interpreter_startup_seconds(),
+            "phases": [{"name": name, "seconds": seconds} for name, seconds in self.phases],
+            "first_paint_s": self.first_paint,
+        }
+
+
+# The profiler of this process; MainWindow times its own phases with it
+profiler = StartupProfiler(_STARTED)
+
+
+def phase(name: str):
+    """Time a start-up phase with the process' profiler."""
+    return profiler.phase(name)
+
+
+def interpreter_startup_seconds() -> Optional[float]:
+    """Seconds from process start to the import of this module (Linux, 10 ms resolution)."""
+    try:
+        with open("/proc/self/stat") as f:
+            # The command name may contain spaces; fields resume after its ')'
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        ticks = os.sysconf("SC_CLK_TCK")
+        process_age = uptime - int(fields[19]) / ticks
+    except (OSError, ValueError, IndexError):
+        return None
+    return max(0.0, process_age - (time.perf_counter() - _STARTED))
+
+
+def parse_import_times(stderr: str) -> List[ImportCost]:
+    """ImportCost of every line of -X importtime output; other lines are ignored."""
+    costs = []
+    for line in stderr.splitlines():
+        match = _IMPORT_TIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            costs.append(ImportCost(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return costs
+
+
+def run_profiled(argv: List[str]) -> dict:
+    """Run main.py with -X importtime and return its report, import costs included."""
+    command = [sys.executable, "-X", "importtime", os.path.join(os.path.dirname(__file__), "main.py")]
+    completed = subprocess.run(command + argv, capture_output=True, text=True)
+    report = None
+    for line in completed.stdout.splitlines():
+        if line.startswith(STARTUP_PROFILE_PREFIX):
+            report = json.loads(line[len(STARTUP_PROFILE_PREFIX):])
+    if report is None:
+        raise RuntimeError(
+            f"profiled start-up exited with {completed.returncode} without a report:\n"
+            + completed.stderr[-2000:]
+        )
+    report["imports"] = [cost._asdict() for cost in parse_import_times(completed.stderr)]
+    return report
+
+
+def format_report(report: dict, top: int = 15) -> str:
+    lines = ["Start-up phases:"]
+    rows: List[tuple] = []
+    if report.get("interpreter_s") is not None:
+        rows.append(("interpreter start-up", report["interpreter_s"]))
+    rows.extend((p["name"], p["seconds"]) for p in report["phases"])
+    lines.extend(f"  {name:<40} {seconds * 1000:>9.1f} ms" for name, seconds in rows)
+    if report.get("first_paint_s") is not None:
+        total = report["first_paint_s"] + (report.get("interpreter_s") or 0.0)
+        lines.append(f"  {'time to first window paint':<40} {total * 1000:>9.1f} ms")
+
+    imports = [ImportCost(**cost) for cost in report.get("imports", [])]
+    if imports:
+        # Modules directly imported by the application code, heaviest first
+        direct: Dict[str, ImportCost] = {}
+        for cost in imports:
+            if cost.depth == 0 and cost.module not in direct:
+                direct[cost.module] = cost
+        lines.append(f"Imports with the most cumulative time (top {top}):")
+        for cost in sorted(direct.values(), key=lambda c: -c.cumulative_us)[:top]:
+            lines.append(f"  {cost.module:<40} {cost.cumulative_us / 1000:>9.1f} ms")
+        lines.append(f"Modules with the most time of their own (top {top}):")
+        for cost in sorted(imports, key=lambda c: -c.self_us)[:top]:
+            lines.append(f"  {cost.module:<40} {cost.self_us / 1000:>9.1f} ms")
+    return "\n".join(lines)
@@ -0,0 +1,260 @@
+# telemetry.py
+"""
+Throughput telemetry for a tunnel.
+
+Counters come from the tunnel device (/sys/class/net/<dev>/statistics) once
+its name is known, otherwise from the management interface's >BYTECOUNT
+totals. Each sample stores the time since the previous one and the counter
+deltas in preallocated arrays used as a ring, so a session of any length
+keeps a fixed amount of memory.
+"""
+import csv
+import logging
+import re
+import time
+from array import array
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from PyQt6.QtCore import QCoreApplication, QObject, QTimer, pyqtSignal
+
+import constants as C
+
+logger = logging.getLogger(__name__)
+
+SYSFS_NET = Path("/sys/class/net")
+COUNTERS = ("rx_bytes", "tx_bytes", "rx_packets", "tx_packets")
+
+# "TUN/TAP device tun0 opened" (DCO: "DCO device tun0 opened")
+DEVICE_OPENED_RE = re.compile(rb"(?:TUN/TAP|DCO) device (\S+) opened")
+
+_MAX_INTERVAL_MS = 2 ** 32 - 1
+
+Counters = Tuple[int, int, int, int]  # rx bytes, tx bytes, rx packets, tx packets
+
+
+def read_interface_counters(device: str, root: Path = SYSFS_NET) -> Optional[Counters]:
+    """The device's byte and packet counters, or None when it does not exist (anymore)."""
+    statistics = root / device / "statistics"
+    try:
+        return tuple(int((statistics / name).read_text()) for name in COUNTERS)
+    except (OSError, ValueError):
+        return None
+
+
+def format_rate(bytes_per_second: float) -> str:
+    if bytes_per_second < 1000:
+        return f"{bytes_per_second:.0f} B/s"
+    value = bytes_per_second / 1000
+    for unit in ("KB/s", "MB/s"):
+        if value < 1000:
+            return f"{value:.1f} {unit}"
+        value /= 1000
+    return f"{value:.1f} GB/s"
+
+
+class TelemetryBuffer:
+    """
+    The last 'capacity' samples of (interval, rx/tx byte deltas, rx/tx packet
+    deltas). Timestamps are not stored per sample; they are rebuilt backwards
+    from the newest one by summing intervals.
+    """
+
+    def __init__(self, capacity: int = C.TELEMETRY_HISTORY_SAMPLES):
+        self.capacity = capacity
+        self._interval_ms = array("I", bytes(4 * capacity))
+        self._rx = array("Q", bytes(8 * capacity))
+        self._tx = array("Q", bytes(8 * capacity))
+        self._rx_packets = array("I", bytes(4 * capacity))
+        self._tx_packets = array("I", bytes(4 * capacity))
+        self.clear()
+
+    def clear(self):
+        self._head = 0  # next slot to write
+        self._count = 0
+        self.last_time: Optional[float] = None  # wall clock of the newest sample
+        self.total_rx = 0
+        self.total_tx = 0
+        self.peak_rx_rate = 0.0
+        self.peak_tx_rate = 0.0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def memory_bytes(self) -> int:
+        return sum(
+            a.itemsize * len(a)
+            for a in (self._interval_ms, self._rx, self._tx, self._rx_packets, self._tx_packets)
+        )
+
+    def append(
+        self,
+        interval: float,
+        rx: int,
+        tx: int,
+        rx_packets: int = 0,
+        tx_packets: int = 0,
+        now: Optional[float] = None,
+    ):
+        """Record counter deltas over the 'interval' seconds that ended at 'now' (time.time())."""
+        interval_ms = min(max(int(round(interval * 1000)), 1), _MAX_INTERVAL_MS)
+        slot = self._head
+        self._interval_ms[slot] = interval_ms
+        self._rx[slot] = rx
+        self._tx[slot] = tx
+        self._rx_packets[slot] = min(rx_packets, 2 ** 32 - 1)
+        self._tx_packets[slot] = min(tx_packets, 2 ** 32 - 1)
+        self._head = (slot + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self.last_time = time.time() if now is None else now
+        self.total_rx += rx
+        self.total_tx += tx
+        seconds = interval_ms / 1000
+        self.peak_rx_rate = max(self.peak_rx_rate, rx / seconds)
+        self.peak_tx_rate = max(self.peak_tx_rate, tx / seconds)
+
+    def _slots(self, last: Optional[int] = None) -> range:
+        """Positions (modulo capacity) of the newest 'last' samples, oldest first."""
+        count = self._count if last is None else min(last, self._count)
+        start = self._head - count
+        return range(start, start + count)
+
+    def current_rates(self) -> Tuple[float, float]:
+        """rx and tx bytes per second over the newest sample."""
+        if not self._count:
+            return 0.0, 0.0
+        slot = (self._head - 1) % self.capacity
+        seconds = self._interval_ms[slot] / 1000
+        return self._rx[slot] / seconds, self._tx[slot] / seconds
+
+    def rates(self, last: Optional[int] = None) -> Tuple[List[float], List[float]]:
+        """rx and tx bytes per second of the newest 'last' samples, oldest first."""
+        rx_rates, tx_rates = [], []
+        for i in self._slots(last):
+            slot = i % self.capacity
+            seconds = self._interval_ms[slot] / 1000
+            rx_rates.append(self._rx[slot] / seconds)
+            tx_rates.append(self._tx[slot] / seconds)
+        return rx_rates, tx_rates
+
+    def rows(self) -> Iterator[Tuple[float, float, int, int, int, int]]:
+        """(end time, interval seconds, rx, tx, rx packets, tx packets), oldest first."""
+        if not self._count:
+            return
+        slots = [i % self.capacity for i in self._slots()]
+        # Walk back from the newest sample to find when the oldest one ended
+        end = self.last_time - sum(self._interval_ms[s] for s in slots[1:]) / 1000
+        for n, slot in enumerate(slots):
+            if n:
+                end += self._interval_ms[slot] / 1000
+            yield (
+                end,
+                self._interval_ms[slot] / 1000,
+                self._rx[slot],
+                self._tx[slot],
+                self._rx_packets[slot],
+                self._tx_packets[slot],
+            )
+
+    def export_csv(self, path: Path):
+        """Write the history with per-sample rates, for capacity planning."""
+        with open(path, "w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(
+                ["time", "interval_s", "rx_bytes", "tx_bytes", "rx_packets", "tx_packets",
+                 "rx_bytes_per_s", "tx_bytes_per_s"]
+            )
+            for end, interval, rx, tx, rx_packets, tx_packets in self.rows():
+                writer.writerow([
+                    time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(end)) + f".{int(end % 1 * 1000):03d}",
+                    f"{interval:.3f}", rx, tx, rx_packets, tx_packets,
+                    f"{rx / interval:.1f}", f"{tx / interval:.1f}",
+                ])
+
+
+class TrafficSampler(QObject):
+    """
+    Feeds a TelemetryBuffer from the tunnel device's counters (polled) or,
+    until the device is known, from management >BYTECOUNT totals (pushed).
+    """
+
+    updated = pyqtSignal()
+
+    def __init__(
+        self,
+        capacity: int = C.TELEMETRY_HISTORY_SAMPLES,
+        interval_ms: int = C.TELEMETRY_SAMPLE_INTERVAL_MS,
+        sysfs_root: Path = SYSFS_NET,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.buffer = TelemetryBuffer(capacity)
+        self.device: Optional[str] = None
+        self._sysfs_root = sysfs_root
+        self._last: Optional[Tuple[float, Counters]] = None
+        self._source: Optional[str] = None  # "sysfs" or "management"
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.poll)
+
+    @property
+    def source(self) -> Optional[str]:
+        return self._source
+
+    def start(self):
+        """Begin a new session: history and device are reset."""
+        self.buffer.clear()
+        self.device = None
+        self._last = None
+        self._source = None
+        if QCoreApplication.instance() is not None:
+            self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def set_device(self, device: str):
+        if device != self.device:
+            logger.info(f"Sampling traffic of {device}")
+            self.device = device
+
+    def scan_log(self, chunk: bytes):
+        """Pick the tunnel device name out of OpenVPN's log."""
+        if self.device is None and b" device " in chunk:
+            match = DEVICE_OPENED_RE.search(chunk)
+            if match:
+                self.set_device(match.group(1).decode(errors="replace"))
+
+    def poll(self):
+        if self.device is None:
+            return
+        counters = read_interface_counters(self.device, self._sysfs_root)
+        if counters is None:
+            return
+        if self._source != "sysfs":
+            # Device counters differ from management totals, which may have come in
+            # after the device appeared; start over from them
+            self._last = None
+            self._source = "sysfs"
+        self._record(counters)
+
+    def feed_bytecount(self, rx: int, tx: int):
+        if self._source == "sysfs":
+            # The device counters are more complete (packets too)
+            return
+        self._source = "management"
+        self._record((rx, tx, 0, 0))
+
+    def _record(self, counters: Counters, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        if self._last is None:
+            self._last = (now, counters)
+            return
+        then, previous = self._last
+        if now <= then:
+            return
+        # A counter that went backwards was reset (device recreated): count from zero
+        deltas = [c - p if c >= p else c for c, p in zip(counters, previous)]
+        self.buffer.append(now - then, *deltas)
+        self._last = (now, counters)
+        self.updated.emit()
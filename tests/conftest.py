@@ -0,0 +1,41 @@
+import os
+import time
+
+import pytest
+
+# Widgets must never try to reach a real display during tests
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """A Qt application for tests that need an event loop."""
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+@pytest.fixture
+def wait_until(qapp):
+    """Process Qt events until predicate() is true or the timeout expires."""
+
+    def _wait(predicate, timeout=3.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            qapp.processEvents()
+            if predicate():
+                return True
+            time.sleep(0.005)
+        return predicate()
+
+    return _wait
+
+
+@pytest.fixture(autouse=True)
+def _isolated_config_index(tmp_path, monkeypatch):
+    """Keep the persistent config index and connect timings out of the real user data dir."""
+    import constants as C
+
+    monkeypatch.setattr(C, "CONFIG_INDEX_PATH", tmp_path / "config-index.json")
+    monkeypatch.setattr(C, "CONNECT_TIMINGS_PATH", tmp_path / "connect-timings.json")
@@ -0,0 +1,62 @@
+"""In-process stand-in for the privileged helper daemon used by the tests."""
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from helper_client import HelperResult, encode_status_all
+from helper_daemon import HelperServer, HelperService
+
+
+class FakeHelperBackend:
+    """Scriptable replacement for ScriptBackend that records every call."""
+
+    def __init__(self):
+        self.calls = []
+        self.statuses = {}
+        self.start_returncode = 0
+        self.start_stderr = ""
+        self.start_stdout = ""
+        self.stop_stdout = ""
+        # False plays a helper script that predates 'status-all'
+        self.supports_status_all = True
+
+    def run(self, command, args, input=None, env=None, timeout=None):
+        self.calls.append((command, list(args), input))
+        if command == "start":
+            name = Path(args[0]).name
+            if self.start_returncode == 0:
+                self.statuses.setdefault(name, "connected")
+            return HelperResult(self.start_returncode, self.start_stdout, self.start_stderr)
+        if command == "stop":
+            self.statuses[args[0]] = "disconnected"
+            return HelperResult(0, self.stop_stdout, "")
+        if command == "status":
+            return HelperResult(0, self.statuses.get(args[0], "disconnected") + "\n", "")
+        if command == "status-all" and self.supports_status_all:
+            configs = {name: {"status": self.statuses.get(name, "disconnected")} for name in args}
+            return HelperResult(0, encode_status_all(configs), "")
+        return HelperResult(1, "", f"unsupported command {command}")
+
+    def count(self, command):
+        return sum(1 for c in self.calls if c[0] == command)
+
+
+@contextmanager
+def fake_helper_server(backend=None, refresh_interval=60.0):
+    """Run a HelperServer with a fake backend on a temporary socket."""
+    backend = backend or FakeHelperBackend()
+    # Keep the path short: Unix socket paths are limited to ~108 bytes
+    tmp_dir = Path(tempfile.mkdtemp(prefix="ovpy-"))
+    service = HelperService(backend, refresh_interval=refresh_interval)
+    server = HelperServer(tmp_dir / "helper.sock", service)
+    server.serve_in_thread()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
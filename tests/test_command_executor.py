@@ -0,0 +1,155 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from command_executor import CommandExecutor
+from helper_client import HelperResult
+from vpn_manager import VPNManager
+import constants as C
+
+
+@pytest.fixture
+def executor(qapp):
+    ex = CommandExecutor()
+    yield ex
+    ex.cancel_all()
+    ex.wait_for_done(5)
+
+
+def test_result_delivered_by_signal(executor, wait_until):
+    """Work runs on a pool thread and the result arrives on the GUI thread."""
+    results = []
+    executor.finished.connect(results.append)
+    main_thread = threading.get_ident()
+
+    executor.submit(lambda ctx: threading.get_ident(), tag="probe")
+
+    assert wait_until(lambda: results)
+    assert results[0].ok
+    assert results[0].tag == "probe"
+    assert results[0].value != main_thread
+
+
+def test_timeout_kills_attached_process(executor, wait_until):
+    """A command over its budget is reported at once and its subprocess is killed."""
+    results = []
+    processes = []
+
+    def slow(ctx):
+        proc = subprocess.Popen(["sleep", "30"])
+        processes.append(proc)
+        ctx.attach_process(proc)
+        proc.wait()
+
+    started = time.monotonic()
+    executor.submit(slow, tag="slow", timeout=0.2, callback=results.append)
+
+    assert wait_until(lambda: results, timeout=5)
+    assert results[0].timed_out
+    assert time.monotonic() - started < 5
+    assert wait_until(lambda: processes and processes[0].poll() is not None)
+
+
+def test_cancel_reports_cancelled(executor, wait_until):
+    """Cancelled commands report back immediately; late values are dropped."""
+    results = []
+    gate = threading.Event()
+    command_id = executor.submit(lambda ctx: gate.wait(5) and "late", tag="x", callback=results.append)
+
+    assert executor.cancel(command_id)
+    gate.set()
+    assert executor.wait_for_done(5)
+    wait_until(lambda: False, timeout=0.1)
+
+    assert len(results) == 1
+    assert results[0].cancelled
+    assert executor.pending_count() == 0
+
+
+def test_inline_without_event_loop():
+    """With inline execution the callback runs before submit() returns."""
+    ex = CommandExecutor(inline=True)
+    results = []
+    ex.submit(lambda ctx: 42, callback=results.append)
+    assert results[0].value == 42
+
+
+def test_vpn_manager_connect_does_not_block(qapp, wait_until):
+    """connect() returns while the helper is still running; the result comes later."""
+    manager = VPNManager()
+    manager._helper_client = None
+    release = threading.Event()
+
+    def fake_start(config_path, log_path, auth_input, context=None, remote_flags=None):
+        release.wait(5)
+        return HelperResult(0, "", "")
+
+    manager._run_helper_start = fake_start
+    logs = []
+    manager.connection_log_received.connect(lambda path, message: logs.append(message))
+    with patch.object(C, 'LOG_FILE_PATH', Path('/nonexistent/openvpn-gui.log')):
+        started = time.monotonic()
+        manager.connect('/tmp/test.ovpn', 'user', 'pass')
+        assert time.monotonic() - started < 0.5
+        assert manager.state('/tmp/test.ovpn') == C.VpnState.CONNECTING
+        release.set()
+        assert wait_until(lambda: "VPN process started via helper." in logs)
+    manager.connection('/tmp/test.ovpn')._cleanup()
+    manager.wait_for_pending_commands(5)
+
+
+def test_stuck_status_sweep_is_not_piled_up(qapp, wait_until):
+    """A sweep stuck in the daemon holds off the next one until its worker actually returns."""
+    manager = VPNManager()
+    manager._status_timer.stop()
+    manager._STATUS_CMD_TIMEOUT_SECONDS = 0.2
+    release = threading.Event()
+    waits = []
+
+    class StuckDaemon:
+        def is_available(self):
+            return True
+
+        def run(self, command, args, timeout=None, env=None, wait=None):
+            if command.startswith("status"):
+                waits.append(wait)
+                release.wait(10)
+            return HelperResult(0, "connected\n", "")
+
+    manager._helper_client = StuckDaemon()
+    connection = manager._connection('/tmp/test.ovpn')
+
+    def bring_up():
+        connection._set_state(C.VpnState.CONNECTING)
+        connection._set_state(C.VpnState.CONNECTED)
+
+    bring_up()
+    timed_out = []
+    manager._executor.finished.connect(lambda result: result.timed_out and timed_out.append(result))
+
+    manager.check_connection_status()
+    assert wait_until(lambda: timed_out, timeout=5)
+    # The timed-out sweep failed the tunnel; a new one is up before the next ticks
+    bring_up()
+    for _ in range(3):
+        manager.check_connection_status()
+    assert len(waits) == 1
+    # The daemon is only waited on for what is left of the sweep's budget
+    assert waits[0] is not None and waits[0] <= 2.2
+
+    release.set()
+    assert wait_until(lambda: manager._executor.running_count("status") == 0)
+    swept = len(waits)
+    manager.check_connection_status()
+    assert wait_until(lambda: len(waits) > swept)
+    manager._helper_client = None
+    connection._cleanup()
+    manager.wait_for_pending_commands(5)
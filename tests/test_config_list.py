@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config_manager import VpnConfig
+from ui.config_list import ConfigList, ConfigListModel
+
+
+def make_configs(*names, directory="/etc/openvpn/client"):
+    return [VpnConfig(name=name, path=Path(directory) / name) for name in names]
+
+
+def test_set_configs_and_lookup(qapp):
+    model = ConfigListModel()
+    configs = make_configs("a.ovpn", "b.ovpn", "c.conf")
+    model.set_configs(configs)
+
+    assert model.rowCount() == 3
+    assert model.row_for_path(str(configs[2].path)) == 2
+    assert model.row_for_path("/nowhere.ovpn") == -1
+    assert model.data(model.index(1)) == "b.ovpn"
+    assert model.data(model.index(1), ConfigListModel.PathRole) == str(configs[1].path)
+
+
+def test_sync_emits_row_signals_instead_of_reset(qapp):
+    model = ConfigListModel()
+    model.set_configs(make_configs("a.ovpn", "b.ovpn", "d.ovpn"))
+    events = []
+    model.modelReset.connect(lambda: events.append("reset"))
+    model.rowsInserted.connect(lambda parent, first, last: events.append(("inserted", first)))
+    model.rowsRemoved.connect(lambda parent, first, last: events.append(("removed", first)))
+
+    target = make_configs("a.ovpn", "c.ovpn", "d.ovpn", "e.ovpn")
+    model.sync_configs(target)
+
+    assert model.configs == target
+    assert events == [("removed", 1), ("inserted", 1), ("inserted", 3)]
+    assert [model.row_for_path(str(c.path)) for c in target] == [0, 1, 2, 3]
+
+
+def test_selection_survives_sync(qapp):
+    widget = ConfigList()
+    selected = []
+    widget.config_selected.connect(selected.append)
+    configs = make_configs("a.ovpn", "b.ovpn", "c.ovpn")
+    widget.set_configs(configs)
+
+    assert widget.select_config_by_path(str(configs[2].path))
+    assert selected == [str(configs[2].path)]
+    assert widget.delete_button.isEnabled()
+
+    widget.sync_configs(configs[1:])
+    assert widget.get_selected_config_path() == str(configs[2].path)
+
+    deleted = []
+    widget.delete_config_requested.connect(deleted.append)
+    widget.on_delete_clicked()
+    assert deleted == [str(configs[2].path)]
@@ -126,3 +126,66 @@ def test_import_nonexistent_file(tmp_path, monkeypatch):
     
     with pytest.raises(ConfigImportError, match="Source file not found"):
         cm.import_config("/nonexistent/file.ovpn")
+
+
+def _age(path, seconds=60):
+    """Backdate a directory so its listing is trusted by the config index."""
+    st = path.stat()
+    os.utime(path, (st.st_atime - seconds, st.st_mtime - seconds))
+
+
+def test_discover_only_rescans_changed_dirs(tmp_path, monkeypatch):
+    user_cfg = tmp_path / "user_configs"
+    system_cfg = tmp_path / "system_configs"
+    for d in (user_cfg, system_cfg):
+        d.mkdir()
+    (user_cfg / "mine.ovpn").write_text("client\n")
+    (system_cfg / "shared.conf").write_text("client\n")
+    # The user dir wins on duplicate names
+    (system_cfg / "mine.ovpn").write_text("client\n")
+    _age(user_cfg)
+    _age(system_cfg)
+
+    cm = ConfigManager()
+    cm.config_dirs = [user_cfg, system_cfg]
+    first = cm.discover_configs()
+    assert [(c.name, c.path.parent) for c in first] == [
+        ("mine.ovpn", user_cfg),
+        ("shared.conf", system_cfg),
+    ]
+
+    scanned = []
+    original_glob = Path.glob
+    monkeypatch.setattr(Path, "glob", lambda self, pattern: scanned.append(self) or original_glob(self, pattern))
+
+    # A fresh instance reads the persisted index: nothing is listed again
+    cm = ConfigManager()
+    cm.config_dirs = [user_cfg, system_cfg]
+    assert cm.cached_configs() == first
+    assert cm.discover_configs() == first
+    assert scanned == []
+
+    (user_cfg / "new.ovpn").write_text("client\n")
+    names = [c.name for c in cm.discover_configs()]
+    assert names == ["mine.ovpn", "new.ovpn", "shared.conf"]
+    assert set(scanned) == {user_cfg}
+
+
+def test_cached_configs_without_index(tmp_path):
+    cm = ConfigManager()
+    cm.config_dirs = [tmp_path]
+    assert cm.cached_configs() is None
+    cm.discover_configs()
+    assert cm.cached_configs() == []
+
+
+def test_discover_drops_removed_dir(tmp_path):
+    user_cfg = tmp_path / "user_configs"
+    user_cfg.mkdir()
+    (user_cfg / "a.ovpn").write_text("client\n")
+
+    cm = ConfigManager()
+    cm.config_dirs = [user_cfg]
+    assert [c.name for c in cm.discover_configs()] == ["a.ovpn"]
+    shutil.rmtree(user_cfg)
+    assert cm.discover_configs() == []
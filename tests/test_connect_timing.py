@@ -0,0 +1,179 @@
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import constants as C
+from connect_timing import (
+    ConnectTimingStore,
+    LatencyHistogram,
+    parse_helper_phases,
+    phase_durations,
+)
+from helper_client import HelperClient
+from tests.fake_helper import fake_helper_server
+from vpn_manager import VPNManager
+
+CONFIG = '/tmp/test.ovpn'
+
+
+def test_histogram_is_exact_for_small_values():
+    histogram = LatencyHistogram()
+    for ms in range(1, 51):
+        histogram.record(ms / 1000)
+
+    assert len(histogram) == 50
+    assert histogram.percentile(50) == pytest.approx(0.025)
+    assert histogram.percentile(95) == pytest.approx(0.048)
+    assert histogram.percentile(100) == pytest.approx(0.050)
+
+
+def test_histogram_percentiles_stay_within_a_few_percent():
+    rng = random.Random(3)
+    values = sorted(rng.lognormvariate(0, 1.2) for _ in range(5000))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    for percent in (50, 90, 95, 99):
+        exact = values[int(percent / 100 * len(values)) - 1]
+        assert histogram.percentile(percent) == pytest.approx(exact, rel=0.03)
+    # Bounded memory: a few hundred buckets at most for any number of values
+    assert len(histogram.counts) < 400
+
+
+def test_histogram_round_trips_and_merges():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    a.record(0.2)
+    b.record(1.5)
+    b.record(1.5)
+    a.merge(LatencyHistogram.from_dict(json.loads(json.dumps(b.to_dict()))))
+
+    assert len(a) == 3
+    assert a.percentile(50) == pytest.approx(1.5, rel=0.02)
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_parse_helper_phases():
+    output = "MANAGEMENT_SOCKET=/run/x.mgmt\nHELPER_PHASES=preclean:1200,prepare:45,unit_start:bad,other:5\n"
+    assert parse_helper_phases(output) == {"preclean": 1.2, "prepare": 0.045}
+    assert parse_helper_phases("") == {}
+    assert parse_helper_phases("HELPER_PHASES=unit_stop:80\n") == {"unit_stop": 0.08}
+
+
+def test_phase_durations_attribute_helper_overhead_to_sudo():
+    marks = {
+        "connect_requested": 0.0,
+        "helper_invoked": 0.3,
+        "helper_started": 2.3,
+        "link_up": 2.5,
+        "tls_done": 3.5,
+        "push_reply": 3.7,
+        "connected": 4.0,
+    }
+    durations = phase_durations(marks, {"preclean": 1.0, "prepare": 0.2, "unit_start": 0.5})
+
+    assert durations["probe"] == pytest.approx(0.3)
+    assert durations["sudo"] == pytest.approx(0.3)
+    assert durations["tls"] == pytest.approx(1.0)
+    assert durations["configure"] == pytest.approx(0.3)
+    assert durations["total"] == pytest.approx(4.0)
+    # Not seen in this attempt
+    assert "dns_fixup" not in durations
+    assert "sudo" not in phase_durations(marks, {"preclean": 1.0})
+
+
+def test_store_persists_across_sessions(tmp_path):
+    path = tmp_path / "timings.json"
+    store = ConnectTimingStore(path)
+    for total in (2.0, 3.0, 10.0):
+        store.record(CONFIG, {"total": total, "tls": total / 4, "unknown": 1.0})
+
+    reloaded = ConnectTimingStore(path)
+    summary = {stats.phase.key: stats for stats in reloaded.summary(CONFIG)}
+
+    assert reloaded.configs() == [CONFIG]
+    assert list(summary) == ["tls", "total"]
+    assert summary["total"].count == 3
+    assert summary["total"].p50 == pytest.approx(3.0, rel=0.02)
+    assert summary["total"].p95 == pytest.approx(10.0, rel=0.02)
+
+    reloaded.clear(CONFIG)
+    assert ConnectTimingStore(path).summary(CONFIG) == []
+
+
+def test_store_ignores_unreadable_file(tmp_path):
+    path = tmp_path / "timings.json"
+    path.write_text("{not json")
+    store = ConnectTimingStore(path)
+
+    assert store.configs() == []
+    store.record(CONFIG, {"total": 1.0})
+    assert ConnectTimingStore(path).configs() == [CONFIG]
+
+
+def test_connect_records_phases_from_helper_and_log(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
+    with fake_helper_server() as daemon:
+        daemon.service.backend.start_stdout = (
+            "MANAGEMENT_SOCKET=\nHELPER_PHASES=env_probe:5,preclean:800,prepare:40,unit_start:300\n"
+        )
+        manager = VPNManager()
+        manager._executor.inline = True
+        manager._helper_client = HelperClient(daemon.socket_path)
+        recorded = []
+        manager.connection_timing_recorded.connect(recorded.append)
+        try:
+            manager.connect(CONFIG, 'user', 'pass')
+            connection = manager.connection(CONFIG)
+            connection.log_path.write_text(
+                "UDPv4 link remote: [AF_INET]198.51.100.7:1194\n"
+                "[server] Peer Connection Initiated with [AF_INET]198.51.100.7:1194\n"
+                "PUSH: Received control message: 'PUSH_REPLY,ping 10'\n"
+                "Initialization Sequence Completed\n"
+            )
+            manager.check_connection_status()
+            assert connection.state == C.VpnState.CONNECTED
+            assert recorded == [CONFIG]
+
+            # The background DNS fix-up lands after connecting and is recorded on its own
+            with open(connection.log_path, "a") as fh:
+                fh.write("HELPER: Post-start DNS fix: done\n")
+            connection._poll_log_file()
+        finally:
+            manager._status_timer.stop()
+            manager._helper_client.close()
+
+    stats = {s.phase.key: s for s in ConnectTimingStore(C.CONNECT_TIMINGS_PATH).summary(CONFIG)}
+    for key in ("probe", "helper", "sudo", "env_probe", "preclean", "prepare", "unit_start",
+                "resolve", "tls", "push_reply", "configure", "dns_fixup", "total"):
+        assert stats[key].count == 1, key
+    assert stats["preclean"].p50 == pytest.approx(0.8, rel=0.02)
+    assert recorded == [CONFIG, CONFIG]
+
+
+def test_disconnect_records_helper_stop_time(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
+    with fake_helper_server() as daemon:
+        daemon.service.backend.stop_stdout = "HELPER_PHASES=unit_stop:120\n"
+        manager = VPNManager()
+        manager._executor.inline = True
+        manager._helper_client = HelperClient(daemon.socket_path)
+        messages = []
+        manager.connection_log_received.connect(lambda _config, message: messages.append(message))
+        try:
+            manager._connection(CONFIG).state = C.VpnState.CONNECTED
+            manager.disconnect(CONFIG)
+        finally:
+            manager._helper_client.close()
+
+    stats = {s.phase.key: s for s in ConnectTimingStore(C.CONNECT_TIMINGS_PATH).summary(CONFIG)}
+    assert set(stats) == {"stop", "unit_stop"}
+    assert stats["unit_stop"].p50 == pytest.approx(0.12, rel=0.02)
+    assert "Disconnect command sent. Helper output: " in messages
+
@@ -0,0 +1,243 @@
+import json
+import socket
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import constants as C
+from config_manager import ConfigManager
+from control_server import (
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    NO_CREDENTIALS,
+    NO_SUCH_CONFIG,
+    NOT_CONNECTED,
+    PARSE_ERROR,
+    ControlServer,
+)
+from helper_backend import SimulatedHelperBackend, SimulationProfile
+from vpn_manager import VPNManager
+
+
+class FakeCredentials:
+    """request_credentials() of CredentialsManager, answered from a dict."""
+
+    def __init__(self, saved=None):
+        self.saved = saved or {}
+
+    def request_credentials(self, config_path, callback):
+        callback(self.saved.get(str(config_path), (None, None)))
+
+
+class Client:
+    """A blocking JSON-RPC client; the server runs on the test's event loop in between."""
+
+    def __init__(self, path, qapp):
+        self.qapp = qapp
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(str(path))
+        self.sock.setblocking(False)
+        self.buffer = b''
+        self.next_id = 0
+
+    def send(self, data: bytes):
+        self.sock.sendall(data)
+
+    def read_message(self, timeout=3.0):
+        deadline = time.monotonic() + timeout
+        while b'\n' not in self.buffer:
+            if time.monotonic() > deadline:
+                raise TimeoutError('no message from the control server')
+            self.qapp.processEvents()
+            try:
+                self.buffer += self.sock.recv(65536)
+            except BlockingIOError:
+                time.sleep(0.001)
+        line, self.buffer = self.buffer.split(b'\n', 1)
+        return json.loads(line)
+
+    def call(self, method, **params):
+        self.next_id += 1
+        self.send(json.dumps({'jsonrpc': '2.0', 'id': self.next_id, 'method': method, 'params': params}).encode() + b'\n')
+        while True:
+            message = self.read_message()
+            if message.get('id') == self.next_id:
+                return message
+
+    def events(self, predicate, timeout=3.0):
+        """Event params read until predicate(params) holds."""
+        received = []
+        while not received or not predicate(received[-1]):
+            message = self.read_message(timeout)
+            if message.get('method') == 'event':
+                received.append(message['params'])
+        return received
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    configs_dir = tmp_path / 'configs'
+    configs_dir.mkdir()
+    path = configs_dir / 'work.ovpn'
+    path.write_text('client\nremote vpn.example.com 1194\n')
+    monkeypatch.setattr(C, 'USER_CONFIGS_DIR', configs_dir)
+    monkeypatch.setattr(C, 'SYSTEM_CONFIG_DIRS', [])
+    monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
+    monkeypatch.setattr(C, 'PROBE_REMOTES_BEFORE_CONNECT', False)
+    return path
+
+
+@pytest.fixture
+def backend():
+    backend = SimulatedHelperBackend(SimulationProfile(connect_delay=0.05))
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def server(qapp, config, backend, tmp_path, wait_until):
+    manager = VPNManager(backend)
+    manager._helper_client = None
+    config_manager = ConfigManager()
+    server = ControlServer(manager, config_manager, FakeCredentials({str(config): ('user', 'pass')}))
+    # What the window's background discovery reports
+    server.set_configs(config_manager.discover_configs())
+    assert server.listen(tmp_path / 'run' / 'control.sock')
+    yield server
+    server.close()
+    # Leave no log tail watching tmp_path once the manager is garbage
+    manager.disconnect_all()
+    assert wait_until(lambda: not manager.active_connections())
+    manager._status_timer.stop()
+    manager.wait_for_pending_commands(5)
+
+
+@pytest.fixture
+def client(server, qapp):
+    client = Client(server.path, qapp)
+    yield client
+    client.close()
+
+
+def test_list_configs(client, config):
+    response = client.call('list_configs')
+
+    assert response['result'] == {
+        'configs': [{'name': 'work.ovpn', 'path': str(config), 'state': 'DISCONNECTED'}],
+        'discovery_pending': False,
+    }
+
+
+def test_configs_are_never_scanned_on_the_gui_thread(server, qapp, config, tmp_path, monkeypatch):
+    config_manager = ConfigManager()
+    monkeypatch.setattr(config_manager, 'discover_configs', lambda: pytest.fail('scanned the config dirs'))
+    other = ControlServer(server.vpn_manager, config_manager, server.credentials_manager)
+    assert other.listen(tmp_path / 'other.sock')
+    client = Client(other.path, qapp)
+    try:
+        # No discovery reported yet: the cached index stands in
+        result = client.call('list_configs')['result']
+        assert [c['name'] for c in result['configs']] == ['work.ovpn'] and result['discovery_pending']
+        assert 'still running' in client.call('connect', config='home')['error']['message']
+
+        C.CONFIG_INDEX_PATH.unlink()
+        config_manager._index = None
+        assert client.call('list_configs')['result'] == {'configs': [], 'discovery_pending': True}
+        # A config given by path needs no discovery
+        assert client.call('status', config=str(config))['result']['connections'][0]['path'] == str(config)
+
+        other.set_configs(server.config_manager.discover_configs())
+
+        result = client.call('list_configs')['result']
+        assert [c['name'] for c in result['configs']] == ['work.ovpn'] and not result['discovery_pending']
+    finally:
+        client.close()
+        other.close()
+
+
+def test_connect_streams_state_events_to_subscribers(server, client, config, qapp):
+    watcher = Client(server.path, qapp)
+    try:
+        assert watcher.call('subscribe_events', events=['state'])['result'] == {'events': ['state']}
+
+        response = client.call('connect', config='work')
+
+        assert response['result']['state'] == 'CONNECTING'
+        events = watcher.events(lambda e: e['state'] == 'CONNECTED')
+        assert [e['state'] for e in events] == ['CONNECTING', 'CONNECTED']
+        assert events[0]['config'] == 'work.ovpn' and events[0]['path'] == str(config)
+        assert client.call('status')['result']['connections'] == [
+            {'config': 'work.ovpn', 'path': str(config), 'state': 'CONNECTED', 'failure': None}
+        ]
+
+        assert client.call('disconnect')['result']['connections'][0]['state'] == 'DISCONNECTING'
+        events = watcher.events(lambda e: e['state'] == 'DISCONNECTED')
+        assert events[-1]['state'] == 'DISCONNECTED'
+    finally:
+        watcher.close()
+
+
+def test_connect_with_given_credentials(server, client, config, backend, wait_until):
+    server.credentials_manager.saved.clear()
+
+    assert client.call('connect', config='work')['error']['code'] == NO_CREDENTIALS
+    assert client.call('connect', config=str(config), username='u', password='p')['result']['state'] == 'CONNECTING'
+    assert wait_until(lambda: backend.starts == 1)
+
+
+def test_errors(client):
+    client.send(b'not json\n')
+    assert client.read_message()['error']['code'] == PARSE_ERROR
+    client.send(b'{"id": 7, "method": "status"}\n')
+    assert client.read_message() == {
+        'jsonrpc': '2.0', 'id': 7, 'error': {'code': INVALID_REQUEST, 'message': 'Invalid Request'}
+    }
+    assert client.call('reboot')['error']['code'] == METHOD_NOT_FOUND
+    assert client.call('connect', config='nope')['error']['code'] == NO_SUCH_CONFIG
+    assert client.call('disconnect', config='work')['error']['code'] == NOT_CONNECTED
+
+
+def test_notifications_get_no_answer(client):
+    client.send(b'{"jsonrpc": "2.0", "method": "subscribe_events"}\n')
+
+    assert client.call('get_metrics')['result']['control'] == {'clients': 1, 'subscribers': 1, 'requests': 2}
+
+
+def test_client_that_stops_reading_is_dropped(server, client, qapp, wait_until, monkeypatch):
+    monkeypatch.setattr(C, 'CONTROL_MAX_BUFFERED_BYTES', 4096)
+    client.call('subscribe_events', events=['log'])
+
+    # The client reads nothing while the app logs on
+    for i in range(2000):
+        server.vpn_manager.log_received.emit(f'message {i} ' + 'x' * 100)
+        if server.client_count() == 0:
+            break
+        qapp.processEvents()
+
+    assert wait_until(lambda: server.client_count() == 0)
+
+
+def test_stale_socket_is_replaced(server, qapp, tmp_path):
+    path = tmp_path / 'stale.sock'
+    leftover = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    leftover.bind(str(path))
+    leftover.close()
+    other = ControlServer(server.vpn_manager, server.config_manager, server.credentials_manager)
+
+    try:
+        assert other.listen(path)
+        # A second instance must not take over a live socket
+        assert not ControlServer(server.vpn_manager, server.config_manager, server.credentials_manager).listen(
+            server.path
+        )
+    finally:
+        other.close()
+    assert not path.exists()
@@ -0,0 +1,318 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+keyring = pytest.importorskip("keyring")
+from keyring.backend import KeyringBackend
+from keyring.errors import PasswordDeleteError
+
+from command_executor import CommandExecutor
+from credentials_manager import CredentialRecord, CredentialsManager
+
+
+class MemoryKeyring(KeyringBackend):
+    """Secrets in a dict; every call is recorded with the thread it came from."""
+
+    priority = 1
+
+    def __init__(self):
+        super().__init__()
+        self.secrets = {}
+        self.calls = []
+        # Set to block get_password until released
+        self.gate = None
+
+    def get_password(self, service, username):
+        self.calls.append(("get", username, threading.get_ident()))
+        if self.gate is not None:
+            self.gate.wait(5)
+        return self.secrets.get((service, username))
+
+    def set_password(self, service, username, password):
+        self.calls.append(("set", username, threading.get_ident()))
+        self.secrets[(service, username)] = password
+
+    def delete_password(self, service, username):
+        self.calls.append(("delete", username, threading.get_ident()))
+        if self.secrets.pop((service, username), None) is None:
+            raise PasswordDeleteError(username)
+
+    def count(self, kind):
+        return sum(1 for call in self.calls if call[0] == kind)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def backend():
+    previous = keyring.get_keyring()
+    memory = MemoryKeyring()
+    keyring.set_keyring(memory)
+    try:
+        yield memory
+    finally:
+        keyring.set_keyring(previous)
+
+
+@pytest.fixture
+def manager(qapp, backend):
+    executor = CommandExecutor(max_threads=1)
+    clock = FakeClock()
+    manager = CredentialsManager(executor, cache_ttl=60, clock=clock)
+    manager.clock = clock
+    yield manager
+    if backend.gate is not None:
+        backend.gate.set()
+    executor.wait_for_done(5)
+
+
+@pytest.fixture
+def config(tmp_path):
+    return tmp_path / "office.ovpn"
+
+
+def _save_in_keyring(manager, backend, config, username="alice", password="secret"):
+    service = manager._get_service_name(config)
+    backend.secrets[(service, "credentials")] = CredentialRecord(username, password).to_json()
+
+
+def _save_legacy(manager, backend, config, username="alice", password="secret"):
+    """Two entries, the way credentials were saved before the record."""
+    service = manager._get_service_name(config)
+    backend.secrets[(service, "username")] = username
+    backend.secrets[(service, "password")] = password
+
+
+def test_lookup_runs_off_the_gui_thread(manager, backend, config, wait_until):
+    _save_in_keyring(manager, backend, config)
+    received = []
+
+    manager.request_credentials(config, received.append)
+
+    assert wait_until(lambda: received)
+    assert received == [("alice", "secret")]
+    assert backend.count("get") == 1
+    assert all(thread != threading.get_ident() for _, _, thread in backend.calls)
+
+
+def test_prefetched_credentials_are_answered_at_once(manager, backend, config, wait_until):
+    """Selecting a config prefetches; Connect is then answered without touching the keyring."""
+    _save_in_keyring(manager, backend, config)
+    manager.prefetch(config)
+    assert wait_until(lambda: manager.cached_credentials(config) is not None)
+    gets = backend.count("get")
+
+    received = []
+    manager.request_credentials(config, received.append)
+
+    assert received == [("alice", "secret")]
+    assert backend.count("get") == gets
+
+
+def test_requests_share_the_lookup_in_flight(manager, backend, config, wait_until):
+    _save_in_keyring(manager, backend, config)
+    backend.gate = threading.Event()
+    received = []
+
+    manager.prefetch(config)
+    manager.request_credentials(config, received.append)
+    manager.request_credentials(config, received.append)
+    assert received == []
+    backend.gate.set()
+
+    assert wait_until(lambda: len(received) == 2)
+    assert backend.count("get") == 1
+
+
+def test_cache_expires_after_ttl(manager, backend, config, wait_until):
+    _save_in_keyring(manager, backend, config)
+    assert manager.get_credentials(config) == ("alice", "secret")
+    assert manager.cached_credentials(config) == ("alice", "secret")
+
+    manager.clock.now += 61
+
+    assert manager.cached_credentials(config) is None
+    manager.get_credentials(config)
+    assert backend.count("get") == 2
+
+
+def test_clear_cache_wins_over_lookup_in_flight(manager, backend, config, wait_until):
+    """Credentials read while the session locked are handed out but not cached."""
+    _save_in_keyring(manager, backend, config)
+    backend.gate = threading.Event()
+    received = []
+
+    manager.request_credentials(config, received.append)
+    manager.clear_cache()
+    backend.gate.set()
+
+    assert wait_until(lambda: received)
+    assert received == [("alice", "secret")]
+    assert manager.cached_credentials(config) is None
+
+
+def test_save_and_delete_update_cache_before_keyring(manager, backend, config, wait_until):
+    manager.save_credentials(config, " bob ", "hunter2 ")
+
+    assert manager.cached_credentials(config) == ("bob", "hunter2")
+    assert wait_until(lambda: backend.count("set") == 1)
+    assert all(thread != threading.get_ident() for _, _, thread in backend.calls)
+
+    manager.delete_credentials(config)
+
+    assert manager.cached_credentials(config) == (None, None)
+    # The record, then any legacy entries a migration left behind
+    assert wait_until(lambda: backend.count("delete") == 3)
+    assert backend.secrets == {}
+
+
+def test_save_during_lookup_is_not_overwritten(manager, backend, config, wait_until):
+    _save_in_keyring(manager, backend, config, "old", "old-secret")
+    backend.gate = threading.Event()
+    received = []
+
+    manager.request_credentials(config, received.append)
+    manager.save_credentials(config, "new", "new-secret")
+    backend.gate.set()
+
+    assert wait_until(lambda: received)
+    assert received == [("new", "new-secret")]
+    assert wait_until(lambda: backend.count("set") == 1)
+    assert manager.cached_credentials(config) == ("new", "new-secret")
+
+
+def test_failed_lookup_is_retried(manager, backend, config, monkeypatch):
+    def locked(service, username):
+        raise keyring.errors.KeyringLocked("dismissed")
+
+    monkeypatch.setattr(backend, "get_password", locked)
+
+    assert manager.get_credentials(config) == (None, None)
+    assert manager.cached_credentials(config) is None
+
+
+def test_record_round_trip_with_metadata(manager, backend, config, wait_until):
+    manager.save_credentials(config, "bob", "hunter2", metadata={"auth": "otp"})
+    assert wait_until(lambda: backend.count("set") == 1)
+
+    record = manager.get_record(config)
+
+    assert record == CredentialRecord("bob", "hunter2", {"auth": "otp"})
+    assert [kind for kind, _, _ in backend.calls] == ["set", "get"]
+
+
+def test_legacy_entries_are_migrated_on_first_read(manager, backend, config):
+    _save_legacy(manager, backend, config)
+    service = manager._get_service_name(config)
+
+    assert manager.get_credentials(config) == ("alice", "secret")
+
+    assert set(backend.secrets) == {(service, "credentials")}
+    assert CredentialRecord.from_json(backend.secrets[(service, "credentials")]).credentials == (
+        "alice",
+        "secret",
+    )
+    manager.clear_cache()
+    backend.calls.clear()
+    assert manager.get_credentials(config) == ("alice", "secret")
+    assert backend.count("get") == 1
+
+
+def test_missing_credentials_cost_one_legacy_probe(manager, backend, config):
+    assert manager.get_credentials(config) == (None, None)
+    # The record, then the legacy password entry; no username lookup, no writes
+    assert [(kind, key) for kind, key, _ in backend.calls] == [
+        ("get", "credentials"),
+        ("get", "password"),
+    ]
+
+
+def test_delete_removes_unmigrated_legacy_entries(manager, backend, config, wait_until):
+    _save_legacy(manager, backend, config)
+
+    manager.delete_credentials(config)
+
+    assert wait_until(lambda: backend.count("delete") == 3)
+    assert backend.secrets == {}
+
+
+def test_delete_after_partial_migration_leaves_nothing_to_migrate_back(
+    manager, backend, config, wait_until, monkeypatch
+):
+    _save_legacy(manager, backend, config)
+    delete_password = backend.delete_password
+
+    def locked_password_entry(service, username):
+        if username == "password":
+            raise RuntimeError("Prompt dismissed")
+        delete_password(service, username)
+
+    monkeypatch.setattr(backend, "delete_password", locked_password_entry)
+    assert manager.get_credentials(config) == ("alice", "secret")
+    service = manager._get_service_name(config)
+    assert set(backend.secrets) == {(service, "credentials"), (service, "password")}
+    monkeypatch.setattr(backend, "delete_password", delete_password)
+
+    manager.delete_credentials(config)
+
+    assert wait_until(lambda: backend.secrets == {})
+    manager.clear_cache()
+    assert manager.get_credentials(config) == (None, None)
+
+
+def test_unreadable_record_counts_as_missing(manager, backend, config):
+    service = manager._get_service_name(config)
+    backend.secrets[(service, "credentials")] = '{"version": 99, "username": "x"}'
+
+    assert manager.get_credentials(config) == (None, None)
+    assert manager.get_record(config) is None
+
+
+def test_service_name_resolves_path_once(manager, config, monkeypatch):
+    calls = []
+    resolve = Path.resolve
+    monkeypatch.setattr(Path, "resolve", lambda self: calls.append(self) or resolve(self))
+
+    first = manager._get_service_name(config)
+    assert manager._get_service_name(config) == first
+    assert manager._get_service_name(Path(str(config))) == first
+
+    assert len(calls) == 1
+
+
+def test_batch_read_prefetch_and_delete(manager, backend, tmp_path, wait_until):
+    configs = [tmp_path / f"site-{i}.ovpn" for i in range(4)]
+    for i, path in enumerate(configs[:3]):
+        _save_in_keyring(manager, backend, path, f"user{i}", f"pw{i}")
+
+    manager.prefetch_many(configs[:2])
+    assert wait_until(lambda: manager.cached_credentials(configs[1]) is not None)
+    backend.calls.clear()
+
+    found = manager.read_many(configs)
+
+    assert found == {
+        configs[0]: ("user0", "pw0"),
+        configs[1]: ("user1", "pw1"),
+        configs[2]: ("user2", "pw2"),
+        configs[3]: (None, None),
+    }
+    # Only the two configs that were not prefetched hit the keyring
+    assert backend.count("get") == 3
+
+    manager.delete_many(configs[:3])
+
+    assert wait_until(lambda: backend.count("delete") == 9)
+    assert backend.secrets == {}
+    assert manager.read_many(configs[:3]) == {path: (None, None) for path in configs[:3]}
@@ -0,0 +1,206 @@
+import io
+import json
+import os
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import constants as C
+import headless
+from headless import (
+    EXIT_FAILED,
+    EXIT_OK,
+    HeadlessRunner,
+    UsageError,
+    main,
+    read_auth_file,
+    resolve_config,
+)
+from helper_backend import SimulatedHelperBackend, SimulationProfile
+from vpn_manager import VPNManager
+
+FAST = SimulationProfile(connect_delay=0.05)
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / 'work.ovpn'
+    path.write_text('client\nremote vpn.example.com 1194\n')
+    return path
+
+
+@pytest.fixture
+def backend():
+    backend = SimulatedHelperBackend(FAST)
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def runner(backend, qapp, tmp_path, monkeypatch, wait_until):
+    monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
+    monkeypatch.setattr(C, 'PROBE_REMOTES_BEFORE_CONNECT', False)
+    manager = VPNManager(backend)
+    manager._helper_client = None
+    runner = HeadlessRunner(manager, out=io.StringIO(), clock=lambda: 1.0)
+    exit_codes = []
+    runner.finished.connect(exit_codes.append)
+    runner.exit_codes = exit_codes
+    yield runner
+    # A tunnel left up keeps tailing its log; the garbage collector may then
+    # delete the tail's watcher on a worker thread while it is notifying
+    manager.disconnect_all()
+    assert wait_until(lambda: not manager.active_connections())
+    manager._status_timer.stop()
+    manager.wait_for_pending_commands(5)
+
+
+def events(runner):
+    return [json.loads(line) for line in runner._out.getvalue().splitlines()]
+
+
+def states(runner):
+    return [e['state'] for e in events(runner) if e['event'] == 'state']
+
+
+def test_connect_prints_transitions_and_exits_when_up(runner, config, wait_until):
+    runner.connect(config, 'user', 'pass')
+
+    assert wait_until(runner.is_finished)
+    assert runner.exit_codes == [EXIT_OK]
+    assert states(runner) == ['CONNECTING', 'CONNECTED']
+    assert events(runner)[0] == {
+        'event': 'state', 'config': 'work.ovpn', 'path': str(config), 'state': 'CONNECTING', 'time': 1.0,
+    }
+
+
+def test_connect_fails_on_authentication_failure(runner, backend, config, wait_until):
+    backend.profile = SimulationProfile(outcome='auth_failed', connect_delay=0.05)
+
+    runner.connect(config, 'user', 'wrong')
+
+    assert wait_until(runner.is_finished)
+    assert runner.exit_codes == [EXIT_FAILED]
+    assert states(runner)[-1] == 'AUTH_FAILED'
+
+
+def test_connect_adopts_a_running_tunnel(runner, backend, config, wait_until):
+    backend.run('start', [str(config), str(C.connection_log_path(config))], input='user\npass\n')
+    assert wait_until(lambda: backend.run('status', [config.name]).stdout.strip() == 'connected')
+
+    runner.connect(config, 'user', 'pass')
+
+    assert runner.exit_codes == [EXIT_OK]
+    assert states(runner) == ['CONNECTED']
+    assert backend.starts == 1
+
+
+def test_disconnect_stops_a_tunnel_started_elsewhere(runner, backend, config, wait_until):
+    backend.run('start', [str(config), str(C.connection_log_path(config))], input='user\npass\n')
+
+    runner.disconnect([config])
+
+    assert wait_until(runner.is_finished)
+    assert runner.exit_codes == [EXIT_OK]
+    assert states(runner)[-2:] == ['DISCONNECTING', 'DISCONNECTED']
+    assert backend.unit(config.name) is None
+
+
+def test_status_reports_every_config(runner, backend, config, tmp_path, wait_until):
+    other = tmp_path / 'home.ovpn'
+    backend.run('start', [str(config), str(C.connection_log_path(config))], input='user\npass\n')
+    assert wait_until(lambda: backend.run('status', [config.name]).stdout.strip() == 'connected')
+
+    runner.status([config, other])
+
+    assert runner.exit_codes == [EXIT_OK]
+    assert [(e['config'], e['status']) for e in events(runner)] == [
+        ('work.ovpn', 'connected'), ('home.ovpn', 'disconnected'),
+    ]
+
+
+def test_follow_keeps_running_until_stopped(runner, backend, config, wait_until):
+    runner.connect(config, 'user', 'pass', follow=True)
+    assert wait_until(lambda: 'CONNECTED' in states(runner))
+    assert not runner.is_finished()
+
+    runner.stop()
+
+    assert wait_until(runner.is_finished)
+    assert runner.exit_codes == [EXIT_OK]
+    assert states(runner)[-1] == 'DISCONNECTED'
+    assert backend.unit(config.name) is None
+
+
+def test_read_auth_file(tmp_path):
+    auth = tmp_path / 'auth.txt'
+    auth.write_text('user\nsecret\n')
+
+    assert read_auth_file(str(auth)) == ('user', 'secret')
+    assert read_auth_file('-', io.StringIO('me\npw\n')) == ('me', 'pw')
+    with pytest.raises(UsageError):
+        read_auth_file('-', io.StringIO('only-a-user\n'))
+
+
+def test_resolve_config_by_path_or_name(config, tmp_path, monkeypatch):
+    monkeypatch.setattr(C, 'USER_CONFIGS_DIR', tmp_path)
+    monkeypatch.setattr(C, 'SYSTEM_CONFIG_DIRS', [])
+    from config_manager import ConfigManager
+
+    manager = ConfigManager()
+
+    assert resolve_config(str(config), manager) == config
+    assert resolve_config('work', manager) == config
+    with pytest.raises(UsageError):
+        resolve_config('home', manager)
+
+
+def test_main_creates_the_log_dir_before_the_helper_runs(config, tmp_path, monkeypatch):
+    log_dir = tmp_path / 'openvpn-py' / 'logs'
+    monkeypatch.setattr(C, 'USER_CONFIGS_DIR', tmp_path / 'openvpn-py' / 'configs')
+    monkeypatch.setattr(C, 'LOG_DIR', log_dir)
+    monkeypatch.setattr(C, 'LOG_FILE_PATH', log_dir / 'openvpn-gui.log')
+    monkeypatch.setattr(C, 'PROBE_REMOTES_BEFORE_CONNECT', False)
+    monkeypatch.setattr(signal, 'signal', lambda *args: None)
+    auth = tmp_path / 'auth.txt'
+    auth.write_text('user\nwrong\n')
+    log_dir_at_start = []
+
+    class RootHelper(SimulatedHelperBackend):
+        def run(self, command, args, **kwargs):
+            if command == 'start':
+                # The real helper runs as root; a logs dir it has to create is root's
+                log_dir_at_start.append(log_dir.is_dir())
+            return super().run(command, args, **kwargs)
+
+    # Rejected credentials end the command without leaving a tunnel up
+    backend = RootHelper(SimulationProfile(outcome='auth_failed', connect_delay=0.05))
+    monkeypatch.setattr(headless, 'backend_from_env', lambda: backend)
+
+    try:
+        assert main(['connect', str(config), '--auth-file', str(auth)]) == EXIT_FAILED
+    finally:
+        backend.close()
+    assert log_dir_at_start == [True]
+
+
+def test_headless_mode_does_not_import_widgets(config, tmp_path):
+    env = {
+        **os.environ,
+        'XDG_CONFIG_HOME': str(tmp_path),
+        'OPENVPN_PY_HELPER_BACKEND': 'simulator',
+    }
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', 'main.py', '--headless', 'status', str(config)],
+        cwd=Path(__file__).parent.parent, env=env, capture_output=True, text=True, timeout=30,
+    )
+
+    assert completed.returncode == 0
+    assert json.loads(completed.stdout)['status'] == 'disconnected'
+    assert 'QtWidgets' not in completed.stderr
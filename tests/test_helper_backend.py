@@ -0,0 +1,268 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import constants as C
+from helper_backend import (
+    SimulatedHelperBackend,
+    SimulationProfile,
+    backend_from_env,
+    profile_from_env,
+)
+from helper_client import HelperClient, parse_status_all
+from log_classifier import LogClassifier, LogEventKind
+from tests.fake_helper import fake_helper_server
+from vpn_manager import VPNManager
+
+CONFIG = '/tmp/test.ovpn'
+FAST = SimulationProfile(connect_delay=0.05)
+
+
+def wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def status(backend, name='test.ovpn'):
+    return backend.run('status', [name]).stdout.strip()
+
+
+def log_kinds(path):
+    classifier = LogClassifier()
+    return [event.kind for event in classifier.feed(path.read_bytes())]
+
+
+@pytest.fixture
+def backend():
+    backend = SimulatedHelperBackend(FAST)
+    yield backend
+    backend.close()
+
+
+def test_simulated_connect_and_stop(backend, tmp_path):
+    log_path = tmp_path / 'test.log'
+
+    result = backend.run('start', [CONFIG, str(log_path)], input='user\npass\n')
+
+    assert result.returncode == 0
+    assert 'HELPER_PHASES=' in result.stdout
+    assert status(backend) == 'connected'
+    assert wait_for(lambda: LogEventKind.INIT_COMPLETE in log_kinds(log_path))
+    assert log_kinds(log_path)[:3] == [LogEventKind.LINK_UP, LogEventKind.TLS_DONE, LogEventKind.PUSH_REPLY]
+    assert 'TUN/TAP device tun0 opened' in log_path.read_text()
+
+    assert backend.run('stop', ['test.ovpn', str(log_path)]).returncode == 0
+    assert status(backend) == 'disconnected'
+    assert log_path.read_text().splitlines()[-1].endswith('process exiting')
+
+
+@pytest.mark.parametrize('outcome, kind', [
+    ('auth_failed', LogEventKind.AUTH_FAILED),
+    ('tls_error', LogEventKind.TLS_ERROR),
+    ('resolve_failed', LogEventKind.RESOLVE_FAILED),
+])
+def test_simulated_failures(backend, tmp_path, outcome, kind):
+    backend.profiles['test.ovpn'] = SimulationProfile(outcome=outcome, connect_delay=0.05)
+    log_path = tmp_path / 'test.log'
+    backend.run('start', [CONFIG, str(log_path)], input='user\npass\n')
+
+    assert wait_for(lambda: status(backend) == 'error')
+    kinds = log_kinds(log_path)
+    assert kind in kinds
+    assert LogEventKind.INIT_COMPLETE not in kinds
+
+
+def test_simulated_drop_and_log_rate(backend, tmp_path):
+    backend.profile = SimulationProfile(
+        outcome='drop', connect_delay=0.01, drop_after=0.3, lines_per_second=5000, verb=5
+    )
+    log_path = tmp_path / 'test.log'
+    backend.run('start', [CONFIG, str(log_path)], input='user\npass\n')
+
+    assert wait_for(lambda: status(backend) == 'disconnected')
+    unit = backend.unit('test.ovpn')
+    # ~1500 lines at 5000/s over 0.3 s; allow for a slow test machine
+    assert 500 < unit.lines_written < 2500
+    assert 'TUN WRITE [1392]' in log_path.read_text()
+
+
+def test_status_all_reports_every_config(backend, tmp_path):
+    backend.run('start', [CONFIG, str(tmp_path / 'test.log')], input='user\npass\n')
+
+    result = backend.run('status-all', ['test.ovpn', 'other.ovpn'])
+
+    assert {name: entry['status'] for name, entry in parse_status_all(result.stdout).items()} == {
+        'test.ovpn': 'connected',
+        'other.ovpn': 'disconnected',
+    }
+
+
+def test_start_requires_credentials(backend, tmp_path):
+    assert backend.run('start', [CONFIG, str(tmp_path / 'test.log')], input='').returncode == 1
+
+
+def test_profile_and_backend_from_env():
+    profile = profile_from_env({'OPENVPN_PY_SIM_OUTCOME': 'hang', 'OPENVPN_PY_SIM_LINES_PER_SECOND': '10000'})
+    assert profile.outcome == 'hang'
+    assert profile.lines_per_second == 10000
+    with pytest.raises(ValueError):
+        SimulationProfile(outcome='explode')
+
+    assert backend_from_env({}) is None
+    simulator = backend_from_env({'OPENVPN_PY_HELPER_BACKEND': 'simulator', 'OPENVPN_PY_SIM_VERB': '5'})
+    assert isinstance(simulator, SimulatedHelperBackend)
+    assert simulator.profile.verb == 5
+
+
+@pytest.fixture
+def manager(backend, qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
+    manager = VPNManager(backend)
+    manager._executor.inline = True
+    manager._helper_client = None
+    yield manager
+    manager._status_timer.stop()
+
+
+def settle(manager, wait_until, state, timeout=3.0):
+    """Run status sweeps until CONFIG reaches 'state'."""
+    def reached():
+        manager.check_connection_status()
+        return manager.state(CONFIG) == state
+    return wait_until(reached, timeout)
+
+
+def test_manager_connects_through_simulator(manager, backend, wait_until):
+    manager.connect(CONFIG, 'user', 'pass')
+
+    assert settle(manager, wait_until, C.VpnState.CONNECTED)
+
+    manager.disconnect(CONFIG)
+    assert manager.state(CONFIG) == C.VpnState.DISCONNECTED
+    assert backend.unit('test.ovpn') is None
+
+
+def test_manager_reports_simulated_auth_failure(manager, backend, wait_until):
+    backend.profile = SimulationProfile(outcome='auth_failed', connect_delay=0.05)
+
+    manager.connect(CONFIG, 'user', 'wrong')
+
+    assert settle(manager, wait_until, C.VpnState.AUTH_FAILED)
+
+
+def test_connect_disconnect_soak(manager, backend, wait_until):
+    """Short soak run: every cycle ends cleanly and nothing is left running."""
+    backend.profile = SimulationProfile(connect_delay=0.01, lines_per_second=2000)
+    threads = threading.active_count()
+    for _ in range(20):
+        manager.connect(CONFIG, 'user', 'pass')
+        assert settle(manager, wait_until, C.VpnState.CONNECTED)
+        manager.disconnect(CONFIG)
+        assert manager.state(CONFIG) == C.VpnState.DISCONNECTED
+
+    assert backend.starts == 20
+    assert threading.active_count() <= threads
+
+
+def test_simulator_behind_helper_daemon(qapp, tmp_path, monkeypatch, wait_until):
+    """The daemon serves the simulator like the real script, over its socket."""
+    monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
+    backend = SimulatedHelperBackend(FAST)
+    with fake_helper_server(backend) as daemon:
+        manager = VPNManager()
+        manager._executor.inline = True
+        manager._helper_client = HelperClient(daemon.socket_path)
+        try:
+            manager.connect(CONFIG, 'user', 'pass')
+            assert settle(manager, wait_until, C.VpnState.CONNECTED)
+            manager.disconnect(CONFIG)
+            assert backend.unit('test.ovpn') is None
+        finally:
+            manager._status_timer.stop()
+            manager._helper_client.close()
+            backend.close()
+
+
+def test_disconnect_during_remote_probe_starts_nothing(backend, qapp, tmp_path, monkeypatch, wait_until):
+    """A stop must not overtake a start still probing remotes; the start never reaches the helper."""
+    monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
+    manager = VPNManager(backend)
+    manager._helper_client = None
+    probing, release = threading.Event(), threading.Event()
+
+    def slow_probe(config_path):
+        probing.set()
+        release.wait(3)
+        return []
+
+    monkeypatch.setattr(manager, '_remote_flags', slow_probe)
+    commands = []
+    run = backend.run
+    monkeypatch.setattr(backend, 'run', lambda command, args, **kw: commands.append(command) or run(command, args, **kw))
+    try:
+        manager.connect(CONFIG, 'user', 'pass')
+        assert probing.wait(3)
+        manager.disconnect(CONFIG)
+        release.set()
+
+        assert wait_until(lambda: manager.state(CONFIG) == C.VpnState.DISCONNECTED)
+        assert manager.wait_for_pending_commands(3)
+        assert 'start' not in commands and 'stop' in commands
+        assert backend.starts == 0
+    finally:
+        release.set()
+        manager._status_timer.stop()
+
+
+def test_reconnect_start_waits_for_the_archive_of_the_dropped_session(backend, qapp, tmp_path, monkeypatch, wait_until):
+    """A slow archive stop queued by a drop must not reach the helper after the reconnect's start."""
+    monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
+    monkeypatch.setattr(C, 'PROBE_REMOTES_BEFORE_CONNECT', False)
+    backend.profile = SimulationProfile(outcome='drop', drop_after=0.1, connect_delay=0.05)
+    manager = VPNManager(backend)
+    manager._helper_client = None
+    archiving, release = threading.Event(), threading.Event()
+    commands = []
+    run = backend.run
+
+    def slow_archive(command, args, **kw):
+        # The archive reaches the helper as a 'stop'
+        if command == 'stop' and not archiving.is_set():
+            archiving.set()
+            release.wait(3)
+        if command in ('start', 'stop'):
+            commands.append(command)
+        return run(command, args, **kw)
+
+    monkeypatch.setattr(backend, 'run', slow_archive)
+    try:
+        manager.connect(CONFIG, 'user', 'pass')
+        assert settle(manager, wait_until, C.VpnState.CONNECTED)
+        backend.profile = FAST
+        assert settle(manager, wait_until, C.VpnState.DISCONNECTED)
+        assert archiving.wait(3)
+
+        # What ReconnectScheduler does once its delay has passed
+        manager.connect(CONFIG, 'user', 'pass')
+        wait_until(lambda: False, 0.2)
+        release.set()
+
+        assert settle(manager, wait_until, C.VpnState.CONNECTED)
+        assert commands == ['start', 'stop', 'start']
+        assert backend.unit('test.ovpn') is not None
+    finally:
+        release.set()
+        manager.disconnect_all()
+        wait_until(lambda: not manager.active_connections())
+        manager._status_timer.stop()
+        manager.wait_for_pending_commands(5)
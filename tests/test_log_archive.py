@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from log_archive import LogArchiveIndex, parse_archive_name
+from log_classifier import LogEventKind
+
+DAY = 24 * 60 * 60
+
+
+def archive(directory, config, when, lines):
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(when))
+    path = directory / f"openvpn-{config}-{stamp}.log"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+@pytest.fixture
+def docs(tmp_path):
+    docs = tmp_path / "OpenVPN-Py"
+    docs.mkdir()
+    return docs
+
+
+@pytest.fixture
+def index(tmp_path):
+    return LogArchiveIndex(tmp_path / "index.sqlite3")
+
+
+def test_parse_archive_name():
+    config, when = parse_archive_name("openvpn-my-vpn-20240501-120000.log")
+    assert config == "my-vpn"
+    assert time.localtime(when)[:6] == (2024, 5, 1, 12, 0, 0)
+    assert parse_archive_name("openvpn-my-vpn.log") is None
+    assert parse_archive_name("openvpn-current.log") is None
+
+
+def test_update_is_incremental(index, docs, monkeypatch):
+    now = time.time()
+    first = archive(docs, "work", now - DAY, ["Initialization Sequence Completed"])
+    archive(docs, "home", now - 2 * DAY, ["TLS Error: handshake failed"])
+    # Live symlinks are not archives
+    os.symlink(first, docs / "openvpn-current.log")
+
+    assert index.update(docs) == (2, 0)
+    assert index.archive_count() == 2
+
+    read = []
+    original = LogArchiveIndex._index_file
+    monkeypatch.setattr(
+        LogArchiveIndex, "_index_file",
+        lambda self, conn, path, *args: read.append(path.name) or original(self, conn, path, *args),
+    )
+    assert index.update(docs) == (0, 0)
+    assert read == []
+
+    with open(first, "a") as fh:
+        fh.write("AUTH: Received control message: AUTH_FAILED\n")
+    (docs / "openvpn-home-notes.log").write_text("not an archive name\n")
+    assert index.update(docs) == (1, 0)
+    assert read == [first.name]
+
+    first.unlink()
+    assert index.update(docs) == (0, 1)
+    assert index.configs() == ["home"]
+
+
+def test_search_by_kind_config_and_period(index, docs):
+    now = time.time()
+    archive(docs, "work", now - 3 * DAY, ["TLS Error: TLS key negotiation failed", "Exiting due to fatal error"])
+    archive(docs, "work", now - 60 * DAY, ["TLS Error: old failure"])
+    archive(docs, "home", now - DAY, ["TLS Error: other config"])
+    index.update(docs)
+
+    matches = index.search(docs, config="work", kinds=[LogEventKind.TLS_ERROR], since=now - 30 * DAY)
+    assert [m.line for m in matches] == ["TLS Error: TLS key negotiation failed"]
+    assert matches[0].kind == LogEventKind.TLS_ERROR
+    assert matches[0].lineno == 1
+    assert matches[0].path.parent == docs
+
+    all_tls = index.search(docs, kinds=[LogEventKind.TLS_ERROR])
+    # Newest session first
+    assert [m.config for m in all_tls] == ["home", "work", "work"]
+
+
+def test_full_text_search(index, docs):
+    now = time.time()
+    archive(docs, "work", now, [
+        "RESOLVE: Cannot resolve host address: vpn.example.com:1194",
+        "TCP/UDP: Preserving recently used remote address",
+        "Peer Connection Initiated with [AF_INET]192.0.2.1:1194",
+    ])
+    index.update(docs)
+
+    assert [m.lineno for m in index.search(docs, text="example")] == [1]
+    # Last term matches as a prefix, all terms are required
+    assert [m.lineno for m in index.search(docs, text="peer conn")] == [3]
+    assert index.search(docs, text="peer example") == []
+    hits = index.search(docs, text="resolve", kinds=[LogEventKind.RESOLVE_FAILED])
+    assert [m.kind for m in hits] == [LogEventKind.RESOLVE_FAILED]
+    # FTS syntax in user input is treated as plain words
+    assert index.search(docs, text='"unbalanced AND (') == []
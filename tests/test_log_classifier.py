@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from log_classifier import LogClassifier, LogEventKind, MarkerAutomaton, classify_line
+
+
+def test_automaton_finds_overlapping_patterns():
+    """Classic Aho-Corasick example: all overlapping matches are reported."""
+    automaton = MarkerAutomaton([(b"he", "he"), (b"she", "she"), (b"his", "his"), (b"hers", "hers")])
+    assert automaton.search(b"ushers") == ["she", "he", "hers"]
+    assert automaton.search(b"nothing here?") == ["he"]
+    assert automaton.search(b"") == []
+
+
+@pytest.mark.parametrize("line, kind", [
+    (b"AUTH: Received control message: AUTH_FAILED", LogEventKind.AUTH_FAILED),
+    (b"SIGTERM[soft,auth-failure] received, process exiting", None),
+    (b"TLS Error: TLS key negotiation failed to occur within 60 seconds", LogEventKind.TLS_ERROR),
+    (b"VERIFY ERROR: depth=0, error=certificate has expired", LogEventKind.TLS_ERROR),
+    (b"RESOLVE: Cannot resolve host address: vpn.example.com", LogEventKind.RESOLVE_FAILED),
+    (b"write UDP: Network is unreachable (code=101)", LogEventKind.NETWORK_UNREACHABLE),
+    (b"Options error: Unrecognized option or missing parameter(s)", LogEventKind.OPTIONS_ERROR),
+    (b"Exiting due to fatal error", LogEventKind.FATAL),
+    (b"Initialization Sequence Completed", LogEventKind.INIT_COMPLETE),
+    (b"UDPv4 link remote: [AF_INET]198.51.100.7:1194", LogEventKind.LINK_UP),
+    (b"[server] Peer Connection Initiated with [AF_INET]198.51.100.7:1194", LogEventKind.TLS_DONE),
+    (b"PUSH: Received control message: 'PUSH_REPLY,route-gateway 10.8.0.1,ping 10'", LogEventKind.PUSH_REPLY),
+    (b"SENT CONTROL [server]: 'PUSH_REQUEST' (status=1)", None),
+    (b"HELPER: Post-start DNS fix: done", LogEventKind.DNS_FIXED),
+    (b"Outgoing Data Channel: Cipher 'AES-256-GCM' initialized", None),
+])
+def test_classify_line(line, kind):
+    assert classify_line(line) == kind
+
+
+def test_auth_failure_wins_over_fatal_on_same_line():
+    assert classify_line(b"FATAL: AUTH_FAILED received") == LogEventKind.AUTH_FAILED
+
+
+def test_events_emitted_per_complete_line_across_chunks():
+    classifier = LogClassifier()
+    first = b"Mon Jan 1 TLS: Initial packet\n"
+    assert classifier.feed(first + b"Mon Jan 1 Initializ") == []
+    events = classifier.feed(b"ation Sequence Comp")
+    assert events == []
+    events = classifier.feed(b"leted\n")
+    assert [e.kind for e in events] == [LogEventKind.INIT_COMPLETE]
+    assert events[0].line == "Mon Jan 1 Initialization Sequence Completed"
+    assert events[0].offset == len(first)
+    assert classifier.offset == len(first) + len(events[0].line) + 1
+    assert classifier.seen(LogEventKind.INIT_COMPLETE)
+    assert classifier.first_failure() is None
+
+
+def test_first_failure_and_reset():
+    classifier = LogClassifier()
+    classifier.feed(b"RESOLVE: Cannot resolve host\nTLS Error: handshake failed\n")
+    assert classifier.first_failure().kind == LogEventKind.RESOLVE_FAILED
+
+    classifier.reset()
+    assert classifier.offset == 0
+    assert not classifier.seen(LogEventKind.RESOLVE_FAILED, LogEventKind.TLS_ERROR)
+    assert classifier.first_failure() is None
+
+
+def test_partial_line_is_bounded_and_flushed():
+    classifier = LogClassifier(max_line_length=64)
+    events = classifier.feed(b"x" * 100 + b" AUTH_FAILED")
+    assert [e.kind for e in events] == [LogEventKind.AUTH_FAILED]
+
+    classifier.feed(b"Exiting due to fatal error")
+    assert [e.kind for e in classifier.flush()] == [LogEventKind.FATAL]
+    assert classifier.flush() == []
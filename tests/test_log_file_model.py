@@ -0,0 +1,96 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ui.log_file_model import LogFileModel
+
+
+def lines_of(model):
+    return [model.line(row) for row in range(model.rowCount())]
+
+
+@pytest.fixture
+def model(qapp):
+    # Tiny blocks so a few lines already span several index blocks
+    model = LogFileModel(block_size=16)
+    yield model
+    model.close()
+
+
+def test_lines_across_blocks(model, tmp_path):
+    log = tmp_path / "session.log"
+    expected = [f"line number {i}" for i in range(200)] + ["", "crlf line"]
+    log.write_bytes("\n".join(expected[:-1]).encode() + b"\ncrlf line\r\n")
+
+    assert model.open(log)
+    model.ensure_indexed()
+    assert model.rowCount() == len(expected)
+    assert lines_of(model) == expected
+    # Random access in any order hits the right block
+    assert model.line(150) == "line number 150"
+    assert model.line(3) == "line number 3"
+
+
+def test_appends_extend_index_incrementally(model, tmp_path):
+    log = tmp_path / "session.log"
+    log.write_bytes(b"first\nsecond\nthi")
+    model.open(log)
+    model.ensure_indexed()
+    assert lines_of(model) == ["first", "second", "thi"]
+
+    inserted, changed = [], []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    model.dataChanged.connect(lambda top, bottom: changed.append(top.row()))
+
+    with open(log, "ab") as fh:
+        fh.write(b"rd\nfourth\n")
+    model.refresh()
+    model.ensure_indexed()
+
+    assert lines_of(model) == ["first", "second", "third", "fourth"]
+    assert inserted == [(3, 3)]
+    assert 2 in changed
+
+
+def test_truncation_and_replacement_start_over(model, tmp_path):
+    log = tmp_path / "session.log"
+    log.write_bytes(b"a\nb\nc\n")
+    model.open(log)
+    model.ensure_indexed()
+    resets = []
+    model.modelReset.connect(lambda: resets.append(True))
+
+    log.write_bytes(b"x\n")
+    model.refresh()
+    model.ensure_indexed()
+    assert lines_of(model) == ["x"]
+
+    replacement = tmp_path / "next.log"
+    replacement.write_bytes(b"new session\n")
+    os.replace(replacement, log)
+    model.refresh()
+    model.ensure_indexed()
+    assert lines_of(model) == ["new session"]
+    assert len(resets) == 2
+
+
+def test_missing_and_empty_files(model, tmp_path):
+    log = tmp_path / "session.log"
+    assert not model.open(log)
+    assert model.rowCount() == 0
+    assert model.text() == ""
+
+    log.touch()
+    model.refresh()
+    assert model.rowCount() == 0
+
+    log.write_bytes(b"hello\n")
+    model.refresh()
+    model.ensure_indexed()
+    assert lines_of(model) == ["hello"]
+    assert model.text() == "hello\n"
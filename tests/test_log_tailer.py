@@ -0,0 +1,114 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from log_tailer import LogTailer
+
+
+class Recorder:
+    def __init__(self, tailer):
+        self.data = b""
+        self.resets = 0
+        tailer.data_received.connect(self._on_data)
+        tailer.reset.connect(self._on_reset)
+
+    def _on_data(self, chunk):
+        self.data += chunk
+
+    def _on_reset(self):
+        self.resets += 1
+        self.data = b""
+
+
+@pytest.fixture
+def run_dir(tmp_path):
+    """Layout like the helper's: a session log in /run/openvpn, a symlink in the user's log dir."""
+    (tmp_path / "run").mkdir()
+    (tmp_path / "logs").mkdir()
+    return tmp_path
+
+
+def link_session(run_dir, name):
+    target = run_dir / "run" / name
+    target.touch()
+    link = run_dir / "logs" / "openvpn-gui.log"
+    tmp_link = run_dir / "logs" / ".tmp-link"
+    os.symlink(target, tmp_link)
+    os.replace(tmp_link, link)  # like 'ln -sfn'
+    return target, link
+
+
+def append(path, data):
+    with open(path, "ab") as fh:
+        fh.write(data)
+
+
+@pytest.fixture
+def tailer(qapp, run_dir):
+    tailer = LogTailer(run_dir / "logs" / "openvpn-gui.log")
+    yield tailer
+    tailer.stop()
+    tailer.close()
+
+
+def test_follows_appends_without_polling(tailer, run_dir, wait_until):
+    target, _ = link_session(run_dir, "a.service.log")
+    recorder = Recorder(tailer)
+    tailer.start()
+    assert tailer.is_watching()
+
+    append(target, b"line 1\n")
+    assert wait_until(lambda: recorder.data == b"line 1\n")
+    append(target, b"line 2\n")
+    assert wait_until(lambda: recorder.data == b"line 1\nline 2\n")
+
+
+def test_drains_everything_in_one_wakeup(tailer, run_dir):
+    target, _ = link_session(run_dir, "a.service.log")
+    recorder = Recorder(tailer)
+    payload = b"x" * 1023 + b"\n"
+    append(target, payload * 1024)  # 1 MiB, well above one read chunk
+
+    assert tailer.drain() == len(payload) * 1024
+    assert recorder.data == payload * 1024
+    assert tailer.drain() == 0
+
+
+def test_symlink_retarget_and_truncation(tailer, run_dir, wait_until):
+    first, _ = link_session(run_dir, "a.service.log")
+    append(first, b"old session\n")
+    recorder = Recorder(tailer)
+    tailer.start()
+    assert wait_until(lambda: recorder.data == b"old session\n")
+
+    second, _ = link_session(run_dir, "b.service.log")
+    append(second, b"new session\n")
+    assert wait_until(lambda: recorder.data == b"new session\n")
+    assert recorder.resets == 1
+
+    os.truncate(second, 0)
+    append(second, b"again\n")
+    tailer.drain()
+    assert recorder.data == b"again\n"
+    assert recorder.resets == 2
+
+
+def test_falls_back_to_polling_when_unwatchable(qapp, tmp_path, wait_until):
+    log_path = tmp_path / "missing" / "openvpn-gui.log"
+    tailer = LogTailer(log_path, poll_interval_ms=20)
+    recorder = Recorder(tailer)
+    try:
+        tailer.start()
+        assert not tailer.is_watching()
+
+        log_path.parent.mkdir()
+        append(log_path, b"hello\n")
+        assert wait_until(lambda: recorder.data == b"hello\n")
+    finally:
+        tailer.stop()
+        tailer.close()
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ui.log_viewer import LogViewer
+
+
+def test_burst_is_rendered_in_one_bounded_flush(qapp, wait_until):
+    viewer = LogViewer(max_lines=100)
+    inserts = []
+    viewer.document().contentsChange.connect(lambda *args: inserts.append(args))
+
+    for i in range(5000):
+        viewer.add_log(f"line {i}")
+    assert viewer.document().toPlainText() == ""
+
+    assert wait_until(lambda: inserts)
+    qapp.processEvents()
+    lines = viewer.toPlainText().splitlines()
+    assert len(lines) == 100
+    assert lines[-1] == "line 4999"
+    assert lines[0] == "line 4900"
+
+
+def test_multiline_messages_and_markup_are_plain_text(qapp):
+    viewer = LogViewer(max_lines=0)
+    viewer.add_log("<b>not bold</b>\nsecond line")
+    viewer.flush()
+    assert viewer.toPlainText() == "<b>not bold</b>\nsecond line"
+
+    viewer.add_log("pending")
+    viewer.clear_log()
+    viewer.flush()
+    assert viewer.toPlainText() == ""
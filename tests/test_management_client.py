@@ -0,0 +1,175 @@
+import socket
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from management_client import ManagementClient, find_management_socket, parse_management_line
+from vpn_manager import VPNManager
+import constants as C
+
+# Recorded management sessions. Lines starting with '<' are commands the
+# client is expected to send before the stand-in server continues.
+CONNECT_TRANSCRIPT = """\
+>INFO:OpenVPN Management Interface Version 5 -- type 'help' for more info
+< state on all
+1700000000,CONNECTING,,,,,,
+1700000001,WAIT,,,,,,
+END
+< bytecount 1
+SUCCESS: bytecount interval changed
+< log on
+SUCCESS: real-time log notification set to ON
+>STATE:1700000002,AUTH,,,,,,
+>STATE:1700000003,GET_CONFIG,,,,,,
+>STATE:1700000004,ASSIGN_IP,,10.8.0.6,,,,
+>LOG:1700000005,I,Initialization Sequence Completed
+>STATE:1700000005,CONNECTED,SUCCESS,10.8.0.6,203.0.113.10,1194,,
+>BYTECOUNT:1024,2048
+"""
+
+AUTH_FAILED_TRANSCRIPT = """\
+>INFO:OpenVPN Management Interface Version 5 -- type 'help' for more info
+< state on all
+1700000000,CONNECTING,,,,,,
+END
+>STATE:1700000002,AUTH,,,,,,
+>PASSWORD:Verification Failed: 'Auth'
+>LOG:1700000003,F,AUTH: Received control message: AUTH_FAILED
+>STATE:1700000003,EXITING,auth-failure,,,,,
+"""
+
+
+class TranscriptServer:
+    """Local stand-in for OpenVPN's management socket that replays a transcript."""
+
+    def __init__(self, transcript: str):
+        self.lines = transcript.splitlines()
+        self.received = []
+        self._dir = tempfile.mkdtemp(prefix="ovpy-mgmt-")
+        self.path = Path(self._dir) / "mgmt.sock"
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(str(self.path))
+        self._sock.listen(1)
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        conn, _ = self._sock.accept()
+        reader = conn.makefile("rb")
+        with conn:
+            for line in self.lines:
+                if line.startswith("< "):
+                    command = reader.readline().decode().strip()
+                    self.received.append(command)
+                    continue
+                conn.sendall((line + "\r\n").encode())
+            # Keep the connection open until the client goes away
+            conn.recv(1)
+
+    def close(self):
+        self._sock.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+@pytest.fixture
+def transcript_server():
+    servers = []
+
+    def _make(transcript):
+        server = TranscriptServer(transcript)
+        servers.append(server)
+        return server
+
+    yield _make
+    for server in servers:
+        server.close()
+
+
+def test_parse_management_line():
+    event = parse_management_line(">STATE:1700000005,CONNECTED,SUCCESS,10.8.0.6,203.0.113.10,1194,,")
+    assert event.kind == "STATE"
+    assert event.fields[1] == "CONNECTED"
+    event = parse_management_line(">LOG:1700000005,I,Peer Connection Initiated with [AF_INET]1.2.3.4:1194, cipher x")
+    assert event.fields == ["1700000005", "I", "Peer Connection Initiated with [AF_INET]1.2.3.4:1194, cipher x"]
+    assert parse_management_line("SUCCESS: bytecount interval changed") is None
+
+
+def test_find_management_socket():
+    output = "some noise\nMANAGEMENT_SOCKET=/run/openvpn/openvpn-py-gui@x.service.mgmt\n"
+    assert find_management_socket(output) == Path("/run/openvpn/openvpn-py-gui@x.service.mgmt")
+    assert find_management_socket("") is None
+
+
+def test_client_replays_connect_transcript(transcript_server, qapp, wait_until):
+    """States from history and real-time notifications arrive in order."""
+    server = transcript_server(CONNECT_TRANSCRIPT)
+    client = ManagementClient(server.path)
+    states, counts = [], []
+    client.state_changed.connect(lambda state, desc: states.append(state))
+    client.bytecount.connect(lambda i, o: counts.append((i, o)))
+
+    client.open()
+    assert wait_until(lambda: counts)
+    client.close()
+
+    assert states == ["CONNECTING", "WAIT", "AUTH", "GET_CONFIG", "ASSIGN_IP", "CONNECTED"]
+    assert counts == [(1024, 2048)]
+    assert server.received == ["state on all", "bytecount 1", "log on"]
+
+
+def test_client_retries_until_socket_appears(qapp, wait_until, tmp_path):
+    """OpenVPN creates the socket after the helper returns; the client keeps trying."""
+    client = ManagementClient(tmp_path / "missing.sock", retry_interval_ms=10, max_connect_attempts=3)
+    client.open()
+    assert wait_until(lambda: client._attempts >= 3)
+    assert not client.is_connected()
+    client.close()
+
+
+@patch('vpn_manager.subprocess.run')
+def test_vpn_manager_connected_via_management(mock_run, transcript_server, qapp, wait_until):
+    """A pushed CONNECTED state reaches state_changed without waiting for a poll."""
+    server = transcript_server(CONNECT_TRANSCRIPT)
+    manager = VPNManager()
+    manager._executor.inline = True
+    connection = manager._connection('/tmp/test.ovpn')
+    connection.state = C.VpnState.CONNECTING
+    traffic = []
+    manager.connection_traffic_updated.connect(lambda path, i, o: traffic.append((path, i, o)))
+
+    connection._start_management(server.path)
+
+    assert wait_until(lambda: connection.state == C.VpnState.CONNECTED)
+    assert wait_until(lambda: traffic == [('/tmp/test.ovpn', 1024, 2048)])
+    connection._cleanup()
+    mock_run.assert_not_called()
+
+
+@patch('vpn_manager.subprocess.run')
+def test_vpn_manager_auth_failure_via_management(mock_run, transcript_server, qapp, wait_until):
+    """'>PASSWORD:Verification Failed' is reported as AUTH_FAILED right away."""
+    server = transcript_server(AUTH_FAILED_TRANSCRIPT)
+    mock_run.return_value = MagicMock(stdout='', stderr='', returncode=0)
+    manager = VPNManager()
+    manager._executor.inline = True
+    manager._helper_client = None
+    connection = manager._connection('/tmp/test.ovpn')
+    connection.state = C.VpnState.CONNECTING
+    states = []
+    manager.connection_state_changed.connect(lambda path, state: states.append(state))
+
+    connection._start_management(server.path)
+
+    assert wait_until(lambda: C.VpnState.AUTH_FAILED in states)
+    assert connection.state == C.VpnState.AUTH_FAILED
+    assert not manager.active_connections()
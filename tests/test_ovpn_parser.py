@@ -0,0 +1,108 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ovpn_parser import OvpnConfigCache, OvpnParseError, Remote, parse_ovpn
+
+CONFIG = b"""# provider config
+client
+dev tun0
+proto tcp
+remote first.example.com 443
+remote second.example.com 1195 udp   # trailing comment
+remote third.example.com
+;remote disabled.example.com
+remote-random
+auth-user-pass
+data-ciphers AES-256-GCM:CHACHA20-POLY1305
+cipher AES-256-CBC
+user nobody
+group nogroup
+verb 4
+up "/etc/openvpn/update-resolv-conf" 'with arg'
+dhcp-option DNS 10.8.0.1
+<ca>
+-----BEGIN CERTIFICATE-----
+MIIBCA==
+-----END CERTIFICATE-----
+</ca>
+<connection>
+remote fallback.example.com
+proto udp
+port 1197
+</connection>
+<tls-crypt>
+-----BEGIN OpenVPN Static key V1-----
+00ff
+-----END OpenVPN Static key V1-----
+</tls-crypt>
+"""
+
+
+def test_parse_typed_facts():
+    config = parse_ovpn(CONFIG)
+
+    assert config.remotes == [
+        Remote("first.example.com", 443, "tcp"),
+        Remote("second.example.com", 1195, "udp"),
+        Remote("third.example.com", 1194, "tcp"),
+        Remote("fallback.example.com", 1197, "udp"),
+    ]
+    assert config.proto == "tcp"
+    assert config.dev == "tun0"
+    assert config.auth_user_pass and config.auth_user_pass_file is None
+    assert config.data_ciphers == ["AES-256-GCM", "CHACHA20-POLY1305"]
+    assert config.cipher == "AES-256-CBC"
+    assert (config.user, config.group, config.verb) == ("nobody", "nogroup", 4)
+    assert config.remote_random
+    assert config.option("up") == ["/etc/openvpn/update-resolv-conf", "with arg"]
+    assert config.has_scripts and config.uses_resolv_script
+    assert config.dns_servers == ["10.8.0.1"]
+    # Directives inside <connection> do not leak into the global options
+    assert config.option("port") is None
+
+
+def test_inline_blocks_are_lazy_slices():
+    config = parse_ovpn(CONFIG)
+
+    assert set(config.inline) == {"ca", "tls-crypt"}
+    ca = config.inline["ca"]
+    assert ca.data == b"-----BEGIN CERTIFICATE-----\nMIIBCA==\n-----END CERTIFICATE-----\n"
+    assert len(ca) == len(ca.data)
+    assert "00ff" in config.inline["tls-crypt"].text
+    # Lines inside inline blocks are never read as directives
+    assert not config.has_option("-----begin")
+
+
+def test_auth_user_pass_file_and_defaults():
+    config = parse_ovpn(b"remote vpn.example.com\nauth-user-pass /etc/openvpn/creds\n")
+    assert config.remotes == [Remote("vpn.example.com", 1194, "udp")]
+    assert config.auth_user_pass_file == "/etc/openvpn/creds"
+
+
+def test_unterminated_inline_block():
+    with pytest.raises(OvpnParseError):
+        parse_ovpn(b"client\n<ca>\n-----BEGIN CERTIFICATE-----\n")
+
+
+def test_cache_reparses_only_changed_files(tmp_path, monkeypatch):
+    path = tmp_path / "work.ovpn"
+    path.write_bytes(b"remote a.example.com 1194\n")
+    cache = OvpnConfigCache()
+
+    first = cache.get(path)
+    assert cache.get(path) is first
+
+    path.write_bytes(b"remote b.example.com 443 tcp\n")
+    st = path.stat()
+    # Make sure the rewrite is visible even on coarse mtime filesystems
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    second = cache.get(path)
+    assert second is not first
+    assert second.remotes == [Remote("b.example.com", 443, "tcp")]
+    assert second.path == path
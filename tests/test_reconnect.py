@@ -0,0 +1,181 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import constants as C
+from helper_client import HelperClient
+from reconnect import ReconnectPolicy, ReconnectScheduler
+from tests.fake_helper import fake_helper_server
+from vpn_manager import VPNManager
+
+CONFIG = '/tmp/test.ovpn'
+FAST = ReconnectPolicy(initial_delay=0.01, max_delay=0.05, jitter=0.0, max_attempts=3)
+
+
+@pytest.fixture
+def daemon():
+    with fake_helper_server() as server:
+        yield server
+
+
+@pytest.fixture
+def manager(daemon, qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
+    manager = VPNManager()
+    manager._executor.inline = True
+    manager._helper_client = HelperClient(daemon.socket_path)
+    yield manager
+    manager._status_timer.stop()
+    manager._helper_client.close()
+
+
+@pytest.fixture
+def scheduler(manager):
+    scheduler = ReconnectScheduler(
+        manager, lambda path, callback: callback(('user', 'pass')), FAST, random.Random(1)
+    )
+    scheduler.set_enabled(CONFIG, True)
+    gave_up = []
+    scheduler.reconnect_gave_up.connect(lambda path, reason: gave_up.append(reason))
+    scheduler.gave_up = gave_up
+    return scheduler
+
+
+def bring_up(manager):
+    connection = manager._connection(CONFIG)
+    connection._set_state(C.VpnState.CONNECTING)
+    connection._set_state(C.VpnState.CONNECTED)
+    return connection
+
+
+def drop(manager, daemon):
+    """The unit goes away under a connected tunnel; the next status sweep notices."""
+    daemon.service.backend.statuses['test.ovpn'] = 'disconnected'
+    manager.check_connection_status()
+
+
+def test_policy_backoff_grows_and_caps_with_jitter():
+    policy = ReconnectPolicy(initial_delay=2.0, max_delay=30.0, jitter=0.25)
+    rng = random.Random(7)
+    for attempt, base in enumerate([2, 4, 8, 16, 30, 30], start=1):
+        for _ in range(20):
+            assert base * 0.75 <= policy.delay(attempt, rng) <= base * 1.25
+    assert ReconnectPolicy(initial_delay=2.0, jitter=0.0).delay(3, rng) == 8.0
+
+
+def test_reconnects_after_unexpected_drop(manager, daemon, scheduler, wait_until):
+    """A dropped tunnel is started again with the saved credentials."""
+    connection = bring_up(manager)
+    backend = daemon.service.backend
+
+    drop(manager, daemon)
+
+    assert connection.state == C.VpnState.DISCONNECTED
+    assert scheduler.pending(CONFIG)[0] == 1
+    backend.statuses['test.ovpn'] = 'connected'
+    assert wait_until(lambda: backend.count('start') == 1)
+    assert [c[2] for c in backend.calls if c[0] == 'start'] == ['user\npass\n']
+    assert connection.state == C.VpnState.CONNECTING
+
+    connection.log_path.write_text('Initialization Sequence Completed\n')
+    manager.check_connection_status()
+
+    assert connection.state == C.VpnState.CONNECTED
+    assert scheduler.pending(CONFIG) is None
+    assert scheduler.gave_up == []
+
+
+def test_auth_failure_stops_reconnecting(manager, daemon, scheduler, wait_until):
+    connection = bring_up(manager)
+    backend = daemon.service.backend
+    drop(manager, daemon)
+    backend.statuses['test.ovpn'] = 'connected'
+    assert wait_until(lambda: connection.state == C.VpnState.CONNECTING)
+
+    connection.log_path.write_text('AUTH: Received control message: AUTH_FAILED\n')
+    backend.statuses['test.ovpn'] = 'error'
+    manager.check_connection_status()
+
+    assert connection.state == C.VpnState.AUTH_FAILED
+    assert scheduler.gave_up == ['authentication failed']
+    assert scheduler.pending(CONFIG) is None
+    starts = backend.count('start')
+    assert not wait_until(lambda: backend.count('start') > starts, timeout=0.2)
+
+
+def test_gives_up_after_attempt_budget(manager, daemon, scheduler, wait_until):
+    bring_up(manager)
+    backend = daemon.service.backend
+    backend.start_returncode = 1
+    backend.start_stderr = 'unit failed'
+
+    drop(manager, daemon)
+
+    assert wait_until(lambda: scheduler.gave_up)
+    assert scheduler.gave_up == ['no success after 3 attempts']
+    assert backend.count('start') == FAST.max_attempts
+
+
+def test_user_disconnect_is_not_reconnected(manager, daemon, scheduler, wait_until):
+    bring_up(manager)
+
+    manager.disconnect(CONFIG)
+
+    assert manager.state(CONFIG) == C.VpnState.DISCONNECTED
+    assert scheduler.pending(CONFIG) is None
+    assert not wait_until(lambda: daemon.service.backend.count('start'), timeout=0.2)
+
+
+def test_failed_first_connect_is_not_retried(manager, daemon, scheduler):
+    daemon.service.backend.start_returncode = 1
+
+    manager.connect(CONFIG, 'user', 'pass')
+
+    assert manager.state(CONFIG) == C.VpnState.ERROR
+    assert scheduler.pending(CONFIG) is None
+
+
+def test_only_enabled_configs_reconnect(manager, daemon, scheduler):
+    scheduler.set_enabled(CONFIG, False)
+    bring_up(manager)
+
+    drop(manager, daemon)
+
+    assert scheduler.pending(CONFIG) is None
+    assert not scheduler.has_pending()
+
+
+def test_attempt_waits_for_the_keyring_without_blocking(manager, daemon, wait_until):
+    """Credentials are requested, not read: the attempt starts once they arrive."""
+    requests = []
+    scheduler = ReconnectScheduler(manager, lambda path, callback: requests.append(callback), FAST, random.Random(1))
+    scheduler.set_enabled(CONFIG, True)
+    bring_up(manager)
+    backend = daemon.service.backend
+
+    drop(manager, daemon)
+
+    assert wait_until(lambda: requests)
+    assert backend.count('start') == 0
+    requests[0](('user', 'pass'))
+    assert wait_until(lambda: backend.count('start') == 1)
+
+
+def test_cancelled_plan_ignores_late_credentials(manager, daemon, wait_until):
+    requests = []
+    scheduler = ReconnectScheduler(manager, lambda path, callback: requests.append(callback), FAST, random.Random(1))
+    scheduler.set_enabled(CONFIG, True)
+    bring_up(manager)
+    drop(manager, daemon)
+    assert wait_until(lambda: requests)
+
+    scheduler.set_enabled(CONFIG, False)
+    requests[0](('user', 'pass'))
+
+    assert daemon.service.backend.count('start') == 0
+    assert manager.state(CONFIG) == C.VpnState.DISCONNECTED
@@ -0,0 +1,198 @@
+import hashlib
+import hmac
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ovpn_parser import Remote, parse_ovpn
+from remote_probe import (
+    P_CONTROL_HARD_RESET_CLIENT_V2,
+    RemoteProber,
+    TlsAuthKey,
+    build_hard_reset,
+    preferred_remote_order,
+    rank,
+    ProbeResult,
+)
+
+STATIC_KEY = bytes(range(256))
+
+
+class StandInUdpServer:
+    """Answers OpenVPN hard resets after 'delay' seconds (or never)."""
+
+    def __init__(self, delay=0.0, answer=True, hmac_key=None):
+        self.delay = delay
+        self.answer = answer
+        self.hmac_key = hmac_key
+        self.packets = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.05)
+        self.port = self.sock.getsockname()[1]
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self.packets.append(data)
+            if not self.answer or data[0] >> 3 != P_CONTROL_HARD_RESET_CLIENT_V2:
+                continue
+            if self.hmac_key is not None and not self._authentic(data):
+                continue
+            reply = bytes([8 << 3]) + b"\x01" * 8 + b"\x00" + b"\x00" * 4
+            threading.Timer(self.delay, self._reply, (reply, addr)).start()
+
+    def _reply(self, reply, addr):
+        try:
+            self.sock.sendto(reply, addr)
+        except OSError:
+            pass
+
+    def _authentic(self, data):
+        size = hashlib.sha1().digest_size
+        op, session, mac, rest = data[:1], data[1:9], data[9:9 + size], data[9 + size:]
+        replay, tail = rest[:8], rest[8:]
+        expected = hmac.new(self.hmac_key, replay + op + session + tail, "sha1").digest()
+        return hmac.compare_digest(mac, expected)
+
+    def close(self):
+        self._stop.set()
+        self.sock.close()
+        self._thread.join()
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def make(**kwargs):
+        server = StandInUdpServer(**kwargs)
+        started.append(server)
+        return server
+
+    yield make
+    for server in started:
+        server.close()
+
+
+def free_port(kind=socket.SOCK_STREAM):
+    with socket.socket(socket.AF_INET, kind) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def config_for(remotes, extra=""):
+    lines = ["client", "proto udp"] + [f"remote {host} {port} {proto}" for host, port, proto in remotes]
+    return parse_ovpn(("\n".join(lines) + "\n" + extra).encode())
+
+
+def test_udp_remotes_ranked_by_rtt(servers):
+    slow = servers(delay=0.2)
+    fast = servers(delay=0.0)
+    silent = servers(answer=False)
+    config = config_for([
+        ("127.0.0.1", slow.port, "udp"),
+        ("127.0.0.1", silent.port, "udp"),
+        ("127.0.0.1", fast.port, "udp"),
+    ])
+
+    started = time.monotonic()
+    results = RemoteProber(timeout=0.6, network_id=lambda: "test").rank_remotes(config)
+    # Probed concurrently: bounded by the timeout, not the sum of the delays
+    assert time.monotonic() - started < 1.5
+
+    assert [r.remote.port for r in results] == [fast.port, slow.port, silent.port]
+    assert results[0].rtt < results[1].rtt
+    assert results[2].error == "timeout"
+
+
+def test_tcp_probe_and_refused_remotes():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(8)
+    try:
+        tcp_port = listener.getsockname()[1]
+        config = config_for([
+            ("127.0.0.1", free_port(), "tcp"),
+            ("unresolvable.invalid", 1194, "udp"),
+            ("127.0.0.1", tcp_port, "tcp"),
+        ])
+        results = RemoteProber(timeout=0.5, network_id=lambda: "test").rank_remotes(config)
+    finally:
+        listener.close()
+
+    assert results[0].remote.port == tcp_port and results[0].reachable
+    assert all(r.failed for r in results[1:])
+
+
+def test_tls_auth_probe_is_signed(servers):
+    # key-direction 1: the client signs with the second HMAC key
+    server = servers(hmac_key=STATIC_KEY[192:192 + 20])
+    key_block = "\n".join(STATIC_KEY[i:i + 16].hex() for i in range(0, 256, 16))
+    config = config_for(
+        [("127.0.0.1", server.port, "udp"), ("127.0.0.1", free_port(socket.SOCK_DGRAM), "udp")],
+        "key-direction 1\n<tls-auth>\n-----BEGIN OpenVPN Static key V1-----\n"
+        f"{key_block}\n-----END OpenVPN Static key V1-----\n</tls-auth>\n",
+    )
+    assert TlsAuthKey.from_config(config).key == STATIC_KEY[192:212]
+
+    results = RemoteProber(timeout=0.5, network_id=lambda: "test").rank_remotes(config)
+    assert results[0].remote.port == server.port and results[0].reachable
+
+
+def test_results_cached_per_network(servers):
+    server = servers()
+    other = servers()
+    config = config_for([("127.0.0.1", server.port, "udp"), ("127.0.0.1", other.port, "udp")])
+    network = ["home"]
+    prober = RemoteProber(timeout=0.5, ttl=60, network_id=lambda: network[0])
+
+    first = prober.rank_remotes(config)
+    assert prober.rank_remotes(config) is first
+    assert len(server.packets) == 1
+
+    network[0] = "office"
+    prober.rank_remotes(config)
+    assert len(server.packets) == 2
+
+    prober.ttl = 0
+    prober.rank_remotes(config)
+    assert len(server.packets) == 3
+
+
+def test_preferred_order_keeps_config_when_nothing_answers(servers):
+    silent = servers(answer=False)
+    prober = RemoteProber(timeout=0.2, network_id=lambda: "test")
+    config = config_for([("127.0.0.1", silent.port, "udp"), ("127.0.0.1", free_port(socket.SOCK_DGRAM), "udp")])
+    assert preferred_remote_order(config, prober) is None
+    # A single remote leaves nothing to reorder
+    assert preferred_remote_order(config_for([("127.0.0.1", silent.port, "udp")]), prober) is None
+
+
+def test_rank_order_and_packet_layout():
+    a, b, c, d = (Remote(h, 1194, "udp") for h in "abcd")
+    ranked = rank([
+        ProbeResult(a, error="timeout"),
+        ProbeResult(b, rtt=0.2),
+        ProbeResult(c, error="resolve: failed"),
+        ProbeResult(d, rtt=0.1),
+    ])
+    assert [r.remote.host for r in ranked] == ["d", "b", "a", "c"]
+
+    packet = build_hard_reset(b"S" * 8)
+    assert packet == bytes([P_CONTROL_HARD_RESET_CLIENT_V2 << 3]) + b"S" * 8 + b"\x00" * 5
@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from session_lock import SessionLockWatcher, logind_session_path
+
+
+def test_logind_session_path_is_bus_escaped():
+    assert logind_session_path("2") == "/org/freedesktop/login1/session/_32"
+    assert logind_session_path("c12") == "/org/freedesktop/login1/session/c12"
+    assert logind_session_path("a-b") == "/org/freedesktop/login1/session/a_2db"
+    assert logind_session_path(None) == ""
+
+
+def test_lock_and_screensaver_emit_locked(qapp):
+    watcher = SessionLockWatcher()
+    seen = []
+    watcher.locked.connect(lambda: seen.append(True))
+
+    watcher._on_screensaver_active_changed(False)
+    assert seen == []
+    watcher._on_screensaver_active_changed(True)
+    watcher._on_session_lock()
+
+    assert seen == [True, True]
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from startup_profile import ImportCost, StartupProfiler, format_report, parse_import_times
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     keyring.errors
+import time:      2000 |       2120 |   credentials_manager
+import time:       900 |      31000 | main_window
+2026-10-17 12:00:00,000 - main - INFO - Main window shown 180 ms after start
+import time:       300 |        300 | ui.logs_window
+"""
+
+
+def test_parse_import_times():
+    costs = parse_import_times(IMPORTTIME_OUTPUT)
+
+    assert costs == [
+        ImportCost("keyring.errors", 120, 120, 2),
+        ImportCost("credentials_manager", 2000, 2120, 1),
+        ImportCost("main_window", 900, 31000, 0),
+        ImportCost("ui.logs_window", 300, 300, 0),
+    ]
+
+
+def test_phases_stop_recording_after_finish():
+    profiler = StartupProfiler(0.0)
+    with profiler.phase("create main window"):
+        pass
+    profiler.mark_first_paint()
+    profiler.finish()
+    with profiler.phase("deferred start-up"):
+        pass
+
+    report = profiler.report()
+
+    assert [p["name"] for p in report["phases"]] == ["create main window"]
+    assert report["first_paint_s"] > 0
+
+
+def test_format_report_lists_phases_and_heaviest_imports():
+    report = {
+        "version": 1,
+        "interpreter_s": 0.04,
+        "phases": [{"name": "import Qt", "seconds": 0.03}],
+        "first_paint_s": 0.2,
+        "imports": [cost._asdict() for cost in parse_import_times(IMPORTTIME_OUTPUT)],
+    }
+
+    text = format_report(report, top=2)
+
+    assert "import Qt" in text
+    assert "time to first window paint" in text and "240.0 ms" in text
+    direct = text.split("cumulative time (top 2):")[1].split("Modules with")[0]
+    assert direct.split() == ["main_window", "31.0", "ms", "ui.logs_window", "0.3", "ms"]
+
+
+def test_importing_constants_creates_no_directories(tmp_path):
+    env = {**os.environ, "XDG_CONFIG_HOME": str(tmp_path)}
+    subprocess.run(
+        [sys.executable, "-c", "import constants"],
+        cwd=Path(__file__).parent.parent, env=env, check=True,
+    )
+
+    assert list(tmp_path.iterdir()) == []
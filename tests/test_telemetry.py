@@ -0,0 +1,125 @@
+import csv
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from telemetry import TelemetryBuffer, TrafficSampler, format_rate, read_interface_counters
+
+
+def write_counters(root: Path, device: str, rx: int, tx: int, rx_packets: int = 0, tx_packets: int = 0):
+    statistics = root / device / "statistics"
+    statistics.mkdir(parents=True, exist_ok=True)
+    for name, value in zip(("rx_bytes", "tx_bytes", "rx_packets", "tx_packets"), (rx, tx, rx_packets, tx_packets)):
+        (statistics / name).write_text(f"{value}\n")
+
+
+def test_buffer_keeps_only_the_newest_samples():
+    buffer = TelemetryBuffer(capacity=4)
+    memory = buffer.memory_bytes()
+    for i in range(1, 11):
+        buffer.append(1.0, i * 100, i * 10, now=1000.0 + i)
+
+    assert len(buffer) == 4
+    assert buffer.memory_bytes() == memory
+    assert buffer.rates() == ([700.0, 800.0, 900.0, 1000.0], [70.0, 80.0, 90.0, 100.0])
+    assert buffer.rates(2) == ([900.0, 1000.0], [90.0, 100.0])
+    assert buffer.current_rates() == (1000.0, 100.0)
+    # Totals and peaks cover the whole session, not just the retained window
+    assert buffer.total_rx == 5500
+    assert buffer.peak_rx_rate == 1000.0
+
+
+def test_buffer_rebuilds_timestamps_from_intervals():
+    buffer = TelemetryBuffer(capacity=8)
+    buffer.append(1.0, 100, 0, now=101.0)
+    buffer.append(0.5, 100, 0, now=101.5)
+    buffer.append(2.0, 100, 0, now=103.5)
+
+    rows = list(buffer.rows())
+
+    assert [row[0] for row in rows] == pytest.approx([101.0, 101.5, 103.5])
+    assert buffer.rates()[0] == [100.0, 200.0, 50.0]
+
+
+def test_export_csv(tmp_path):
+    buffer = TelemetryBuffer(capacity=8)
+    buffer.append(1.0, 2048, 512, 4, 2, now=1700000000.25)
+    path = tmp_path / "traffic.csv"
+
+    buffer.export_csv(path)
+
+    with open(path, newline="") as fh:
+        rows = list(csv.DictReader(fh))
+    assert len(rows) == 1
+    assert rows[0]["rx_bytes"] == "2048"
+    assert rows[0]["tx_packets"] == "2"
+    assert rows[0]["rx_bytes_per_s"] == "2048.0"
+    assert rows[0]["time"].endswith(".250")
+
+
+def test_sampler_reads_device_counters(tmp_path):
+    write_counters(tmp_path, "tun0", 1000, 500, 10, 5)
+    sampler = TrafficSampler(capacity=16, sysfs_root=tmp_path)
+    sampler.scan_log(b"2024-01-01 TUN/TAP device tun0 opened\n")
+    assert sampler.device == "tun0"
+
+    sampler._record(read_interface_counters("tun0", tmp_path), now=10.0)
+    write_counters(tmp_path, "tun0", 3000, 1500, 30, 15)
+    sampler._record(read_interface_counters("tun0", tmp_path), now=12.0)
+
+    assert sampler.buffer.rates() == ([1000.0], [500.0])
+    row = next(sampler.buffer.rows())
+    assert row[4:] == (20, 10)
+
+
+def test_sampler_prefers_device_counters_over_bytecount(tmp_path):
+    write_counters(tmp_path, "tun0", 0, 0)
+    sampler = TrafficSampler(capacity=16, sysfs_root=tmp_path)
+    sampler.feed_bytecount(100, 100)
+    assert sampler.source == "management"
+
+    sampler.set_device("tun0")
+    sampler.poll()
+    sampler.feed_bytecount(999999, 999999)
+
+    assert sampler.source == "sysfs"
+    assert len(sampler.buffer) == 0
+
+
+def test_device_found_mid_session_does_not_spike_the_rates(tmp_path):
+    write_counters(tmp_path, "tun0", 5_000_000, 5_000_000)
+    sampler = TrafficSampler(capacity=16, sysfs_root=tmp_path)
+    sampler.feed_bytecount(100, 100)
+    sampler.set_device("tun0")
+    # Still on management totals until the first poll
+    sampler.feed_bytecount(200, 200)
+    samples = len(sampler.buffer)
+
+    sampler.poll()
+
+    assert sampler.source == "sysfs"
+    assert len(sampler.buffer) == samples
+    assert sampler.buffer.total_rx <= 100
+
+
+def test_sampler_handles_counter_reset(tmp_path):
+    sampler = TrafficSampler(capacity=16, sysfs_root=tmp_path)
+    sampler._record((5000, 5000, 0, 0), now=1.0)
+    sampler._record((300, 200, 0, 0), now=2.0)
+
+    assert sampler.buffer.rates() == ([300.0], [200.0])
+
+
+def test_missing_device_yields_no_counters(tmp_path):
+    assert read_interface_counters("tun9", tmp_path) is None
+
+
+def test_format_rate():
+    assert format_rate(512) == "512 B/s"
+    assert format_rate(1500) == "1.5 KB/s"
+    assert format_rate(2_500_000) == "2.5 MB/s"
+    assert format_rate(3e12) == "3000.0 GB/s"
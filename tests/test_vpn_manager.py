@@ -1,4 +1,8 @@
+import json
+import socket
 import sys
+import tempfile
+import threading
 from pathlib import Path
 import pytest
 from unittest.mock import Mock, patch, MagicMock
@@ -8,6 +12,10 @@ import subprocess
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from vpn_manager import VPNManager
+from helper_client import HelperClient, HelperError
+from ovpn_parser import Remote
+from remote_probe import ProbeResult
+from tests.fake_helper import fake_helper_server
 import constants as C
 
 
@@ -15,26 +23,25 @@ class TestVPNManager:
     """Test suite for VPNManager class."""
     
     @pytest.fixture
-    def vpn_manager(self):
+    def vpn_manager(self, tmp_path, monkeypatch):
         """Create a VPNManager instance for testing."""
+        monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
         manager = VPNManager()
+        # Run helper commands synchronously so assertions can follow the calls
+        manager._executor.inline = True
         return manager
     
     def test_initial_state(self, vpn_manager):
         """Test that VPNManager starts in correct initial state."""
-        assert vpn_manager._state == C.VpnState.NO_CONFIG_SELECTED
-        assert vpn_manager._process is None
-        assert vpn_manager._current_config_path is None
+        assert vpn_manager.connections() == []
+        assert vpn_manager.state('/tmp/test.ovpn') == C.VpnState.DISCONNECTED
     
     @patch('vpn_manager.subprocess.Popen')
-    @patch('vpn_manager.C.LOG_FILE_PATH')
     @patch('vpn_manager.C.HELPER_SCRIPT_PATH')
-    def test_connect_success(self, mock_helper_path, mock_log_path, mock_popen, vpn_manager):
+    def test_connect_success(self, mock_helper_path, mock_popen, vpn_manager):
         """Test successful VPN connection."""
         # Setup mocks
         mock_helper_path.__str__.return_value = '/usr/local/bin/helper.sh'
-        mock_log_path.exists.return_value = False
-        mock_log_path.__str__.return_value = '/tmp/test.log'
         
         mock_process = MagicMock()
         mock_process.returncode = 0
@@ -44,15 +51,14 @@ class TestVPNManager:
         # Test connection
         vpn_manager.connect('/tmp/test.ovpn', 'testuser', 'testpass')
         
-        assert vpn_manager._state == C.VpnState.CONNECTING
+        assert vpn_manager.state('/tmp/test.ovpn') == C.VpnState.CONNECTING
         mock_popen.assert_called_once()
+        # The helper writes this connection's own log file
+        assert mock_popen.call_args[0][0][5] == str(C.connection_log_path('/tmp/test.ovpn'))
     
     @patch('vpn_manager.subprocess.Popen')
-    @patch('vpn_manager.C.LOG_FILE_PATH')
-    def test_connect_auth_failure(self, mock_log_path, mock_popen, vpn_manager):
+    def test_connect_auth_failure(self, mock_popen, vpn_manager):
         """Test VPN connection with authentication failure."""
-        mock_log_path.exists.return_value = False
-        
         mock_process = MagicMock()
         mock_process.returncode = 1
         mock_process.communicate.return_value = ('', 'Authentication failed')
@@ -61,92 +67,371 @@ class TestVPNManager:
         vpn_manager.connect('/tmp/test.ovpn', 'wronguser', 'wrongpass')
         
         # Should cleanup on error
-        assert vpn_manager._process is None
+        assert vpn_manager.state('/tmp/test.ovpn') == C.VpnState.ERROR
+        assert vpn_manager.active_connections() == []
     
     def test_connect_when_already_connected(self, vpn_manager):
         """Test that connecting when already connected does nothing."""
-        vpn_manager._state = C.VpnState.CONNECTED
+        vpn_manager._connection('/tmp/test.ovpn').state = C.VpnState.CONNECTED
         
         vpn_manager.connect('/tmp/test.ovpn', 'user', 'pass')
         
         # State should remain CONNECTED
-        assert vpn_manager._state == C.VpnState.CONNECTED
+        assert vpn_manager.state('/tmp/test.ovpn') == C.VpnState.CONNECTED
+
+    @patch('vpn_manager.subprocess.Popen')
+    def test_connects_second_config_while_first_is_up(self, mock_popen, vpn_manager):
+        """Another config can connect while one is already connected."""
+        mock_popen.return_value = MagicMock(returncode=0, communicate=MagicMock(return_value=('', '')))
+        vpn_manager._connection('/tmp/a.ovpn').state = C.VpnState.CONNECTED
+
+        vpn_manager.connect('/tmp/b.ovpn', 'user', 'pass')
+
+        assert vpn_manager.state('/tmp/a.ovpn') == C.VpnState.CONNECTED
+        assert vpn_manager.state('/tmp/b.ovpn') == C.VpnState.CONNECTING
+        assert C.connection_log_path('/tmp/a.ovpn') != C.connection_log_path('/tmp/b.ovpn')
     
     @patch('vpn_manager.subprocess.run')
     def test_disconnect(self, mock_run, vpn_manager):
         """Test VPN disconnection."""
-        vpn_manager._current_config_path = Path('/tmp/test.ovpn')
-        vpn_manager._state = C.VpnState.CONNECTED
+        vpn_manager._connection('/tmp/test.ovpn').state = C.VpnState.CONNECTED
         
         mock_run.return_value = MagicMock(stdout='Disconnected', stderr='')
         
-        vpn_manager.disconnect()
+        vpn_manager.disconnect('/tmp/test.ovpn')
         
-        # After disconnect, manager should transition to DISCONNECTED
-        assert vpn_manager._state == C.VpnState.DISCONNECTED
+        # After disconnect, the connection should transition to DISCONNECTED
+        assert vpn_manager.state('/tmp/test.ovpn') == C.VpnState.DISCONNECTED
         mock_run.assert_called_once()
+
+    @patch('vpn_manager.subprocess.run')
+    def test_disconnect_one_of_several(self, mock_run, vpn_manager):
+        """Disconnecting one config leaves the other tunnels alone."""
+        vpn_manager._connection('/tmp/a.ovpn').state = C.VpnState.CONNECTED
+        vpn_manager._connection('/tmp/b.ovpn').state = C.VpnState.CONNECTED
+        mock_run.return_value = MagicMock(stdout='', stderr='')
+
+        # Ambiguous without a path
+        vpn_manager.disconnect()
+        mock_run.assert_not_called()
+
+        vpn_manager.disconnect('/tmp/a.ovpn')
+
+        assert mock_run.call_args[0][0][3:5] == ['stop', 'a.ovpn']
+        assert vpn_manager.state('/tmp/a.ovpn') == C.VpnState.DISCONNECTED
+        assert vpn_manager.state('/tmp/b.ovpn') == C.VpnState.CONNECTED
+
+        vpn_manager.disconnect_all()
+        assert vpn_manager.active_connections() == []
     
     def test_disconnect_when_not_connected(self, vpn_manager):
         """Test disconnecting when not connected."""
-        vpn_manager._current_config_path = None
-        
-        vpn_manager.disconnect()
+        messages = []
+        vpn_manager.log_received.connect(messages.append)
+
+        vpn_manager.disconnect('/tmp/test.ovpn')
         
         # Should emit log message about not being connected
+        assert messages == ["Not currently connected or no config selected."]
     
     @patch('vpn_manager.subprocess.run')
-    @patch('vpn_manager.C.LOG_FILE_PATH')
-    def test_check_connection_status_connected(self, mock_log_path, mock_run, vpn_manager):
+    def test_check_connection_status_connected(self, mock_run, vpn_manager):
         """Test checking connection status when connected."""
-        vpn_manager._current_config_path = Path('/tmp/test.ovpn')
-        vpn_manager._state = C.VpnState.CONNECTING
+        C.connection_log_path('/tmp/test.ovpn').write_text('Initialization Sequence Completed\n')
+        vpn_manager._connection('/tmp/test.ovpn').state = C.VpnState.CONNECTING
         
         mock_run.return_value = MagicMock(
             stdout='connected',
             stderr='',
             returncode=0
         )
-        mock_log_path.read_text.return_value = 'Initialization Sequence Completed'
         
         vpn_manager.check_connection_status()
         
-        assert vpn_manager._state == C.VpnState.CONNECTED
+        assert vpn_manager.state('/tmp/test.ovpn') == C.VpnState.CONNECTED
     
     @patch('vpn_manager.subprocess.run')
-    @patch('vpn_manager.C.LOG_FILE_PATH')
-    def test_check_connection_status_auth_failed(self, mock_log_path, mock_run, vpn_manager):
+    def test_check_connection_status_auth_failed(self, mock_run, vpn_manager):
         """Test checking connection status with auth failure."""
-        vpn_manager._current_config_path = Path('/tmp/test.ovpn')
-        vpn_manager._state = C.VpnState.CONNECTING
+        C.connection_log_path('/tmp/test.ovpn').write_text('AUTH: Received control message: AUTH_FAILED\n')
+        vpn_manager._connection('/tmp/test.ovpn').state = C.VpnState.CONNECTING
         
         mock_run.return_value = MagicMock(
             stdout='error',
             stderr='',
             returncode=0
         )
-        mock_log_path.read_text.return_value = 'AUTH_FAILED'
         
         vpn_manager.check_connection_status()
         
-        assert vpn_manager._state == C.VpnState.AUTH_FAILED
+        assert vpn_manager.state('/tmp/test.ovpn') == C.VpnState.AUTH_FAILED
+
+    @patch('vpn_manager.subprocess.run')
+    def test_status_sweep_covers_all_connections(self, mock_run, vpn_manager):
+        """One sweep polls every active tunnel and routes each answer to its connection."""
+        C.connection_log_path('/tmp/a.ovpn').write_text('Initialization Sequence Completed\n')
+        C.connection_log_path('/tmp/b.ovpn').write_text('AUTH: Received control message: AUTH_FAILED\n')
+        vpn_manager._connection('/tmp/a.ovpn').state = C.VpnState.CONNECTING
+        vpn_manager._connection('/tmp/b.ovpn').state = C.VpnState.CONNECTING
+        vpn_manager._connection('/tmp/idle.ovpn')
+        answers = {'a.ovpn': 'connected', 'b.ovpn': 'error'}
+        mock_run.side_effect = lambda cmd, **kw: MagicMock(
+            stdout=answers.get(cmd[4], ''), stderr='', returncode=0
+        )
+
+        with patch.object(vpn_manager._executor, 'submit', wraps=vpn_manager._executor.submit) as submit:
+            vpn_manager.check_connection_status()
+
+        assert [c.kwargs.get('tag') for c in submit.call_args_list].count('status') == 1
+        assert [c[0][0][3:5] for c in mock_run.call_args_list if c[0][0][3] == 'status'] == [
+            ['status', 'a.ovpn'], ['status', 'b.ovpn']
+        ]
+        assert vpn_manager.state('/tmp/a.ovpn') == C.VpnState.CONNECTED
+        assert vpn_manager.state('/tmp/b.ovpn') == C.VpnState.AUTH_FAILED
+        assert vpn_manager.state('/tmp/idle.ovpn') == C.VpnState.DISCONNECTED
     
+    @patch('vpn_manager.subprocess.run')
+    def test_status_sweep_is_one_status_all_call(self, mock_run, vpn_manager):
+        """Without the daemon, one sudo status-all run answers for every active tunnel."""
+        C.connection_log_path('/tmp/a.ovpn').write_text('Initialization Sequence Completed\n')
+        C.connection_log_path('/tmp/b.ovpn').write_text('AUTH: Received control message: AUTH_FAILED\n')
+        vpn_manager._connection('/tmp/a.ovpn').state = C.VpnState.CONNECTING
+        vpn_manager._connection('/tmp/b.ovpn').state = C.VpnState.CONNECTING
+        mock_run.return_value = MagicMock(
+            stdout='{"version":1,"configs":{"a.ovpn":{"status":"connected","unit":"openvpn-py-gui@a.service"},'
+                   '"b.ovpn":{"status":"error","unit":""}}}\n',
+            stderr='',
+            returncode=0,
+        )
+
+        vpn_manager.check_connection_status()
+
+        assert [c[0][0][3:] for c in mock_run.call_args_list if c[0][0][3].startswith('status')] == [
+            ['status-all', 'a.ovpn', 'b.ovpn']
+        ]
+        assert vpn_manager.state('/tmp/a.ovpn') == C.VpnState.CONNECTED
+        assert vpn_manager.state('/tmp/b.ovpn') == C.VpnState.AUTH_FAILED
+
+    @patch('vpn_manager.subprocess.run')
+    def test_status_sweep_falls_back_for_old_helper(self, mock_run, vpn_manager):
+        """An installed helper without status-all is polled per config from then on."""
+        C.connection_log_path('/tmp/a.ovpn').write_text('Initialization Sequence Completed\n')
+        vpn_manager._connection('/tmp/a.ovpn').state = C.VpnState.CONNECTING
+        mock_run.side_effect = lambda cmd, **kw: (
+            MagicMock(stdout='', stderr="ERROR: Invalid command 'status-all'.", returncode=1)
+            if cmd[3] == 'status-all'
+            else MagicMock(stdout='connected', stderr='', returncode=0)
+        )
+
+        vpn_manager.check_connection_status()
+        vpn_manager._connection('/tmp/a.ovpn').state = C.VpnState.CONNECTING
+        vpn_manager.check_connection_status()
+
+        assert [c[0][0][3] for c in mock_run.call_args_list] == ['status-all', 'status', 'status']
+        assert vpn_manager.state('/tmp/a.ovpn') == C.VpnState.CONNECTED
+
     def test_cleanup_on_error(self, vpn_manager):
         """Test cleanup sets correct error state."""
-        vpn_manager._state = C.VpnState.CONNECTING
-        vpn_manager._current_config_path = Path('/tmp/test.ovpn')
+        connection = vpn_manager._connection('/tmp/test.ovpn')
+        connection.state = C.VpnState.CONNECTING
         
-        vpn_manager._cleanup(error=True)
+        connection._cleanup(error=True)
         
-        assert vpn_manager._state == C.VpnState.ERROR
-        assert vpn_manager._current_config_path is None
-        assert vpn_manager._process is None
+        assert connection.state == C.VpnState.ERROR
+        assert vpn_manager.active_connections() == []
     
     def test_cleanup_on_disconnect(self, vpn_manager):
         """Test cleanup after normal disconnect."""
-        vpn_manager._state = C.VpnState.DISCONNECTING
-        vpn_manager._current_config_path = Path('/tmp/test.ovpn')
+        connection = vpn_manager._connection('/tmp/test.ovpn')
+        connection.state = C.VpnState.DISCONNECTING
         
-        vpn_manager._cleanup(error=False)
+        connection._cleanup(error=False)
         
-        assert vpn_manager._state == C.VpnState.DISCONNECTED
-        assert vpn_manager._current_config_path is None
+        assert connection.state == C.VpnState.DISCONNECTED
+
+
+class TestHelperDaemon:
+    """VPNManager talking to the persistent helper daemon over its socket."""
+
+    @pytest.fixture
+    def daemon(self):
+        with fake_helper_server() as server:
+            yield server
+
+    @pytest.fixture
+    def vpn_manager(self, daemon):
+        manager = VPNManager()
+        manager._executor.inline = True
+        manager._helper_client = HelperClient(daemon.socket_path)
+        yield manager
+        manager._helper_client.close()
+
+    @patch('vpn_manager.subprocess.Popen')
+    @patch('vpn_manager.subprocess.run')
+    def test_connect_uses_daemon(self, mock_run, mock_popen, vpn_manager, daemon, tmp_path, monkeypatch):
+        """Start goes through the daemon with credentials on stdin, no sudo spawn."""
+        monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
+
+        vpn_manager.connect('/tmp/test.ovpn', 'user', 'pass')
+
+        assert vpn_manager.state('/tmp/test.ovpn') == C.VpnState.CONNECTING
+        backend = daemon.service.backend
+        assert backend.calls[0] == ('start', ['/tmp/test.ovpn', str(tmp_path / 'openvpn-gui-test.log')], 'user\npass\n')
+        mock_popen.assert_not_called()
+        mock_run.assert_not_called()
+
+    @patch('vpn_manager.subprocess.Popen')
+    def test_connect_passes_probed_remote_order(self, mock_popen, vpn_manager, daemon, tmp_path, monkeypatch):
+        """Remotes ranked by the pre-connect probe reach the helper as --remote flags."""
+        monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
+        config = tmp_path / 'multi.ovpn'
+        config.write_text('client\nremote slow.example.com 1194\nremote fast.example.com 443 tcp\n')
+        slow, fast = Remote('slow.example.com', 1194, 'udp'), Remote('fast.example.com', 443, 'tcp')
+        monkeypatch.setattr(
+            vpn_manager._remote_prober, 'rank_remotes',
+            lambda cfg: [ProbeResult(fast, rtt=0.01), ProbeResult(slow, rtt=0.2)],
+        )
+
+        vpn_manager.connect(str(config), 'user', 'pass')
+
+        args = daemon.service.backend.calls[0][1]
+        assert args[2:] == ['--remote=fast.example.com,443,tcp', '--remote=slow.example.com,1194,udp']
+        mock_popen.assert_not_called()
+
+    def test_daemon_rejects_bad_remote_flags(self, vpn_manager):
+        """Start flags are validated before they can reach OpenVPN's command line."""
+        with pytest.raises(HelperError):
+            vpn_manager._helper_client.run(
+                'start', ['/tmp/test.ovpn', '/tmp/log', '--remote=--up,1,udp']
+            )
+
+    @patch('vpn_manager.subprocess.run')
+    def test_status_served_from_daemon_cache(self, mock_run, vpn_manager, daemon, tmp_path, monkeypatch):
+        """Repeated status polls reuse the daemon's cached answer."""
+        monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
+        C.connection_log_path('/tmp/test.ovpn').write_text('Initialization Sequence Completed\n')
+        daemon.service.backend.statuses['test.ovpn'] = 'connected'
+        vpn_manager._connection('/tmp/test.ovpn').state = C.VpnState.CONNECTING
+
+        for _ in range(5):
+            vpn_manager.check_connection_status()
+
+        assert vpn_manager.state('/tmp/test.ovpn') == C.VpnState.CONNECTED
+        assert daemon.service.backend.count('status-all') == 1
+        assert daemon.service.backend.count('status') == 0
+        mock_run.assert_not_called()
+
+    def test_daemon_batches_status_of_all_tunnels(self, vpn_manager, daemon, tmp_path, monkeypatch):
+        """One sweep over several tunnels is one request and one status-all helper run."""
+        monkeypatch.setattr(C, 'LOG_FILE_PATH', tmp_path / 'openvpn-gui.log')
+        backend = daemon.service.backend
+        backend.statuses.update({'a.ovpn': 'connected', 'b.ovpn': 'error'})
+        C.connection_log_path('/tmp/a.ovpn').write_text('Initialization Sequence Completed\n')
+        C.connection_log_path('/tmp/b.ovpn').write_text('AUTH: Received control message: AUTH_FAILED\n')
+        vpn_manager._connection('/tmp/a.ovpn').state = C.VpnState.CONNECTING
+        vpn_manager._connection('/tmp/b.ovpn').state = C.VpnState.CONNECTING
+
+        vpn_manager.check_connection_status()
+
+        assert [c[1] for c in backend.calls if c[0].startswith('status')] == [['a.ovpn', 'b.ovpn']]
+        assert backend.count('status') == 0
+        assert vpn_manager.state('/tmp/a.ovpn') == C.VpnState.CONNECTED
+        assert vpn_manager.state('/tmp/b.ovpn') == C.VpnState.AUTH_FAILED
+
+    def test_daemon_polls_per_config_without_status_all(self, vpn_manager, daemon):
+        """A helper script without status-all is asked config by config, and not offered it again."""
+        backend = daemon.service.backend
+        backend.supports_status_all = False
+        backend.statuses.update({'a.ovpn': 'connected', 'b.ovpn': 'connected'})
+
+        entries = daemon.service.status_all(['a.ovpn', 'b.ovpn'])
+        daemon.service._status_cache.clear()
+        daemon.service.status_all(['a.ovpn', 'b.ovpn'])
+
+        assert {n: e['status'] for n, e in entries.items()} == {'a.ovpn': 'connected', 'b.ovpn': 'connected'}
+        assert backend.count('status-all') == 1
+        assert backend.count('status') == 4
+
+    def test_disconnect_uses_daemon(self, vpn_manager, daemon):
+        """Stop is delegated to the daemon and the manager ends DISCONNECTED."""
+        vpn_manager._connection('/tmp/test.ovpn').state = C.VpnState.CONNECTED
+
+        vpn_manager.disconnect('/tmp/test.ovpn')
+
+        assert vpn_manager.state('/tmp/test.ovpn') == C.VpnState.DISCONNECTED
+        assert daemon.service.backend.count('stop') == 1
+
+    def test_daemon_rejects_paths_for_status(self, vpn_manager):
+        """The daemon only accepts bare config names where the helper expects them."""
+        with pytest.raises(HelperError):
+            vpn_manager._helper_client.run('status', ['../etc/passwd'])
+
+    @patch('vpn_manager.subprocess.run')
+    def test_falls_back_to_sudo_without_daemon(self, mock_run, vpn_manager, tmp_path):
+        """A missing daemon socket falls back to the sudo helper invocation."""
+        vpn_manager._helper_client = HelperClient(tmp_path / 'missing.sock')
+        vpn_manager._connection('/tmp/test.ovpn').state = C.VpnState.CONNECTED
+        mock_run.return_value = MagicMock(stdout='', stderr='', returncode=0)
+
+        vpn_manager.disconnect('/tmp/test.ovpn')
+
+        assert mock_run.call_args[0][0][:2] == ['sudo', '-n']
+        assert vpn_manager.state('/tmp/test.ovpn') == C.VpnState.DISCONNECTED
+
+
+class TestHelperClient:
+    """HelperClient against a daemon whose replies the test scripts."""
+
+    @pytest.fixture
+    def daemon(self):
+        """A socket that answers request N with replies[N](request), one connection after another."""
+        tmp_dir = Path(tempfile.mkdtemp(prefix="ovpy-"))
+        path = tmp_dir / "helper.sock"
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(path))
+        server.listen()
+        replies = []
+
+        def serve():
+            while replies:
+                try:
+                    conn, _ = server.accept()
+                except OSError:
+                    return
+                with conn, conn.makefile("rb") as reader:
+                    for line in reader:
+                        conn.sendall(replies.pop(0)(json.loads(line)))
+                        if not replies:
+                            return
+
+        def start(*scripted):
+            replies.extend(scripted)
+            threading.Thread(target=serve, daemon=True).start()
+            return HelperClient(path, timeout=2)
+
+        yield start
+        server.close()
+        path.unlink(missing_ok=True)
+        tmp_dir.rmdir()
+
+    @staticmethod
+    def ok(request, **fields):
+        return (json.dumps({"id": request["id"], "ok": True, "stdout": "connected\n", **fields}) + "\n").encode()
+
+    def test_malformed_reply_drops_the_connection(self, daemon):
+        client = daemon(lambda request: b'{"id": 1, "ok": tr\xff\n', self.ok)
+
+        with pytest.raises(HelperError):
+            client.run("status", ["test.ovpn"])
+        # The next request starts over on a fresh connection
+        assert client.run("status", ["test.ovpn"]).stdout == "connected\n"
+        client.close()
+
+    def test_out_of_sequence_reply_drops_the_connection(self, daemon):
+        # A late answer to an earlier request arrives ahead of the real one
+        client = daemon(lambda request: self.ok(dict(request, id=request["id"] - 1)) + self.ok(request), self.ok)
+
+        with pytest.raises(HelperError, match="out of sequence"):
+            client.run("status", ["test.ovpn"])
+        assert client.run("status", ["test.ovpn"]).stdout == "connected\n"
+        client.close()
@@ -0,0 +1,183 @@
+import logging
+import time
+from pathlib import Path
+from PyQt6.QtWidgets import (
+    QMainWindow,
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLineEdit,
+    QComboBox,
+    QLabel,
+    QTableView,
+    QAbstractItemView,
+    QHeaderView,
+)
+from PyQt6.QtGui import QStandardItemModel, QStandardItem, QDesktopServices
+from PyQt6.QtCore import Qt, QTimer, QUrl
+from command_executor import CommandExecutor, CommandResult
+from log_archive import LogArchiveIndex
+from log_classifier import LogEventKind
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+
+
+class ArchiveBrowser(QMainWindow):
+    """Search the archived session logs (openvpn-<config>-<timestamp>.log) in Documents."""
+
+    def __init__(self, archive_dir: Path, index: LogArchiveIndex, parent=None):
+        super().__init__(parent)
+        self.archive_dir = Path(archive_dir)
+        self.index = index
+        self.setWindowTitle(self.tr("Search Archived Logs"))
+        self.setMinimumSize(800, 500)
+
+        self._executor = CommandExecutor(self, max_threads=1)
+
+        central = QWidget(self)
+        self.setCentralWidget(central)
+        layout = QVBoxLayout(central)
+
+        # Filters
+        filters = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText(self.tr("Search text..."))
+        self.search_edit.setClearButtonEnabled(True)
+        self.config_combo = QComboBox()
+        self.kind_combo = QComboBox()
+        self.kind_combo.addItem(self.tr("Any line"), None)
+        for kind, label in self._kind_labels().items():
+            self.kind_combo.addItem(label, kind)
+        self.period_combo = QComboBox()
+        self.period_combo.addItem(self.tr("All time"), None)
+        self.period_combo.addItem(self.tr("Last 24 hours"), DAY)
+        self.period_combo.addItem(self.tr("Last 7 days"), 7 * DAY)
+        self.period_combo.addItem(self.tr("Last 30 days"), 30 * DAY)
+        filters.addWidget(self.search_edit, 1)
+        filters.addWidget(self.config_combo)
+        filters.addWidget(self.kind_combo)
+        filters.addWidget(self.period_combo)
+
+        # Results
+        self.results = QStandardItemModel(0, 4, self)
+        self.results.setHorizontalHeaderLabels(
+            [self.tr("Session"), self.tr("Config"), self.tr("Event"), self.tr("Line")]
+        )
+        self.results_view = QTableView()
+        self.results_view.setModel(self.results)
+        self.results_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.results_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.results_view.setWordWrap(False)
+        self.results_view.verticalHeader().hide()
+        self.results_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.results_view.horizontalHeader().setStretchLastSection(True)
+        self.results_view.doubleClicked.connect(self._open_archive)
+
+        self.status_label = QLabel()
+
+        layout.addLayout(filters)
+        layout.addWidget(self.results_view)
+        layout.addWidget(self.status_label)
+
+        # Typing searches after a short pause; combo changes search right away
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(200)
+        self._search_timer.timeout.connect(self.run_search)
+        self.search_edit.textChanged.connect(lambda _text: self._search_timer.start())
+        self.config_combo.currentIndexChanged.connect(lambda _i: self.run_search())
+        self.kind_combo.currentIndexChanged.connect(lambda _i: self.run_search())
+        self.period_combo.currentIndexChanged.connect(lambda _i: self.run_search())
+
+        self._load_configs()
+
+    def _kind_labels(self):
+        return {
+            LogEventKind.AUTH_FAILED: self.tr("Authentication failed"),
+            LogEventKind.TLS_ERROR: self.tr("TLS error"),
+            LogEventKind.RESOLVE_FAILED: self.tr("Cannot resolve host"),
+            LogEventKind.NETWORK_UNREACHABLE: self.tr("Network unreachable"),
+            LogEventKind.OPTIONS_ERROR: self.tr("Options error"),
+            LogEventKind.FATAL: self.tr("Fatal error"),
+            LogEventKind.INIT_COMPLETE: self.tr("Connected"),
+            LogEventKind.LINK_UP: self.tr("Link up"),
+            LogEventKind.TLS_DONE: self.tr("TLS handshake done"),
+            LogEventKind.PUSH_REPLY: self.tr("Options pushed"),
+            LogEventKind.DNS_FIXED: self.tr("DNS fixed up"),
+        }
+
+    def refresh_index(self):
+        """Index new or changed archives in the background, then search again."""
+        if self._executor.pending_count("index"):
+            return
+        self.status_label.setText(self.tr("Updating index..."))
+        self._executor.submit(
+            lambda ctx: self.index.update(self.archive_dir),
+            tag="index",
+            callback=self._on_index_updated,
+        )
+
+    def _on_index_updated(self, result: CommandResult):
+        if result.error is not None:
+            logger.error(f"Failed to update log archive index: {result.error}")
+        self._load_configs()
+        self.run_search()
+
+    def _load_configs(self):
+        current = self.config_combo.currentData()
+        self.config_combo.blockSignals(True)
+        self.config_combo.clear()
+        self.config_combo.addItem(self.tr("All configs"), None)
+        try:
+            for name in self.index.configs():
+                self.config_combo.addItem(name, name)
+        except Exception as e:
+            logger.error(f"Failed to read log archive index: {e}")
+        position = self.config_combo.findData(current)
+        self.config_combo.setCurrentIndex(max(position, 0))
+        self.config_combo.blockSignals(False)
+
+    def run_search(self):
+        self._search_timer.stop()
+        period = self.period_combo.currentData()
+        kind = self.kind_combo.currentData()
+        started = time.perf_counter()
+        try:
+            matches = self.index.search(
+                self.archive_dir,
+                text=self.search_edit.text(),
+                config=self.config_combo.currentData(),
+                kinds=[kind] if kind is not None else None,
+                since=time.time() - period if period else None,
+            )
+        except Exception as e:
+            logger.error(f"Log archive search failed: {e}")
+            self.status_label.setText(self.tr("Search failed: {0}").format(e))
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        labels = self._kind_labels()
+        self.results.removeRows(0, self.results.rowCount())
+        for match in matches:
+            session = QStandardItem(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(match.session_time)))
+            session.setData(str(match.path), Qt.ItemDataRole.UserRole)
+            self.results.appendRow([
+                session,
+                QStandardItem(match.config),
+                QStandardItem(labels.get(match.kind, "")),
+                QStandardItem(f"{match.lineno}: {match.line}"),
+            ])
+        self.status_label.setText(
+            self.tr("{0} matching lines ({1} ms)").format(len(matches), f"{elapsed_ms:.0f}")
+        )
+
+    def _open_archive(self, index):
+        path = self.results.item(index.row(), 0).data(Qt.ItemDataRole.UserRole)
+        if path:
+            QDesktopServices.openUrl(QUrl.fromLocalFile(path))
+
+    def closeEvent(self, event):
+        self._executor.cancel_all()
+        super().closeEvent(event)
@@ -1,9 +1,137 @@
 # /ui/config_list.py
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QListView, QPushButton, QHBoxLayout, QAbstractItemView
-from PyQt6.QtCore import QStringListModel, pyqtSignal, QItemSelectionModel
-from typing import List, Optional
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt, pyqtSignal, QItemSelectionModel
+from typing import Dict, List, Optional, Sequence
+import constants as C
 from config_manager import VpnConfig
 
+# sync_configs() resets the model instead when more rows than this change
+SYNC_RESET_THRESHOLD = 64
+
+
+class ConfigListModel(QAbstractListModel):
+    """
+    List model of VpnConfigs keyed by path. Rows are looked up through a
+    path -> row dict, set_configs() replaces everything with one model
+    reset, and single inserts/removals emit row signals so views keep
+    their selection and scroll position. Each config's connection state is
+    kept by path, so it survives rescans.
+    """
+
+    PathRole = Qt.ItemDataRole.UserRole + 1
+    StateRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._configs: List[VpnConfig] = []
+        self._rows: Dict[str, int] = {}
+        self._states: Dict[str, C.VpnState] = {}
+
+    @property
+    def configs(self) -> List[VpnConfig]:
+        return self._configs
+
+    def set_configs(self, configs: Sequence[VpnConfig]):
+        self.beginResetModel()
+        self._configs = list(configs)
+        self._reindex(0)
+        self.endResetModel()
+
+    def insert_config(self, config: VpnConfig, row: Optional[int] = None):
+        """Insert config at row (default: at the end). A config already in the model is replaced."""
+        existing = self.row_for_path(str(config.path))
+        if existing >= 0:
+            self._configs[existing] = config
+            index = self.index(existing)
+            self.dataChanged.emit(index, index)
+            return
+        if row is None or row > len(self._configs):
+            row = len(self._configs)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._configs.insert(row, config)
+        self._reindex(row)
+        self.endInsertRows()
+
+    def remove_config(self, path: str) -> bool:
+        row = self.row_for_path(path)
+        if row < 0:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._configs[row]
+        del self._rows[path]
+        self._reindex(row)
+        self.endRemoveRows()
+        return True
+
+    def sync_configs(self, configs: Sequence[VpnConfig]):
+        """
+        Make the model equal to configs with row-level removes and inserts,
+        so a rescan that found one new file does not reset the view.
+        """
+        wanted = {str(c.path) for c in configs}
+        removed = sum(1 for c in self._configs if str(c.path) not in wanted)
+        added = len(wanted) - (len(self._configs) - removed)
+        # Each row operation reindexes the rows after it; many of them cost more than a reset
+        if not self._configs or removed + added > SYNC_RESET_THRESHOLD:
+            self.set_configs(configs)
+            return
+        for config in [c for c in self._configs if str(c.path) not in wanted]:
+            self.remove_config(str(config.path))
+        for row, config in enumerate(configs):
+            if row >= len(self._configs) or self._configs[row] != config:
+                self.insert_config(config, row)
+        if self._configs != list(configs):
+            # Order of the surviving rows changed; fall back to a reset
+            self.set_configs(configs)
+
+    def row_for_path(self, path: str) -> int:
+        return self._rows.get(path, -1)
+
+    def set_state(self, path: str, state: C.VpnState):
+        if state == C.VpnState.DISCONNECTED:
+            changed = self._states.pop(path, None) is not None
+        else:
+            changed = self._states.get(path) != state
+            self._states[path] = state
+        row = self.row_for_path(path)
+        if changed and row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def state(self, path: str) -> C.VpnState:
+        return self._states.get(path, C.VpnState.DISCONNECTED)
+
+    def config_at(self, row: int) -> Optional[VpnConfig]:
+        if 0 <= row < len(self._configs):
+            return self._configs[row]
+        return None
+
+    def _reindex(self, start: int):
+        if start == 0:
+            self._rows = {}
+        for row in range(start, len(self._configs)):
+            self._rows[str(self._configs[row].path)] = row
+
+    # --- QAbstractListModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._configs)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._configs):
+            return None
+        config = self._configs[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            state = self._states.get(str(config.path))
+            if state is None:
+                return config.name
+            return f"{config.name} ({state.name.replace('_', ' ').title()})"
+        if role in (Qt.ItemDataRole.ToolTipRole, self.PathRole):
+            return str(config.path)
+        if role == self.StateRole:
+            return self.state(str(config.path))
+        return None
+
+
 class ConfigList(QWidget):
     config_selected = pyqtSignal(str)
     import_config_requested = pyqtSignal()
@@ -11,45 +139,59 @@ class ConfigList(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.model = QStringListModel(self)
-        self.configs: List[VpnConfig] = []
+        self.model = ConfigListModel(self)
         self.init_ui()
 
+    @property
+    def configs(self) -> List[VpnConfig]:
+        return self.model.configs
+
     def init_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0,0,0,0)
-        
+
         self.list_view = QListView()
         self.list_view.setModel(self.model)
         self.list_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        # All rows have the same height; lets the view skip measuring each one
+        self.list_view.setUniformItemSizes(True)
         self.list_view.selectionModel().selectionChanged.connect(self.on_selection_changed)
 
         button_layout = QHBoxLayout()
         import_button = QPushButton(self.tr("Import"))
         self.delete_button = QPushButton(self.tr("Delete"))
-        
+
         import_button.clicked.connect(self.import_config_requested)
         self.delete_button.clicked.connect(self.on_delete_clicked)
         self.delete_button.setEnabled(False)
+        self.model.modelReset.connect(lambda: self.delete_button.setEnabled(False))
 
         button_layout.addWidget(import_button)
         button_layout.addWidget(self.delete_button)
 
         layout.addWidget(self.list_view)
         layout.addLayout(button_layout)
-        
+
     def add_config(self, config: VpnConfig):
-        self.configs.append(config)
-        self.update_view()
+        self.model.insert_config(config)
+
+    def remove_config(self, config_path: str) -> bool:
+        return self.model.remove_config(config_path)
+
+    def set_configs(self, configs: Sequence[VpnConfig]):
+        """Replace the list in one go."""
+        self.model.set_configs(configs)
+
+    def sync_configs(self, configs: Sequence[VpnConfig]):
+        """Update the list to configs, keeping the selection where possible."""
+        self.model.sync_configs(configs)
 
     def clear_configs(self):
-        self.configs.clear()
-        self.update_view()
+        self.model.set_configs([])
 
-    def update_view(self):
-        config_names = [c.name for c in self.configs]
-        self.model.setStringList(config_names)
-        self.delete_button.setEnabled(False)
+    def set_config_state(self, config_path: str, state: C.VpnState):
+        """Show a config's connection state next to its name."""
+        self.model.set_state(config_path, state)
 
     def on_selection_changed(self, selected, deselected):
         indexes = selected.indexes()
@@ -57,42 +199,33 @@ class ConfigList(QWidget):
             self.delete_button.setEnabled(False)
             return
 
-        selected_config_name = self.model.stringList()[indexes[0].row()]
-        selected_config = next((c for c in self.configs if c.name == selected_config_name), None)
+        selected_config = self.model.config_at(indexes[0].row())
         if selected_config:
             self.config_selected.emit(str(selected_config.path))
             self.delete_button.setEnabled(True)
 
     def on_delete_clicked(self):
-        selected_indexes = self.list_view.selectedIndexes()
-        if not selected_indexes:
-            return
-        
-        selected_config_name = self.model.stringList()[selected_indexes[0].row()]
-        selected_config = next((c for c in self.configs if c.name == selected_config_name), None)
-        if selected_config:
-            self.delete_config_requested.emit(str(selected_config.path))
+        selected_path = self.get_selected_config_path()
+        if selected_path:
+            self.delete_config_requested.emit(selected_path)
 
     def get_selected_config_path(self) -> Optional[str]:
         """Return the full path of the currently selected config, if any."""
         selected_indexes = self.list_view.selectedIndexes()
         if not selected_indexes:
             return None
-        row = selected_indexes[0].row()
-        if row < 0 or row >= len(self.configs):
-            return None
-        return str(self.configs[row].path)
+        config = self.model.config_at(selected_indexes[0].row())
+        return str(config.path) if config else None
 
     def select_config_by_path(self, config_path: str) -> bool:
         """Programmatically select a config by its full path. Returns True if selected."""
-        for idx, cfg in enumerate(self.configs):
-            if str(cfg.path) == config_path:
-                model_index = self.model.index(idx)
-                if model_index.isValid():
-                    self.list_view.setCurrentIndex(model_index)
-                    self.list_view.selectionModel().select(
-                        model_index,
-                        QItemSelectionModel.SelectionFlag.ClearAndSelect | QItemSelectionModel.SelectionFlag.Rows,
-                    )
-                    return True
-        return False
+        row = self.model.row_for_path(config_path)
+        if row < 0:
+            return False
+        model_index = self.model.index(row)
+        self.list_view.setCurrentIndex(model_index)
+        self.list_view.selectionModel().select(
+            model_index,
+            QItemSelectionModel.SelectionFlag.ClearAndSelect | QItemSelectionModel.SelectionFlag.Rows,
+        )
+        return True
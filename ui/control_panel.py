@@ -1,8 +1,11 @@
 # /ui/control_panel.py
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel, QFrame
+import math
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel, QFrame, QCheckBox
 from PyQt6.QtCore import pyqtSlot
 from PyQt6.QtGui import QFont
 import constants as C
+from telemetry import format_rate
+from ui.sparkline import Sparkline, RX_COLOR, TX_COLOR
 
 class ControlPanel(QWidget):
     def __init__(self, parent=None):
@@ -25,17 +28,36 @@ class ControlPanel(QWidget):
         status_label_title.setText(self.tr("Status")) # Use tr()
         
         self.status_label = QLabel()
+        # Next automatic reconnect attempt, hidden unless one is scheduled
+        self.reconnect_label = QLabel()
+        self.reconnect_label.hide()
         
         status_layout.addWidget(status_label_title)
         status_layout.addWidget(self.status_label)
+        status_layout.addWidget(self.reconnect_label)
+
+        # Throughput of the selected connection
+        self.traffic_label = QLabel()
+        self.peak_label = QLabel()
+        self.sparkline = Sparkline()
+        self.export_traffic_button = QPushButton(self.tr("Export Traffic..."))
+        self.export_traffic_button.setEnabled(False)
+        status_layout.addWidget(self.traffic_label)
+        status_layout.addWidget(self.peak_label)
+        status_layout.addWidget(self.sparkline)
+        status_layout.addWidget(self.export_traffic_button)
+        self.clear_traffic()
         
         # Control Buttons
         self.connect_button = QPushButton()
         self.disconnect_button = QPushButton()
+        self.auto_reconnect_checkbox = QCheckBox(self.tr("Reconnect automatically"))
+        self.auto_reconnect_checkbox.setEnabled(False)
         
         layout.addWidget(status_frame)
         layout.addWidget(self.connect_button)
         layout.addWidget(self.disconnect_button)
+        layout.addWidget(self.auto_reconnect_checkbox)
         layout.addStretch(1)
 
         self.update_state(C.VpnState.NO_CONFIG_SELECTED)
@@ -67,6 +89,7 @@ class ControlPanel(QWidget):
         is_busy = state in [C.VpnState.CONNECTING, C.VpnState.DISCONNECTING]
 
         self.connect_button.setEnabled(can_connect and has_selection and not is_busy)
+        self.auto_reconnect_checkbox.setEnabled(has_selection)
         self.disconnect_button.setEnabled(state == C.VpnState.CONNECTED and not is_busy)
 
         # Update button text for better UX
@@ -79,3 +102,33 @@ class ControlPanel(QWidget):
             self.disconnect_button.setText(self.tr("Disconnecting..."))
         else:
             self.disconnect_button.setText(self.tr("Disconnect"))
+
+    def show_reconnect(self, attempt: int, max_attempts: int, seconds_left: float):
+        self.reconnect_label.setText(
+            self.tr("Reconnecting in {0} s (attempt {1} of {2})").format(
+                math.ceil(seconds_left), attempt, max_attempts
+            )
+        )
+        self.reconnect_label.show()
+
+    def clear_reconnect(self):
+        self.reconnect_label.hide()
+
+    def show_traffic(self, rates, peaks, history):
+        """rates/peaks are (rx, tx) bytes per second, history is (rx list, tx list)."""
+        self.traffic_label.setText(
+            self.tr("<span style='color:{0}'>\u2193 {1}</span>  <span style='color:{2}'>\u2191 {3}</span>").format(
+                RX_COLOR.name(), format_rate(rates[0]), TX_COLOR.name(), format_rate(rates[1])
+            )
+        )
+        self.peak_label.setText(
+            self.tr("Peak: \u2193 {0}  \u2191 {1}").format(format_rate(peaks[0]), format_rate(peaks[1]))
+        )
+        self.sparkline.set_values(*history)
+        self.export_traffic_button.setEnabled(bool(history[0]))
+
+    def clear_traffic(self):
+        self.traffic_label.setText(self.tr("No traffic data"))
+        self.peak_label.clear()
+        self.sparkline.clear()
+        self.export_traffic_button.setEnabled(False)
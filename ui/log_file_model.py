@@ -0,0 +1,227 @@
+import bisect
+import logging
+import mmap
+import os
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer, QCoreApplication
+
+logger = logging.getLogger(__name__)
+
+# Granularity of the line index: one newline count per block, exact newline
+# positions only for blocks that are actually displayed
+BLOCK_SIZE = 1 << 20
+CACHED_BLOCKS = 64
+
+
+class LogFileModel(QAbstractListModel):
+    """
+    Read-only list model over a (possibly huge) log file, one row per line.
+
+    The file is memory-mapped and never read as a whole. Opening only counts
+    newlines per 1 MiB block, incrementally on a zero-interval timer so rows
+    appear right away; exact line offsets are built for a block the first
+    time one of its rows is shown, and only visible rows are decoded.
+    refresh() picks up appended data by indexing just the new bytes.
+    """
+
+    def __init__(self, parent=None, block_size: int = BLOCK_SIZE, index_budget_ms: int = 15):
+        super().__init__(parent)
+        self.block_size = block_size
+        self.index_budget_ms = index_budget_ms
+        self._path: Optional[Path] = None
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._identity = None
+        self._size = 0
+        self._reset_index()
+
+        self._index_timer = QTimer(self)
+        self._index_timer.setInterval(0)
+        self._index_timer.timeout.connect(self._index_some)
+
+    def _reset_index(self):
+        self._block_starts = array("q")  # byte offset where each block starts
+        self._block_newlines = array("q")  # newlines before each block
+        self._newlines = 0  # newlines in the indexed bytes
+        self._indexed = 0  # bytes indexed so far
+        self._rows = 0
+        self._partial = False  # last row has no newline yet
+        self._positions: "OrderedDict[int, array]" = OrderedDict()
+
+    # --- File handling ---
+    @property
+    def path(self) -> Optional[Path]:
+        return self._path
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def open(self, path: Path) -> bool:
+        """Show the file at path. Returns False (and shows nothing) if it cannot be read."""
+        self.beginResetModel()
+        self._close_file()
+        self._path = Path(path)
+        ok = self._open_file()
+        self.endResetModel()
+        self._schedule_indexing()
+        return ok
+
+    def close(self):
+        self.beginResetModel()
+        self._close_file()
+        self._path = None
+        self.endResetModel()
+
+    def refresh(self):
+        """Follow the file: index appended bytes, start over if it was replaced or truncated."""
+        if self._path is None:
+            return
+        try:
+            st = os.stat(self._path)
+        except OSError:
+            return
+        if self._file is None or (st.st_dev, st.st_ino) != self._identity or st.st_size < self._size:
+            self.open(self._path)
+            return
+        if st.st_size == self._size:
+            return
+        # An mmap cannot grow; map the file again at its new size
+        self._unmap()
+        self._size = st.st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._schedule_indexing()
+
+    def is_indexed(self) -> bool:
+        return self._indexed >= self._size
+
+    def ensure_indexed(self):
+        """Index the whole file now (for callers without an event loop)."""
+        self._index_timer.stop()
+        while not self.is_indexed():
+            self._index_block()
+        self._update_rows()
+
+    def _open_file(self) -> bool:
+        try:
+            self._file = open(self._path, "rb")
+            st = os.fstat(self._file.fileno())
+            self._identity = (st.st_dev, st.st_ino)
+            self._size = st.st_size
+            if self._size:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            return True
+        except (OSError, ValueError) as e:
+            logger.debug(f"Cannot open log {self._path}: {e}")
+            self._close_file()
+            return False
+
+    def _close_file(self):
+        self._index_timer.stop()
+        self._unmap()
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._identity = None
+        self._size = 0
+        self._reset_index()
+
+    def _unmap(self):
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+
+    # --- Indexing ---
+    def _schedule_indexing(self):
+        if self.is_indexed():
+            self._update_rows()
+        elif QCoreApplication.instance() is None:
+            self.ensure_indexed()
+        else:
+            # First slice right away so the view has rows to show
+            self._index_some()
+            if not self.is_indexed():
+                self._index_timer.start()
+
+    def _index_some(self):
+        deadline = time.monotonic() + self.index_budget_ms / 1000
+        while not self.is_indexed() and time.monotonic() < deadline:
+            self._index_block()
+        if self.is_indexed():
+            self._index_timer.stop()
+        self._update_rows()
+
+    def _index_block(self):
+        start = self._indexed
+        end = min(start + self.block_size, self._size)
+        self._block_starts.append(start)
+        self._block_newlines.append(self._newlines)
+        self._newlines += self._map[start:end].count(b"\n")
+        self._indexed = end
+
+    def _update_rows(self):
+        rows = self._newlines
+        partial = False
+        if self.is_indexed() and self._size and self._map[self._size - 1] != ord("\n"):
+            rows += 1  # unterminated last line (still being written)
+            partial = True
+        old = self._rows
+        rows = max(rows, old)  # the file only grows; a replaced file goes through open()
+        if self._partial and old:
+            # The previously unterminated last line may have more text now
+            changed = self.index(old - 1)
+            self.dataChanged.emit(changed, changed)
+        if rows > old:
+            self.beginInsertRows(QModelIndex(), old, rows - 1)
+            self._rows = rows
+            self.endInsertRows()
+        self._partial = partial
+
+    def _newline_position(self, n: int) -> int:
+        """Byte offset of the n-th newline (0-based)."""
+        block = bisect.bisect_right(self._block_newlines, n) - 1
+        positions = self._positions.get(block)
+        if positions is None:
+            positions = array("q")
+            start = self._block_starts[block]
+            end = self._block_starts[block + 1] if block + 1 < len(self._block_starts) else self._indexed
+            mm = self._map
+            pos = mm.find(b"\n", start, end)
+            while pos != -1:
+                positions.append(pos)
+                pos = mm.find(b"\n", pos + 1, end)
+            self._positions[block] = positions
+            if len(self._positions) > CACHED_BLOCKS:
+                self._positions.popitem(last=False)
+        else:
+            self._positions.move_to_end(block)
+        return positions[n - self._block_newlines[block]]
+
+    # --- Access ---
+    def line(self, row: int) -> str:
+        if row < 0 or row >= self._rows:
+            raise IndexError(row)
+        start = self._newline_position(row - 1) + 1 if row else 0
+        end = self._newline_position(row) if row < self._newlines else self._indexed
+        return self._map[start:end].decode(errors="replace").rstrip("\r")
+
+    def text(self) -> str:
+        """The whole file as text (e.g. for the clipboard)."""
+        if self._map is None:
+            return ""
+        return self._map[: self._size].decode(errors="replace")
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._rows
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        try:
+            return self.line(index.row())
+        except (IndexError, ValueError):
+            return None
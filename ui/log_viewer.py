@@ -1,39 +1,59 @@
-from PyQt6.QtWidgets import QTextEdit, QSizePolicy
-from PyQt6.QtCore import Qt
+from collections import deque
+from PyQt6.QtWidgets import QPlainTextEdit, QSizePolicy
+from PyQt6.QtCore import Qt, QTimer
 import logging
 import constants as C
 
 logger = logging.getLogger(__name__)
 
-class LogViewer(QTextEdit):
-    def __init__(self):
+# Render at most once per frame (~60 Hz), however many lines arrive in between
+FRAME_INTERVAL_MS = 16
+
+
+class LogViewer(QPlainTextEdit):
+    def __init__(self, max_lines: int = C.MAX_LOG_LINES_IN_VIEWER):
         super().__init__()
         self.setReadOnly(True)
-        self.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.setStyleSheet("background-color: #2b2b2b; color: #a9b7c6; font-family: Monospace;")
+        # The document drops its oldest blocks itself; 0 keeps everything
+        self.setMaximumBlockCount(max_lines)
+
+        # Lines waiting for the next frame. Bounded like the document: anything
+        # older would be trimmed right after insertion anyway.
+        self._pending = deque(maxlen=max_lines or None)
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FRAME_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
 
     def add_log(self, message: str):
+        self._pending.extend(message.splitlines() or [""])
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Insert all pending lines as a single plain-text append."""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
         try:
+            text = "\n".join(self._pending)
+            self._pending.clear()
+
             # Check if the scrollbar is at the bottom before appending text
             scrollbar = self.verticalScrollBar()
             scroll_at_bottom = scrollbar.value() >= scrollbar.maximum() - 10  # Small tolerance
 
-            # Efficiently remove old lines if max is reached
-            doc = self.document()
-            if doc.blockCount() > C.MAX_LOG_LINES_IN_VIEWER:
-                blocks_to_delete = doc.blockCount() - C.MAX_LOG_LINES_IN_VIEWER
-                cursor = self.textCursor()
-                cursor.movePosition(cursor.MoveOperation.Start)
-                cursor.movePosition(cursor.MoveOperation.NextBlock, cursor.MoveMode.KeepAnchor, blocks_to_delete)
-                cursor.removeSelectedText()
-
-            self.append(message)
+            self.appendPlainText(text)
 
             if scroll_at_bottom:
-                self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+                scrollbar.setValue(scrollbar.maximum())
         except Exception as e:
             logger.error(f"Error adding log message: {e}")
 
     def clear_log(self):
+        self._pending.clear()
+        self._flush_timer.stop()
         self.clear()
@@ -1,8 +1,9 @@
-from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QApplication
-from PyQt6.QtCore import Qt
-from ui.log_viewer import LogViewer
+from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QApplication, QTableView, QAbstractItemView, QHeaderView
+from PyQt6.QtCore import Qt, QTimer
+from ui.log_file_model import LogFileModel
 import constants as C
 from pathlib import Path
+from typing import Optional
 
 
 class LogsWindow(QMainWindow):
@@ -23,28 +24,67 @@ class LogsWindow(QMainWindow):
         toolbar.addWidget(self.copy_btn)
         toolbar.addStretch(1)
 
-        # Log viewer
-        self.log_viewer = LogViewer()
+        # Log view: rows come straight from the memory-mapped log file,
+        # only the visible ones are ever decoded. A table view with fixed row
+        # heights lays out millions of rows in constant time (QListView does not).
+        self.model = LogFileModel(self)
+        self.log_view = QTableView()
+        self.log_view.setModel(self.model)
+        self.log_view.setShowGrid(False)
+        self.log_view.setWordWrap(False)
+        self.log_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.log_view.horizontalHeader().hide()
+        self.log_view.horizontalHeader().setStretchLastSection(True)
+        vheader = self.log_view.verticalHeader()
+        vheader.hide()
+        vheader.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vheader.setDefaultSectionSize(self.log_view.fontMetrics().height() + 2)
+        self.log_view.setStyleSheet("background-color: #2b2b2b; color: #a9b7c6; font-family: Monospace;")
+        self.model.rowsAboutToBeInserted.connect(self._remember_scroll_position)
+        self.model.rowsInserted.connect(self._follow_tail)
+        self._at_bottom = True
 
         layout.addLayout(toolbar)
-        layout.addWidget(self.log_viewer)
+        layout.addWidget(self.log_view)
+
+        # Appends are picked up from the file; bursts of log lines refresh once
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(100)
+        self._refresh_timer.timeout.connect(self.model.refresh)
 
         # Load current log content if available
+        self.log_path: Path = C.LOG_FILE_PATH
         self.load_from_file()
 
-    def load_from_file(self):
+    def load_from_file(self, log_path: Optional[Path] = None):
+        """Show 'log_path' (a connection's log), or keep showing the current one."""
         try:
-            log_path: Path = C.LOG_FILE_PATH
-            if log_path.exists():
-                content = log_path.read_text(errors="ignore")
-                self.log_viewer.setPlainText(content)
+            self.log_path = log_path or self.log_path
+            if self.model.path == self.log_path:
+                self.model.refresh()
+            else:
+                self.model.open(self.log_path)
+            self.setWindowTitle(self.tr("Logs") + f" - {self.log_path.name}")
+            self.log_view.scrollToBottom()
         except Exception:
             # ignore read errors, keep empty viewer
             pass
 
     def append_log(self, message: str):
-        self.log_viewer.add_log(message)
+        # The message is already in (or about to be in) the log file
+        if self.model.path != self.log_path:
+            self.load_from_file()
+        elif not self._refresh_timer.isActive():
+            self._refresh_timer.start()
 
     def copy_all(self):
-        text = self.log_viewer.toPlainText()
-        QApplication.clipboard().setText(text)
+        QApplication.clipboard().setText(self.model.text())
+
+    def _remember_scroll_position(self, *_args):
+        scrollbar = self.log_view.verticalScrollBar()
+        self._at_bottom = scrollbar.value() >= scrollbar.maximum() - 2
+
+    def _follow_tail(self, *_args):
+        if self._at_bottom:
+            self.log_view.scrollToBottom()
@@ -0,0 +1,46 @@
+from typing import Sequence
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+from PyQt6.QtCore import QPointF, QSize, Qt
+from PyQt6.QtGui import QColor, QPainter, QPen, QPolygonF
+
+RX_COLOR = QColor("#2e86de")
+TX_COLOR = QColor("#27ae60")
+
+
+class Sparkline(QWidget):
+    """Small line graph of recent download (rx) and upload (tx) rates on a shared scale."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rx: Sequence[float] = ()
+        self._tx: Sequence[float] = ()
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+
+    def sizeHint(self):
+        return QSize(200, 40)
+
+    def set_values(self, rx: Sequence[float], tx: Sequence[float]):
+        self._rx, self._tx = rx, tx
+        self.update()
+
+    def clear(self):
+        self.set_values((), ())
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(self.palette().mid().color()))
+        painter.drawLine(0, self.height() - 1, self.width(), self.height() - 1)
+        top = max(max(self._rx, default=0), max(self._tx, default=0))
+        if top <= 0:
+            return
+        for values, color in ((self._rx, RX_COLOR), (self._tx, TX_COLOR)):
+            if len(values) < 2:
+                continue
+            step = (self.width() - 1) / (len(values) - 1)
+            height = self.height() - 2
+            points = QPolygonF(
+                [QPointF(i * step, 1 + height * (1 - v / top)) for i, v in enumerate(values)]
+            )
+            painter.setPen(QPen(color, 1.5, Qt.PenStyle.SolidLine))
+            painter.drawPolyline(points)
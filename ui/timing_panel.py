@@ -0,0 +1,108 @@
+from pathlib import Path
+from typing import Optional
+from PyQt6.QtWidgets import (
+    QMainWindow,
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QComboBox,
+    QLabel,
+    QPushButton,
+    QTableView,
+    QAbstractItemView,
+    QHeaderView,
+)
+from PyQt6.QtGui import QStandardItemModel, QStandardItem
+from PyQt6.QtCore import Qt
+from connect_timing import HELPER_PHASES, HELPER_STOP_PHASES, ConnectTimingStore, format_duration
+
+
+class TimingPanel(QMainWindow):
+    """p50/p95 of each phase of connecting, per config, from the persisted timing histograms."""
+
+    def __init__(self, store: ConnectTimingStore, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.setWindowTitle(self.tr("Connection Timing"))
+        self.setMinimumSize(560, 420)
+
+        central = QWidget(self)
+        self.setCentralWidget(central)
+        layout = QVBoxLayout(central)
+
+        top = QHBoxLayout()
+        self.config_combo = QComboBox()
+        self.config_combo.currentIndexChanged.connect(lambda _i: self.refresh())
+        self.reset_button = QPushButton(self.tr("Reset"))
+        self.reset_button.setToolTip(self.tr("Forget the recorded timings of this config"))
+        self.reset_button.clicked.connect(self.reset_selected)
+        top.addWidget(self.config_combo, 1)
+        top.addWidget(self.reset_button)
+
+        self.table = QStandardItemModel(0, 4, self)
+        self.table.setHorizontalHeaderLabels(
+            [self.tr("Phase"), self.tr("p50"), self.tr("p95"), self.tr("Samples")]
+        )
+        self.table_view = QTableView()
+        self.table_view.setModel(self.table)
+        self.table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.verticalHeader().hide()
+        header = self.table_view.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+
+        layout.addLayout(top)
+        layout.addWidget(self.table_view)
+        layout.addWidget(self.status_label)
+
+    def show_config(self, config_path: Optional[Path]):
+        """Reload the list of configs and select 'config_path' if it has timings."""
+        self.config_combo.blockSignals(True)
+        self.config_combo.clear()
+        for config in self.store.configs():
+            self.config_combo.addItem(Path(config).name, config)
+        index = self.config_combo.findData(str(config_path)) if config_path is not None else -1
+        self.config_combo.setCurrentIndex(max(index, 0))
+        self.config_combo.blockSignals(False)
+        self.refresh()
+
+    def refresh(self):
+        self.table.removeRows(0, self.table.rowCount())
+        config = self.config_combo.currentData()
+        self.reset_button.setEnabled(config is not None)
+        if config is None:
+            self.status_label.setText(self.tr("No connection has been timed yet."))
+            return
+        for stats in self.store.summary(config):
+            key = stats.phase.key
+            indent = "    " if key in HELPER_PHASES or key in HELPER_STOP_PHASES or key == "sudo" else ""
+            row = [
+                QStandardItem(indent + self.tr(stats.phase.label)),
+                QStandardItem(format_duration(stats.p50)),
+                QStandardItem(format_duration(stats.p95)),
+                QStandardItem(str(stats.count)),
+            ]
+            for item in row[1:]:
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            if stats.phase.key == "total":
+                for item in row:
+                    font = item.font()
+                    font.setBold(True)
+                    item.setFont(font)
+            self.table.appendRow(row)
+        self.status_label.setText(
+            self.tr(
+                "Connect phases come from successful connects only. "
+                "Indented rows are parts of the helper command above them."
+            )
+        )
+
+    def reset_selected(self):
+        config = self.config_combo.currentData()
+        if config is not None:
+            self.store.clear(config)
+            self.show_config(None)
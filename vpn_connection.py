@@ -0,0 +1,558 @@
+# vpn_connection.py
+"""
+One OpenVPN tunnel: its state machine, log stream and management socket.
+
+VPNManager owns one VpnConnection per config it has touched and runs the
+helper commands for them; everything that depends on which tunnel a
+message is about lives here.
+"""
+import codecs
+import logging
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Union
+
+from PyQt6.QtCore import QCoreApplication, QObject, pyqtSignal
+
+import constants as C
+from command_executor import CommandResult
+from connect_timing import HELPER_PHASES_PREFIX, LOG_MARKS, parse_helper_phases, phase_durations
+from helper_client import HelperResult
+from log_classifier import LogClassifier, LogEvent, LogEventKind
+from log_tailer import LogTailer
+from management_client import ManagementClient, find_management_socket
+from telemetry import TrafficSampler
+
+if TYPE_CHECKING:
+    from vpn_manager import VPNManager
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = (C.VpnState.CONNECTING, C.VpnState.CONNECTED)
+
+
+class VpnConnection(QObject):
+    state_changed = pyqtSignal(C.VpnState)
+    log_received = pyqtSignal(str)
+    traffic_updated = pyqtSignal(int, int)  # total bytes in, bytes out
+    timing_recorded = pyqtSignal(dict)  # seconds per phase of a successful attempt
+
+    def __init__(self, config_path: Path, manager: "VPNManager"):
+        super().__init__(manager)
+        self.config_path = Path(config_path)
+        self.log_path = C.connection_log_path(self.config_path)
+        self.state = C.VpnState.DISCONNECTED
+        self._manager = manager
+        self._ever_connected = False
+        self._connected_polls: int = 0
+        # Monotonic timestamps of the current attempt's phases (connect_requested,
+        # helper_invoked, helper_started, the LOG_MARKS, connected, disconnected)
+        self.timings: Dict[str, float] = {}
+        # Durations the helper measured inside its start command
+        self.helper_phases: Dict[str, float] = {}
+        # Held by start and stop jobs while they run, so a stop never overtakes
+        # a cancelled start that has already reached the helper
+        self._helper_lock = threading.Lock()
+        # Set once the latest archive job holds (or will never take) the lock
+        self._archived: Optional[threading.Event] = None
+
+        # Real-time log tailing (inotify-driven, polls when watching is unavailable)
+        self._log_tailer = LogTailer(self.log_path, self)
+        self._log_tailer.data_received.connect(self._on_log_data)
+        self._log_tailer.reset.connect(self._on_log_reset)
+        # Classifies tailed log lines as they arrive (auth failure, TLS error, ...)
+        self._log_classifier = LogClassifier()
+        self._log_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        # OpenVPN management interface: push-based state, byte counters and log
+        self._management: Optional[ManagementClient] = None
+        self._last_fatal: Optional[str] = None
+
+        # Throughput history of the current (or last) session
+        self.telemetry = TrafficSampler(parent=self)
+
+    @property
+    def name(self) -> str:
+        return self.config_path.name
+
+    def is_active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+    def last_failure(self) -> Optional[LogEventKind]:
+        """Why the last attempt failed, as far as the log tells; None if unknown."""
+        if self.state == C.VpnState.AUTH_FAILED:
+            return LogEventKind.AUTH_FAILED
+        failure = self._log_classifier.first_failure()
+        return failure.kind if failure is not None else None
+
+    def _tag(self, command: str) -> str:
+        """Executor tag of this connection's helper commands."""
+        return f"{command}:{self.config_path}"
+
+    def _set_state(self, state: C.VpnState):
+        if self.state != state:
+            logger.info(
+                f"VPN state of {self.name} changing from {self.state.name} to {state.name}"
+            )
+            self.state = state
+            self.state_changed.emit(self.state)
+
+    def _emit_log_snippet(self, header: str = "Startup error log excerpt:", max_lines: int = 25):
+        """Emit the last lines of the OpenVPN log to help diagnose startup issues."""
+        try:
+            content = self.log_path.read_text()
+            lines = content.splitlines()
+            snippet = "\n".join(lines[-max_lines:])
+            if snippet.strip():
+                self.log_received.emit(f"{header}\n{snippet}")
+        except Exception:
+            # If we can't read the log, ignore silently
+            pass
+
+    # --- Start / stop ---
+    def start(self, username: str, password: str):
+        manager = self._manager
+        self.log_path = C.connection_log_path(self.config_path)
+        self._set_state(C.VpnState.CONNECTING)
+        self.log_received.emit(f"Connecting to {self.name}...")
+        self._ever_connected = False
+        self._connected_polls = 0
+        self.timings = {"connect_requested": time.monotonic()}
+        self.helper_phases = {}
+
+        # Clear previous log file to avoid reading old status messages
+        try:
+            if self.log_path.exists():
+                self.log_path.unlink()
+        except Exception as e:
+            logger.warning(f"Could not clear log file: {e}")
+        self._reset_log_tail()
+
+        config_path, log_path, timings = self.config_path, self.log_path, self.timings
+        auth_input = f"{username}\n{password}\n"
+        archived = self._archived
+
+        def run_start(ctx):
+            if archived is not None:
+                # A reconnect follows a drop closely; the stop that archives the
+                # dropped session must reach the helper first, not tear this one down
+                archived.wait(ctx.remaining())
+            with self._helper_lock:
+                remote_flags = manager._remote_flags(config_path)
+                # Disconnect may have been clicked while the remotes were probed
+                ctx.check()
+                timings["helper_invoked"] = time.monotonic()
+                return manager._run_helper_start(config_path, log_path, auth_input, ctx, remote_flags)
+
+        manager._executor.submit(
+            run_start,
+            tag=self._tag("start"),
+            timeout=manager._START_CMD_TIMEOUT_SECONDS + C.REMOTE_PROBE_TIMEOUT_SECONDS + 5,
+            callback=self._on_start_finished,
+        )
+
+    def _on_start_finished(self, command: CommandResult):
+        if command.cancelled or self.state != C.VpnState.CONNECTING:
+            # Disconnected while the helper was starting
+            return
+        try:
+            if command.timed_out:
+                raise subprocess.TimeoutExpired("start", self._manager._START_CMD_TIMEOUT_SECONDS)
+            if command.error is not None:
+                raise command.error
+            result = command.value
+
+            if result.returncode != 0:
+                error_message = result.stderr.strip()
+                logger.error(f"Helper script failed: {error_message}")
+                # Provide a clearer hint when sudo requires a password or askpass failed
+                lower_err = error_message.lower()
+                if (
+                    "a password is required" in lower_err
+                    or "askpass" in lower_err
+                    or "ein passwort ist notwendig" in lower_err
+                    or "passwort" in lower_err and "sudo" in lower_err
+                ):
+                    error_message += (
+                        "\nHinweis: Füge deinen Benutzer der Gruppe 'openvpn' hinzu und melde dich neu an (oder starte neu). "
+                        "Die App nutzt eine NOPASSWD-sudoers-Regel für den Helper."
+                    )
+                raise RuntimeError(error_message)
+
+            self.timings["helper_started"] = time.monotonic()
+            self.helper_phases = parse_helper_phases(result.stdout)
+            self.log_received.emit("VPN process started via helper.")
+            self.telemetry.start()
+            # Start watching only if a Qt application exists (prevents test/headless crashes)
+            self._start_watching_if_possible()
+            self._start_management(find_management_socket(result.stdout))
+
+        except subprocess.TimeoutExpired:
+            self.log_received.emit("Connection timeout - helper script did not respond")
+            self._cleanup(error=True)
+        except Exception as e:
+            self.log_received.emit(f"Error connecting: {e}")
+            self._cleanup(error=True)
+
+    def adopt(self):
+        """
+        Take over a tunnel the helper reports running that was started by
+        another process (e.g. an earlier 'main.py --headless connect'): it is
+        marked connected and then monitored like one started here.
+        """
+        if self.is_active():
+            return
+        self.log_path = C.connection_log_path(self.config_path)
+        self.timings = {}
+        self.helper_phases = {}
+        self._connected_polls = 0
+        self._ever_connected = True
+        self._set_state(C.VpnState.CONNECTED)
+        self.log_received.emit(f"Attached to the running tunnel of {self.name}.")
+        self.telemetry.start()
+        self._start_watching_if_possible()
+
+    def stop(self):
+        manager = self._manager
+        self._set_state(C.VpnState.DISCONNECTING)
+        self.log_received.emit("Disconnecting...")
+        # A start still in flight must not race the stop
+        manager._executor.cancel_all(self._tag("start"))
+
+        config_name, log_path, timings = self.name, self.log_path, self.timings
+
+        def run_stop(ctx):
+            timings["disconnect_requested"] = time.monotonic()
+            # Waits for the cancelled start to return; if it got as far as
+            # the helper, this stop takes the tunnel down again
+            with self._helper_lock:
+                return manager._run_helper(
+                    "stop",
+                    config_name,
+                    str(log_path),
+                    timeout=manager._DISCONNECT_CMD_TIMEOUT_SECONDS,
+                    check=True,
+                    context=ctx,
+                )
+
+        manager._executor.submit(
+            run_stop,
+            tag=self._tag("stop"),
+            timeout=manager._DISCONNECT_CMD_TIMEOUT_SECONDS + 5,
+            callback=self._on_stop_finished,
+        )
+
+    def _on_stop_finished(self, command: CommandResult):
+        try:
+            if command.timed_out:
+                self.log_received.emit("Disconnect timed out - helper script did not respond")
+            elif isinstance(command.error, subprocess.CalledProcessError):
+                self.log_received.emit(
+                    f"Error during disconnect: {(command.error.stderr or '').strip()}"
+                )
+            elif command.error is not None:
+                self.log_received.emit(
+                    "An unexpected error occurred during disconnect: " f"{command.error}"
+                )
+            elif command.value is not None:
+                self.timings["helper_stopped"] = time.monotonic()
+                self.helper_phases.update(parse_helper_phases(command.value.stdout))
+                self._record_timings("stop", "unit_stop")
+                output = "\n".join(
+                    line for line in command.value.stdout.strip().splitlines()
+                    if not line.startswith(HELPER_PHASES_PREFIX)
+                )
+                self.log_received.emit(f"Disconnect command sent. Helper output: {output}")
+        finally:
+            # The config may have been connected again while the stop was running
+            if self.state == C.VpnState.DISCONNECTING:
+                self._cleanup()
+
+    # --- Status ---
+    def check_connect_timeout(self) -> bool:
+        """Fail a CONNECTING attempt that exceeded the connect timeout; True if it did."""
+        started = self.timings.get("connect_requested")
+        if self.state != C.VpnState.CONNECTING or started is None:
+            return False
+        elapsed = time.monotonic() - started
+        if elapsed <= self._manager._CONNECT_TIMEOUT_SECONDS:
+            return False
+        self.log_received.emit(f"Connection attempt timed out after {int(elapsed)}s.")
+        self._emit_log_snippet(header="Timeout log excerpt:")
+        # Ask helper to stop and archive last session log
+        self._invoke_helper_stop_for_archive()
+        self._cleanup(error=True)
+        return True
+
+    def apply_status(self, outcome: Union[HelperResult, BaseException]):
+        """Act on this config's answer from the manager's status sweep."""
+        if not self.is_active():
+            return
+        try:
+            if isinstance(outcome, BaseException):
+                raise outcome
+            status_str = outcome.stdout.strip()
+
+            # Catch up on log lines the tail has not classified yet
+            self._poll_log_file()
+            if not self.is_active():
+                # A classified log line already settled the attempt
+                return
+            log_seen = self._log_tailer.is_open()
+            classifier = self._log_classifier
+
+            if status_str == "connected":
+                if self.state != C.VpnState.CONNECTED:
+                    if classifier.seen(LogEventKind.INIT_COMPLETE):
+                        self._mark_connected("Connection successfully established.")
+                    elif self._management_active():
+                        # The management interface reports CONNECTED without polling heuristics
+                        pass
+                    else:
+                        # Fallback: after several consecutive 'connected' reports, proceed
+                        self._connected_polls += 1
+                        if self._connected_polls >= 3:
+                            if log_seen:
+                                self._mark_connected(
+                                    "Helper reports connected repeatedly; proceeding without the usual log marker."
+                                )
+                            else:
+                                self._mark_connected(
+                                    "Helper reports connected repeatedly; proceeding though log not yet readable."
+                                )
+                        # otherwise, stay in CONNECTING
+
+            elif status_str == "error":
+                if classifier.seen(LogEventKind.AUTH_FAILED):
+                    self.log_received.emit("Authentication failed.")
+                    self._set_state(C.VpnState.AUTH_FAILED)
+                    self._emit_log_snippet()
+                else:
+                    self.log_received.emit(
+                        "VPN connection failed or is in an error state."
+                    )
+                    self._emit_log_snippet()
+                # Ensure helper stops and archives the session log into Documents
+                self._invoke_helper_stop_for_archive()
+                self._cleanup(error=True)
+            else:  # disconnected or not yet active
+                if self.state == C.VpnState.CONNECTED:
+                    self.log_received.emit("VPN terminated.")
+                    # Archive last session log into Documents
+                    self._invoke_helper_stop_for_archive()
+                    self._cleanup()
+                elif classifier.seen(LogEventKind.AUTH_FAILED):
+                    # If the process died early, infer the likely cause from the log.
+                    self.log_received.emit("Authentication failed.")
+                    self._set_state(C.VpnState.AUTH_FAILED)
+                    self._emit_log_snippet()
+                    # Archive last session log into Documents
+                    self._invoke_helper_stop_for_archive()
+                    self._cleanup(error=True)
+                elif classifier.first_failure() is not None:
+                    self._report_startup_failure()
+                    self._emit_log_snippet()
+                    # Archive last session log into Documents
+                    self._invoke_helper_stop_for_archive()
+                    self._cleanup(error=True)
+                # else, keep waiting for next poll
+
+        except Exception as e:
+            self.log_received.emit(f"Could not check VPN status: {e}")
+            self._cleanup(error=True)
+
+    def _mark_connected(self, message: str):
+        self.log_received.emit(message)
+        self.timings["connected"] = time.monotonic()
+        self._set_state(C.VpnState.CONNECTED)
+        self._ever_connected = True
+        self._connected_polls = 0
+        self._record_timings()
+
+    def _record_timings(self, *phases: str):
+        """Report the attempt's phase durations (only 'phases' if given)."""
+        durations = phase_durations(self.timings, self.helper_phases)
+        if phases:
+            durations = {k: v for k, v in durations.items() if k in phases}
+        if durations:
+            self.timing_recorded.emit(durations)
+
+    def _report_startup_failure(self):
+        failure = self._log_classifier.first_failure()
+        if self._last_fatal:
+            self.log_received.emit(f"VPN startup failed: {self._last_fatal}")
+        elif failure is not None:
+            self.log_received.emit(f"VPN startup failed: {failure.line.strip()}")
+        else:
+            self.log_received.emit("VPN startup failed. See log for details.")
+
+    def _cleanup(self, error=False):
+        self.telemetry.stop()
+        self._log_tailer.stop()
+        self._log_tailer.close()
+        self._stop_management()
+        self.timings["disconnected"] = time.monotonic()
+
+        if error:
+            # Preserve AUTH_FAILED state if already set
+            if self.state != C.VpnState.AUTH_FAILED:
+                self._set_state(C.VpnState.ERROR)
+        else:
+            self._set_state(C.VpnState.DISCONNECTED)
+
+        self._connected_polls = 0
+
+    # --- Internal: management interface ---
+    def _start_management(self, socket_path: Optional[Path]):
+        """Subscribe to OpenVPN's management socket announced by the helper."""
+        self._stop_management()
+        self._last_fatal = None
+        if socket_path is None or QCoreApplication.instance() is None:
+            return
+        try:
+            client = ManagementClient(socket_path, self)
+            client.state_changed.connect(self._on_management_state)
+            client.bytecount.connect(self.traffic_updated)
+            client.bytecount.connect(self.telemetry.feed_bytecount)
+            client.log_line.connect(self._on_management_log)
+            client.password_event.connect(self._on_management_password)
+            client.fatal.connect(self._on_management_fatal)
+            self._management = client
+            client.open()
+        except Exception as e:
+            logger.warning(f"Could not attach to management interface: {e}")
+            self._management = None
+
+    def _stop_management(self):
+        if self._management is not None:
+            try:
+                self._management.close()
+                self._management.deleteLater()
+            except Exception:
+                pass
+            self._management = None
+
+    def _management_active(self) -> bool:
+        return self._management is not None and self._management.is_connected()
+
+    def _on_management_state(self, state: str, description: str):
+        if not self.is_active():
+            return
+        if state == "CONNECTED":
+            if self.state != C.VpnState.CONNECTED:
+                self._mark_connected("Connection successfully established.")
+        elif state == "RECONNECTING":
+            self.log_received.emit(f"OpenVPN is reconnecting ({description or 'no reason given'}).")
+        elif state == "EXITING" and description == "auth-failure":
+            self._fail_authentication()
+
+    def _on_management_password(self, payload: str):
+        # Sent as ">PASSWORD:Verification Failed: 'Auth'" when the server rejects us
+        if "Verification Failed" in payload and self.is_active():
+            self._fail_authentication()
+
+    def _on_management_log(self, flags: str, message: str):
+        if "F" in flags:
+            self._last_fatal = message
+
+    def _on_management_fatal(self, message: str):
+        self._last_fatal = message
+
+    def _fail_authentication(self):
+        self.log_received.emit("Authentication failed.")
+        self._set_state(C.VpnState.AUTH_FAILED)
+        self._emit_log_snippet()
+        self._invoke_helper_stop_for_archive()
+        self._cleanup(error=True)
+
+    # --- Internal: log tailing ---
+    def _reset_log_tail(self):
+        self._log_tailer.close()
+        self._on_log_reset()
+
+    def _start_watching_if_possible(self):
+        """Start log tailing only if a Qt application exists; the status
+        sweep itself is driven by the manager."""
+        try:
+            if QCoreApplication.instance() is None:
+                return
+            # Stream from the start of the fresh log
+            self._reset_log_tail()
+            self._log_tailer.set_path(self.log_path)
+            self._log_tailer.start()
+        except Exception:
+            # Never let tailing issues break core logic
+            pass
+        self._manager._start_status_sweep_if_possible()
+
+    def _poll_log_file(self):
+        """Read whatever the tail has not delivered yet (used before status decisions)."""
+        try:
+            self._log_tailer.set_path(self.log_path)
+            self._log_tailer.drain()
+        except Exception:
+            # Do not spam errors into UI; silent failure is fine here
+            return
+
+    def _on_log_reset(self):
+        self._log_classifier.reset()
+        self._log_decoder.reset()
+
+    def _on_log_data(self, chunk: bytes):
+        events = self._log_classifier.feed(chunk)
+        self.telemetry.scan_log(chunk)
+        # Emit as-is; UI will append
+        text = self._log_decoder.decode(chunk)
+        if text:
+            self.log_received.emit(text.rstrip("\n"))
+        for event in events:
+            self._on_log_event(event)
+
+    def _on_log_event(self, event: LogEvent):
+        """React to classified log lines as soon as the tail sees them."""
+        mark = LOG_MARKS.get(event.kind)
+        if mark is not None:
+            if self.is_active() and mark not in self.timings:
+                self.timings[mark] = time.monotonic()
+                if mark == "dns_fixed" and "connected" in self.timings:
+                    # The fix-up runs in the background and usually lands after connecting
+                    self._record_timings("dns_fixup")
+        elif event.kind == LogEventKind.INIT_COMPLETE:
+            if self.state == C.VpnState.CONNECTING:
+                self._mark_connected("Connection successfully established.")
+        elif event.kind == LogEventKind.AUTH_FAILED:
+            if self.is_active():
+                self._fail_authentication()
+
+    def _invoke_helper_stop_for_archive(self):
+        """Ask helper to run 'stop' to archive logs into Documents. Safe to call multiple times."""
+        manager = self._manager
+        try:
+            config_name, log_path = self.name, self.log_path
+            archived = self._archived = threading.Event()
+
+            def run_archive(ctx):
+                try:
+                    with self._helper_lock:
+                        archived.set()
+                        return manager._run_helper(
+                            "archive",
+                            config_name,
+                            str(log_path),
+                            timeout=manager._DISCONNECT_CMD_TIMEOUT_SECONDS,
+                            context=ctx,
+                        )
+                finally:
+                    archived.set()
+
+            manager._executor.submit(
+                run_archive,
+                tag=self._tag("archive"),
+                timeout=manager._DISCONNECT_CMD_TIMEOUT_SECONDS + 5,
+                # Also when cancelled before it ran
+                callback=lambda command: archived.set(),
+            )
+        except Exception:
+            pass
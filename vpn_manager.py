@@ -1,409 +1,414 @@
 # vpn_manager.py
 import subprocess
 import logging
-import signal
 import os
-import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Union
 from PyQt6.QtCore import QObject, pyqtSignal, QTimer, QCoreApplication
 import constants as C
+from command_executor import CommandContext, CommandExecutor, CommandResult
+from connect_timing import ConnectTimingStore, format_duration
+from helper_backend import HelperBackend
+from helper_client import (
+    REMOTE_FLAG_RE,
+    HelperClient,
+    HelperError,
+    HelperResult,
+    HelperUnavailableError,
+    parse_status_all,
+)
+from ovpn_parser import load_ovpn
+from remote_probe import RemoteProber, preferred_remote_order, remote_flag
+from vpn_connection import VpnConnection
 
 logger = logging.getLogger(__name__)
 
 
 class VPNManager(QObject):
-    state_changed = pyqtSignal(C.VpnState)
+    """
+    Runs any number of tunnels side by side, one VpnConnection per config.
+    A single status sweep polls all active connections together instead of
+    one timer per tunnel.
+    """
+
+    # Per-connection signals carry the config path as the first argument
+    connection_state_changed = pyqtSignal(str, C.VpnState)
+    connection_log_received = pyqtSignal(str, str)
+    connection_traffic_updated = pyqtSignal(str, int, int)  # total bytes in, bytes out
+    connection_telemetry_updated = pyqtSignal(str)  # a new throughput sample was recorded
+    connection_timing_recorded = pyqtSignal(str)  # phase durations were added to timing_store
+    # Messages not about any one connection
     log_received = pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, backend: Optional[HelperBackend] = None):
         super().__init__()
-        self._process = None
-        self._current_config_path: Optional[Path] = None
-        self._state = C.VpnState.NO_CONFIG_SELECTED
-        self._ever_connected = False
-        # Track connection attempt timing and heuristics
-        self._connect_started_at: Optional[float] = None
-        self._connected_polls: int = 0
+        self._connections: Dict[str, VpnConnection] = {}
 
         # Timeout thresholds
         self._CONNECT_TIMEOUT_SECONDS = 90  # fail CONNECTING after this many seconds
+        self._START_CMD_TIMEOUT_SECONDS = 10
         self._STATUS_CMD_TIMEOUT_SECONDS = 5
         self._DISCONNECT_CMD_TIMEOUT_SECONDS = 15
 
+        # Helper invocations run off the GUI thread; results come back via callbacks
+        self._executor = CommandExecutor(self)
+
+        # One sweep over all active connections every 2 seconds
         self._status_timer = QTimer(self)
-        self._status_timer.setInterval(2000)  # Check status every 2 seconds
+        self._status_timer.setInterval(2000)
         self._status_timer.timeout.connect(self.check_connection_status)
 
-        # Real-time log tailing
-        self._log_timer = QTimer(self)
-        self._log_timer.setInterval(800)  # poll ~1x/sec
-        self._log_timer.timeout.connect(self._poll_log_file)
-        self._log_file_pos = 0
-        self._log_inode = None
-
-    def _set_state(self, state: C.VpnState):
-        if self._state != state:
-            logger.info(
-                f"VPN state changing from {self._state.name} to {state.name}"
-            )
-            self._state = state
-            self.state_changed.emit(self._state)
-
-    def _emit_log_snippet(self, header: str = "Startup error log excerpt:", max_lines: int = 25):
-        """Emit the last lines of the OpenVPN log to help diagnose startup issues."""
-        try:
-            content = C.LOG_FILE_PATH.read_text()
-            lines = content.splitlines()
-            snippet = "\n".join(lines[-max_lines:])
-            if snippet.strip():
-                self.log_received.emit(f"{header}\n{snippet}")
-        except Exception:
-            # If we can't read the log, ignore silently
-            pass
-
-    def connect(self, config_path: str, username: str, password: str):
-        if (
-            self._state == C.VpnState.CONNECTING
-            or self._state == C.VpnState.CONNECTED
-        ):
-            self.log_received.emit("Already connected or connecting.")
-            return
-
-        self._current_config_path = Path(config_path)
-        self._set_state(C.VpnState.CONNECTING)
-        self.log_received.emit(
-            f"Connecting to {self._current_config_path.name}..."
+        # Ranks a config's remotes by probe RTT before each connect
+        self._remote_prober = RemoteProber(
+            C.REMOTE_PROBE_TIMEOUT_SECONDS, C.REMOTE_PROBE_CACHE_TTL_SECONDS
         )
-        self._ever_connected = False
-        self._connect_started_at = time.monotonic()
-        self._connected_polls = 0
-
-        # Clear previous log file to avoid reading old status messages
-        try:
-            if C.LOG_FILE_PATH.exists():
-                C.LOG_FILE_PATH.unlink()
-        except Exception as e:
-            logger.warning(f"Could not clear log file: {e}")
-
-        try:
-            command = [
-                "sudo",
-                "-n",
-                str(C.HELPER_SCRIPT_PATH),
-                "start",
-                str(self._current_config_path),
-                str(C.LOG_FILE_PATH),
-            ]
-
-            auth_input = f"{username}\n{password}\n"
-
-            self._process = subprocess.Popen(
-                command,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-
-            try:
-                stdout, stderr = self._process.communicate(input=auth_input, timeout=10)
-            except subprocess.TimeoutExpired:
-                self._process.kill()
-                stdout, stderr = self._process.communicate()
-                raise RuntimeError("Helper script timed out")
-
-            if self._process.returncode != 0:
-                error_message = stderr.strip()
-                logger.error(f"Helper script failed: {error_message}")
-                # Provide a clearer hint when sudo requires a password or askpass failed
-                lower_err = error_message.lower()
-                if (
-                    "a password is required" in lower_err
-                    or "askpass" in lower_err
-                    or "ein passwort ist notwendig" in lower_err
-                    or "passwort" in lower_err and "sudo" in lower_err
-                ):
-                    error_message += (
-                        "\nHinweis: Füge deinen Benutzer der Gruppe 'openvpn' hinzu und melde dich neu an (oder starte neu). "
-                        "Die App nutzt eine NOPASSWD-sudoers-Regel für den Helper."
-                    )
-                raise RuntimeError(error_message)
-
-            self.log_received.emit("VPN process started via helper.")
-            # Start timers only if a Qt application exists (prevents test/headless crashes)
-            self._start_timers_if_possible()
-
-        except subprocess.TimeoutExpired:
-            self.log_received.emit("Connection timeout - helper script did not respond")
-            self._cleanup(error=True)
-        except Exception as e:
-            self.log_received.emit(f"Error connecting: {e}")
-            self._cleanup(error=True)
 
-    def disconnect(self):
-        if not self._current_config_path:
-            self.log_received.emit(
-                "Not currently connected or no config selected."
+        # Persistent helper daemon; falls back to sudo when it is not running
+        self._helper_client: Optional[HelperClient] = HelperClient(C.HELPER_SOCKET_PATH)
+        # When set, runs every helper command instead of the daemon and sudo
+        # (e.g. the simulator of helper_backend.py)
+        self._backend = backend
+        # Cleared once the helper turns out to predate 'status-all'
+        self._status_all_supported = True
+        # Set once it has been logged that connections cannot be monitored
+        self._warned_no_event_loop = False
+
+        # How long each phase of connecting took, per config, across sessions
+        self.timing_store = ConnectTimingStore()
+
+    # --- Connections ---
+    def connection(self, config_path) -> Optional[VpnConnection]:
+        return self._connections.get(str(config_path))
+
+    def connections(self) -> List[VpnConnection]:
+        return list(self._connections.values())
+
+    def active_connections(self) -> List[VpnConnection]:
+        return [c for c in self._connections.values() if c.is_active()]
+
+    def state(self, config_path) -> C.VpnState:
+        connection = self.connection(config_path)
+        return connection.state if connection is not None else C.VpnState.DISCONNECTED
+
+    def _connection(self, config_path) -> VpnConnection:
+        """The connection for a config, created on first use."""
+        key = str(config_path)
+        connection = self._connections.get(key)
+        if connection is None:
+            connection = VpnConnection(Path(config_path), self)
+            connection.state_changed.connect(
+                lambda state, key=key: self.connection_state_changed.emit(key, state)
             )
-            return
-
-        self._set_state(C.VpnState.DISCONNECTING)
-        self.log_received.emit("Disconnecting...")
-
-        try:
-            command = [
-                "sudo",
-                "-n",
-                str(C.HELPER_SCRIPT_PATH),
-                "stop",
-                self._current_config_path.name,
-                str(C.LOG_FILE_PATH),
-            ]
-            result = subprocess.run(
-                command, check=True, capture_output=True, text=True, timeout=self._DISCONNECT_CMD_TIMEOUT_SECONDS
+            connection.log_received.connect(
+                lambda message, key=key: self.connection_log_received.emit(key, message)
             )
-            self.log_received.emit(
-                "Disconnect command sent. Helper output: "
-                f"{result.stdout.strip()}"
+            connection.traffic_updated.connect(
+                lambda rx, tx, key=key: self.connection_traffic_updated.emit(key, rx, tx)
             )
-
-        except subprocess.CalledProcessError as e:
-            self.log_received.emit(
-                f"Error during disconnect: {e.stderr.strip()}"
+            connection.telemetry.updated.connect(
+                lambda key=key: self.connection_telemetry_updated.emit(key)
             )
-        except Exception as e:
-            self.log_received.emit(
-                "An unexpected error occurred during disconnect: " f"{e}"
+            connection.timing_recorded.connect(
+                lambda durations, key=key: self._record_timing(key, durations)
             )
-        finally:
-            self._cleanup()
+            self._connections[key] = connection
+        return connection
 
-    def check_connection_status(self):
-        if not self._current_config_path:
-            self._cleanup()
+    def connect(self, config_path: str, username: str, password: str):
+        connection = self._connection(config_path)
+        if connection.is_active():
+            connection.log_received.emit("Already connected or connecting.")
             return
+        connection.start(username, password)
 
-        # Guard: abort CONNECTING if we've exceeded a reasonable timeout
-        if self._state == C.VpnState.CONNECTING and self._connect_started_at is not None:
-            elapsed = time.monotonic() - self._connect_started_at
-            if elapsed > self._CONNECT_TIMEOUT_SECONDS:
+    def disconnect(self, config_path=None):
+        """Disconnect one config; without a path, the only active connection."""
+        if config_path is None:
+            active = self.active_connections()
+            if len(active) != 1:
                 self.log_received.emit(
-                    f"Connection attempt timed out after {int(elapsed)}s."
+                    "Not currently connected or no config selected."
+                    if not active
+                    else "Several connections are active; choose one to disconnect."
                 )
-                self._emit_log_snippet(header="Timeout log excerpt:")
-                # Ask helper to stop and archive last session log
-                self._invoke_helper_stop_for_archive()
-                self._cleanup(error=True)
                 return
-
-        try:
-            command = [
-                "sudo",
-                "-n",
-                str(C.HELPER_SCRIPT_PATH),
-                "status",
-                self._current_config_path.name,
-            ]
-            result = subprocess.run(
-                command, check=True, capture_output=True, text=True, timeout=self._STATUS_CMD_TIMEOUT_SECONDS
-            )
-            status_str = result.stdout.strip()
-
-            if status_str == "connected":
-                if self._state != C.VpnState.CONNECTED:
-                    try:
-                        log_content = C.LOG_FILE_PATH.read_text()
-                        if "Initialization Sequence Completed" in log_content:
-                            self.log_received.emit(
-                                "Connection successfully established."
-                            )
-                            self._set_state(C.VpnState.CONNECTED)
-                            self._ever_connected = True
-                            self._connected_polls = 0
-                        else:
-                            # Fallback: after several consecutive 'connected' reports, proceed
-                            self._connected_polls += 1
-                            if self._connected_polls >= 3:
-                                self.log_received.emit(
-                                    "Helper reports connected repeatedly; proceeding without the usual log marker."
-                                )
-                                self._set_state(C.VpnState.CONNECTED)
-                                self._ever_connected = True
-                                self._connected_polls = 0
-                            # otherwise, stay in CONNECTING
-                    except FileNotFoundError:
-                        # Log not yet available, count towards heuristic
-                        self._connected_polls += 1
-                        if self._connected_polls >= 3:
-                            self.log_received.emit(
-                                "Helper reports connected repeatedly; proceeding though log not yet readable."
-                            )
-                            self._set_state(C.VpnState.CONNECTED)
-                            self._ever_connected = True
-                            self._connected_polls = 0
-
-            elif status_str == "error":
-                # Try to determine if this was an authentication failure
-                auth_failed = False
-                try:
-                    log_content = C.LOG_FILE_PATH.read_text()
-                    if any(x in log_content.upper() for x in ["AUTH_FAILED", "AUTH FAILURE", "AUTH FAILED", "AUTHENTICATION FAILED"]):
-                        auth_failed = True
-                except Exception:
-                    pass
-
-                if auth_failed:
-                    self.log_received.emit("Authentication failed.")
-                    self._set_state(C.VpnState.AUTH_FAILED)
-                    self._emit_log_snippet()
-                else:
-                    self.log_received.emit(
-                        "VPN connection failed or is in an error state."
-                    )
-                    self._emit_log_snippet()
-                # Ensure helper stops and archives the session log into Documents
-                self._invoke_helper_stop_for_archive()
-                self._cleanup(error=True)
-            else:  # disconnected or not yet active
-                if self._state == C.VpnState.CONNECTED:
-                    self.log_received.emit("VPN terminated.")
-                    # Archive last session log into Documents
-                    self._invoke_helper_stop_for_archive()
-                    self._cleanup()
-                elif self._state == C.VpnState.CONNECTING:
-                    # If the process died early, try to infer likely cause from the log.
-                    try:
-                        log_upper = C.LOG_FILE_PATH.read_text().upper()
-                        auth_markers = [
-                            "AUTH_FAILED",
-                            "AUTH FAILURE",
-                            "AUTH FAILED",
-                            "AUTHENTICATION FAILED",
-                        ]
-                        fatal_markers = [
-                            "FATAL",
-                            "TLS ERROR",
-                            "VERIFY ERROR",
-                            "CANNOT RESOLVE",
-                            "NETWORK IS UNREACHABLE",
-                            "EXITING DUE TO FATAL ERROR",
-                            "OPTIONS ERROR",
-                            "RESOLVE:",
-                        ]
-                        if any(m in log_upper for m in auth_markers):
-                            self.log_received.emit("Authentication failed.")
-                            self._set_state(C.VpnState.AUTH_FAILED)
-                            self._emit_log_snippet()
-                            # Archive last session log into Documents
-                            self._invoke_helper_stop_for_archive()
-                            self._cleanup(error=True)
-                        elif any(m in log_upper for m in fatal_markers):
-                            self.log_received.emit("VPN startup failed. See log for details.")
-                            self._emit_log_snippet()
-                            # Archive last session log into Documents
-                            self._invoke_helper_stop_for_archive()
-                            self._cleanup(error=True)
-                        # else, keep waiting for next poll
-                    except Exception:
-                        # Log not yet available; keep waiting.
-                        pass
-                else:
-                    # Ensure archiving if any transient log exists
-                    self._invoke_helper_stop_for_archive()
-                    self._cleanup()
-
-        except Exception as e:
-            self.log_received.emit(f"Could not check VPN status: {e}")
-            self._cleanup(error=True)
-
-    def _cleanup(self, error=False):
-        self._status_timer.stop()
-        self._log_timer.stop()
-        self._process = None
-
-        if error:
-            # Preserve AUTH_FAILED state if already set
-            if self._state != C.VpnState.AUTH_FAILED:
-                self._set_state(C.VpnState.ERROR)
+            connection = active[0]
         else:
-            # If the state was DISCONNECTING, the final state should be
-            # DISCONNECTED
-            if self._state == C.VpnState.DISCONNECTING:
-                self._set_state(C.VpnState.DISCONNECTED)
-            else:
-                self._set_state(C.VpnState.DISCONNECTED)
+            connection = self.connection(config_path)
+            if connection is None or not connection.is_active():
+                self.log_received.emit(
+                    "Not currently connected or no config selected."
+                )
+                return
+        connection.stop()
 
-        self._current_config_path = None
-        self._connect_started_at = None
-        self._connected_polls = 0
+    def disconnect_all(self):
+        for connection in self.active_connections():
+            connection.stop()
 
-    # --- Internal: log tailing ---
-    def _start_log_tail(self):
-        try:
-            # Reset pointers so we stream from start of fresh log
-            self._log_file_pos = 0
-            self._log_inode = None
-            self._log_timer.start()
-        except Exception:
-            pass
+    def adopt(self, config_path):
+        """Monitor (and allow disconnecting) a tunnel another process started."""
+        self._connection(config_path).adopt()
 
-    def _poll_log_file(self):
-        log_path = C.LOG_FILE_PATH
-        try:
-            # Resolve current file status
-            st = os.stat(log_path)
-            inode = (st.st_dev, st.st_ino)
-            # Handle rotation/symlink target change or truncation
-            if self._log_inode != inode or self._log_file_pos > st.st_size:
-                self._log_inode = inode
-                self._log_file_pos = 0
-
-            # Read any new data
-            with open(log_path, "r", errors="ignore") as f:
-                f.seek(self._log_file_pos)
-                chunk = f.read(64 * 1024)
-                if chunk:
-                    self._log_file_pos = f.tell()
-                    # Emit as-is; UI will append
-                    self.log_received.emit(chunk.rstrip("\n"))
-        except FileNotFoundError:
-            # wait until helper creates the symlink/target
-            return
-        except PermissionError:
-            # If unreadable (e.g., restrictive permissions), skip silently
-            return
-        except Exception:
-            # Do not spam errors into UI; silent failure is fine here
-            return
+    def _record_timing(self, key: str, durations: Dict[str, float]):
+        if "total" in durations:
+            logger.info(
+                f"Connected {Path(key).name} in {format_duration(durations['total'])}: "
+                + ", ".join(f"{k} {format_duration(v)}" for k, v in durations.items() if k != "total")
+            )
+        elif "stop" in durations:
+            logger.info(
+                f"Disconnected {Path(key).name}: helper stop took {format_duration(durations['stop'])}"
+                + (f", {format_duration(durations['unit_stop'])} in the script" if "unit_stop" in durations else "")
+            )
+        self.timing_store.record(key, durations)
+        self.connection_timing_recorded.emit(key)
 
-    def _invoke_helper_stop_for_archive(self):
-        """Ask helper to run 'stop' to archive logs into Documents. Safe to call multiple times."""
-        try:
-            if not self._current_config_path:
-                return
-            command = [
-                "sudo",
-                "-n",
-                str(C.HELPER_SCRIPT_PATH),
-                "stop",
-                self._current_config_path.name,
-                str(C.LOG_FILE_PATH),
-            ]
-            subprocess.run(command, check=False, capture_output=True, text=True)
-        except Exception:
-            pass
+    def wait_for_pending_commands(self, timeout: float) -> bool:
+        """Block until in-flight helper commands have finished (used on quit)."""
+        return self._executor.wait_for_done(timeout)
 
-    def _start_timers_if_possible(self):
-        """Start status and log timers only if a Qt application exists.
+    # --- Shared status sweep ---
+    def _start_status_sweep_if_possible(self):
+        """Start the sweep timer only if a Qt application exists.
         This avoids crashes in unit tests or headless environments without Q(Core)Application.
         """
         try:
             if QCoreApplication.instance() is None:
+                if not self._warned_no_event_loop:
+                    self._warned_no_event_loop = True
+                    logger.warning(
+                        "No Qt application is running: connections will not be monitored "
+                        "(main.py --headless runs the manager without a window)"
+                    )
                 return
-            self._status_timer.start()
-            # start log tailing from beginning of current log file
-            self._start_log_tail()
+            if not self._status_timer.isActive():
+                self._status_timer.start()
         except Exception:
             # Never let timer issues break core logic
             pass
+
+    def check_connection_status(self):
+        """Poll the helper once for every active connection."""
+        for connection in self.active_connections():
+            connection.check_connect_timeout()
+        active = self.active_connections()
+        if not active:
+            self._status_timer.stop()
+            return
+
+        if self._executor.running_count("status"):
+            # Previous sweep still running (slow systemd, stuck daemon), even if it
+            # already timed out; a new one would only pile up behind it in the pool
+            return
+        keys = [str(c.config_path) for c in active]
+        names = [c.name for c in active]
+        self._executor.submit(
+            lambda ctx: self._run_status_sweep(names, ctx),
+            tag="status",
+            timeout=self._STATUS_CMD_TIMEOUT_SECONDS * len(names) + 2,
+            callback=lambda result: self._on_status_sweep_finished(keys, result),
+        )
+
+    def query_status(self, config_paths: Sequence) -> Dict[str, Union[str, BaseException]]:
+        """
+        The helper's status of each config ('connected', 'error' or
+        'disconnected'), or the exception that kept it from answering. Asks the
+        helper directly, so tunnels started by other processes are seen too.
+        Blocking; the GUI relies on the status sweep instead.
+        """
+        keys = [str(path) for path in config_paths]
+        outcomes = self._run_status_sweep([Path(key).name for key in keys])
+        return {
+            key: outcome if isinstance(outcome, BaseException) else outcome.stdout.strip()
+            for key, outcome in zip(keys, outcomes)
+        }
+
+    def _run_status_sweep(
+        self, names: Sequence[str], context: Optional[CommandContext] = None
+    ) -> List[Union[HelperResult, BaseException]]:
+        """Status of each config, in order; a failed query yields its exception.
+        One 'status-all' covers every config; older helpers are asked one config at a time.
+        """
+        if self._status_all_supported:
+            try:
+                result = self._run_helper(
+                    "status-all",
+                    *names,
+                    timeout=self._STATUS_CMD_TIMEOUT_SECONDS,
+                    context=context,
+                )
+            except Exception as e:
+                return [e] * len(names)
+            if result.returncode != 0:
+                logger.info("Helper has no 'status-all' command; polling configs one by one")
+                self._status_all_supported = False
+            else:
+                try:
+                    entries = parse_status_all(result.stdout)
+                except HelperError as e:
+                    logger.warning(f"Falling back to per-config status: {e}")
+                    entries = {}
+                if all(name in entries for name in names):
+                    return [HelperResult(0, entries[name]["status"] + "\n", "") for name in names]
+        outcomes = []
+        for name in names:
+            try:
+                outcomes.append(
+                    self._run_helper(
+                        "status",
+                        name,
+                        timeout=self._STATUS_CMD_TIMEOUT_SECONDS,
+                        check=True,
+                        context=context,
+                    )
+                )
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
+
+    def _on_status_sweep_finished(self, keys: List[str], command: CommandResult):
+        if command.cancelled:
+            return
+        if command.timed_out:
+            outcomes = [subprocess.TimeoutExpired("status", self._STATUS_CMD_TIMEOUT_SECONDS)] * len(keys)
+        elif command.error is not None:
+            outcomes = [command.error] * len(keys)
+        else:
+            outcomes = command.value
+        for key, outcome in zip(keys, outcomes):
+            connection = self._connections.get(key)
+            if connection is not None:
+                connection.apply_status(outcome)
+        if not self.active_connections():
+            self._status_timer.stop()
+
+    # --- Internal: helper invocation ---
+    def _use_daemon(self) -> bool:
+        return self._helper_client is not None and self._helper_client.is_available()
+
+    def _helper_env(self) -> dict:
+        """OPENVPN_PY_* overrides to forward to the helper (sudo keeps them via env_keep)."""
+        return {k: v for k, v in os.environ.items() if k.startswith("OPENVPN_PY_")}
+
+    def _run_helper(
+        self,
+        command: str,
+        *args: str,
+        timeout=None,
+        check=False,
+        context: Optional[CommandContext] = None,
+    ) -> HelperResult:
+        """Run a helper command through the daemon if it is running, otherwise via sudo.
+        With check=True a non-zero exit raises subprocess.CalledProcessError either way.
+        Blocking: call it from an executor worker and pass its CommandContext so the
+        command never outlives the executor's deadline.
+        """
+        # The script has no separate archive command: its stop branch archives the log
+        helper_command = "stop" if command == "archive" else command
+        if self._backend is not None:
+            result = self._backend.run(
+                helper_command, list(args), timeout=timeout, env=self._helper_env()
+            )
+            return self._checked(result, command, check)
+
+        if self._use_daemon():
+            wait = None
+            if context is not None:
+                context.check()
+                wait = context.remaining()
+            try:
+                result = self._helper_client.run(
+                    command, args, timeout=timeout, env=self._helper_env(), wait=wait
+                )
+                return self._checked(result, command, check)
+            except HelperUnavailableError as e:
+                logger.warning(f"Helper daemon unavailable, falling back to sudo: {e}")
+
+        command_line = ["sudo", "-n", str(C.HELPER_SCRIPT_PATH), helper_command, *args]
+        if context is not None:
+            context.check()
+            remaining = context.remaining()
+            if remaining is not None:
+                timeout = min(timeout, remaining) if timeout else remaining
+        completed = subprocess.run(
+            command_line, check=check, capture_output=True, text=True, timeout=timeout
+        )
+        return HelperResult(completed.returncode, completed.stdout, completed.stderr)
+
+    @staticmethod
+    def _checked(result: HelperResult, command: str, check: bool) -> HelperResult:
+        if check and result.returncode != 0:
+            raise subprocess.CalledProcessError(
+                result.returncode, command, result.stdout, result.stderr
+            )
+        return result
+
+    def _run_helper_start(
+        self,
+        config_path: Path,
+        log_path: Path,
+        auth_input: str,
+        context: Optional[CommandContext] = None,
+        remote_flags: Optional[Sequence[str]] = None,
+    ) -> HelperResult:
+        """Run the helper's start command, feeding credentials on stdin."""
+        if remote_flags is None:
+            remote_flags = self._remote_flags(config_path)
+        if context is not None:
+            # Only the sudo path below can be killed once started
+            context.check()
+        args = [str(config_path), str(log_path), *remote_flags]
+        if self._backend is not None:
+            return self._backend.run(
+                "start",
+                args,
+                input=auth_input,
+                timeout=self._START_CMD_TIMEOUT_SECONDS,
+                env=self._helper_env(),
+            )
+        if self._use_daemon():
+            try:
+                return self._helper_client.run(
+                    "start",
+                    args,
+                    input=auth_input,
+                    timeout=self._START_CMD_TIMEOUT_SECONDS,
+                    env=self._helper_env(),
+                )
+            except HelperUnavailableError as e:
+                logger.warning(f"Helper daemon unavailable, falling back to sudo: {e}")
+
+        process = subprocess.Popen(
+            ["sudo", "-n", str(C.HELPER_SCRIPT_PATH), "start", *args],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if context is not None:
+            context.attach_process(process)
+        try:
+            stdout, stderr = process.communicate(
+                input=auth_input, timeout=self._START_CMD_TIMEOUT_SECONDS
+            )
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise RuntimeError("Helper script timed out")
+        return HelperResult(process.returncode, stdout, stderr)
+
+    def _remote_flags(self, config_path: Path):
+        """--remote flags putting the fastest answering remotes first; empty to keep the config order."""
+        if not C.PROBE_REMOTES_BEFORE_CONNECT:
+            return []
+        try:
+            order = preferred_remote_order(load_ovpn(config_path), self._remote_prober)
+        except Exception as e:
+            logger.debug(f"Remote probing skipped for {config_path}: {e}")
+            return []
+        flags = [remote_flag(remote) for remote in order or ()]
+        if not all(REMOTE_FLAG_RE.fullmatch(flag) for flag in flags):
+            # The helper would refuse to start; let OpenVPN use the config's order
+            return []
+        return flags